@@ -0,0 +1,171 @@
+"""
+Backtest Bars Module
+Array-backed bar access for the walk-forward backtest loop
+
+run_backtest visits every bar once and does little work per bar, so pandas
+overhead used to dominate it: ``data.iloc[idx]`` built a Series for every
+bar, ``data.iloc[:idx+1]`` built a prefix frame for the pattern tracker
+on every bar, and ``data.index.get_loc`` mapped each pending signal's
+timestamp back to a position.
+
+BacktestBars extracts the columns and timestamps of the backtest data once
+and hands out lightweight stand-ins for those objects:
+
+- BarView: one bar, read like a DataFrame row (``bar['High']``, ``bar.name``)
+- DataPrefix: the bars before a position, read like ``data.iloc[:stop]``;
+  the frame is only sliced when a consumer actually reads from it
+- position(): timestamp -> bar position from a dict built once
+- range_index: one OHLCRangeIndex over all bars, shared by every prefix
+  (a prefix only asks about bars before its end)
+"""
+
+from typing import Dict, Hashable, List, Optional
+import numpy as np
+import pandas as pd
+
+from ohlc_range_index import OHLCRangeIndex
+
+
+class BacktestBars:
+    """
+    Column arrays and timestamps of a backtest DataFrame.
+
+    The arrays are a snapshot: build a new instance if the frame changes.
+    """
+
+    def __init__(self, data: pd.DataFrame):
+        """
+        Args:
+            data: OHLC DataFrame indexed by timestamp
+        """
+        self.data = data
+        self.columns: Dict[Hashable, np.ndarray] = {column: data[column].to_numpy() for column in data.columns}
+        self.timestamps: List = list(data.index)
+        self.positions: Dict[Hashable, int] = {}
+        for position, timestamp in enumerate(self.timestamps):
+            self.positions.setdefault(timestamp, position)
+        self._range_index = None
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def bar(self, idx: int) -> 'BarView':
+        """View of bar idx"""
+        return BarView(self.columns, idx, self.timestamps[idx])
+
+    def position(self, timestamp: Hashable) -> int:
+        """Position of the first bar at timestamp, like data.index.get_loc"""
+        return self.positions[timestamp]
+
+    @property
+    def range_index(self) -> OHLCRangeIndex:
+        """High/Low range index over every bar (built on first use)"""
+        if self._range_index is None:
+            self._range_index = OHLCRangeIndex(self.data)
+        return self._range_index
+
+    def prefix(self, stop: int) -> 'DataPrefix':
+        """View of bars [0, stop), like data.iloc[:stop]"""
+        return DataPrefix(self.data, stop, self)
+
+
+class BarView:
+    """
+    One bar of a BacktestBars, read like a DataFrame row.
+
+    ``bar[column]`` returns the column value and ``bar.name`` the bar's
+    timestamp, as ``data.iloc[idx]`` would.
+    """
+
+    __slots__ = ('_columns', '_idx', 'name')
+
+    def __init__(self, columns: Dict[Hashable, np.ndarray], idx: int, name):
+        self._columns = columns
+        self._idx = idx
+        self.name = name
+
+    def __getitem__(self, column: Hashable):
+        return self._columns[column][self._idx]
+
+    def __contains__(self, column: Hashable) -> bool:
+        return column in self._columns
+
+    def __repr__(self) -> str:
+        return f"BarView({self.name!r}, {self._idx})"
+
+
+class DataPrefix:
+    """
+    The first `stop` rows of a DataFrame, read like ``data.iloc[:stop]``.
+
+    len(), .columns, .empty, column access and .iloc (integer or slice
+    positions, resolved against the prefix length) are supported; anything
+    else materializes the slice. range_index is the full frame's
+    OHLCRangeIndex when the prefix comes from a BacktestBars (None
+    otherwise); queries must stay below len(prefix).
+    """
+
+    __slots__ = ('_data', '_stop', '_frame', '_bars')
+
+    def __init__(self, data: pd.DataFrame, stop: int, bars: Optional[BacktestBars] = None):
+        self._data = data
+        self._stop = min(max(stop, 0), len(data))
+        self._frame = None
+        self._bars = bars
+
+    def __len__(self) -> int:
+        return self._stop
+
+    def __reduce__(self):
+        # Never pickle the materialized slice or the bar arrays
+        return DataPrefix, (self._data, self._stop)
+
+    @property
+    def range_index(self) -> Optional[OHLCRangeIndex]:
+        return self._bars.range_index if self._bars is not None else None
+
+    @property
+    def columns(self) -> pd.Index:
+        return self._data.columns
+
+    @property
+    def empty(self) -> bool:
+        return self._stop == 0
+
+    @property
+    def iloc(self) -> '_PrefixILoc':
+        return _PrefixILoc(self._data, self._stop)
+
+    def __getitem__(self, key):
+        return self.frame()[key]
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(self.frame(), name)
+
+    def frame(self) -> pd.DataFrame:
+        """The prefix as a DataFrame (sliced on first use)"""
+        if self._frame is None:
+            self._frame = self._data.iloc[:self._stop]
+        return self._frame
+
+
+class _PrefixILoc:
+    """Positional indexer of a DataPrefix"""
+
+    __slots__ = ('_data', '_stop')
+
+    def __init__(self, data: pd.DataFrame, stop: int):
+        self._data = data
+        self._stop = stop
+
+    def __getitem__(self, key):
+        if isinstance(key, slice) and key.step in (None, 1):
+            start, stop, _ = key.indices(self._stop)
+            return self._data.iloc[start:stop]
+        if isinstance(key, (int, np.integer)):
+            if not -self._stop <= key < self._stop:
+                raise IndexError("single positional indexer is out-of-bounds")
+            return self._data.iloc[key % self._stop]
+        return self._data.iloc[:self._stop].iloc[key]
@@ -0,0 +1,192 @@
+"""
+Backtest Checkpoint Module
+Snapshots of walk-forward backtest state for resuming long runs
+
+A full-history backtest on a low timeframe can run for hours. The
+backtester periodically writes its state (pattern tracker, signals and
+trades, Fibonacci trackers, extremum state and the next bar to process)
+to a checkpoint file so a crashed or cancelled run can resume from the
+last snapshot, and a finished run can be extended when new candles arrive.
+
+File format: a 12-byte header (magic, format version, code manifest
+size), the code manifest, then a zlib-compressed pickle. Objects
+registered as shared (the backtest DataFrame) are written as references
+and re-bound on load, so a checkpoint never contains a copy of the price
+data. Files are written to a temporary name and moved into place, so an
+interrupted write leaves the previous checkpoint intact.
+
+The code manifest (JSON) holds a checksum of the source of every project
+module whose classes the pickle contains. A checkpoint written by other
+code is refused instead of being unpickled into objects whose attributes
+no longer match their classes.
+
+Each checkpoint records a fingerprint of the bars already processed;
+resuming on data whose first bars differ (e.g. a different symbol or
+re-downloaded candles) is refused.
+"""
+
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Optional
+import importlib.util
+import io
+import json
+import os
+import pickle
+import struct
+import sys
+import zlib
+import pandas as pd
+
+from exceptions import CheckpointError
+
+
+CHECKPOINT_MAGIC = b'HMBT'
+CHECKPOINT_VERSION = 2
+_HEADER = struct.Struct('<4sI')  # magic, format version
+_MANIFEST_SIZE = struct.Struct('<I')
+
+# Only modules of this project go into the code manifest; library upgrades
+# that break a pickle surface as unpickling errors instead
+_PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# What unpickling stale or damaged bytes raises
+_UNPICKLING_ERRORS = (pickle.UnpicklingError, AttributeError, EOFError, ImportError,
+                      IndexError, KeyError, TypeError, ValueError)
+
+
+class _CheckpointPickler(pickle.Pickler):
+    """Pickler that writes shared objects as references"""
+
+    def __init__(self, file, shared: Dict[str, Any]):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self._shared_ids = {id(obj): key for key, obj in shared.items()}
+        self.modules = set()  # Modules of the classes pickled
+
+    def persistent_id(self, obj):
+        return self._shared_ids.get(id(obj))
+
+    def reducer_override(self, obj):
+        owner = obj if isinstance(obj, type) else type(obj)
+        self.modules.add(owner.__module__)
+        return NotImplemented
+
+
+class _CheckpointUnpickler(pickle.Unpickler):
+    """Unpickler that re-binds references written by _CheckpointPickler"""
+
+    def __init__(self, file, shared: Dict[str, Any]):
+        super().__init__(file)
+        self._shared = shared
+
+    def persistent_load(self, pid):
+        if pid not in self._shared:
+            raise CheckpointError(f"Checkpoint references unknown shared object '{pid}'")
+        return self._shared[pid]
+
+
+@lru_cache(maxsize=None)
+def _source_checksum(path: str) -> str:
+    with open(path, 'rb') as f:
+        return f"{zlib.crc32(f.read()):08x}"
+
+
+def _module_source(name: str) -> Optional[str]:
+    """Source file of a module (imported or importable), None if there is none"""
+    module = sys.modules.get(name)
+    if module is not None:
+        path = getattr(module, '__file__', None)
+    else:
+        try:
+            spec = importlib.util.find_spec(name)
+        except (ImportError, ValueError):
+            spec = None
+        path = spec.origin if spec is not None and spec.has_location else None
+    return os.path.abspath(path) if path else None
+
+
+def code_manifest(module_names: Iterable[str]) -> Dict[str, str]:
+    """Source checksum of each of the named modules that belongs to this project"""
+    manifest = {}
+    for name in sorted(set(module_names)):
+        path = _module_source(name)
+        if path is not None and path.startswith(_PROJECT_DIR + os.sep):
+            manifest[name] = _source_checksum(path)
+    return manifest
+
+
+def data_fingerprint(data: pd.DataFrame, n_bars: int) -> str:
+    """Hash of the index and values of the first n_bars rows of data"""
+    hashes = pd.util.hash_pandas_object(data.iloc[:n_bars], index=True).to_numpy()
+    return f"{n_bars}:{zlib.crc32(hashes.tobytes()):08x}"
+
+
+def save_checkpoint(path: str, state: Dict[str, Any], shared: Optional[Dict[str, Any]] = None):
+    """
+    Write a checkpoint atomically.
+
+    Args:
+        path: Checkpoint file path
+        state: Picklable state
+        shared: Key -> object written as a reference instead of by value
+    """
+    buffer = io.BytesIO()
+    pickler = _CheckpointPickler(buffer, shared or {})
+    pickler.dump(state)
+    manifest = json.dumps(code_manifest(pickler.modules)).encode()
+    payload = (_HEADER.pack(CHECKPOINT_MAGIC, CHECKPOINT_VERSION) + _MANIFEST_SIZE.pack(len(manifest))
+               + manifest + zlib.compress(buffer.getvalue(), 6))
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def load_checkpoint(path: str, shared: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Read a checkpoint written by save_checkpoint.
+
+    Args:
+        path: Checkpoint file path
+        shared: Key -> object to bind the references to (same keys as when saving)
+
+    Returns:
+        The saved state
+
+    Raises:
+        CheckpointError: If the file is not a checkpoint of this format
+            version, was written by other code or cannot be unpickled
+    """
+    with open(path, 'rb') as f:
+        payload = f.read()
+
+    if len(payload) < _HEADER.size:
+        raise CheckpointError(f"{path} is not a backtest checkpoint")
+    magic, version = _HEADER.unpack_from(payload)
+    if magic != CHECKPOINT_MAGIC:
+        raise CheckpointError(f"{path} is not a backtest checkpoint")
+    if version != CHECKPOINT_VERSION:
+        raise CheckpointError(f"{path} has checkpoint version {version}, expected {CHECKPOINT_VERSION}")
+
+    start = _HEADER.size + _MANIFEST_SIZE.size
+    if len(payload) < start:
+        raise CheckpointError(f"{path} is corrupt: truncated header")
+    (manifest_size,) = _MANIFEST_SIZE.unpack_from(payload, _HEADER.size)
+    try:
+        manifest = json.loads(payload[start:start + manifest_size])
+        stale = [name for name, checksum in manifest.items() if code_manifest([name]).get(name) != checksum]
+    except (ValueError, AttributeError) as e:
+        raise CheckpointError(f"{path} is corrupt: {e}") from e
+    if stale:
+        raise CheckpointError(f"{path} was written by a different version of {', '.join(stale)}")
+
+    try:
+        raw = zlib.decompress(payload[start + manifest_size:])
+    except zlib.error as e:
+        raise CheckpointError(f"{path} is corrupt: {e}") from e
+    try:
+        return _CheckpointUnpickler(io.BytesIO(raw), shared or {}).load()
+    except _UNPICKLING_ERRORS as e:
+        raise CheckpointError(f"{path} could not be unpickled: {e!r}") from e
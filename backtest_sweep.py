@@ -0,0 +1,282 @@
+"""
+Backtest Sweep Module
+Parameter-sweep backtesting across worker processes
+
+Runs OptimizedWalkForwardBacktester once per (dataset, parameter set) pair
+of a grid, without the GUI:
+
+- Every dataset's OHLC columns are copied into one shared-memory block;
+  each worker attaches to it once at start-up instead of receiving
+  pickled frames with every job
+- Jobs run in a process pool on all cores and their BacktestStatistics
+  are streamed back as they finish
+- Results are collected into one table (one row per job)
+
+Usage:
+    python backtest_sweep.py btcusdt_1d.csv ethusdt_1d.csv \\
+        --extremum-length 1 2 3 --detection-interval 1 --output sweep.csv
+"""
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import fields
+from typing import Callable, Dict, List, Optional, Union
+import argparse
+import contextlib
+import io
+import itertools
+import os
+import time
+import pandas as pd
+
+from shared_frames import SharedArrays, attach_shared_arrays, encode_frame, decode_frame
+
+
+# Per-process state set up once by _init_sweep_worker
+_sweep_state = {}
+
+
+def parameter_grid(grid: Dict[str, List]) -> List[Dict]:
+    """
+    Expand a parameter grid into one dict per combination.
+
+    Args:
+        grid: Parameter name -> list of values
+
+    Returns:
+        Parameter dicts in itertools.product order (last parameter varies fastest)
+    """
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+
+def load_ohlc_csv(path: str) -> pd.DataFrame:
+    """
+    Load an OHLC CSV (time,open,high,low,close,volume) as the backtester expects it.
+
+    Column names are capitalized and the Date/Time column becomes the
+    index, named 'Date' as in run_optimized_backtest.
+    """
+    df = pd.read_csv(path)
+    df.columns = df.columns.str.capitalize()
+    df.rename(columns={'Time': 'Date'}, inplace=True)
+
+    if 'Date' in df.columns:
+        df['Date'] = pd.to_datetime(df['Date'])
+        df.set_index('Date', inplace=True)
+
+    return df
+
+
+def statistics_row(stats) -> Dict:
+    """Scalar fields of a BacktestStatistics (curves and breakdowns are dropped)"""
+    return {
+        f.name: getattr(stats, f.name) for f in fields(stats)
+        if isinstance(getattr(stats, f.name), (int, float, bool))
+    }
+
+
+def _run_backtest_job(data: pd.DataFrame, params: Dict, quiet: bool) -> Dict:
+    """Run one backtest and return its statistics row"""
+    from optimized_walk_forward_backtester import OptimizedWalkForwardBacktester
+
+    start = time.time()
+    try:
+        backtester = OptimizedWalkForwardBacktester(data=data, **params)
+        # run_backtest prints its summaries; keep worker output readable
+        with contextlib.redirect_stdout(io.StringIO()) if quiet else contextlib.nullcontext():
+            stats = backtester.run_backtest()
+        row = statistics_row(stats)
+        row['error'] = ''
+    except Exception as e:
+        row = {'error': str(e)}
+    row['time_taken'] = time.time() - start
+    return row
+
+
+def _init_sweep_worker(shm_name: str, layout: List, frame_specs: Dict[str, Dict]):
+    """Process pool initializer: attach the shared block and rebuild every dataset once"""
+    shm, arrays = attach_shared_arrays(shm_name, layout)
+    _sweep_state['shm'] = shm
+    _sweep_state['datasets'] = {}
+    for pos, (name, spec) in enumerate(frame_specs.items()):
+        prefix = f'd{pos}/'
+        frame_arrays = {key[len(prefix):]: array for key, array in arrays.items() if key.startswith(prefix)}
+        _sweep_state['datasets'][name] = decode_frame(frame_arrays, spec)
+
+
+def _sweep_job(dataset: str, params: Dict) -> Dict:
+    """Worker task: run one backtest on a shared dataset"""
+    return _run_backtest_job(_sweep_state['datasets'][dataset], params, quiet=True)
+
+
+class BacktestSweep:
+    """
+    Run a grid of backtests over one or more datasets in a process pool.
+
+    Every (dataset, parameter set) pair is one job. Jobs share the
+    read-only OHLC columns through shared memory, run independently (a
+    failing job reports its error in its row and does not stop the sweep)
+    and are reported in completion order.
+    """
+
+    def __init__(
+        self,
+        datasets: Dict[str, Union[pd.DataFrame, str]],
+        grid: Dict[str, List],
+        base_params: Optional[Dict] = None,
+        max_workers: Optional[int] = None,
+        mp_context=None
+    ):
+        """
+        Initialize the sweep.
+
+        Args:
+            datasets: Dataset name (e.g. symbol) -> OHLC DataFrame or CSV path
+            grid: Backtester parameter name -> values to try
+                Example: {'extremum_length': [1, 2, 3], 'detection_interval': [1, 5]}
+            base_params: Backtester parameters shared by every job
+            max_workers: Number of worker processes (default: os.cpu_count())
+            mp_context: Optional multiprocessing context for the pool
+        """
+        self.datasets = {
+            name: load_ohlc_csv(data) if isinstance(data, (str, os.PathLike)) else data
+            for name, data in datasets.items()
+        }
+        self.grid = grid
+        self.base_params = base_params or {}
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.mp_context = mp_context
+
+    def jobs(self) -> List[tuple]:
+        """(dataset name, backtester parameters) for every job, in submission order"""
+        return [
+            (name, {**self.base_params, **params})
+            for name in self.datasets
+            for params in parameter_grid(self.grid)
+        ]
+
+    def run(self, result_callback: Optional[Callable[[Dict], None]] = None) -> pd.DataFrame:
+        """
+        Run every job.
+
+        Args:
+            result_callback: Optional callback(row) called as each job finishes
+
+        Returns:
+            DataFrame with one row per job: dataset, the swept parameters,
+            the scalar BacktestStatistics fields and an error column
+            (empty when the job succeeded), in submission order
+        """
+        jobs = self.jobs()
+        rows: List[Optional[Dict]] = [None] * len(jobs)
+
+        def collect(job_idx: int, stats_row: Dict):
+            dataset, params = jobs[job_idx]
+            row = {'dataset': dataset, **{name: params[name] for name in self.grid}, **stats_row}
+            rows[job_idx] = row
+            if result_callback:
+                result_callback(row)
+
+        if self.max_workers <= 1 or len(jobs) <= 1:
+            for job_idx, (dataset, params) in enumerate(jobs):
+                collect(job_idx, _run_backtest_job(self.datasets[dataset], params, quiet=False))
+            return pd.DataFrame(rows)
+
+        arrays = {}
+        frame_specs = {}
+        for pos, (name, df) in enumerate(self.datasets.items()):
+            frame_arrays, frame_specs[name] = encode_frame(df)
+            arrays.update({f'd{pos}/{key}': array for key, array in frame_arrays.items()})
+
+        shared = SharedArrays(arrays)
+        try:
+            with ProcessPoolExecutor(
+                max_workers=min(self.max_workers, len(jobs)),
+                mp_context=self.mp_context,
+                initializer=_init_sweep_worker,
+                initargs=(shared.name, shared.layout, frame_specs)
+            ) as executor:
+                futures = {
+                    executor.submit(_sweep_job, dataset, params): job_idx
+                    for job_idx, (dataset, params) in enumerate(jobs)
+                }
+                for future in as_completed(futures):
+                    try:
+                        stats_row = future.result()
+                    except Exception as e:  # Worker crashed or result could not be returned
+                        stats_row = {'error': str(e)}
+                    collect(futures[future], stats_row)
+        finally:
+            shared.close()
+
+        return pd.DataFrame(rows)
+
+
+def run_backtest_sweep(
+    datasets: Dict[str, Union[pd.DataFrame, str]],
+    grid: Dict[str, List],
+    base_params: Optional[Dict] = None,
+    max_workers: Optional[int] = None,
+    result_callback: Optional[Callable[[Dict], None]] = None
+) -> pd.DataFrame:
+    """
+    Convenience function to run a parameter sweep.
+
+    Args:
+        datasets: Dataset name -> OHLC DataFrame or CSV path
+        grid: Backtester parameter name -> values to try
+        base_params: Backtester parameters shared by every job
+        max_workers: Number of worker processes (default: os.cpu_count())
+        result_callback: Optional callback(row) called as each job finishes
+
+    Returns:
+        Results table, one row per job
+    """
+    sweep = BacktestSweep(datasets, grid, base_params=base_params, max_workers=max_workers)
+    return sweep.run(result_callback=result_callback)
+
+
+def _parse_bool(value: str) -> bool:
+    return value.lower() in ('1', 'true', 'yes', 'on')
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Run a walk-forward backtest parameter sweep")
+    parser.add_argument('csv_files', nargs='+', help="OHLC CSV files (one dataset each)")
+    parser.add_argument('--extremum-length', type=int, nargs='+', default=[1])
+    parser.add_argument('--detection-interval', type=int, nargs='+', default=[1])
+    parser.add_argument('--future-buffer', type=int, nargs='+', default=[5])
+    parser.add_argument('--validate-d-crossing', type=_parse_bool, nargs='+', default=[False])
+    parser.add_argument('--incremental', action='store_true', help="Use incremental detection")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument('--output', default='backtest_sweep_results.csv', help="Results CSV")
+    args = parser.parse_args(argv)
+
+    grid = {
+        'extremum_length': args.extremum_length,
+        'detection_interval': args.detection_interval,
+        'future_buffer': args.future_buffer,
+        'validate_d_crossing_during_tracking': args.validate_d_crossing,
+    }
+    datasets = {os.path.splitext(os.path.basename(path))[0]: path for path in args.csv_files}
+
+    def report(row: Dict):
+        status = f"error: {row['error']}" if row.get('error') else (
+            f"return={row.get('total_return', 0):.2%} trades={row.get('total_trades', 0)} "
+            f"success={row.get('patterns_success', 0)}"
+        )
+        params = ', '.join(f"{name}={row[name]}" for name in grid)
+        print(f"{row['dataset']} [{params}] {status} ({row['time_taken']:.1f}s)")
+
+    results = run_backtest_sweep(
+        datasets, grid,
+        base_params={'incremental_detection': args.incremental},
+        max_workers=args.workers,
+        result_callback=report
+    )
+    results.to_csv(args.output, index=False)
+    print(f"\nResults for {len(results)} backtests exported to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -16,9 +16,13 @@ from pyqtgraph import PlotWidget, mkPen, mkBrush
 import pandas as pd
 import numpy as np
 import os
+import zlib
 from datetime import datetime
 from PyQt6.QtGui import QFont, QColor
 from optimized_walk_forward_backtester import OptimizedWalkForwardBacktester
+from backtest_checkpoint import data_fingerprint
+from exceptions import CheckpointError
+from pattern_replay import PatternReplayEngine
 from enhanced_excel_export import (
     create_enhanced_pattern_details,
     create_fibonacci_analysis_sheet,
@@ -159,7 +163,24 @@ class BacktestThread(QThread):
             )
 
             self.message.emit("Running backtest simulation...")
-            stats = self.backtester.run_backtest(progress_callback=self.progress.emit)
+            # With a checkpoint path, a crashed or stopped run resumes from its
+            # last checkpoint, and a finished one only walks newly added bars
+            checkpoint_path = self.params.get('checkpoint_path')
+            resume = bool(checkpoint_path) and self.params.get('resume_from_checkpoint', False)
+            try:
+                stats = self.backtester.run_backtest(
+                    progress_callback=self.progress.emit,
+                    checkpoint_path=checkpoint_path,
+                    resume=resume
+                )
+            except CheckpointError as e:
+                if not resume:
+                    raise
+                self.message.emit(f"Checkpoint not usable ({e}), starting from the first bar...")
+                stats = self.backtester.run_backtest(
+                    progress_callback=self.progress.emit,
+                    checkpoint_path=checkpoint_path
+                )
 
             self.message.emit("Backtest completed!")
 
@@ -233,6 +254,44 @@ class BacktestThread(QThread):
             self.error.emit(error_details)
 
 
+class PatternReplayThread(QThread):
+    """Thread for replaying patterns after D without blocking GUI"""
+    progress = pyqtSignal(int)
+    finished = pyqtSignal(list)
+    error = pyqtSignal(str)
+
+    def __init__(self, engine, jobs):
+        """
+        Args:
+            engine: PatternReplayEngine to replay on
+            jobs: List of (engine method name, args) tuples
+        """
+        super().__init__()
+        self.engine = engine
+        self.jobs = jobs
+
+    def run(self):
+        try:
+            # One result per job, in order; a failed job yields its exception
+            # and an interrupted run yields the results computed so far
+            results = []
+            for idx, (method, args) in enumerate(self.jobs):
+                if self.isInterruptionRequested():
+                    break
+                try:
+                    results.append(getattr(self.engine, method)(*args))
+                except Exception as e:
+                    results.append(e)
+                self.progress.emit(idx + 1)
+
+            self.finished.emit(results)
+
+        except Exception as e:
+            import traceback
+            error_details = f"{str(e)}\n\nTraceback:\n{traceback.format_exc()}"
+            self.error.emit(error_details)
+
+
 class BacktestingDialog(QDialog):
     """Dialog for configuring and running backtests"""
 
@@ -242,6 +301,9 @@ class BacktestingDialog(QDialog):
         self.data = data  # This might be filtered data from the main window
         self.full_data = None  # Will store the full dataset
         self.backtest_thread = None
+        self.replay_thread = None
+        self.replay_engine = None  # Cached pattern replays for the last backtest's data
+        self.replay_engine_data = None
         self.setWindowTitle("Harmonic Pattern Backtesting")
         self.setModal(False)  # Allow interaction with main window
 
@@ -521,6 +583,19 @@ class BacktestingDialog(QDialog):
         row2.addWidget(self.detection_interval_spin)
         params_layout.addLayout(row2)
 
+        # Row 3: Checkpointing
+        self.resume_checkbox = QCheckBox("Resume from checkpoint")
+        self.resume_checkbox.setChecked(True)
+        self.resume_checkbox.setToolTip(
+            "<b>Checkpoints</b><br>"
+            "Every run saves its progress to backtest_results/checkpoints<br>"
+            "(one file per date range start and parameter set).<br>"
+            "When checked, a stopped or crashed run continues from its<br>"
+            "last checkpoint, and a finished run only processes new bars.<br>"
+            "Uncheck to always start from the first bar."
+        )
+        params_layout.addWidget(self.resume_checkbox)
+
         # Hidden parameters with default values (for compatibility with existing code)
         self.capital_spin = QSpinBox()
         self.capital_spin.setValue(10000)
@@ -931,6 +1006,11 @@ class BacktestingDialog(QDialog):
             'detection_interval': self.detection_interval_spin.value(),
             'extremum_length': self.extremum_length_spin.value()  # Add extremum length
         }
+        params['checkpoint_path'] = self.checkpointPath(data_to_use, params)
+        params['resume_from_checkpoint'] = self.resume_checkbox.isChecked()
+        if (params['checkpoint_path'] and params['resume_from_checkpoint']
+                and os.path.exists(params['checkpoint_path'])):
+            self.results_text.append(f"Resuming from checkpoint {params['checkpoint_path']}\n")
 
         # Create and start backtest thread
         self.backtest_thread = BacktestThread(data_to_use, params)
@@ -950,6 +1030,17 @@ class BacktestingDialog(QDialog):
         # Start backtest
         self.backtest_thread.start()
 
+    def checkpointPath(self, data, params):
+        """Checkpoint file for a run: one per parameter set and first bar of the data"""
+        if data.empty:
+            return None
+        checkpoint_dir = os.path.join("backtest_results", "checkpoints")
+        os.makedirs(checkpoint_dir, exist_ok=True)
+        # Runs whose data starts at the same bar with the same settings share a
+        # checkpoint, so a longer date range extends the shorter run
+        key = zlib.crc32(f"{sorted(params.items())}|{data_fingerprint(data, 1)}".encode())
+        return os.path.join(checkpoint_dir, f"backtest_{data.index[0]:%Y%m%d_%H%M}_{key:08x}.ckpt")
+
     def stopBacktest(self):
         """Stop the running backtest"""
         if self.backtest_thread and self.backtest_thread.isRunning():
@@ -2267,6 +2358,56 @@ class BacktestingDialog(QDialog):
             # Redraw current chart with/without Harmonic Points
             self.generateAndDisplayChart()
 
+    def getReplayEngine(self):
+        """Pattern replay engine for the last backtest's data (replays are cached across analyses)"""
+        data = self.last_backtester.data
+        if self.replay_engine is None or self.replay_engine_data is not data:
+            self.replay_engine = PatternReplayEngine.from_data(data)
+            self.replay_engine_data = data
+        return self.replay_engine
+
+    def runPatternReplays(self, jobs, label, title, on_finished):
+        """
+        Run pattern replay jobs on a worker thread behind a progress dialog.
+
+        Args:
+            jobs: List of (PatternReplayEngine method name, args) tuples
+            label, title: Progress dialog text
+            on_finished: Called with the list of results, one per job (only
+                the jobs completed before Cancel was pressed)
+        """
+        from PyQt6.QtWidgets import QProgressDialog
+
+        if self.replay_thread and self.replay_thread.isRunning():
+            QMessageBox.warning(self, "Analysis Running", "An analysis is already running. Please wait for it to finish.")
+            return
+
+        progress = QProgressDialog(label, "Cancel", 0, len(jobs), self)
+        progress.setWindowTitle(title)
+        progress.setWindowModality(Qt.WindowModality.WindowModal)
+        progress.setMinimumDuration(0)
+        progress.show()
+
+        self.replay_thread = PatternReplayThread(self.getReplayEngine(), jobs)
+
+        def handleFinished(results):
+            progress.setValue(len(jobs))  # Closes the dialog
+            self.replay_thread.deleteLater()
+            self.replay_thread = None
+            on_finished(results)
+
+        def handleError(error_msg):
+            progress.reset()
+            self.replay_thread.deleteLater()
+            self.replay_thread = None
+            QMessageBox.critical(self, "Analysis Error", f"Pattern replay failed:\n\n{error_msg}")
+
+        self.replay_thread.progress.connect(progress.setValue)
+        self.replay_thread.finished.connect(handleFinished)
+        self.replay_thread.error.connect(handleError)
+        progress.canceled.connect(self.replay_thread.requestInterruption)
+        self.replay_thread.start()
+
     def runFibonacciAnalysis(self):
         """Analyze Fibonacci level touches for current loaded patterns"""
         from PyQt6.QtWidgets import QDialog, QVBoxLayout, QTextEdit, QPushButton, QProgressDialog, QMessageBox
@@ -2318,31 +2459,16 @@ class BacktestingDialog(QDialog):
             QMessageBox.warning(self, "No Patterns", "No successfully completed patterns available to analyze.")
             return
 
-        # Show progress dialog
-        progress = QProgressDialog("Computing Fibonacci analysis...", "Cancel", 0, len(patterns_to_analyze), self)
-        progress.setWindowTitle("Fibonacci Analysis")
-        progress.setWindowModality(Qt.WindowModality.WindowModal)
-        progress.show()
-
-        # Initialize tracking
+        # Collect the patterns to replay
         fib_percentages = [0, 23.6, 38.2, 50, 61.8, 78.6, 88.6, 100, 112.8, 127.2, 141.4, 161.8]
-        fib_stats = {f"{pct}%": {'touched': 0, 'total_candles': 0, 'touches': []} for pct in fib_percentages}
-        total_patterns_analyzed = 0
-
-        # Track individual pattern results
-        individual_pattern_results = []
+        replayed_patterns = []  # (idx, pattern_id, tracked_pattern) per replay job
+        jobs = []
 
         print(f"\n🔍 Starting Fibonacci analysis on {len(patterns_to_analyze)} patterns")
         print(f"   Category: {category_name}")
         print(f"   Tracker available: {tracker is not None}")
 
-        # Analyze each pattern
         for idx, pattern_dict in enumerate(patterns_to_analyze):
-            if progress.wasCanceled():
-                break
-
-            progress.setValue(idx)
-
             try:
                 # Get pattern data
                 tracked_pattern = pattern_dict.get('tracked_pattern')
@@ -2353,8 +2479,9 @@ class BacktestingDialog(QDialog):
                 points = pattern_dict.get('points', {})
                 pattern_id = pattern_dict.get('pattern_id')
 
-                # Get A, C, D prices
+                # Get A, B, C, D prices
                 a_price = points.get('A', {}).get('price') if 'A' in points else None
+                b_price = points.get('B', {}).get('price') if 'B' in points else None
                 c_price = points.get('C', {}).get('price') if 'C' in points else None
 
                 # Get D price (formed pattern or zone_entry_price for unformed)
@@ -2368,30 +2495,7 @@ class BacktestingDialog(QDialog):
                     print(f"⚠️ Pattern {idx}: Missing price data - A:{a_price}, C:{c_price}, D:{d_price}")
                     continue
 
-                # Determine direction (same logic as chart drawing)
-                is_bullish = a_price > c_price  # A > C = bullish
-
-                # Calculate Fibonacci levels
-                # For BULLISH: 0% at C/A (low), 100% at D (high) - measures upward extension
-                # For BEARISH: 0% at D (high), 100% at C/A (low) - measures downward retracement
-                if is_bullish:
-                    start_price = max(a_price, c_price)  # 0% at swing high (C or A)
-                    end_price = d_price  # 100% at D (higher)
-                    price_range = end_price - start_price
-                else:
-                    # BEARISH: Retracement FROM D back down
-                    start_price = d_price  # 0% at D (the high where pattern completed)
-                    end_price = min(a_price, c_price)  # 100% back to swing low (C or A)
-                    price_range = end_price - start_price  # Negative range for bearish
-
-                # Calculate Fibonacci levels
-                fib_levels = {}
-                for pct in fib_percentages:
-                    level_price = start_price + (price_range * pct / 100.0)
-                    fib_levels[f"{pct}%"] = level_price
-
-                # Get data after D point (when pattern completes)
-                # This gives us maximum candles for analysis
+                # Get D bar (when pattern completes) - analysis starts there
                 d_bar = tracked_pattern.zone_entry_bar if tracked_pattern.zone_entry_bar else None
                 if not d_bar:
                     # Fallback to actual D point if available
@@ -2403,54 +2507,40 @@ class BacktestingDialog(QDialog):
                         print(f"  ⚠️ No D bar found!")
                         continue
 
-                display_data = backtest_data.iloc[d_bar:].copy().reset_index(drop=True)
+                replayed_patterns.append((idx, pattern_id, tracked_pattern))
+                jobs.append(('replay_levels', (d_bar, a_price, b_price, c_price, d_price)))
+
+            except Exception as e:
+                print(f"❌ Error analyzing pattern {idx}: {e}")
+                import traceback
+                traceback.print_exc()
+                continue
+
+        def finishFibonacciAnalysis(replays):
+            fib_stats = {f"{pct}%": {'touched': 0, 'total_candles': 0, 'touches': []} for pct in fib_percentages}
+            total_patterns_analyzed = 0
 
-                if display_data.empty:
+            # Track individual pattern results
+            individual_pattern_results = []
+
+            for (idx, pattern_id, tracked_pattern), replay in zip(replayed_patterns, replays):
+                if isinstance(replay, Exception):
+                    print(f"❌ Error analyzing pattern {idx}: {replay}")
+                    continue
+                if replay is None:
                     print(f"  ⚠️ No data after formation!")
                     continue
 
-                # Track how many times price crosses each Fibonacci level (for this pattern)
+                # Touches are counted up to the first candle touching 161.8% (pattern completion)
+                if replay.completed:
+                    print(f"    🎯 161.8% Fib hit at candle {replay.stop - 1} - Pattern COMPLETED, stopping analysis")
+
+                level_touches = replay.touch_counts()
                 pattern_fib_crosses = {f"{pct}%": 0 for pct in fib_percentages}
                 total_crosses = 0
-                pattern_completed = False  # Flag to mark pattern as completed when 161.8% hit
-
-                # Check if 161.8% level is hit first (pattern completion condition)
-                level_161_8 = fib_levels.get('161.8%')
-                stop_at_candle = len(display_data)  # Default: analyze all candles
-
-                if level_161_8:
-                    # Find first candle that touches 161.8% level
-                    for candle_idx in range(len(display_data)):
-                        candle = display_data.iloc[candle_idx]
-                        # Check if candle touched 161.8% (low <= level <= high)
-                        if candle['Low'] <= level_161_8 <= candle['High']:
-                            stop_at_candle = candle_idx + 1  # Include this candle
-                            pattern_completed = True
-                            print(f"    🎯 161.8% Fib hit at candle {candle_idx} - Pattern COMPLETED, stopping analysis")
-                            break
-
-                for level_name, level_price in fib_levels.items():
-                    # Stop at 161.8%
-                    if float(level_name.rstrip('%')) > 161.8:
-                        break
-
-                    # Track touches: count every time candle wick touches the level
-                    touches = 0
-                    touch_details = []  # Store touch info for debug
-
-                    # Only analyze up to stop_at_candle (either all candles or where 161.8% was hit)
-                    for candle_idx in range(min(stop_at_candle, len(display_data))):
-                        candle = display_data.iloc[candle_idx]
-
-                        # Check if candle touched this level (low <= level <= high)
-                        if candle['Low'] <= level_price <= candle['High']:
-                            touches += 1
-                            touch_details.append({
-                                'candle': candle_idx,
-                                'low': candle['Low'],
-                                'high': candle['High'],
-                                'close': candle['Close']
-                            })
+
+                for level_name in pattern_fib_crosses:
+                    touches = level_touches[level_name]
 
                     # Update stats for this level
                     if touches > 0:
@@ -2473,21 +2563,15 @@ class BacktestingDialog(QDialog):
 
                 total_patterns_analyzed += 1
 
-            except Exception as e:
-                print(f"❌ Error analyzing pattern {idx}: {e}")
-                import traceback
-                traceback.print_exc()
-                continue
-
-        progress.setValue(len(patterns_to_analyze))
+            print(f"\n📊 Analysis complete: {total_patterns_analyzed} patterns analyzed")
 
-        print(f"\n📊 Analysis complete: {total_patterns_analyzed} patterns analyzed")
+            # Save statistics to database for Active Trading Signals
+            self.saveFibonacciStatistics(fib_stats, total_patterns_analyzed, individual_pattern_results)
 
-        # Save statistics to database for Active Trading Signals
-        self.saveFibonacciStatistics(fib_stats, total_patterns_analyzed, individual_pattern_results)
+            # Generate results display
+            self.showFibonacciAnalysisResults(fib_stats, total_patterns_analyzed, individual_pattern_results, category_name)
 
-        # Generate results display
-        self.showFibonacciAnalysisResults(fib_stats, total_patterns_analyzed, individual_pattern_results, category_name)
+        self.runPatternReplays(jobs, "Computing Fibonacci analysis...", "Fibonacci Analysis", finishFibonacciAnalysis)
 
     def saveFibonacciStatistics(self, fib_stats, total_patterns, individual_results):
         """Save Fibonacci analysis statistics to database for use in Active Trading Signals"""
@@ -2686,7 +2770,7 @@ class BacktestingDialog(QDialog):
 
     def runHarmonicPointsAnalysis(self):
         """Analyze how many times harmonic pattern points A, B, C are touched after point D"""
-        from PyQt6.QtWidgets import QProgressDialog, QMessageBox
+        from PyQt6.QtWidgets import QMessageBox
         from PyQt6.QtCore import Qt
 
         # Check if a category is selected
@@ -2725,39 +2809,15 @@ class BacktestingDialog(QDialog):
             QMessageBox.warning(self, "No Patterns", "No successfully completed patterns available to analyze.")
             return
 
-        # Show progress dialog
-        progress = QProgressDialog("Computing Harmonic Points analysis...", "Cancel", 0, len(patterns_to_analyze), self)
-        progress.setWindowTitle("Harmonic Points Analysis")
-        progress.setWindowModality(Qt.WindowModality.WindowModal)
-        progress.show()
-
-        # Initialize tracking for points A, B, C (separate for bullish and bearish)
-        points_stats = {
-            'bullish': {
-                'A': {'touched': 0, 'total_touches': 0, 'touches': []},
-                'B': {'touched': 0, 'total_touches': 0, 'touches': []},
-                'C': {'touched': 0, 'total_touches': 0, 'touches': []}
-            },
-            'bearish': {
-                'A': {'touched': 0, 'total_touches': 0, 'touches': []},
-                'B': {'touched': 0, 'total_touches': 0, 'touches': []},
-                'C': {'touched': 0, 'total_touches': 0, 'touches': []}
-            }
-        }
-        total_patterns_analyzed = {'bullish': 0, 'bearish': 0}
-        individual_pattern_results = []
+        # Collect the patterns to replay
+        replayed_patterns = []  # (idx, pattern_id, tracked_pattern, direction) per replay job
+        jobs = []
 
         print(f"\n🔍 Starting Harmonic Points analysis on {len(patterns_to_analyze)} patterns")
         print(f"   Category: {category_name}")
         print(f"   Tracker available: {tracker is not None}")
 
-        # Analyze each pattern
         for idx, pattern_dict in enumerate(patterns_to_analyze):
-            if progress.wasCanceled():
-                break
-
-            progress.setValue(idx)
-
             try:
                 tracked_pattern = pattern_dict.get('tracked_pattern')
                 if not tracked_pattern:
@@ -2788,19 +2848,7 @@ class BacktestingDialog(QDialog):
                 is_bullish = a_price > c_price
                 direction = 'bullish' if is_bullish else 'bearish'
 
-                # Calculate 161.8% Fibonacci level to stop analysis
-                if is_bullish:
-                    start_price = max(a_price, c_price)
-                    end_price = d_price
-                    price_range = end_price - start_price
-                else:
-                    start_price = d_price
-                    end_price = min(a_price, c_price)
-                    price_range = end_price - start_price
-
-                fib_161_8 = start_price + (price_range * 161.8 / 100.0)
-
-                # Get data after D point
+                # Get D bar - analysis starts there
                 d_bar = tracked_pattern.zone_entry_bar if tracked_pattern.zone_entry_bar else None
                 if not d_bar:
                     if 'D' in points and 'index' in points['D']:
@@ -2811,34 +2859,48 @@ class BacktestingDialog(QDialog):
                         print(f"  ⚠️ No D bar found!")
                         continue
 
-                display_data = backtest_data.iloc[d_bar:].copy().reset_index(drop=True)
+                replayed_patterns.append((idx, pattern_id, tracked_pattern, direction))
+                jobs.append(('replay_levels', (d_bar, a_price, b_price, c_price, d_price)))
+
+            except Exception as e:
+                print(f"❌ Error analyzing pattern {idx}: {e}")
+                import traceback
+                traceback.print_exc()
+                continue
+
+        def finishHarmonicPointsAnalysis(replays):
+            # Initialize tracking for points A, B, C (separate for bullish and bearish)
+            points_stats = {
+                'bullish': {
+                    'A': {'touched': 0, 'total_touches': 0, 'touches': []},
+                    'B': {'touched': 0, 'total_touches': 0, 'touches': []},
+                    'C': {'touched': 0, 'total_touches': 0, 'touches': []}
+                },
+                'bearish': {
+                    'A': {'touched': 0, 'total_touches': 0, 'touches': []},
+                    'B': {'touched': 0, 'total_touches': 0, 'touches': []},
+                    'C': {'touched': 0, 'total_touches': 0, 'touches': []}
+                }
+            }
+            total_patterns_analyzed = {'bullish': 0, 'bearish': 0}
+            individual_pattern_results = []
 
-                if display_data.empty:
+            for (idx, pattern_id, tracked_pattern, direction), replay in zip(replayed_patterns, replays):
+                if isinstance(replay, Exception):
+                    print(f"❌ Error analyzing pattern {idx}: {replay}")
+                    continue
+                if replay is None:
                     print(f"  ⚠️ No data after D point!")
                     continue
 
-                # Find where 161.8% Fib is hit to stop analysis
-                stop_at_candle = len(display_data)
-                for candle_idx in range(len(display_data)):
-                    candle = display_data.iloc[candle_idx]
-                    if candle['Low'] <= fib_161_8 <= candle['High']:
-                        stop_at_candle = candle_idx + 1
-                        break
-
-                # Track point touches (count ALL touches, not just first)
-                # IMPORTANT: Start counting from candle AFTER D point (skip the D bar itself)
+                # Point touches (ALL touches, not just first) up to the 161.8% Fib candle
+                # IMPORTANT: Counting starts from the candle AFTER D point (skip the D bar itself)
+                point_touches = replay.touch_counts(skip_d_bar=True)
                 pattern_point_touches = {'A': 0, 'B': 0, 'C': 0}
                 total_touches = 0
 
-                for point_name, point_price in [('A', a_price), ('B', b_price), ('C', c_price)]:
-                    touches = 0
-
-                    # Start from index 1 to skip the D bar itself
-                    for candle_idx in range(1, min(stop_at_candle, len(display_data))):
-                        candle = display_data.iloc[candle_idx]
-                        # Check if candle touched this point level (Low <= level <= High)
-                        if candle['Low'] <= point_price <= candle['High']:
-                            touches += 1
+                for point_name in pattern_point_touches:
+                    touches = point_touches[point_name]
 
                     if touches > 0:
                         # Update direction-specific stats
@@ -2862,22 +2924,17 @@ class BacktestingDialog(QDialog):
 
                 total_patterns_analyzed[direction] += 1
 
-            except Exception as e:
-                print(f"❌ Error analyzing pattern {idx}: {e}")
-                import traceback
-                traceback.print_exc()
-                continue
-
-        progress.setValue(len(patterns_to_analyze))
+            total_analyzed = total_patterns_analyzed['bullish'] + total_patterns_analyzed['bearish']
+            print(f"\n📊 Analysis complete: {total_analyzed} patterns analyzed ({total_patterns_analyzed['bullish']} bullish, {total_patterns_analyzed['bearish']} bearish)")
 
-        total_analyzed = total_patterns_analyzed['bullish'] + total_patterns_analyzed['bearish']
-        print(f"\n📊 Analysis complete: {total_analyzed} patterns analyzed ({total_patterns_analyzed['bullish']} bullish, {total_patterns_analyzed['bearish']} bearish)")
+            # Save statistics to database for Active Trading Signals
+            self.saveHarmonicPointsStatistics(points_stats, total_patterns_analyzed, individual_pattern_results)
 
-        # Save statistics to database for Active Trading Signals
-        self.saveHarmonicPointsStatistics(points_stats, total_patterns_analyzed, individual_pattern_results)
+            # Generate results display
+            self.showHarmonicPointsAnalysisResults(points_stats, total_patterns_analyzed, individual_pattern_results, category_name)
 
-        # Generate results display
-        self.showHarmonicPointsAnalysisResults(points_stats, total_patterns_analyzed, individual_pattern_results, category_name)
+        self.runPatternReplays(jobs, "Computing Harmonic Points analysis...", "Harmonic Points Analysis",
+                               finishHarmonicPointsAnalysis)
 
     def saveHarmonicPointsStatistics(self, points_stats, total_patterns, individual_results):
         """Save Harmonic Points analysis statistics to database for use in Active Trading Signals"""
@@ -3283,8 +3340,6 @@ class BacktestingDialog(QDialog):
         - Leverage: 1x
         - Long for bullish, Short for bearish
         """
-        from PyQt6.QtWidgets import QProgressDialog
-
         if not hasattr(self, 'last_backtester') or not self.last_backtester:
             QMessageBox.warning(self, "No Data", "Please run backtest first")
             return
@@ -3313,22 +3368,14 @@ class BacktestingDialog(QDialog):
             QMessageBox.warning(self, "No Successful Patterns", status_msg)
             return
 
-        # Progress dialog
-        progress = QProgressDialog("Calculating Enhanced PnL...", "Cancel", 0, len(successful_patterns), self)
-        progress.setWindowModality(Qt.WindowModality.WindowModal)
-        progress.setMinimumDuration(0)
-
         backtest_data = self.last_backtester.data
         tracker = self.last_backtester.pattern_tracker
 
-        results = []
+        replayed_trades = []  # (idx, pattern_id, pattern_dict, entry_price, d_bar, is_bullish, stop_loss, candidates)
+        jobs = []
         skipped_reasons = {}  # Track why patterns are skipped
 
         for idx, pattern_dict in enumerate(successful_patterns):
-            progress.setValue(idx)
-            if progress.wasCanceled():
-                break
-
             try:
                 pattern_id = pattern_dict.get('pattern_id')
                 if not pattern_id:
@@ -3424,81 +3471,69 @@ class BacktestingDialog(QDialog):
                     skipped_reasons['no_tp_candidates'] = skipped_reasons.get('no_tp_candidates', 0) + 1
                     continue
 
-                # Track all TPs and SL hits
-                display_data = backtest_data.iloc[d_bar:].copy().reset_index(drop=True)
+                replayed_trades.append((idx, pattern_id, pattern_dict, entry_price, d_bar, is_bullish, stop_loss, all_candidates))
+                jobs.append(('replay_trade', (d_bar, entry_price, stop_loss, is_bullish, [c[2] for c in all_candidates])))
+
+            except Exception as e:
+                print(f"Error calculating enhanced PnL for pattern {idx}: {e}")
+                continue
+
+        def finishEnhancedPnLAnalysis(replays):
+            position_size = 100  # $100 per trade
+            leverage = 1  # 1x leverage
 
-                position_size = 100  # $100 per trade
-                leverage = 1  # 1x leverage
+            results = []
+
+            for trade, replay in zip(replayed_trades, replays):
+                idx, pattern_id, pattern_dict, entry_price, d_bar, is_bullish, stop_loss, all_candidates = trade
+                if isinstance(replay, Exception):
+                    print(f"Error calculating enhanced PnL for pattern {idx}: {replay}")
+                    continue
 
+                # TPs hit after D (SL moved to entry after TP1), in hit order
                 tp_hits = []  # List of {tp_num, tp_name, tp_price, tp_bar, bars_to_tp, profit_usd, profit_pct}
-                sl_hit = False
-                sl_hit_bar = None
-                remaining_candidates = all_candidates.copy()
-                current_sl = stop_loss
-
-                # Scan through candles after D
-                for candle_idx in range(1, len(display_data)):
-                    candle = display_data.iloc[candle_idx]
+                for candidate_idx, candle_idx in replay.tp_hits:
+                    candidate_type, candidate_name, candidate_price = all_candidates[candidate_idx]
                     current_bar = d_bar + candle_idx
+                    tp_num = len(tp_hits) + 1
+                    tp_name = f"{candidate_type} {candidate_name}"
 
-                    # Check if SL hit first
+                    # Calculate profit for this TP
                     if is_bullish:
-                        if candle['Low'] <= current_sl:
-                            sl_hit = True
-                            sl_hit_bar = current_bar
-                            break
+                        price_change_percent = ((candidate_price - entry_price) / entry_price) * 100
                     else:
-                        if candle['High'] >= current_sl:
-                            sl_hit = True
-                            sl_hit_bar = current_bar
-                            break
-
-                    # Check if any TP level hit
-                    for candidate_type, candidate_name, candidate_price in remaining_candidates:
-                        if candle['Low'] <= candidate_price <= candle['High']:
-                            tp_num = len(tp_hits) + 1
-                            tp_name = f"{candidate_type} {candidate_name}"
-
-                            # Calculate profit for this TP
-                            if is_bullish:
-                                price_change_percent = ((candidate_price - entry_price) / entry_price) * 100
-                            else:
-                                price_change_percent = ((entry_price - candidate_price) / entry_price) * 100
-
-                            # TP1: 25%, TP2+: 10% each
-                            position_pct = 0.25 if tp_num == 1 else 0.10
-                            profit_percent = price_change_percent * leverage * position_pct
-                            profit_usd = (position_size * profit_percent) / 100
-
-                            tp_hits.append({
-                                'tp_num': tp_num,
-                                'tp_name': tp_name,
-                                'tp_price': candidate_price,
-                                'tp_bar': current_bar,
-                                'bars_to_tp': current_bar - d_bar,
-                                'profit_usd': profit_usd,
-                                'profit_pct': profit_percent,
-                                'position_pct': position_pct * 100
-                            })
-
-                            # After TP1, move SL to entry
-                            if tp_num == 1:
-                                current_sl = entry_price
-
-                            # Remove this candidate
-                            remaining_candidates.remove((candidate_type, candidate_name, candidate_price))
-                            break
+                        price_change_percent = ((entry_price - candidate_price) / entry_price) * 100
+
+                    # TP1: 25%, TP2+: 10% each
+                    position_pct = 0.25 if tp_num == 1 else 0.10
+                    profit_percent = price_change_percent * leverage * position_pct
+                    profit_usd = (position_size * profit_percent) / 100
+
+                    tp_hits.append({
+                        'tp_num': tp_num,
+                        'tp_name': tp_name,
+                        'tp_price': candidate_price,
+                        'tp_bar': current_bar,
+                        'bars_to_tp': current_bar - d_bar,
+                        'profit_usd': profit_usd,
+                        'profit_pct': profit_percent,
+                        'position_pct': position_pct * 100
+                    })
+
+                sl_hit = replay.sl_hit_offset is not None
+                sl_hit_bar = d_bar + replay.sl_hit_offset if sl_hit else None
 
                 # Mark as pending if no outcome yet (neither TP nor SL hit)
                 is_pending = not tp_hits and not sl_hit
 
                 if is_pending:
                     # Log pending pattern
+                    display_data = backtest_data.iloc[d_bar:]
                     print(f"\n⏳ Pattern {pattern_id} - Pending (no TP or SL hit yet):")
                     print(f"   Entry: ${entry_price:.2f} at bar {d_bar}")
                     print(f"   Direction: {'Bullish' if is_bullish else 'Bearish'}")
                     print(f"   TP Candidates ({len(all_candidates)}): {[(c[1], f'${c[2]:.2f}') for c in all_candidates[:5]]}")
-                    print(f"   Candles after D: {len(display_data) - 1}")
+                    print(f"   Candles after D: {replay.candles}")
                     if len(display_data) > 1:
                         print(f"   Price range after D: ${display_data['Low'].min():.2f} - ${display_data['High'].max():.2f}")
                     print(f"   Status: Will update when price hits TP or SL")
@@ -3573,36 +3608,34 @@ class BacktestingDialog(QDialog):
                     'tp_hits': tp_hits,
                     'total_profit_usd': total_profit_usd,
                     'num_tps_hit': len(tp_hits),
+                    'mfe_pct': replay.mfe_pct,
+                    'mae_pct': replay.mae_pct,
                     'status': status,
                     'is_pending': is_pending
                 }
 
                 results.append(result)
 
-            except Exception as e:
-                print(f"Error calculating enhanced PnL for pattern {idx}: {e}")
-                continue
-
-        progress.setValue(len(successful_patterns))
-
-        if not results:
-            # Show detailed error message with skip reasons
-            error_msg = f"Could not calculate PnL for any successful patterns.\n\n"
-            error_msg += f"Analyzed {len(successful_patterns)} successful patterns, but all were skipped.\n\n"
-            error_msg += "Skip reasons:\n"
-            for reason, count in skipped_reasons.items():
-                error_msg += f"  • {reason}: {count} patterns\n"
-
-            error_msg += "\nPossible solutions:\n"
-            error_msg += "  • Ensure patterns have D point data\n"
-            error_msg += "  • Verify Fibonacci levels or harmonic points exist\n"
-            error_msg += "  • Check that price moved beyond entry after pattern formed\n"
+            if not results:
+                # Show detailed error message with skip reasons
+                error_msg = f"Could not calculate PnL for any successful patterns.\n\n"
+                error_msg += f"Analyzed {len(successful_patterns)} successful patterns, but all were skipped.\n\n"
+                error_msg += "Skip reasons:\n"
+                for reason, count in skipped_reasons.items():
+                    error_msg += f"  • {reason}: {count} patterns\n"
+
+                error_msg += "\nPossible solutions:\n"
+                error_msg += "  • Ensure patterns have D point data\n"
+                error_msg += "  • Verify Fibonacci levels or harmonic points exist\n"
+                error_msg += "  • Check that price moved beyond entry after pattern formed\n"
+
+                QMessageBox.information(self, "No Results", error_msg)
+                return
 
-            QMessageBox.information(self, "No Results", error_msg)
-            return
+            # Show results
+            self.showEnhancedPnLResults(results)
 
-        # Show results
-        self.showEnhancedPnLResults(results)
+        self.runPatternReplays(jobs, "Calculating Enhanced PnL...", "Enhanced PnL Analysis", finishEnhancedPnLAnalysis)
 
     def showEnhancedPnLResults(self, results):
         """Display Enhanced PnL Analysis Results with multiple TPs and SL tracking"""
@@ -123,6 +123,17 @@ class InvalidAlertError(AlertError):
     pass
 
 
+# Backtest exceptions
+class BacktestError(HarmonicPatternError):
+    """Base class for backtesting errors"""
+    pass
+
+
+class CheckpointError(BacktestError):
+    """Raised when a backtest checkpoint cannot be read or does not match the run"""
+    pass
+
+
 # Utility functions for error handling
 def format_error_message(error: Exception, context: str = "") -> str:
     """
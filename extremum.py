@@ -1,11 +1,16 @@
 """
 Extremum point detection for harmonic patterns.
 Detects ALL high and low points without filtering to ensure maximum pattern coverage.
+
+Extremum points are (timestamp, price, is_high, bar_index) tuples. ExtremumArray
+holds the same points as contiguous columns; every detector accepts either form.
 """
 
-from typing import List, Tuple
+from collections import deque
+from typing import List, Optional, Sequence, Tuple, Union
 import pandas as pd
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 
 
 def detect_extremum_points(df: pd.DataFrame, length: int = 1) -> List[Tuple]:
@@ -25,51 +30,311 @@ def detect_extremum_points(df: pd.DataFrame, length: int = 1) -> List[Tuple]:
         where is_high is True for high points, False for low points
         and bar_index is the position in the DataFrame
     """
+    return list(detect_extremum_array(df, length).points)
+
+
+class ExtremumStream:
+    """
+    Streaming extremum detection for data that grows one bar at a time.
+
+    A pivot at bar i needs `length` bars on each side, so it is confirmed
+    when bar i + length arrives. append() returns only the pivots confirmed
+    by the new bar; over a whole DataFrame the confirmed points are the same
+    as detect_extremum_points(df, length).
+    """
+
+    def __init__(self, length: int = 1):
+        """
+        Args:
+            length: Look-back/forward window for detecting pivots (default 1)
+        """
+        self.length = length
+        self.window = 2 * length + 1
+        self.bar_count = 0
+        self.points: List[Tuple] = []
+
+        # Only the last 2*length+1 bars are needed to confirm the next pivot
+        self._highs = deque(maxlen=self.window)
+        self._lows = deque(maxlen=self.window)
+        self._timestamps = deque(maxlen=self.window)
+
+    def append(self, bar, timestamp=None) -> List[Tuple]:
+        """
+        Add one bar and return the extremum points it confirms.
+
+        Args:
+            bar: Mapping with 'High'/'Low' (or 'high'/'low') values, e.g. a DataFrame row
+            timestamp: Bar timestamp (defaults to bar.name for DataFrame rows)
+
+        Returns:
+            List of newly confirmed (timestamp, price, is_high, bar_index) tuples
+        """
+        high = bar['High'] if 'High' in bar else bar['high']
+        low = bar['Low'] if 'Low' in bar else bar['low']
+        if timestamp is None:
+            timestamp = getattr(bar, 'name', self.bar_count)
+        return self._push(high, low, timestamp)
+
+    def extend(self, df: pd.DataFrame) -> List[Tuple]:
+        """
+        Add all bars of a DataFrame and return the extremum points they confirm.
+
+        Timestamps follow detect_extremum_points (index values for a DatetimeIndex).
+        """
+        high_col = 'High' if 'High' in df.columns else 'high'
+        low_col = 'Low' if 'Low' in df.columns else 'low'
+        highs = df[high_col].values
+        lows = df[low_col].values
+        timestamps = df.index.values if isinstance(df.index, pd.DatetimeIndex) else df.index
+
+        confirmed = []
+        for i in range(len(df)):
+            confirmed.extend(self._push(highs[i], lows[i], timestamps[i]))
+        return confirmed
+
+    def _push(self, high, low, timestamp) -> List[Tuple]:
+        self._highs.append(high)
+        self._lows.append(low)
+        self._timestamps.append(timestamp)
+        self.bar_count += 1
+
+        if len(self._highs) < self.window:
+            return []
+
+        # Centre of the window is the bar being confirmed
+        centre = self.length
+        highs = np.array(self._highs, dtype=float)
+        lows = np.array(self._lows, dtype=float)
+        bar_index = self.bar_count - 1 - self.length
+
+        confirmed = []
+        if highs[centre] >= highs.max():
+            confirmed.append((self._timestamps[centre], self._highs[centre], True, bar_index))
+        if lows[centre] <= lows.min():
+            confirmed.append((self._timestamps[centre], self._lows[centre], False, bar_index))
+
+        self.points.extend(confirmed)
+        return confirmed
+
+
+class ExtremumArray:
+    """
+    Columnar extremum points: contiguous bar_idx (int32), price (float64),
+    is_high (bool) and ts (int64) arrays.
+
+    Behaves as a read-only sequence of (timestamp, price, is_high, bar_index)
+    tuples, so it can be passed wherever a list of extremum tuples is
+    expected. Slicing returns a zero-copy ExtremumArray view; `highs`/`lows`
+    are precomputed sub-views of each extremum type.
+
+    Timestamps are stored as int64 (nanoseconds for datetimes, the value
+    itself for integer indices, a code into a value table otherwise) so
+    equal timestamps compare equal as integers; tuples decode them back.
+    """
+
+    def __init__(self, bar_idx, price, is_high, ts, ts_kind: str = 'int',
+                 ts_values: Optional[list] = None):
+        """
+        Args:
+            bar_idx: Bar index of each point
+            price: Price of each point
+            is_high: True for high points, False for low points
+            ts: int64 timestamp column (see ts_kind)
+            ts_kind: 'datetime64', 'timestamp', 'int' or 'object'
+            ts_values: Value table for ts_kind='object' (ts holds codes into it)
+        """
+        self.bar_idx = np.asarray(bar_idx, dtype=np.int32)
+        self.price = np.asarray(price, dtype=np.float64)
+        self.is_high = np.asarray(is_high, dtype=bool)
+        self.ts = np.asarray(ts, dtype=np.int64)
+        self.ts_kind = ts_kind
+        self._ts_values = ts_values
+
+        self.high_positions = np.flatnonzero(self.is_high)
+        self.low_positions = np.flatnonzero(~self.is_high)
+        self._points = None
+        self._sub_views = {}
+
+    @classmethod
+    def from_points(cls, extremum_points: Union['ExtremumArray', Sequence[Tuple]]) -> 'ExtremumArray':
+        """
+        Build from (timestamp, price, is_high[, bar_index]) tuples.
+
+        Points without a bar index use their position. An ExtremumArray is
+        returned unchanged.
+        """
+        if isinstance(extremum_points, cls):
+            return extremum_points
+
+        bar_idx = [point[3] if len(point) > 3 else pos for pos, point in enumerate(extremum_points)]
+        price = [point[1] for point in extremum_points]
+        is_high = [bool(point[2]) for point in extremum_points]
+        ts, ts_kind, ts_values = _encode_timestamps([point[0] for point in extremum_points])
+        array = cls(bar_idx, price, is_high, ts, ts_kind, ts_values)
+        array._points = [tuple(point[:4]) if len(point) > 3 else (*point, pos)
+                         for pos, point in enumerate(extremum_points)]
+        return array
+
+    def __len__(self) -> int:
+        return len(self.price)
+
+    def __getitem__(self, key):
+        if isinstance(key, (slice, np.ndarray)):
+            # Slices are zero-copy views; index/boolean arrays select rows
+            return self._view(key)
+        return self.points[key]
+
+    def __iter__(self):
+        return iter(self.points)
+
+    def __repr__(self) -> str:
+        return f"ExtremumArray({len(self)} points, {len(self.high_positions)} highs)"
+
+    def _view(self, index) -> 'ExtremumArray':
+        return ExtremumArray(self.bar_idx[index], self.price[index], self.is_high[index],
+                             self.ts[index], self.ts_kind, self._ts_values)
+
+    @property
+    def points(self) -> List[Tuple]:
+        """(timestamp, price, is_high, bar_index) tuples, built once and cached."""
+        if self._points is None:
+            self._points = list(zip(self.timestamps(), self.price.tolist(),
+                                    self.is_high.tolist(), self.bar_idx.tolist()))
+        return self._points
+
+    @property
+    def highs(self) -> 'ExtremumArray':
+        """High points only (positions in self.high_positions)."""
+        return self._sub_view(True)
+
+    @property
+    def lows(self) -> 'ExtremumArray':
+        """Low points only (positions in self.low_positions)."""
+        return self._sub_view(False)
+
+    def _sub_view(self, is_high: bool) -> 'ExtremumArray':
+        view = self._sub_views.get(is_high)
+        if view is None:
+            view = self._view(self.high_positions if is_high else self.low_positions)
+            self._sub_views[is_high] = view
+        return view
+
+    def timestamps(self) -> list:
+        """Decoded timestamp of every point."""
+        if self.ts_kind == 'datetime64':
+            return list(self.ts.view('datetime64[ns]'))
+        if self.ts_kind == 'timestamp':
+            return list(pd.to_datetime(self.ts))
+        if self.ts_kind == 'object':
+            return [self._ts_values[code] for code in self.ts.tolist()]
+        return self.ts.tolist()
+
+    def bar_rows(self, is_high: bool) -> List[Tuple]:
+        """(bar_index, timestamp, price) tuples of one extremum type, in order."""
+        view = self._sub_view(is_high)
+        return list(zip(view.bar_idx.tolist(), view.timestamps(), view.price.tolist()))
+
+    def with_timestamps(self, ts, ts_kind: Optional[str] = None) -> 'ExtremumArray':
+        """
+        Same points with a different timestamp column (columns are shared).
+
+        Args:
+            ts: New timestamps, one per point (datetime64 values, integers, ...)
+            ts_kind: Encoding of ts if it is already an int64 column
+        """
+        if ts_kind is None:
+            ts, ts_kind, ts_values = _encode_timestamps(ts)
+        else:
+            ts_values = None
+        return ExtremumArray(self.bar_idx, self.price, self.is_high, ts, ts_kind, ts_values)
+
+    def with_bar_timestamps(self) -> 'ExtremumArray':
+        """Same points with the bar index as timestamp: (bar_index, price, is_high, bar_index)."""
+        return self.with_timestamps(self.bar_idx.astype(np.int64), ts_kind='int')
+
+
+def _encode_timestamps(timestamps) -> Tuple[np.ndarray, str, Optional[list]]:
+    """Encode timestamps as an int64 column plus the kind needed to decode them."""
+    if isinstance(timestamps, np.ndarray) and timestamps.dtype.kind == 'M':
+        return timestamps.astype('datetime64[ns]').view(np.int64), 'datetime64', None
+    if isinstance(timestamps, np.ndarray) and timestamps.dtype.kind in 'iu':
+        return timestamps.astype(np.int64), 'int', None
+
+    timestamps = list(timestamps)
+    if all(isinstance(value, np.datetime64) for value in timestamps):
+        return (np.array(timestamps, dtype='datetime64[ns]').view(np.int64).reshape(len(timestamps)),
+                'datetime64', None)
+    if all(isinstance(value, pd.Timestamp) and value.tz is None for value in timestamps):
+        return np.array([value.value for value in timestamps], dtype=np.int64), 'timestamp', None
+    if all(isinstance(value, (int, np.integer)) and not isinstance(value, bool) for value in timestamps):
+        return np.array(timestamps, dtype=np.int64), 'int', None
+
+    codes = {}
+    values = []
+    for value in timestamps:
+        if value not in codes:
+            codes[value] = len(values)
+            values.append(value)
+    return np.array([codes[value] for value in timestamps], dtype=np.int64), 'object', values
+
+
+def as_extremum_tuples(extremum_points: Union[ExtremumArray, Sequence[Tuple]]) -> Sequence[Tuple]:
+    """
+    Tuple form of extremum points for tuple-indexing detector loops.
+
+    Lists are returned unchanged; an ExtremumArray returns its cached tuples.
+    """
+    if isinstance(extremum_points, ExtremumArray):
+        return extremum_points.points
+    return extremum_points
+
+
+def detect_extremum_array(df: pd.DataFrame, length: int = 1) -> ExtremumArray:
+    """
+    Columnar detect_extremum_points: the same points, as an ExtremumArray.
 
-    extremum_points = []
+    Args:
+        df: DataFrame with OHLC data (must have 'High' and 'Low' columns)
+        length: Look-back/forward window for detecting pivots (default 1)
 
-    # Convert to numpy arrays for faster processing
-    # Handle both capitalized and lowercase column names
+    Returns:
+        ExtremumArray whose tuples equal detect_extremum_points(df, length)
+    """
     high_col = 'High' if 'High' in df.columns else 'high'
     low_col = 'Low' if 'Low' in df.columns else 'low'
-    highs = df[high_col].values
-    lows = df[low_col].values
-    timestamps = df.index.values if isinstance(df.index, pd.DatetimeIndex) else df.index
+    highs = df[high_col].to_numpy(dtype=float)
+    lows = df[low_col].to_numpy(dtype=float)
+    timestamps = df.index.values if isinstance(df.index, pd.DatetimeIndex) else np.asarray(df.index)
     n = len(df)
 
-    # Detect ALL high and low pivots
-    for i in range(length, n - length):
-        # Use numpy operations for window comparisons
-        left_window = slice(i-length, i)
-        right_window = slice(i+1, i+length+1)
-
-        # Check for high pivot - a local maximum
-        is_high_pivot = (
-            highs[i] >= np.max(highs[left_window]) and
-            highs[i] >= np.max(highs[right_window])
-        )
-
-        # Check for low pivot - a local minimum
-        is_low_pivot = (
-            lows[i] <= np.min(lows[left_window]) and
-            lows[i] <= np.min(lows[right_window])
-        )
-
-        # Add BOTH high and low pivots if they exist
-        # This ensures we capture ALL extremum points
-        # Unlike GUI which chooses one, we keep both to allow pattern detection flexibility
-        if is_high_pivot:
-            extremum_points.append((timestamps[i], highs[i], True, i))
-
-        # Add low pivot separately (not elif) to capture both if they exist on same candle
-        if is_low_pivot:
-            extremum_points.append((timestamps[i], lows[i], False, i))
-
-    # Sort by date
-    extremum_points.sort(key=lambda x: x[0])
-
-    # Count highs and lows for reporting
-    high_count = sum(1 for _, _, is_high, _ in extremum_points if is_high)
-    low_count = len(extremum_points) - high_count
-
-    return extremum_points
\ No newline at end of file
+    window = 2 * length + 1
+    if n < window:
+        return ExtremumArray.from_points([])
+
+    # Sliding window max/min over [i-length, i+length] for every bar i in
+    # range(length, n - length). A bar is a pivot when it equals its window
+    # extreme (NaN anywhere in the window means no pivot, as with np.max/np.min)
+    window_highs = sliding_window_view(highs, window).max(axis=1)
+    window_lows = sliding_window_view(lows, window).min(axis=1)
+    bars = np.arange(length, n - length)
+    is_high_pivot = highs[length:n - length] >= window_highs
+    is_low_pivot = lows[length:n - length] <= window_lows
+
+    # BOTH high and low pivots are kept (unlike the GUI, which chooses one)
+    # to allow pattern detection flexibility: high before low when both
+    # exist on the same candle, then a stable sort by timestamp
+    bar_idx = np.concatenate([bars[is_high_pivot], bars[is_low_pivot]])
+    point_is_high = np.concatenate([np.ones(is_high_pivot.sum(), dtype=bool),
+                                    np.zeros(is_low_pivot.sum(), dtype=bool)])
+    order = np.lexsort((~point_is_high, bar_idx))
+    bar_idx, point_is_high = bar_idx[order], point_is_high[order]
+    price = np.where(point_is_high, highs[bar_idx], lows[bar_idx])
+
+    ts, ts_kind, ts_values = _encode_timestamps(timestamps[bar_idx])
+    if ts_kind == 'object':
+        # Codes follow first appearance, not value order
+        order = np.array(sorted(range(len(ts)), key=lambda pos: ts_values[ts[pos]]), dtype=np.int64)
+    else:
+        order = np.argsort(ts, kind='stable')
+    bar_idx, price, point_is_high, ts = bar_idx[order], price[order], point_is_high[order], ts[order]
+    return ExtremumArray(bar_idx, price, point_is_high, ts, ts_kind, ts_values)
@@ -0,0 +1,181 @@
+"""
+Fibonacci Level Table Module
+Array-backed per-bar level checks for formed-pattern Fibonacci analysis
+
+After a pattern forms, the backtester follows it bar by bar: it stops
+tracking once price crosses D or breaks the PRZ, and otherwise records
+every Fibonacci / harmonic structure level the bar touches. Doing that
+with a Python loop over every tracked pattern and every level makes the
+analysis the slowest optional part of a backtest.
+
+FibLevelTable keeps one row per tracked pattern (level prices padded with
+NaN to a common width, plus direction, D price and PRZ bounds) and
+evaluates a bar with a handful of NumPy masks:
+
+- D crossed: low < D for bullish patterns, high > D for bearish ones
+- PRZ broken: low < PRZ min for bullish patterns, high > PRZ max for
+  bearish ones (only checked for rows whose D was not crossed)
+- Touch: low <= level <= high, classified as "body" if open/close
+  straddle the level, else "high" or "low" by the nearer wick end
+
+Rows that cross D or break the PRZ are removed; touches are returned
+grouped by pattern, in level order, so they can be appended in bulk.
+"""
+
+from typing import Dict, Hashable, List, Tuple
+import numpy as np
+
+
+TOUCH_TYPES = ('body', 'high', 'low')
+
+
+class FibLevelTable:
+    """
+    Table of (pattern x level) prices checked against one bar at a time.
+
+    Row order is not stable: removing a row moves the last row into its
+    place.
+    """
+
+    def __init__(self):
+        self.ids: List[Hashable] = []
+        self._rows: Dict[Hashable, int] = {}
+        self._level_items: List[List[Tuple[str, float]]] = []  # Per row: (name, price) in level order
+        self._levels = np.empty((0, 0), dtype=float)
+        self._is_bullish = np.empty(0, dtype=bool)
+        self._d_price = np.empty(0, dtype=float)
+        self._prz_min = np.empty(0, dtype=float)
+        self._prz_max = np.empty(0, dtype=float)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._rows
+
+    def add(self, key: Hashable, levels: Dict[str, float], is_bullish: bool,
+            d_price: float, prz_min: float, prz_max: float):
+        """
+        Start tracking a pattern.
+
+        Args:
+            key: Pattern ID
+            levels: Level name -> price, in the order touches are reported
+            is_bullish: Pattern direction
+            d_price: D point price (crossing it ends tracking)
+            prz_min, prz_max: PRZ bounds (breaking them ends tracking)
+        """
+        if key in self._rows:
+            self.remove(key)
+
+        row = len(self.ids)
+        width = max(len(levels), self._levels.shape[1])
+        capacity = self._levels.shape[0]
+        if row == capacity or width > self._levels.shape[1]:
+            self._grow(max(2 * capacity, 16) if row == capacity else capacity, width)
+
+        self.ids.append(key)
+        self._rows[key] = row
+        self._level_items.append(list(levels.items()))
+        self._levels[row] = np.nan
+        self._levels[row, :len(levels)] = [_as_price(price) for price in levels.values()]
+        self._is_bullish[row] = bool(is_bullish)
+        self._d_price[row] = _as_price(d_price)
+        self._prz_min[row] = _as_price(prz_min)
+        self._prz_max[row] = _as_price(prz_max)
+
+    def remove(self, key: Hashable):
+        """Stop tracking a pattern (no-op for unknown keys)"""
+        row = self._rows.pop(key, None)
+        if row is None:
+            return
+        last = len(self.ids) - 1
+        if row != last:
+            moved = self.ids[last]
+            self.ids[row] = moved
+            self._rows[moved] = row
+            self._level_items[row] = self._level_items[last]
+            for column in (self._levels, self._is_bullish, self._d_price, self._prz_min, self._prz_max):
+                column[row] = column[last]
+        self.ids.pop()
+        self._level_items.pop()
+
+    def clear(self):
+        """Stop tracking every pattern"""
+        self.__init__()
+
+    def update(self, high: float, low: float, open_price: float, close_price: float,
+               check_d_cross: bool = True
+               ) -> Tuple[List[Hashable], List[Hashable], List[Tuple[Hashable, List[Tuple[str, float, str]]]]]:
+        """
+        Check one bar against every tracked pattern.
+
+        Args:
+            high, low, open_price, close_price: The bar's prices
+            check_d_cross: Whether crossing D ends tracking
+
+        Returns:
+            (d_crossed, prz_broken, touches): IDs of patterns whose D was
+            crossed, IDs of patterns whose PRZ was broken (both are removed
+            from the table), and for every other pattern touched this bar,
+            (pattern ID, [(level name, level price, touch type), ...])
+        """
+        n = len(self.ids)
+        if n == 0:
+            return [], [], []
+
+        is_bullish = self._is_bullish[:n]
+        if check_d_cross:
+            d_crossed = np.where(is_bullish, low < self._d_price[:n], high > self._d_price[:n])
+        else:
+            d_crossed = np.zeros(n, dtype=bool)
+        prz_broken = ~d_crossed & np.where(is_bullish, low < self._prz_min[:n], high > self._prz_max[:n])
+        tracking = ~(d_crossed | prz_broken)
+
+        levels = self._levels[:n]
+        touched = (low <= levels) & (levels <= high) & tracking[:, None]
+        touches = []
+        if touched.any():
+            rows, cols = np.nonzero(touched)  # Row-major: levels in order within a row
+            touched_levels = levels[rows, cols]
+            body = (((open_price <= touched_levels) & (touched_levels <= close_price)) |
+                    ((close_price <= touched_levels) & (touched_levels <= open_price)))
+            near_high = np.abs(high - touched_levels) < np.abs(low - touched_levels)
+            type_codes = np.where(body, 0, np.where(near_high, 1, 2))
+
+            rows, cols, type_codes = rows.tolist(), cols.tolist(), type_codes.tolist()
+            start = 0
+            while start < len(rows):
+                row = rows[start]
+                stop = start + 1
+                while stop < len(rows) and rows[stop] == row:
+                    stop += 1
+                level_items = self._level_items[row]
+                touches.append((self.ids[row], [
+                    (*level_items[col], TOUCH_TYPES[code])
+                    for col, code in zip(cols[start:stop], type_codes[start:stop])
+                ]))
+                start = stop
+
+        d_crossed_ids = [self.ids[row] for row in np.flatnonzero(d_crossed).tolist()]
+        prz_broken_ids = [self.ids[row] for row in np.flatnonzero(prz_broken).tolist()]
+        for key in d_crossed_ids + prz_broken_ids:
+            self.remove(key)
+        return d_crossed_ids, prz_broken_ids, touches
+
+    def _grow(self, capacity: int, width: int):
+        """Reallocate the row arrays for at least `capacity` rows of `width` levels"""
+        n = len(self.ids)
+        levels = np.full((capacity, width), np.nan)
+        levels[:n, :self._levels.shape[1]] = self._levels[:n]
+        self._levels = levels
+        for name in ('_is_bullish', '_d_price', '_prz_min', '_prz_max'):
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[:n] = old[:n]
+            setattr(self, name, new)
+
+
+def _as_price(value) -> float:
+    """Float price; missing values never match any comparison"""
+    return np.nan if value is None else float(value)
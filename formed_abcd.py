@@ -12,7 +12,11 @@ from typing import List, Tuple, Dict, Optional
 import pandas as pd
 import numpy as np
 from pattern_ratios_2_Final import ABCD_PATTERN_RATIOS
+from ratio_index import ABCD_RATIO_INDEX
 from pattern_data_standard import StandardPattern, PatternPoint, standardize_pattern_name, fix_unicode_issues
+from ohlc_range_index import OHLCRangeIndex, ensure_range_index
+from price_band_index import PriceBandIndex, ratio_price_band
+from extremum import ExtremumArray
 
 # Configuration constants
 EPSILON = 1e-10
@@ -24,7 +28,8 @@ def validate_price_containment_bullish(df: pd.DataFrame,
                                       a_idx: int, b_idx: int,
                                       c_idx: int, d_idx: int,
                                       a_price: float, b_price: float,
-                                      c_price: float, d_price: float) -> bool:
+                                      c_price: float, d_price: float,
+                                      range_index: Optional[OHLCRangeIndex] = None) -> bool:
     """
     Validate price containment for bullish formed ABCD patterns.
 
@@ -49,38 +54,27 @@ def validate_price_containment_bullish(df: pd.DataFrame,
     assert a_idx <= b_idx <= c_idx <= d_idx, f"Invalid index order: A({a_idx}) <= B({b_idx}) <= C({c_idx}) <= D({d_idx})"
 
     try:
-        high_col = 'High' if 'High' in df.columns else 'high'
-        low_col = 'Low' if 'Low' in df.columns else 'low'
+        range_index = ensure_range_index(df, range_index)
 
         # Check A to B: no high exceeds A (excluding A itself)
-        if a_idx + 1 < b_idx:
-            segment_ab = df.iloc[a_idx+1:b_idx+1]
-            if any(segment_ab[high_col] > a_price):
-                return False
+        if a_idx + 1 < b_idx and range_index.high_exceeds(a_idx+1, b_idx+1, a_price):
+            return False
 
         # Check A to C: no low breaks B (excluding A, including B and C)
-        if a_idx + 1 < c_idx:
-            segment_ac = df.iloc[a_idx+1:c_idx+1]
-            if any(segment_ac[low_col] < b_price):
-                return False
+        if a_idx + 1 < c_idx and range_index.low_breaks(a_idx+1, c_idx+1, b_price):
+            return False
 
         # Check B to C: no high exceeds C (excluding C itself, as C IS the high)
-        if b_idx < c_idx:
-            segment_bc = df.iloc[b_idx:c_idx]
-            if any(segment_bc[high_col] > c_price):
-                return False
+        if b_idx < c_idx and range_index.high_exceeds(b_idx, c_idx, c_price):
+            return False
 
         # Check B to D: no high exceeds C (excluding C, D endpoints)
-        if b_idx < d_idx:
-            segment_bd = df.iloc[b_idx:d_idx]
-            if any(segment_bd[high_col] > c_price):
-                return False
+        if b_idx < d_idx and range_index.high_exceeds(b_idx, d_idx, c_price):
+            return False
 
         # Check C to D: no low breaks D (excluding D itself, as D IS the low)
-        if c_idx < d_idx:
-            segment_cd = df.iloc[c_idx:d_idx]
-            if any(segment_cd[low_col] < d_price):
-                return False
+        if c_idx < d_idx and range_index.low_breaks(c_idx, d_idx, d_price):
+            return False
 
         return True
 
@@ -95,7 +89,8 @@ def validate_price_containment_bearish(df: pd.DataFrame,
                                       a_idx: int, b_idx: int,
                                       c_idx: int, d_idx: int,
                                       a_price: float, b_price: float,
-                                      c_price: float, d_price: float) -> bool:
+                                      c_price: float, d_price: float,
+                                      range_index: Optional[OHLCRangeIndex] = None) -> bool:
     """
     Validate price containment for bearish formed ABCD patterns.
 
@@ -120,38 +115,27 @@ def validate_price_containment_bearish(df: pd.DataFrame,
     assert a_idx <= b_idx <= c_idx <= d_idx, f"Invalid index order: A({a_idx}) <= B({b_idx}) <= C({c_idx}) <= D({d_idx})"
 
     try:
-        high_col = 'High' if 'High' in df.columns else 'high'
-        low_col = 'Low' if 'Low' in df.columns else 'low'
+        range_index = ensure_range_index(df, range_index)
 
         # Check A to B: no low breaks A (excluding A itself)
-        if a_idx + 1 < b_idx:
-            segment_ab = df.iloc[a_idx+1:b_idx+1]
-            if any(segment_ab[low_col] < a_price):
-                return False
+        if a_idx + 1 < b_idx and range_index.low_breaks(a_idx+1, b_idx+1, a_price):
+            return False
 
         # Check A to C: no high exceeds B (excluding A, including B and C)
-        if a_idx + 1 < c_idx:
-            segment_ac = df.iloc[a_idx+1:c_idx+1]
-            if any(segment_ac[high_col] > b_price):
-                return False
+        if a_idx + 1 < c_idx and range_index.high_exceeds(a_idx+1, c_idx+1, b_price):
+            return False
 
         # Check B to C: no low breaks C (excluding C itself, as C IS the low)
-        if b_idx < c_idx:
-            segment_bc = df.iloc[b_idx:c_idx]
-            if any(segment_bc[low_col] < c_price):
-                return False
+        if b_idx < c_idx and range_index.low_breaks(b_idx, c_idx, c_price):
+            return False
 
         # Check B to D: no low breaks C (excluding C, D endpoints)
-        if b_idx < d_idx:
-            segment_bd = df.iloc[b_idx:d_idx]
-            if any(segment_bd[low_col] < c_price):
-                return False
+        if b_idx < d_idx and range_index.low_breaks(b_idx, d_idx, c_price):
+            return False
 
         # Check C to D: no high exceeds D (excluding D itself, as D IS the high)
-        if c_idx < d_idx:
-            segment_cd = df.iloc[c_idx:d_idx]
-            if any(segment_cd[high_col] > d_price):
-                return False
+        if c_idx < d_idx and range_index.high_exceeds(c_idx, d_idx, d_price):
+            return False
 
         return True
 
@@ -162,6 +146,103 @@ def validate_price_containment_bearish(df: pd.DataFrame,
         return False
 
 
+class _SortedExtrema:
+    """
+    Extremum rows of one type in bar order, with bar-window and price-band lookups.
+
+    Built once per detection call and shared by every ABCD pattern definition.
+    """
+
+    def __init__(self, rows: List[Tuple]):
+        """
+        Args:
+            rows: (bar_index, timestamp, price) tuples of one extremum type
+        """
+        self.rows = sorted(rows, key=lambda row: row[0])
+        self.bars = np.array([row[0] for row in self.rows], dtype=np.int64)
+        self.band_index = PriceBandIndex([row[2] for row in self.rows])
+
+    def window(self, after_bar: int, last_bar: Optional[int] = None) -> Tuple[int, int]:
+        """Half-open row range with after_bar < bar <= last_bar (None = no upper bound)"""
+        start = int(np.searchsorted(self.bars, after_bar, side='right'))
+        if last_bar is None:
+            return start, len(self.rows)
+        return start, int(np.searchsorted(self.bars, last_bar, side='right'))
+
+
+def _abcd_prz_bounds(pattern_name: str, c_price: float, bc_move: float,
+                     is_bullish: bool) -> Tuple[float, float]:
+    """PRZ (min, max) where D completes pattern_name, from its CD projection range"""
+    proj_min, proj_max = ABCD_PATTERN_RATIOS[pattern_name]['proj']
+    if is_bullish:
+        # For bullish: D is below C
+        return c_price - (bc_move * proj_max / 100), c_price - (bc_move * proj_min / 100)
+    # For bearish: D is above C
+    return c_price + (bc_move * proj_min / 100), c_price + (bc_move * proj_max / 100)
+
+
+def _build_formed_abcd_pattern(pattern_name: str, points: Tuple[Tuple, ...],
+                               bc_retracement: float, cd_projection: float,
+                               is_bullish: bool, log_details: bool) -> Optional[Dict]:
+    """
+    Build the legacy dict for one validated (A, B, C, D) under one pattern name.
+
+    Returns None if D lies outside the pattern's PRZ.
+    """
+    (a_idx, a_time, a_price), (b_idx, b_time, b_price), \
+        (c_idx, c_time, c_price), (d_idx, d_time, d_price) = points
+    ratio_range = ABCD_PATTERN_RATIOS[pattern_name]
+    bc_move = abs(c_price - b_price)
+
+    # Calculate PRZ zones using the pattern's projection ratios
+    # This shows where D was expected based on BC move
+    proj_min = ratio_range['proj'][0]
+    proj_max = ratio_range['proj'][1]
+    prz_min, prz_max = _abcd_prz_bounds(pattern_name, c_price, bc_move, is_bullish)
+
+    # Validate that D point is within PRZ zone
+    if not (prz_min <= d_price <= prz_max):
+        if log_details:
+            print(f"  Rejected {pattern_name}: D point {d_price:.2f} not in PRZ [{prz_min:.2f}, {prz_max:.2f}]")
+        return None
+
+    # Create PRZ zone for this pattern
+    prz_zones = [{
+        'min': prz_min,
+        'max': prz_max,
+        'proj_min': proj_min,
+        'proj_max': proj_max,
+        'pattern_source': pattern_name
+    }]
+
+    # Create standardized pattern object
+    direction = 'bullish' if is_bullish else 'bearish'
+    pattern_name_std = standardize_pattern_name(pattern_name, 'formed', direction)
+    pattern_name_std = fix_unicode_issues(pattern_name_std)
+
+    # Create standardized pattern
+    standard_pattern = StandardPattern(
+        name=pattern_name_std,
+        pattern_type='ABCD',
+        formation_status='formed',
+        direction=direction,
+        x_point=None,  # ABCD patterns don't have X point
+        a_point=PatternPoint(timestamp=a_time, price=a_price, index=a_idx),
+        b_point=PatternPoint(timestamp=b_time, price=b_price, index=b_idx),
+        c_point=PatternPoint(timestamp=c_time, price=c_price, index=c_idx),
+        d_point=PatternPoint(timestamp=d_time, price=d_price, index=d_idx),
+        ratios={
+            'bc_retracement': bc_retracement,
+            'cd_projection': cd_projection,
+            'prz_zones': prz_zones  # Add PRZ zones to ratios
+        },
+        validation_type='strict_containment'
+    )
+
+    # Convert to legacy dict format for backward compatibility
+    return standard_pattern.to_legacy_dict()
+
+
 def detect_strict_abcd_patterns(extremum_points: List[Tuple],
                                df: pd.DataFrame,
                                log_details: bool = False,
@@ -177,11 +258,12 @@ def detect_strict_abcd_patterns(extremum_points: List[Tuple],
 
     Args:
         extremum_points: List of extremum points to search for patterns within
-                        Format: (timestamp, price, is_high, bar_index)
+                        Format: (timestamp, price, is_high, bar_index), or an ExtremumArray
                         Must contain at least 4 points
         df: DataFrame with OHLC data for validation
         log_details: Whether to print detailed logs
-        max_patterns: Maximum number of patterns to return
+        max_patterns: Maximum number of patterns to return (the first ones in
+                     ABCD_PATTERN_RATIOS order; None = no limit)
         max_search_window: Maximum distance between pattern points (None = unlimited)
         validate_d_crossing: If True, reject patterns where price crosses D after formation.
                            If False, allow patterns even if D is violated later.
@@ -216,111 +298,96 @@ def detect_strict_abcd_patterns(extremum_points: List[Tuple],
 
     # Formed ABCD detection starting (verbose output removed for cleaner console)
 
-    # OPTIMIZATION: Cache D point crossing checks to avoid redundant calculations
-    high_col = 'High' if 'High' in df_copy.columns else 'high'
-    low_col = 'Low' if 'Low' in df_copy.columns else 'low'
-
-    # Cache for D point crossing checks: (d_idx, d_price, is_bullish) -> bool
-    d_point_crossing_cache = {}
+    # OPTIMIZATION: Answer every containment/crossing check from one shared
+    # range index (O(1) range min/max queries)
+    range_index = OHLCRangeIndex(df_copy)
 
     # Separate highs and lows with bar indices
-    highs = []
-    lows = []
+    if isinstance(extremum_points, ExtremumArray):
+        # Columnar input already holds precomputed high/low sub-views
+        highs = extremum_points.bar_rows(True)
+        lows = extremum_points.bar_rows(False)
+    else:
+        highs = []
+        lows = []
+
+        for i, ep in enumerate(extremum_points):
+            # Get bar index from 4th element
+            bar_idx = ep[3] if len(ep) > 3 else i
+
+            if ep[2]:  # Is high
+                highs.append((bar_idx, ep[0], ep[1]))
+            else:  # Is low
+                lows.append((bar_idx, ep[0], ep[1]))
 
-    for i, ep in enumerate(extremum_points):
-        # Get bar index from 4th element
-        bar_idx = ep[3] if len(ep) > 3 else i
+    # Highs and lows separated (debug output removed)
 
-        if ep[2]:  # Is high
-            highs.append((bar_idx, ep[0], ep[1]))
-        else:  # Is low
-            lows.append((bar_idx, ep[0], ep[1]))
+    # Pattern-independent candidate lists: one bar-sorted array per extremum
+    # type, shared by every pattern definition. Bar windows are found with
+    # searchsorted and C/D price bands with the price-sorted band index, and
+    # each (A, B, C, D) is matched against all ratio ranges at once.
+    extrema = {True: _SortedExtrema(highs), False: _SortedExtrema(lows)}
+    last_bar = len(df) - 1
 
-    # Highs and lows separated (debug output removed)
+    def window_end(bar_idx: int) -> Optional[int]:
+        if max_search_window is None:
+            return None
+        return min(bar_idx + max_search_window, last_bar)
+
+    # Matches are collected per pattern name so the output keeps the
+    # ABCD_PATTERN_RATIOS order (then A, B, C, D order within a name)
+    matches = {name: [] for name in ABCD_PATTERN_RATIOS}
+
+    for is_bullish in (True, False):
+        direction_mask = ABCD_RATIO_INDEX.match_mask({}, is_bullish)
+        if not direction_mask:
+            continue
+        retr_min, retr_max = ABCD_RATIO_INDEX.bounds(direction_mask, 'retr')
 
-    patterns_found = 0
-    patterns_checked = 0
-    patterns_rejected = 0
-
-    # Use all points in the dataset
-    MAX_CANDIDATES = len(extremum_points)
-
-    for pattern_name, ratio_range in ABCD_PATTERN_RATIOS.items():
-        if max_patterns is not None and patterns_found >= max_patterns:
-            break
-
-        is_bullish = 'bull' in pattern_name
-
-        # Select appropriate candidates
-        if is_bullish:
-            a_candidates = highs[-MAX_CANDIDATES:] if len(highs) > MAX_CANDIDATES else highs
-            b_candidates = lows[-MAX_CANDIDATES:] if len(lows) > MAX_CANDIDATES else lows
-            c_candidates = highs[-MAX_CANDIDATES:] if len(highs) > MAX_CANDIDATES else highs
-            d_candidates = lows[-MAX_CANDIDATES:] if len(lows) > MAX_CANDIDATES else lows
-        else:
-            a_candidates = lows[-MAX_CANDIDATES:] if len(lows) > MAX_CANDIDATES else lows
-            b_candidates = highs[-MAX_CANDIDATES:] if len(highs) > MAX_CANDIDATES else highs
-            c_candidates = lows[-MAX_CANDIDATES:] if len(lows) > MAX_CANDIDATES else lows
-            d_candidates = highs[-MAX_CANDIDATES:] if len(highs) > MAX_CANDIDATES else highs
-
-        # Search for valid patterns
-        for i, (a_idx, a_time, a_price) in enumerate(a_candidates):
-            if max_patterns is not None and patterns_found >= max_patterns:
-                break
-
-            # Find valid B points
-            if max_search_window is not None:
-                valid_b = [b for b in b_candidates
-                          if a_idx < b[0] <= min(a_idx + max_search_window, len(df)-1)]
-            else:
-                valid_b = [b for b in b_candidates if a_idx < b[0]]
-
-            for b_idx, b_time, b_price in valid_b:
-                if max_patterns is not None and patterns_found >= max_patterns:
-                    break
+        # Bullish: A/C are highs, B/D are lows; bearish the other way round
+        ac_side = extrema[is_bullish]
+        bd_side = extrema[not is_bullish]
 
+        for a_idx, a_time, a_price in ac_side.rows:
+            b_start, b_stop = bd_side.window(a_idx, window_end(a_idx))
+
+            for b_idx, b_time, b_price in bd_side.rows[b_start:b_stop]:
                 ab_move = abs(b_price - a_price)
                 if ab_move == 0:
                     continue
 
-                # Find valid C points
-                if max_search_window is not None:
-                    valid_c = [c for c in c_candidates
-                              if b_idx < c[0] <= min(b_idx + max_search_window, len(df)-1)]
-                else:
-                    valid_c = [c for c in c_candidates if b_idx < c[0]]
+                # RATIO PRUNING: only C points whose BC retracement can fall in
+                # any pattern's range (on the structural side of B)
+                c_low, c_high = ratio_price_band(b_price, ab_move, retr_min, retr_max, upward=is_bullish)
+                c_start, c_stop = ac_side.window(b_idx, window_end(b_idx))
 
-                for c_idx, c_time, c_price in valid_c:
-                    if max_patterns is not None and patterns_found >= max_patterns:
-                        break
+                for c_pos in ac_side.band_index.positions(c_low, c_high, c_start, c_stop):
+                    c_idx, c_time, c_price = ac_side.rows[c_pos]
 
                     # Calculate BC retracement
                     bc_move = abs(c_price - b_price)
                     bc_retracement = (bc_move / ab_move) * 100
 
-                    # Check if BC retracement is within range
-                    if not (ratio_range['retr'][0] <= bc_retracement <= ratio_range['retr'][1]):
+                    retr_mask = ABCD_RATIO_INDEX.match_mask({'retr': bc_retracement}, is_bullish)
+                    if not retr_mask:
                         continue
 
-                    # Find valid D points
-                    if max_search_window is not None:
-                        valid_d = [d for d in d_candidates
-                                  if c_idx < d[0] <= min(c_idx + max_search_window, len(df)-1)]
-                    else:
-                        valid_d = [d for d in d_candidates if c_idx < d[0]]
-
-                    for d_idx, d_time, d_price in valid_d:
-                        if max_patterns is not None and patterns_found >= max_patterns:
-                            break
+                    # RATIO PRUNING: only D points whose CD projection can fall
+                    # in the range of a pattern matching this retracement
+                    proj_min, proj_max = ABCD_RATIO_INDEX.bounds(retr_mask, 'proj')
+                    d_low, d_high = ratio_price_band(c_price, bc_move + EPSILON, proj_min, proj_max,
+                                                     upward=not is_bullish)
+                    d_start, d_stop = bd_side.window(c_idx, window_end(c_idx))
 
-                        patterns_checked += 1
+                    for d_pos in bd_side.band_index.positions(d_low, d_high, d_start, d_stop):
+                        d_idx, d_time, d_price = bd_side.rows[d_pos]
 
                         # Calculate CD projection
                         cd_move = abs(d_price - c_price)
                         cd_projection = (cd_move / (bc_move + EPSILON)) * 100
 
-                        # Check if CD projection is within range
-                        if not (ratio_range['proj'][0] <= cd_projection <= ratio_range['proj'][1]):
+                        pattern_mask = retr_mask & ABCD_RATIO_INDEX.mask('proj', cd_projection)
+                        if not pattern_mask:
                             continue
 
                         # Validate pattern structure
@@ -342,135 +409,58 @@ def detect_strict_abcd_patterns(extremum_points: List[Tuple],
                         if not structure_valid:
                             continue
 
-                        # Apply strict validation
-                        try:
-                            # Use bar indices directly
-                            a_candle_idx = a_idx
-                            b_candle_idx = b_idx
-                            c_candle_idx = c_idx
-                            d_candle_idx = d_idx
-
-                            if None in [a_candle_idx, b_candle_idx, c_candle_idx, d_candle_idx]:
-                                patterns_rejected += 1
-                                continue
+                        pattern_names = ABCD_RATIO_INDEX.names_for(pattern_mask)
 
-                            # Validate price containment
+                        # Apply strict validation (pattern-independent, checked once)
+                        try:
                             if is_bullish:
                                 containment_valid = validate_price_containment_bullish(
-                                    df_copy, a_candle_idx, b_candle_idx, c_candle_idx, d_candle_idx,
-                                    a_price, b_price, c_price, d_price
+                                    df_copy, a_idx, b_idx, c_idx, d_idx,
+                                    a_price, b_price, c_price, d_price,
+                                    range_index=range_index
                                 )
                             else:
                                 containment_valid = validate_price_containment_bearish(
-                                    df_copy, a_candle_idx, b_candle_idx, c_candle_idx, d_candle_idx,
-                                    a_price, b_price, c_price, d_price
+                                    df_copy, a_idx, b_idx, c_idx, d_idx,
+                                    a_price, b_price, c_price, d_price,
+                                    range_index=range_index
                                 )
 
                             if not containment_valid:
-                                patterns_rejected += 1
                                 if log_details:
-                                    print(f"  Rejected {pattern_name}: Failed strict price containment")
+                                    print(f"  Rejected {', '.join(pattern_names)}: Failed strict price containment")
                                 continue
 
                         except Exception as e:
                             if log_details:
                                 print(f"  Error validating containment: {str(e)}")
-                            patterns_rejected += 1
-                            continue
-
-                        # Calculate PRZ zones using the pattern's projection ratios
-                        # This shows where D was expected based on BC move
-                        proj_min = ratio_range['proj'][0]
-                        proj_max = ratio_range['proj'][1]
-
-                        if is_bullish:
-                            # For bullish: D is below C
-                            prz_min = c_price - (bc_move * proj_max / 100)
-                            prz_max = c_price - (bc_move * proj_min / 100)
-                        else:
-                            # For bearish: D is above C
-                            prz_min = c_price + (bc_move * proj_min / 100)
-                            prz_max = c_price + (bc_move * proj_max / 100)
-
-                        # Validate that D point is within PRZ zone
-                        if not (prz_min <= d_price <= prz_max):
-                            patterns_rejected += 1
-                            if log_details:
-                                print(f"  Rejected {pattern_name}: D point {d_price:.2f} not in PRZ [{prz_min:.2f}, {prz_max:.2f}]")
                             continue
 
                         # Validate that price doesn't cross D point after formation (OPTIONAL)
-                        # OPTIMIZED: Cache results to avoid recalculating for same D point
+                        # Bullish: D is a low, no later bar may go below it; bearish:
+                        # D is a high, no later bar may go above it
                         if validate_d_crossing and d_idx < len(df_copy) - 1:
-                            # Create cache key for this D point check
-                            cache_key = (d_idx, d_price, is_bullish)
-
-                            # Check if we've already validated this D point
-                            if cache_key not in d_point_crossing_cache:
-                                # Calculate and cache the result
-                                d_point_crossed = False
-                                if is_bullish:
-                                    # For bullish: D is a low, check if any bar after D goes below D
-                                    min_low_after = df_copy[low_col].iloc[d_idx+1:].min()
-                                    if min_low_after < d_price:
-                                        d_point_crossed = True
-                                else:
-                                    # For bearish: D is a high, check if any bar after D goes above D
-                                    max_high_after = df_copy[high_col].iloc[d_idx+1:].max()
-                                    if max_high_after > d_price:
-                                        d_point_crossed = True
-
-                                d_point_crossing_cache[cache_key] = d_point_crossed
-
-                            # Use cached result
-                            if d_point_crossing_cache[cache_key]:
-                                patterns_rejected += 1
+                            if is_bullish:
+                                d_point_crossed = range_index.low_breaks(d_idx+1, len(df_copy), d_price)
+                            else:
+                                d_point_crossed = range_index.high_exceeds(d_idx+1, len(df_copy), d_price)
+
+                            if d_point_crossed:
                                 continue
 
-                        # Create PRZ zone for this pattern
-                        prz_zones = [{
-                            'min': prz_min,
-                            'max': prz_max,
-                            'proj_min': proj_min,
-                            'proj_max': proj_max,
-                            'pattern_source': pattern_name
-                        }]
-
-                        # Create standardized pattern object
-                        direction = 'bullish' if is_bullish else 'bearish'
-                        pattern_name_std = standardize_pattern_name(pattern_name, 'formed', direction)
-                        pattern_name_std = fix_unicode_issues(pattern_name_std)
-
-                        # Create pattern points with proper indices
-                        a_point = PatternPoint(timestamp=a_time, price=a_price, index=a_idx)
-                        b_point = PatternPoint(timestamp=b_time, price=b_price, index=b_idx)
-                        c_point = PatternPoint(timestamp=c_time, price=c_price, index=c_idx)
-                        d_point = PatternPoint(timestamp=d_time, price=d_price, index=d_idx)
-
-                        # Create standardized pattern
-                        standard_pattern = StandardPattern(
-                            name=pattern_name_std,
-                            pattern_type='ABCD',
-                            formation_status='formed',
-                            direction=direction,
-                            x_point=None,  # ABCD patterns don't have X point
-                            a_point=a_point,
-                            b_point=b_point,
-                            c_point=c_point,
-                            d_point=d_point,
-                            ratios={
-                                'bc_retracement': bc_retracement,
-                                'cd_projection': cd_projection,
-                                'prz_zones': prz_zones  # Add PRZ zones to ratios
-                            },
-                            validation_type='strict_containment'
-                        )
-
-                        # Convert to legacy dict format for backward compatibility
-                        pattern = standard_pattern.to_legacy_dict()
-
-                        patterns.append(pattern)
-                        patterns_found += 1
+                        for pattern_name in pattern_names:
+                            pattern = _build_formed_abcd_pattern(
+                                pattern_name,
+                                ((a_idx, a_time, a_price), (b_idx, b_time, b_price),
+                                 (c_idx, c_time, c_price), (d_idx, d_time, d_price)),
+                                bc_retracement, cd_projection, is_bullish, log_details
+                            )
+                            if pattern is not None:
+                                matches[pattern_name].append(pattern)
+
+    patterns = [pattern for name_patterns in matches.values() for pattern in name_patterns]
+    if max_patterns is not None:
+        patterns = patterns[:max_patterns]
 
     # Detection complete (verbose summary removed for cleaner console)
 
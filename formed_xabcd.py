@@ -12,6 +12,10 @@ from pattern_ratios_2_Final import (
     PATTERN_COLORS,
     PRZ_PROJECTION_PAIRS
 )
+from ohlc_range_index import OHLCRangeIndex, ensure_range_index
+from ratio_index import XABCD_RATIO_INDEX
+from price_band_index import ExtremumBandIndex, ratio_price_band
+from extremum import ExtremumArray
 
 
 def validate_xabcd_price_containment_bullish(df: pd.DataFrame,
@@ -19,7 +23,8 @@ def validate_xabcd_price_containment_bullish(df: pd.DataFrame,
                                             c_idx: int, d_idx: int,
                                             x_price: float, a_price: float,
                                             b_price: float, c_price: float,
-                                            d_price: float) -> bool:
+                                            d_price: float,
+                                            range_index: Optional[OHLCRangeIndex] = None) -> bool:
     """
     Validate price containment for bullish XABCD patterns.
 
@@ -33,42 +38,31 @@ def validate_xabcd_price_containment_bullish(df: pd.DataFrame,
     5. D should be the lowest point between C and D, and D < B
     """
     try:
-        high_col = 'High' if 'High' in df.columns else 'high'
-        low_col = 'Low' if 'Low' in df.columns else 'low'
+        range_index = ensure_range_index(df, range_index)
 
         # Rule 1: X should be the lowest between X-A (excluding X itself)
-        if x_idx + 1 < a_idx:
-            segment_xa = df.iloc[x_idx+1:a_idx+1]
-            if any(segment_xa[low_col] < x_price):
-                return False  # Found a lower low than X
+        if x_idx + 1 < a_idx and range_index.low_breaks(x_idx+1, a_idx+1, x_price):
+            return False  # Found a lower low than X
 
         # Rule 2: A should be the highest between X-B (excluding A itself)
-        if x_idx < b_idx:
-            segment_xb = df.iloc[x_idx:b_idx]
-            if any(segment_xb[high_col] > a_price):
-                return False  # Found a higher high than A
+        if x_idx < b_idx and range_index.high_exceeds(x_idx, b_idx, a_price):
+            return False  # Found a higher high than A
 
         # Rule 3a: B should be greater than X
         if b_price <= x_price:
             return False  # B must be higher than X
 
         # Rule 3b: B should be the lowest between A-C (excluding B where it's the low)
-        if a_idx < c_idx:
-            segment_ac = df.iloc[a_idx:c_idx+1]
-            if any(segment_ac[low_col] < b_price):
-                return False  # Found a lower low than B
+        if a_idx < c_idx and range_index.low_breaks(a_idx, c_idx+1, b_price):
+            return False  # Found a lower low than B
 
         # Rule 4: C should be the highest between B-D (excluding C and D endpoints)
-        if b_idx < d_idx:
-            segment_bd = df.iloc[b_idx:d_idx]
-            if any(segment_bd[high_col] > c_price):
-                return False  # Found a higher high than C
+        if b_idx < d_idx and range_index.high_exceeds(b_idx, d_idx, c_price):
+            return False  # Found a higher high than C
 
         # Rule 5a: D should be the lowest between C-D (excluding D itself)
-        if c_idx < d_idx:
-            segment_cd = df.iloc[c_idx:d_idx]
-            if any(segment_cd[low_col] < d_price):
-                return False  # Found a lower low than D
+        if c_idx < d_idx and range_index.low_breaks(c_idx, d_idx, d_price):
+            return False  # Found a lower low than D
 
         # Rule 5b: D should be lower than B
         if d_price >= b_price:
@@ -85,7 +79,8 @@ def validate_xabcd_price_containment_bearish(df: pd.DataFrame,
                                             c_idx: int, d_idx: int,
                                             x_price: float, a_price: float,
                                             b_price: float, c_price: float,
-                                            d_price: float) -> bool:
+                                            d_price: float,
+                                            range_index: Optional[OHLCRangeIndex] = None) -> bool:
     """
     Validate price containment for bearish XABCD patterns.
 
@@ -99,42 +94,31 @@ def validate_xabcd_price_containment_bearish(df: pd.DataFrame,
     5. D should be the highest point between C and D, and D > B
     """
     try:
-        high_col = 'High' if 'High' in df.columns else 'high'
-        low_col = 'Low' if 'Low' in df.columns else 'low'
+        range_index = ensure_range_index(df, range_index)
 
         # Rule 1: X should be the highest between X-A (excluding X itself)
-        if x_idx + 1 < a_idx:
-            segment_xa = df.iloc[x_idx+1:a_idx+1]
-            if any(segment_xa[high_col] > x_price):
-                return False  # Found a higher high than X
+        if x_idx + 1 < a_idx and range_index.high_exceeds(x_idx+1, a_idx+1, x_price):
+            return False  # Found a higher high than X
 
         # Rule 2: A should be the lowest between X-B (excluding A itself)
-        if x_idx < b_idx:
-            segment_xb = df.iloc[x_idx:b_idx]
-            if any(segment_xb[low_col] < a_price):
-                return False  # Found a lower low than A
+        if x_idx < b_idx and range_index.low_breaks(x_idx, b_idx, a_price):
+            return False  # Found a lower low than A
 
         # Rule 3a: B should be less than X
         if b_price >= x_price:
             return False  # B must be lower than X
 
         # Rule 3b: B should be the highest between A-C (excluding B where it's the high)
-        if a_idx < c_idx:
-            segment_ac = df.iloc[a_idx:c_idx+1]
-            if any(segment_ac[high_col] > b_price):
-                return False  # Found a higher high than B
+        if a_idx < c_idx and range_index.high_exceeds(a_idx, c_idx+1, b_price):
+            return False  # Found a higher high than B
 
         # Rule 4: C should be the lowest between B-D (excluding C and D endpoints)
-        if b_idx < d_idx:
-            segment_bd = df.iloc[b_idx:d_idx]
-            if any(segment_bd[low_col] < c_price):
-                return False  # Found a lower low than C
+        if b_idx < d_idx and range_index.low_breaks(b_idx, d_idx, c_price):
+            return False  # Found a lower low than C
 
         # Rule 5a: D should be the highest between C-D (excluding D itself)
-        if c_idx < d_idx:
-            segment_cd = df.iloc[c_idx:d_idx]
-            if any(segment_cd[high_col] > d_price):
-                return False  # Found a higher high than D
+        if c_idx < d_idx and range_index.high_exceeds(c_idx, d_idx, d_price):
+            return False  # Found a higher high than D
 
         # Rule 5b: D should be higher than B
         if d_price <= b_price:
@@ -373,16 +357,290 @@ def calculate_d_lines_for_formed_pattern(x_price: float, a_price: float, b_price
     return unique_d_lines
 
 
+def _formed_xabcd_d_lines(pattern_name: str, points: Tuple[Tuple, ...],
+                          positions: Tuple[int, ...], is_bullish_pattern: bool,
+                          df: Optional[pd.DataFrame], range_index: Optional[OHLCRangeIndex],
+                          strict_validation: bool, validate_d_crossing: bool,
+                          log_details: bool) -> Optional[List[float]]:
+    """
+    Validate one ratio-matched XABCD candidate.
+
+    Applies price containment, the D-in-PRZ check and the optional D crossing
+    check; shared by the pattern builder and the joint detection scan.
+
+    Returns:
+        The pattern's D lines, or None if the candidate is rejected
+    """
+    X, A, B, C, D = points
+    x_i, a_i, b_i, c_i, d_i = positions
+    x_price, a_price, b_price, c_price, d_price = X[1], A[1], B[1], C[1], D[1]
+    ratios = XABCD_PATTERN_RATIOS[pattern_name]
+
+    # Get bar indices from extremum points
+    x_bar_idx = X[3] if len(X) > 3 else x_i
+    a_bar_idx = A[3] if len(A) > 3 else a_i
+    b_bar_idx = B[3] if len(B) > 3 else b_i
+    c_bar_idx = C[3] if len(C) > 3 else c_i
+    d_bar_idx = D[3] if len(D) > 3 else d_i
+
+    # Apply price containment validation if enabled
+    if strict_validation and df is not None:
+        # Validate price containment
+        if is_bullish_pattern:
+            containment_valid = validate_xabcd_price_containment_bullish(
+                df, x_bar_idx, a_bar_idx, b_bar_idx, c_bar_idx, d_bar_idx,
+                x_price, a_price, b_price, c_price, d_price,
+                range_index=range_index
+            )
+        else:
+            containment_valid = validate_xabcd_price_containment_bearish(
+                df, x_bar_idx, a_bar_idx, b_bar_idx, c_bar_idx, d_bar_idx,
+                x_price, a_price, b_price, c_price, d_price,
+                range_index=range_index
+            )
+
+        if not containment_valid:
+            if log_details:
+                print(f"Pattern {pattern_name} rejected due to price containment violation")
+            return None
+
+    # Calculate d_lines using the same algorithm as unformed XABCD
+    d_lines = calculate_d_lines_for_formed_pattern(
+        x_price, a_price, b_price, c_price,
+        ratios, is_bullish_pattern
+    )
+
+    # Validate that D point is within PRZ zone (min/max of d_lines)
+    if d_lines:
+        prz_min = min(d_lines)
+        prz_max = max(d_lines)
+
+        if not (prz_min <= d_price <= prz_max):
+            if log_details:
+                print(f"  Rejected {pattern_name}: D point {d_price:.2f} not in PRZ [{prz_min:.2f}, {prz_max:.2f}]")
+            return None
+
+        # Validate that price doesn't cross D point after formation (OPTIONAL)
+        # Bullish: D is a low, no later bar may go below it; bearish: D is a
+        # high, no later bar may go above it (O(1) suffix min/max query)
+        if validate_d_crossing and d_bar_idx < len(df) - 1:
+            if is_bullish_pattern:
+                d_point_crossed = range_index.low_breaks(d_bar_idx+1, len(df), d_price)
+            else:
+                d_point_crossed = range_index.high_exceeds(d_bar_idx+1, len(df), d_price)
+
+            if d_point_crossed:
+                if log_details:
+                    print(f"  Rejected {pattern_name}: D point crossed after formation")
+                return None
+
+    return d_lines
+
+
+def _build_formed_xabcd_pattern(pattern_name: str, points: Tuple[Tuple, ...],
+                                positions: Tuple[int, ...], ratio_values: Tuple[float, ...],
+                                is_bullish_pattern: bool, df: Optional[pd.DataFrame],
+                                range_index: Optional[OHLCRangeIndex], strict_validation: bool,
+                                validate_d_crossing: bool, log_details: bool) -> Optional[Dict]:
+    """
+    Validate one ratio-matched XABCD candidate and build its pattern dict.
+
+    Validation is _formed_xabcd_d_lines; shared by the scalar and batched
+    enumerations of detect_xabcd_patterns.
+
+    Returns:
+        Pattern dictionary, or None if the candidate is rejected
+    """
+    d_lines = _formed_xabcd_d_lines(pattern_name, points, positions, is_bullish_pattern, df,
+                                    range_index, strict_validation, validate_d_crossing,
+                                    log_details)
+    if d_lines is None:
+        return None
+
+    X, A, B, C, D = points
+    x_i, a_i, b_i, c_i, d_i = positions
+    ab_xa_ratio, bc_ab_ratio, cd_bc_ratio, ad_xa_ratio = ratio_values
+    x_price, a_price, b_price, c_price, d_price = X[1], A[1], B[1], C[1], D[1]
+
+    # Get bar indices from extremum points (needed for pattern ID generation)
+    x_bar_idx = X[3] if len(X) > 3 else x_i
+    a_bar_idx = A[3] if len(A) > 3 else a_i
+    b_bar_idx = B[3] if len(B) > 3 else b_i
+    c_bar_idx = C[3] if len(C) > 3 else c_i
+    d_bar_idx = D[3] if len(D) > 3 else d_i
+
+    # Found valid pattern
+    return {
+        'name': pattern_name,
+        'type': 'bullish' if is_bullish_pattern else 'bearish',
+        'pattern_type': 'XABCD',  # Add pattern type
+        'points': {
+            'X': {'time': X[0], 'price': x_price, 'index': x_bar_idx},
+            'A': {'time': A[0], 'price': a_price, 'index': a_bar_idx},
+            'B': {'time': B[0], 'price': b_price, 'index': b_bar_idx},
+            'C': {'time': C[0], 'price': c_price, 'index': c_bar_idx},
+            'D': {'time': D[0], 'price': d_price, 'index': d_bar_idx}
+        },
+        'indices': {
+            'X': x_bar_idx,
+            'A': a_bar_idx,
+            'B': b_bar_idx,
+            'C': c_bar_idx,
+            'D': d_bar_idx
+        },
+        'ratios': {
+            'ab_xa': ab_xa_ratio,
+            'bc_ab': bc_ab_ratio,
+            'cd_bc': cd_bc_ratio,
+            'ad_xa': ad_xa_ratio
+        },
+        'd_lines': d_lines  # Add d_lines to pattern
+    }
+
+
+def _extremum_arrays(extremum_array: ExtremumArray) -> Tuple[np.ndarray, ...]:
+    """
+    Columnar (price, is_high, bar, timestamp code) arrays for batched detection.
+
+    ExtremumArray timestamps are int64 codes, so equal timestamps compare
+    equal as NumPy integers.
+    """
+    return (extremum_array.price, extremum_array.is_high,
+            extremum_array.bar_idx.astype(np.int64), extremum_array.ts)
+
+
+def _batched_bcd_candidates(arrays: Tuple[np.ndarray, ...], x_i: int, a_i: int,
+                            is_bullish_pattern: bool, search_window: Optional[int]):
+    """
+    Every (B, C, D) completing X, A whose structure and ratios match a pattern.
+
+    Builds NumPy arrays of all B points, then all (B, C) pairs, then all
+    (B, C, D) triples, computing AB/XA, BC/AB, CD/BC and AD/XA as vectors
+    and applying every pattern range as a broadcast mask
+    (XABCD_RATIO_INDEX.match_matrix). Each stage keeps only rows matching
+    at least one pattern, so most candidates never leave NumPy.
+
+    Args:
+        arrays: Output of _extremum_arrays
+        x_i, a_i: Extremum positions of X and A (alternating, X-A structure valid)
+        is_bullish_pattern: Pattern direction (X is a low for bullish)
+        search_window: Maximum bar distance between consecutive points (None = unlimited)
+
+    Yields:
+        (b_i, c_i, d_i, (ab_xa, bc_ab, cd_bc, ad_xa), matching names) in
+        ascending (b_i, c_i, d_i) order, names in table order
+    """
+    prices, is_high, bars, timestamps = arrays
+    n = len(prices)
+    x_price, a_price = prices[x_i], prices[a_i]
+    xa_move = abs(a_price - x_price)
+    names = XABCD_RATIO_INDEX.direction_names(is_bullish_pattern)
+    x_ts, a_ts = timestamps[x_i], timestamps[a_i]
+
+    def _sign(values):
+        # Bullish legs: B and D below the previous point, C above
+        return values if is_bullish_pattern else -values
+
+    # B: opposite type to A, after A, below A (bullish) / above A (bearish)
+    b_pos = np.arange(a_i + 1, n - 2)
+    b_ok = ((is_high[b_pos] != is_high[a_i]) & (timestamps[b_pos] != x_ts)
+            & (timestamps[b_pos] != a_ts) & (_sign(a_price - prices[b_pos]) > 0))
+    if search_window is not None:
+        b_ok &= bars[b_pos] - bars[a_i] <= search_window
+    b_pos = b_pos[b_ok]
+    ab_move = np.abs(prices[b_pos] - a_price)
+    ab_xa = (ab_move / xa_move) * 100
+    b_match = XABCD_RATIO_INDEX.match_matrix({'ab_xa': ab_xa}, is_bullish_pattern)
+    keep = b_match.any(axis=1)
+    b_pos, ab_move, ab_xa, b_match = b_pos[keep], ab_move[keep], ab_xa[keep], b_match[keep]
+    if not len(b_pos):
+        return
+
+    # (B, C) pairs: C is A's type, after B, above B (bullish) / below B (bearish)
+    c_pos = np.arange(a_i + 2, n - 1)
+    c_pos = c_pos[(is_high[c_pos] == is_high[a_i]) & (timestamps[c_pos] != x_ts)
+                  & (timestamps[c_pos] != a_ts)]
+    pair_ok = ((c_pos[None, :] > b_pos[:, None])
+               & (timestamps[c_pos][None, :] != timestamps[b_pos][:, None])
+               & (_sign(prices[c_pos][None, :] - prices[b_pos][:, None]) > 0))
+    if search_window is not None:
+        pair_ok &= bars[c_pos][None, :] - bars[b_pos][:, None] <= search_window
+    b_rows, c_cols = np.nonzero(pair_ok)
+    pair_b, pair_c = b_pos[b_rows], c_pos[c_cols]
+    bc_move = np.abs(prices[pair_c] - prices[pair_b])
+    bc_ab = (bc_move / ab_move[b_rows]) * 100
+
+    # Cheap pre-filter: BC/AB inside the hull of the patterns B still allows
+    bc_min, bc_max = XABCD_RATIO_INDEX.row_bounds(b_match, 'bc_ab', is_bullish_pattern)
+    keep = (bc_ab >= bc_min[b_rows]) & (bc_ab <= bc_max[b_rows])
+    b_rows, pair_b, pair_c, bc_move, bc_ab = b_rows[keep], pair_b[keep], pair_c[keep], bc_move[keep], bc_ab[keep]
+    pair_match = b_match[b_rows] & XABCD_RATIO_INDEX.match_matrix({'bc_ab': bc_ab}, is_bullish_pattern)
+    keep = pair_match.any(axis=1)
+    b_rows, pair_b, pair_c = b_rows[keep], pair_b[keep], pair_c[keep]
+    bc_move, bc_ab, pair_match = bc_move[keep], bc_ab[keep], pair_match[keep]
+    if not len(pair_c):
+        return
+
+    # (B, C, D) triples: D is B's type, after C, below C (bullish) / above C (bearish)
+    d_pos = np.arange(a_i + 3, n)
+    d_pos = d_pos[(is_high[d_pos] != is_high[a_i]) & (timestamps[d_pos] != x_ts)
+                  & (timestamps[d_pos] != a_ts)]
+    triple_ok = ((d_pos[None, :] > pair_c[:, None])
+                 & (timestamps[d_pos][None, :] != timestamps[pair_b][:, None])
+                 & (timestamps[d_pos][None, :] != timestamps[pair_c][:, None])
+                 & (_sign(prices[pair_c][:, None] - prices[d_pos][None, :]) > 0))
+    if search_window is not None:
+        triple_ok &= bars[d_pos][None, :] - bars[pair_c][:, None] <= search_window
+    pair_rows, d_cols = np.nonzero(triple_ok)
+    triple_d = d_pos[d_cols]
+    cd_bc = (np.abs(prices[triple_d] - prices[pair_c[pair_rows]]) / bc_move[pair_rows]) * 100
+    ad_xa = (np.abs(prices[triple_d] - a_price) / xa_move) * 100
+
+    # Only patterns still possible for some (B, C) pair are tested on D,
+    # after a cheap pre-filter against each pair's CD/BC and AD/XA hulls
+    active = np.flatnonzero(pair_match.any(axis=0))
+    pair_match = pair_match[:, active]
+    keep = np.ones(len(pair_rows), dtype=bool)
+    for key, values in (('cd_bc', cd_bc), ('ad_xa', ad_xa)):
+        hull_min, hull_max = XABCD_RATIO_INDEX.row_bounds(pair_match, key, is_bullish_pattern, active)
+        keep &= (values >= hull_min[pair_rows]) & (values <= hull_max[pair_rows])
+    pair_rows, triple_d, cd_bc, ad_xa = pair_rows[keep], triple_d[keep], cd_bc[keep], ad_xa[keep]
+    triple_match = pair_match[pair_rows] & XABCD_RATIO_INDEX.match_matrix(
+        {'cd_bc': cd_bc, 'ad_xa': ad_xa}, is_bullish_pattern, columns=active)
+
+    # Only survivors become Python objects
+    match_rows, match_cols = np.nonzero(triple_match)
+    active_names = [names[col] for col in active.tolist()]
+    row_names = {}
+    for row, col in zip(match_rows.tolist(), match_cols.tolist()):
+        row_names.setdefault(row, []).append(active_names[col])
+    for row, matching_names in row_names.items():
+        pair_row = pair_rows[row]
+        yield (
+            int(pair_b[pair_row]), int(pair_c[pair_row]), int(triple_d[row]),
+            (float(ab_xa[b_rows[pair_row]]), float(bc_ab[pair_row]),
+             float(cd_bc[row]), float(ad_xa[row])),
+            matching_names
+        )
+
+
 def detect_xabcd_patterns(extremum_points: List[Tuple], df: pd.DataFrame = None,
                          log_details: bool = False, strict_validation: bool = True,
                          max_search_window: Optional[int] = 30,
-                         validate_d_crossing: bool = True) -> List[Dict]:
+                         validate_d_crossing: bool = True,
+                         batched: bool = False,
+                         start_range: Optional[Tuple[int, int]] = None) -> List[Dict]:
     """
     XABCD pattern detection with optional price containment validation.
     Detects complete 5-point XABCD patterns (X-A-B-C-D).
 
+    In batched mode the (B, C, D) enumeration for each (X, A) pair runs in
+    NumPy: ratios are computed as vectors and every pattern range is applied
+    as a broadcast mask, so only ratio-matching candidates reach the Python
+    validation. Results (including order) are identical to the scalar loop.
+
     Args:
-        extremum_points: List of tuples (timestamp, price, is_high, bar_index)
+        extremum_points: List of tuples (timestamp, price, is_high, bar_index), or an ExtremumArray
         df: DataFrame with OHLC data for price containment validation
         log_details: Whether to print detailed logs
         strict_validation: Whether to apply strict price containment
@@ -392,6 +650,11 @@ def detect_xabcd_patterns(extremum_points: List[Tuple], df: pd.DataFrame = None,
         validate_d_crossing: If True, reject patterns where price crosses D after formation.
                            If False, allow patterns even if D is violated later.
                            Default=True for strict validation.
+        batched: If True, evaluate (B, C, D) candidates with NumPy per (X, A) pair
+        start_range: Optional half-open (start, stop) range of X positions to
+                     enumerate (None = all). Concatenating the results of
+                     consecutive ranges gives the full result; used by the
+                     process-pool backend to partition the search.
 
     Returns:
         List of dictionaries containing pattern information
@@ -415,24 +678,31 @@ def detect_xabcd_patterns(extremum_points: List[Tuple], df: pd.DataFrame = None,
         else:
             print("Price containment validation: DISABLED")
 
-    # OPTIMIZATION: Pre-compute min/max values for D point crossing validation
-    # Cache results per unique D point to avoid redundant calculations
-    high_col = 'High' if df is not None and 'High' in df.columns else 'high'
-    low_col = 'Low' if df is not None and 'Low' in df.columns else 'low'
+    # OPTIMIZATION: Build the High/Low range index once; containment and
+    # D point crossing checks become O(1) range max/min queries
+    range_index = OHLCRangeIndex(df) if df is not None else None
 
-    # Cache for D point crossing checks: (d_bar_idx, d_price, is_bullish) -> bool
-    d_point_crossing_cache = {}
+    # Price-sorted extremum index for ratio-driven C/D candidate pruning,
+    # built on the columns
+    extremum_array = ExtremumArray.from_points(extremum_points)
+    band_index = ExtremumBandIndex(extremum_array)
 
     # Determine search window for loops
     # Limit search to reasonable pattern sizes for performance
     # Pattern points typically appear within 20-40 extremum points of each other
     search_window = max_search_window if max_search_window is not None else n
 
+    # Columnar extremum arrays for the batched (B, C, D) enumeration; the
+    # loops below index tuples
+    extremum_arrays = _extremum_arrays(extremum_array) if batched else None
+    extremum_points = extremum_array.points
+
     # OPTIMIZED: Check 5-point combinations with search window limits
     # This reduces complexity from O(n^5) to O(n*w^4) where w is the window size
     # IMPORTANT: Window is measured in BAR INDEX distance, not extremum_points distance
     # This ensures consistency when same bar appears as both high and low
-    for x_i in range(n - 4):
+    x_start, x_stop = start_range if start_range is not None else (0, n - 4)
+    for x_i in range(max(x_start, 0), min(x_stop, n - 4)):
         X = extremum_points[x_i]
         X_bar = X[3] if len(X) > 3 else x_i
 
@@ -454,6 +724,37 @@ def detect_xabcd_patterns(extremum_points: List[Tuple], df: pd.DataFrame = None,
             if X[0] == A[0]:
                 continue
 
+            if batched:
+                # NumPy evaluates every (B, C, D) for this (X, A) pair at once;
+                # only ratio-matching candidates come back
+                is_bullish_pattern = not X[2]  # X is low = bullish
+                if is_bullish_pattern and not X[1] < A[1]:
+                    continue
+                if not is_bullish_pattern and not X[1] > A[1]:
+                    continue
+                candidates = _batched_bcd_candidates(
+                    extremum_arrays, x_i, a_i, is_bullish_pattern,
+                    None if search_window == n else search_window
+                )
+                for b_i, c_i, d_i, ratio_values, matching_names in candidates:
+                    points = (X, A, extremum_points[b_i], extremum_points[c_i], extremum_points[d_i])
+                    for pattern_name in matching_names:
+                        patterns_checked += 1
+                        pattern = _build_formed_xabcd_pattern(
+                            pattern_name, points, (x_i, a_i, b_i, c_i, d_i), ratio_values,
+                            is_bullish_pattern, df, range_index, strict_validation,
+                            validate_d_crossing, log_details
+                        )
+                        if pattern is None:
+                            patterns_rejected_containment += 1
+                            continue
+
+                        patterns.append(pattern)
+
+                        if log_details:
+                            print(f"Found {pattern_name}: AB/XA={ratio_values[0]:.1f}%, BC/AB={ratio_values[1]:.1f}%, CD/BC={ratio_values[2]:.1f}%, AD/XA={ratio_values[3]:.1f}%")
+                continue
+
             # Search all B points (will filter by bar index distance below)
             b_end = n - 2
             for b_i in range(a_i + 1, b_end):
@@ -472,9 +773,28 @@ def detect_xabcd_patterns(extremum_points: List[Tuple], df: pd.DataFrame = None,
                 if X[0] == B[0] or A[0] == B[0]:
                     continue
 
-                # Search all C points (will filter by bar index distance below)
+                # RATIO PRUNING: X, A, B fix AB/XA, and the BC/AB ranges of the
+                # patterns it matches bound C's price - only C points inside
+                # that band are visited
+                is_bullish_pattern = not X[2]  # X is low = bullish
+                x_price, a_price, b_price = X[1], A[1], B[1]
+                if is_bullish_pattern and not (x_price < a_price and b_price < a_price):
+                    continue
+                if not is_bullish_pattern and not (x_price > a_price and b_price > a_price):
+                    continue
+                xa_move = abs(a_price - x_price)
+                ab_move = abs(b_price - a_price)
+                xab_mask = XABCD_RATIO_INDEX.match_mask(
+                    {'ab_xa': (ab_move / xa_move) * 100}, is_bullish_pattern)
+                if not xab_mask:
+                    continue
+                bc_min, bc_max = XABCD_RATIO_INDEX.bounds(xab_mask, 'bc_ab')
+                c_low, c_high = ratio_price_band(b_price, ab_move, bc_min, bc_max,
+                                                 upward=is_bullish_pattern)
+
+                # Search C points inside the band (will filter by bar index distance below)
                 c_end = n - 1
-                for c_i in range(b_i + 1, c_end):
+                for c_i in band_index.candidates(not B[2], c_low, c_high, b_i + 1, c_end):
                     C = extremum_points[c_i]
                     C_bar = C[3] if len(C) > 3 else c_i
 
@@ -490,9 +810,25 @@ def detect_xabcd_patterns(extremum_points: List[Tuple], df: pd.DataFrame = None,
                     if X[0] == C[0] or A[0] == C[0] or B[0] == C[0]:
                         continue
 
-                    # Search all D points (will filter by bar index distance below)
+                    # RATIO PRUNING: CD/BC and AD/XA ranges of the patterns
+                    # matching AB/XA and BC/AB bound D's price
+                    bc_move = abs(C[1] - b_price)
+                    if bc_move == 0:
+                        continue
+                    xabc_mask = XABCD_RATIO_INDEX.match_mask(
+                        {'bc_ab': (bc_move / ab_move) * 100}, is_bullish_pattern) & xab_mask
+                    if not xabc_mask:
+                        continue
+                    cd_min, cd_max = XABCD_RATIO_INDEX.bounds(xabc_mask, 'cd_bc')
+                    d_low, d_high = ratio_price_band(C[1], bc_move, cd_min, cd_max,
+                                                     upward=not is_bullish_pattern)
+                    _, ad_max = XABCD_RATIO_INDEX.bounds(xabc_mask, 'ad_xa')
+                    ad_low, ad_high = ratio_price_band(a_price, xa_move, -ad_max, ad_max, upward=True)
+                    d_low, d_high = max(d_low, ad_low), min(d_high, ad_high)
+
+                    # Search D points inside the band (will filter by bar index distance below)
                     d_end = n
-                    for d_i in range(c_i + 1, d_end):
+                    for d_i in band_index.candidates(not C[2], d_low, d_high, c_i + 1, d_end):
                         D = extremum_points[d_i]
                         D_bar = D[3] if len(D) > 3 else d_i
 
@@ -559,125 +895,23 @@ def detect_xabcd_patterns(extremum_points: List[Tuple], df: pd.DataFrame = None,
                         cd_bc_ratio = (cd_move / bc_move) * 100
                         ad_xa_ratio = (ad_move / xa_move) * 100
 
-                        # Now check against all matching pattern types
-                        for pattern_name, ratios in XABCD_PATTERN_RATIOS.items():
-                            # Check if pattern type matches
-                            pattern_is_bullish = 'bull' in pattern_name
-                            if pattern_is_bullish != is_bullish_pattern:
-                                continue
-
-                            # Check if all ratios match the pattern requirements
-                            ab_xa_match = ratios['ab_xa'][0] <= ab_xa_ratio <= ratios['ab_xa'][1]
-                            bc_ab_match = ratios['bc_ab'][0] <= bc_ab_ratio <= ratios['bc_ab'][1]
-                            cd_bc_match = ratios['cd_bc'][0] <= cd_bc_ratio <= ratios['cd_bc'][1]
-                            ad_xa_match = ratios['ad_xa'][0] <= ad_xa_ratio <= ratios['ad_xa'][1]
-
-                            if not (ab_xa_match and bc_ab_match and cd_bc_match and ad_xa_match):
-                                continue
+                        # Now check against all matching pattern types (compiled ratio index)
+                        matching_names = XABCD_RATIO_INDEX.match({
+                            'ab_xa': ab_xa_ratio, 'bc_ab': bc_ab_ratio,
+                            'cd_bc': cd_bc_ratio, 'ad_xa': ad_xa_ratio
+                        }, is_bullish_pattern)
 
+                        for pattern_name in matching_names:
                             patterns_checked += 1
-
-                            # Get bar indices from extremum points (needed for pattern ID generation)
-                            x_bar_idx = X[3] if len(X) > 3 else x_i
-                            a_bar_idx = A[3] if len(A) > 3 else a_i
-                            b_bar_idx = B[3] if len(B) > 3 else b_i
-                            c_bar_idx = C[3] if len(C) > 3 else c_i
-                            d_bar_idx = D[3] if len(D) > 3 else d_i
-
-                            # Apply price containment validation if enabled
-                            if strict_validation and df is not None:
-                                # Validate price containment
-                                if is_bullish_pattern:
-                                    containment_valid = validate_xabcd_price_containment_bullish(
-                                        df, x_bar_idx, a_bar_idx, b_bar_idx, c_bar_idx, d_bar_idx,
-                                        x_price, a_price, b_price, c_price, d_price
-                                    )
-                                else:
-                                    containment_valid = validate_xabcd_price_containment_bearish(
-                                        df, x_bar_idx, a_bar_idx, b_bar_idx, c_bar_idx, d_bar_idx,
-                                        x_price, a_price, b_price, c_price, d_price
-                                    )
-
-                                if not containment_valid:
-                                    patterns_rejected_containment += 1
-                                    if log_details:
-                                        print(f"Pattern {pattern_name} rejected due to price containment violation")
-                                    continue
-
-                            # Calculate d_lines using the same algorithm as unformed XABCD
-                            d_lines = calculate_d_lines_for_formed_pattern(
-                                x_price, a_price, b_price, c_price,
-                                ratios, is_bullish_pattern
+                            pattern = _build_formed_xabcd_pattern(
+                                pattern_name, (X, A, B, C, D), (x_i, a_i, b_i, c_i, d_i),
+                                (ab_xa_ratio, bc_ab_ratio, cd_bc_ratio, ad_xa_ratio),
+                                is_bullish_pattern, df, range_index, strict_validation,
+                                validate_d_crossing, log_details
                             )
-
-                            # Validate that D point is within PRZ zone (min/max of d_lines)
-                            if d_lines:
-                                prz_min = min(d_lines)
-                                prz_max = max(d_lines)
-
-                                if not (prz_min <= d_price <= prz_max):
-                                    patterns_rejected_containment += 1
-                                    if log_details:
-                                        print(f"  Rejected {pattern_name}: D point {d_price:.2f} not in PRZ [{prz_min:.2f}, {prz_max:.2f}]")
-                                    continue
-
-                                # Validate that price doesn't cross D point after formation (OPTIONAL)
-                                # OPTIMIZED: Cache results to avoid recalculating for same D point
-                                if validate_d_crossing and d_bar_idx < len(df) - 1:
-                                    # Create cache key for this D point check
-                                    cache_key = (d_bar_idx, d_price, is_bullish_pattern)
-
-                                    # Check if we've already validated this D point
-                                    if cache_key not in d_point_crossing_cache:
-                                        # Calculate and cache the result
-                                        d_point_crossed = False
-                                        if is_bullish_pattern:
-                                            # For bullish: D is a low, check if any bar after D goes below D
-                                            min_low_after = df[low_col].iloc[d_bar_idx+1:].min()
-                                            if min_low_after < d_price:
-                                                d_point_crossed = True
-                                        else:
-                                            # For bearish: D is a high, check if any bar after D goes above D
-                                            max_high_after = df[high_col].iloc[d_bar_idx+1:].max()
-                                            if max_high_after > d_price:
-                                                d_point_crossed = True
-
-                                        d_point_crossing_cache[cache_key] = d_point_crossed
-
-                                    # Use cached result
-                                    if d_point_crossing_cache[cache_key]:
-                                        patterns_rejected_containment += 1
-                                        if log_details:
-                                            print(f"  Rejected {pattern_name}: D point crossed after formation")
-                                        continue
-
-                            # Found valid pattern
-                            pattern = {
-                                'name': pattern_name,
-                                'type': 'bullish' if is_bullish_pattern else 'bearish',
-                                'pattern_type': 'XABCD',  # Add pattern type
-                                'points': {
-                                    'X': {'time': X[0], 'price': x_price, 'index': x_bar_idx},
-                                    'A': {'time': A[0], 'price': a_price, 'index': a_bar_idx},
-                                    'B': {'time': B[0], 'price': b_price, 'index': b_bar_idx},
-                                    'C': {'time': C[0], 'price': c_price, 'index': c_bar_idx},
-                                    'D': {'time': D[0], 'price': d_price, 'index': d_bar_idx}
-                                },
-                                'indices': {
-                                    'X': x_bar_idx,
-                                    'A': a_bar_idx,
-                                    'B': b_bar_idx,
-                                    'C': c_bar_idx,
-                                    'D': d_bar_idx
-                                },
-                                'ratios': {
-                                    'ab_xa': ab_xa_ratio,
-                                    'bc_ab': bc_ab_ratio,
-                                    'cd_bc': cd_bc_ratio,
-                                    'ad_xa': ad_xa_ratio
-                                },
-                                'd_lines': d_lines  # Add d_lines to pattern
-                            }
+                            if pattern is None:
+                                patterns_rejected_containment += 1
+                                continue
 
                             patterns.append(pattern)
 
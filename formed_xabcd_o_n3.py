@@ -7,6 +7,9 @@ Reduces complexity from O(n⁵) to O(n³) using:
 2. XABC extension with D price range pre-calculation - O(n³)
 3. D probing with range check - O(n²)
 
+B, C and D candidates are looked up by admissible price band in a
+price-sorted index (see price_band_index) instead of being scanned.
+
 Total: O(n³) expected 100-1000x speedup for large datasets
 """
 
@@ -15,6 +18,9 @@ from typing import List, Tuple, Dict, Optional
 from collections import defaultdict
 import pandas as pd
 from pattern_ratios_2_Final import XABCD_PATTERN_RATIOS
+from ohlc_range_index import OHLCRangeIndex, ensure_range_index
+from price_band_index import PriceBandIndex, ratio_price_band
+from extremum import ExtremumArray
 
 
 @dataclass
@@ -55,23 +61,23 @@ class XABC_Entry:
 
 
 def validate_xabcd_containment_bullish(df, x_idx, a_idx, b_idx, c_idx, d_idx,
-                                       x_price, a_price, b_price, c_price, d_price):
+                                       x_price, a_price, b_price, c_price, d_price,
+                                       range_index=None):
     """Validate price containment for bullish XABCD"""
     try:
-        high_col = 'High' if 'High' in df.columns else 'high'
-        low_col = 'Low' if 'Low' in df.columns else 'low'
+        range_index = ensure_range_index(df, range_index)
 
-        if x_idx + 1 < a_idx and any(df.iloc[x_idx+1:a_idx+1][low_col] < x_price):
+        if x_idx + 1 < a_idx and range_index.low_breaks(x_idx+1, a_idx+1, x_price):
             return False
-        if x_idx < b_idx and any(df.iloc[x_idx:b_idx][high_col] > a_price):
+        if x_idx < b_idx and range_index.high_exceeds(x_idx, b_idx, a_price):
             return False
         if b_price <= x_price:
             return False
-        if a_idx < c_idx and any(df.iloc[a_idx:c_idx+1][low_col] < b_price):
+        if a_idx < c_idx and range_index.low_breaks(a_idx, c_idx+1, b_price):
             return False
-        if b_idx < d_idx and any(df.iloc[b_idx:d_idx][high_col] > c_price):
+        if b_idx < d_idx and range_index.high_exceeds(b_idx, d_idx, c_price):
             return False
-        if c_idx < d_idx and any(df.iloc[c_idx:d_idx][low_col] < d_price):
+        if c_idx < d_idx and range_index.low_breaks(c_idx, d_idx, d_price):
             return False
         if d_price >= b_price:
             return False
@@ -81,23 +87,23 @@ def validate_xabcd_containment_bullish(df, x_idx, a_idx, b_idx, c_idx, d_idx,
 
 
 def validate_xabcd_containment_bearish(df, x_idx, a_idx, b_idx, c_idx, d_idx,
-                                       x_price, a_price, b_price, c_price, d_price):
+                                       x_price, a_price, b_price, c_price, d_price,
+                                       range_index=None):
     """Validate price containment for bearish XABCD"""
     try:
-        high_col = 'High' if 'High' in df.columns else 'high'
-        low_col = 'Low' if 'Low' in df.columns else 'low'
+        range_index = ensure_range_index(df, range_index)
 
-        if x_idx + 1 < a_idx and any(df.iloc[x_idx+1:a_idx+1][high_col] > x_price):
+        if x_idx + 1 < a_idx and range_index.high_exceeds(x_idx+1, a_idx+1, x_price):
             return False
-        if x_idx < b_idx and any(df.iloc[x_idx:b_idx][low_col] < a_price):
+        if x_idx < b_idx and range_index.low_breaks(x_idx, b_idx, a_price):
             return False
         if b_price >= x_price:
             return False
-        if a_idx < c_idx and any(df.iloc[a_idx:c_idx+1][high_col] > b_price):
+        if a_idx < c_idx and range_index.high_exceeds(a_idx, c_idx+1, b_price):
             return False
-        if b_idx < d_idx and any(df.iloc[b_idx:d_idx][low_col] < c_price):
+        if b_idx < d_idx and range_index.low_breaks(b_idx, d_idx, c_price):
             return False
-        if c_idx < d_idx and any(df.iloc[c_idx:d_idx][high_col] > d_price):
+        if c_idx < d_idx and range_index.high_exceeds(c_idx, d_idx, d_price):
             return False
         if d_price <= b_price:
             return False
@@ -121,7 +127,7 @@ def detect_xabcd_patterns_o_n3(extremum_points: List[Tuple],
     3. Probe with D - O(n²)
 
     Args:
-        extremum_points: List of (timestamp, price, is_high, bar_index)
+        extremum_points: List of (timestamp, price, is_high, bar_index), or an ExtremumArray
         df: DataFrame for validation
         log_details: Print progress
         strict_validation: Apply price containment
@@ -143,18 +149,25 @@ def detect_xabcd_patterns_o_n3(extremum_points: List[Tuple],
         print(f"[O(n³)] XABCD detection with {n} extremum points")
 
     # Separate highs and lows
-    highs = []
-    lows = []
-    for i, ep in enumerate(extremum_points):
-        bar_idx = ep[3] if len(ep) > 3 else i
-        if ep[2]:
-            highs.append((bar_idx, ep[0], ep[1]))
-        else:
-            lows.append((bar_idx, ep[0], ep[1]))
-
-    high_col = 'High' if df is not None and 'High' in df.columns else 'high'
-    low_col = 'Low' if df is not None and 'Low' in df.columns else 'low'
-    d_crossing_cache = {}
+    if isinstance(extremum_points, ExtremumArray):
+        highs = extremum_points.bar_rows(True)
+        lows = extremum_points.bar_rows(False)
+    else:
+        highs = []
+        lows = []
+        for i, ep in enumerate(extremum_points):
+            bar_idx = ep[3] if len(ep) > 3 else i
+            if ep[2]:
+                highs.append((bar_idx, ep[0], ep[1]))
+            else:
+                lows.append((bar_idx, ep[0], ep[1]))
+
+    # Price-sorted views of highs/lows for C and D candidate pruning
+    high_band_index = PriceBandIndex([h[2] for h in highs])
+    low_band_index = PriceBandIndex([l[2] for l in lows])
+
+    # Shared High/Low range index: every containment check is O(1)
+    range_index = OHLCRangeIndex(df) if df is not None else None
 
     # ================================================================
     # PHASE 1: Build XAB Index - O(n³)
@@ -171,6 +184,7 @@ def detect_xabcd_patterns_o_n3(extremum_points: List[Tuple],
         x_cand = lows if is_bullish else highs
         a_cand = highs if is_bullish else lows
         b_cand = lows if is_bullish else highs
+        b_band_index = low_band_index if is_bullish else high_band_index
 
         for x_idx, x_time, x_price in x_cand:
             for a_idx, a_time, a_price in a_cand:
@@ -183,7 +197,13 @@ def detect_xabcd_patterns_o_n3(extremum_points: List[Tuple],
                 if xa_move == 0:
                     continue
 
-                for b_idx, b_time, b_price in b_cand:
+                # RATIO PRUNING: only B points whose AB/XA retracement can
+                # fall in this pattern's range
+                b_low, b_high = ratio_price_band(a_price, xa_move, *ratios['ab_xa'],
+                                                 upward=not is_bullish)
+
+                for b_pos in b_band_index.positions(b_low, b_high):
+                    b_idx, b_time, b_price = b_cand[b_pos]
                     if not (a_idx < b_idx):
                         continue
                     if max_search_window and (b_idx - a_idx) > max_search_window:
@@ -223,16 +243,36 @@ def detect_xabcd_patterns_o_n3(extremum_points: List[Tuple],
     if log_details:
         print(f"[O(n³)] Phase 2: Building XABC with D ranges...")
 
-    XABC_by_C = defaultdict(list)
+    # XAB entry groups per (pattern, B), in XAB index order
+    XAB_by_B = defaultdict(lambda: defaultdict(list))
+    for pattern_name, xab_by_key in XAB_index.items():
+        for (a_idx_key, b_idx_key), xab_entries in xab_by_key.items():
+            XAB_by_B[pattern_name][b_idx_key].append(xab_entries)
+
+    XABC_by_C = defaultdict(list)  # (pattern_name, c_idx) -> [XABC_Entry]
 
     for pattern_name, ratios in XABCD_PATTERN_RATIOS.items():
         is_bullish = 'bull' in pattern_name
 
         b_cand = lows if is_bullish else highs
         c_cand = highs if is_bullish else lows
+        c_band_index = high_band_index if is_bullish else low_band_index
 
         for b_idx, b_time, b_price in b_cand:
-            for c_idx, c_time, c_price in c_cand:
+            xab_groups = XAB_by_B[pattern_name].get(b_idx)
+            if not xab_groups:
+                continue
+
+            # RATIO PRUNING: the BC/AB range over the AB legs ending at B
+            # bounds C's price - only C points inside that band are visited
+            ab_moves = [xab.ab_move for xab_entries in xab_groups for xab in xab_entries]
+            near_low, near_high = ratio_price_band(b_price, min(ab_moves), *ratios['bc_ab'],
+                                                   upward=is_bullish)
+            far_low, far_high = ratio_price_band(b_price, max(ab_moves), *ratios['bc_ab'],
+                                                 upward=is_bullish)
+
+            for c_pos in c_band_index.positions(min(near_low, far_low), max(near_high, far_high)):
+                c_idx, c_time, c_price = c_cand[c_pos]
                 if not (b_idx < c_idx):
                     continue
                 if max_search_window and (c_idx - b_idx) > max_search_window:
@@ -242,11 +282,8 @@ def detect_xabcd_patterns_o_n3(extremum_points: List[Tuple],
                 if bc_move == 0:
                     continue
 
-                # Lookup XAB entries
-                for (a_idx_key, b_idx_key), xab_entries in XAB_index[pattern_name].items():
-                    if b_idx_key != b_idx:
-                        continue
-
+                # Lookup XAB entries ending at B
+                for xab_entries in xab_groups:
                     for xab in xab_entries:
                         ab_move = xab.ab_move
                         bc_ab_ratio = (bc_move / ab_move) * 100
@@ -295,7 +332,7 @@ def detect_xabcd_patterns_o_n3(extremum_points: List[Tuple],
                                 xab.ab_xa_ratio, bc_ab_ratio,
                                 d_min, d_max, pattern_name
                             )
-                            XABC_by_C[c_idx].append(xabc)
+                            XABC_by_C[(pattern_name, c_idx)].append(xabc)
 
     if log_details:
         total_xabc = sum(len(e) for e in XABC_by_C.values())
@@ -313,21 +350,25 @@ def detect_xabcd_patterns_o_n3(extremum_points: List[Tuple],
     for pattern_name, ratios in XABCD_PATTERN_RATIOS.items():
         is_bullish = 'bull' in pattern_name
         d_cand = lows if is_bullish else highs
+        d_band_index = low_band_index if is_bullish else high_band_index
 
         for c_idx, c_time, c_price in (highs if is_bullish else lows):
-            if c_idx not in XABC_by_C:
+            xabc_entries = XABC_by_C.get((pattern_name, c_idx))
+            if not xabc_entries:
                 continue
 
-            for d_idx, d_time, d_price in d_cand:
+            # Only D points inside the union of the entries' D price ranges
+            d_low = min(xabc.d_price_min for xabc in xabc_entries)
+            d_high = max(xabc.d_price_max for xabc in xabc_entries)
+
+            for d_pos in d_band_index.positions(d_low, d_high):
+                d_idx, d_time, d_price = d_cand[d_pos]
                 if not (c_idx < d_idx):
                     continue
                 if max_search_window and (d_idx - c_idx) > max_search_window:
                     continue
 
-                for xabc in XABC_by_C[c_idx]:
-                    if xabc.pattern_name != pattern_name:
-                        continue
-
+                for xabc in xabc_entries:
                     # O(1) range check - both ratios guaranteed!
                     if not (xabc.d_price_min <= d_price <= xabc.d_price_max):
                         continue
@@ -349,29 +390,25 @@ def detect_xabcd_patterns_o_n3(extremum_points: List[Tuple],
                         if is_bullish:
                             valid = validate_xabcd_containment_bullish(
                                 df, xabc.x_idx, xabc.a_idx, xabc.b_idx, c_idx, d_idx,
-                                xabc.x_price, xabc.a_price, xabc.b_price, c_price, d_price
+                                xabc.x_price, xabc.a_price, xabc.b_price, c_price, d_price,
+                                range_index=range_index
                             )
                         else:
                             valid = validate_xabcd_containment_bearish(
                                 df, xabc.x_idx, xabc.a_idx, xabc.b_idx, c_idx, d_idx,
-                                xabc.x_price, xabc.a_price, xabc.b_price, c_price, d_price
+                                xabc.x_price, xabc.a_price, xabc.b_price, c_price, d_price,
+                                range_index=range_index
                             )
                         if not valid:
                             continue
 
                     # Validate D crossing
                     if validate_d_crossing and df is not None and d_idx < len(df) - 1:
-                        key = (d_idx, d_price, is_bullish)
-                        if key not in d_crossing_cache:
-                            crossed = False
-                            if is_bullish:
-                                if df[low_col].iloc[d_idx+1:].min() < d_price:
-                                    crossed = True
-                            else:
-                                if df[high_col].iloc[d_idx+1:].max() > d_price:
-                                    crossed = True
-                            d_crossing_cache[key] = crossed
-                        if d_crossing_cache[key]:
+                        if is_bullish:
+                            crossed = range_index.low_breaks(d_idx+1, len(df), d_price)
+                        else:
+                            crossed = range_index.high_exceeds(d_idx+1, len(df), d_price)
+                        if crossed:
                             continue
 
                     # Create pattern
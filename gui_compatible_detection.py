@@ -7,6 +7,7 @@ including proper timestamp conversion for strict pattern validation.
 
 import pandas as pd
 from typing import List, Tuple, Dict, Any
+from extremum import ExtremumArray
 from formed_abcd import detect_strict_abcd_patterns
 # Updated to use smart adaptive XABCD detection (O(n³) for large datasets, original for small)
 from xabcd_detection import detect_xabcd_patterns_smart as detect_strict_xabcd_patterns
@@ -20,13 +21,27 @@ def convert_extremums_to_timestamps(extremums: List[Tuple], df: pd.DataFrame) ->
     but strict validation expects actual timestamps.
 
     Args:
-        extremums: List of tuples (timestamp, price, is_high, bar_index) from detect_extremum_points
+        extremums: List of tuples (timestamp, price, is_high, bar_index) from detect_extremum_points,
+                   or an ExtremumArray
         df: DataFrame with Date column containing timestamps
 
     Returns:
         List of tuples (timestamp, price, is_high, bar_index) for strict validation
+        (an ExtremumArray for ExtremumArray input)
     """
     import numpy as np
+
+    if isinstance(extremums, ExtremumArray) and extremums.ts_kind == 'int':
+        # Columnar input: map every index to its Date in one lookup
+        in_bounds = extremums.ts < len(df)
+        for idx in extremums.ts[~in_bounds].tolist():
+            print(f"Warning: extremum index {idx} is out of bounds for DataFrame length {len(df)}")
+        extremums = extremums[in_bounds]
+        dates = df['Date']
+        if dates.dtype == 'datetime64[ns]':
+            return extremums.with_timestamps(dates.to_numpy()[extremums.ts].view(np.int64), ts_kind='timestamp')
+        return extremums.with_timestamps(dates.iloc[extremums.ts].tolist())
+
     converted_extremums = []
 
     for item in extremums:
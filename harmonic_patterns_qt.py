@@ -10,6 +10,7 @@ DEBUG_MODE = True  # Set to False for production
 
 import sys
 import os
+import multiprocessing
 import pandas as pd
 import numpy as np
 from datetime import datetime
@@ -43,7 +44,7 @@ from active_signals_window import ActiveSignalsWindow
 from pattern_cache import get_pattern_cache
 
 # Parallel pattern detection
-from parallel_pattern_detector import detect_patterns_parallel
+from parallel_pattern_detector import detect_patterns_parallel, ParallelPatternDetector
 
 # PRZ Pattern color mapping for better visual identification
 PRZ_PATTERN_COLORS = {
@@ -90,6 +91,9 @@ detect_unformed_xabcd_patterns = None
 # Import formed ABCD pattern detection (formerly called strict)
 # These imports have been consolidated into formed_abcd.py and formed_xabcd.py
 
+# Extremum (pivot) detection
+from extremum import detect_extremum_points
+
 # Import ABCD pattern detection from separated modules
 from formed_abcd import (
     detect_strict_abcd_patterns as detect_comprehensive_strict_abcd
@@ -100,9 +104,10 @@ from unformed_abcd import (
 print("ABCD pattern detection loaded")
 
 # Import XABCD pattern detection from renamed files
-from unformed_xabcd import detect_strict_unformed_xabcd_patterns as detect_comprehensive_unformed_xabcd
+from xabcd_detection import detect_unformed_xabcd_patterns_smart as detect_comprehensive_unformed_xabcd
 # Updated to use smart adaptive XABCD detection (O(n³) for large datasets, original for small)
 from xabcd_detection import detect_xabcd_patterns_smart as detect_formed_xabcd_func
+from xabcd_detection import ADAPTIVE_THRESHOLD
 from backtesting_dialog import BacktestingDialog
 print("Comprehensive XABCD pattern detection loaded (with adaptive O(n³) optimization)")
 
@@ -422,7 +427,6 @@ class PatternDetectionWorker(QThread):
 
     def _run_parallel(self):
         """Parallel pattern detection for maximum performance"""
-        from concurrent.futures import ThreadPoolExecutor, as_completed
         import time as _time
 
         if DEBUG_MODE: print(f"Starting PARALLEL pattern detection with types: {self.pattern_types}")
@@ -457,41 +461,47 @@ class PatternDetectionWorker(QThread):
         if 'unstrict_xabcd' in self.pattern_types:
             detection_map['unformed_xabcd'] = self.detect_unformed_xabcd_patterns
 
+        # Unformed searches dominate the run time; on large inputs they are
+        # split across worker processes instead of sharing a thread's GIL
+        pooled_map = {}
+        if 'unformed' in detection_map:
+            pooled_map['unformed'] = lambda pool: self.detect_unformed_patterns(pool)
+        if 'unformed_xabcd' in detection_map:
+            pooled_map['unformed_xabcd'] = lambda pool: self.detect_unformed_xabcd_patterns(pool)
+
         start_time = _time.time()
         completed_count = 0
         total_tasks = len(detection_map)
 
-        try:
-            # Run all detection tasks in parallel
-            with ThreadPoolExecutor(max_workers=min(4, total_tasks)) as executor:
-                future_to_type = {}
-
-                # Submit all tasks
-                for pattern_type, detection_method in detection_map.items():
-                    self.status.emit(f"Starting {pattern_type.replace('_', ' ').title()}...")
-                    future = executor.submit(detection_method)
-                    future_to_type[future] = pattern_type
-
-                # Collect results as they complete
-                for future in as_completed(future_to_type):
-                    pattern_type = future_to_type[future]
-
-                    try:
-                        patterns = future.result()
-                        results[pattern_type] = patterns if patterns else []
+        def on_progress(pattern_type, status, count=None, error=None):
+            nonlocal completed_count
+            if status == 'started':
+                self.status.emit(f"Starting {pattern_type.replace('_', ' ').title()}...")
+                return
 
-                        completed_count += 1
-                        progress = int((completed_count / total_tasks) * 100)
-                        self.progress.emit(progress)
+            completed_count += 1
+            progress = int((completed_count / total_tasks) * 100)
+            self.progress.emit(progress)
 
-                        self.status.emit(f"Completed {pattern_type.replace('_', ' ').title()}: {len(results[pattern_type])} patterns")
-                        if DEBUG_MODE:
-                            print(f"✓ {pattern_type}: {len(results[pattern_type])} patterns")
+            if status == 'completed':
+                self.status.emit(f"Completed {pattern_type.replace('_', ' ').title()}: {count} patterns")
+                if DEBUG_MODE:
+                    print(f"✓ {pattern_type}: {count} patterns")
+            elif DEBUG_MODE:
+                print(f"✗ {pattern_type} failed: {error}")
 
-                    except Exception as e:
-                        if DEBUG_MODE:
-                            print(f"✗ {pattern_type} failed: {e}")
-                        results[pattern_type] = []
+        try:
+            # Run all detection tasks in parallel. This thread runs beside
+            # Qt's, so pool workers are spawned rather than forked from it.
+            detector = ParallelPatternDetector(max_workers=min(4, max(total_tasks, 1)),
+                                               mp_context=multiprocessing.get_context('spawn'))
+            detected = detector.detect_all_patterns(
+                self.extremum_points, self.data, detection_map,
+                progress_callback=on_progress,
+                pooled_methods=pooled_map
+            )
+            for pattern_type, patterns in detected.items():
+                results[pattern_type] = patterns if patterns else []
 
             # Validate results
             for ptype, plist in results.items():
@@ -813,8 +823,8 @@ class PatternDetectionWorker(QThread):
         print(f"DEBUG: filter_unformed_patterns returning {len(filtered)} patterns")
         return filtered
 
-    def detect_unformed_patterns(self):
-        """Detect Unformed ABCD patterns (CACHED)"""
+    def detect_unformed_patterns(self, pool=None):
+        """Detect Unformed ABCD patterns (CACHED), across `pool`'s processes if given"""
         # Get search window value
         max_window = self.get_search_window(len(self.extremum_points))
 
@@ -837,12 +847,19 @@ class PatternDetectionWorker(QThread):
             return cached
 
         # Detect patterns
-        patterns = detect_unformed_abcd_patterns(
-            limited_extremum_points,
-            df=self.data,
-            log_details=True,  # Enable console logging for progress visibility
-            max_search_window=max_window
-        )
+        if pool is not None:
+            patterns = pool.detect(
+                'unformed_abcd', limited_extremum_points, self.data,
+                max_search_window=max_window,
+                strict_validation=True
+            )
+        else:
+            patterns = detect_unformed_abcd_patterns(
+                limited_extremum_points,
+                df=self.data,
+                log_details=True,  # Enable console logging for progress visibility
+                max_search_window=max_window
+            )
         filtered = self.filter_unformed_patterns(patterns, is_xabcd=False)
 
         # Cache filtered results
@@ -964,8 +981,8 @@ class PatternDetectionWorker(QThread):
         print(f"DEBUG: After filtering: {len(unformed_filtered) if isinstance(unformed_filtered, list) else 'NOT A LIST'} patterns")
         return unformed_filtered
 
-    def detect_unformed_xabcd_patterns(self):
-        """Detect Unformed XABCD patterns (CACHED)"""
+    def detect_unformed_xabcd_patterns(self, pool=None):
+        """Detect Unformed XABCD patterns (CACHED), across `pool`'s processes if given"""
         # Get search window value from GUI
         max_window = self.get_search_window(len(self.extremum_points))
 
@@ -1013,13 +1030,23 @@ class PatternDetectionWorker(QThread):
         if 'max_window' in locals():
             print(f"  - max_window value: {max_window}")
 
-        patterns = detect_comprehensive_unformed_xabcd(
-            extremums_to_use, self.data,
-            log_details=True,  # Enable console logging for progress visibility
-            max_patterns=max_pats if 'max_pats' in locals() else 100,
-            max_search_window=max_window if 'max_window' in locals() else 20,
-            strict_validation=True
-        )
+        if pool is not None and len(extremums_to_use) >= ADAPTIVE_THRESHOLD:
+            # The indexed algorithm the smart detector picks at this size,
+            # split across the pool's processes
+            patterns = pool.detect(
+                'unformed_xabcd', extremums_to_use, self.data,
+                max_patterns=max_pats,
+                max_search_window=max_window,
+                strict_validation=True
+            )
+        else:
+            patterns = detect_comprehensive_unformed_xabcd(
+                extremums_to_use, self.data,
+                log_details=True,  # Enable console logging for progress visibility
+                max_patterns=max_pats if 'max_pats' in locals() else 100,
+                max_search_window=max_window if 'max_window' in locals() else 20,
+                strict_validation=True
+            )
 
         print(f"DEBUG: Got {len(patterns)} patterns from detect_comprehensive_unformed_xabcd")
 
@@ -4913,47 +4940,9 @@ class HarmonicPatternDetector(QMainWindow):
         data = self.filtered_data if self.filtered_data is not None else self.data
         length = self.length_spinbox.value()
 
-        # OPTIMIZED pivot detection using vectorized operations
-        self.extremum_points = []
-
-        # Convert to numpy arrays for vectorized operations (10x faster)
-        highs = data['High'].values
-        lows = data['Low'].values
-        timestamps = data.index.values
-        n = len(data)
-
-        # Vectorized pivot detection - O(n) instead of O(n²)
-        for i in range(length, n - length):
-            # Use numpy operations for window comparisons
-            left_window = slice(i-length, i)
-            right_window = slice(i+1, i+length+1)
-
-            # Check for high pivot
-            is_high_pivot = (
-                highs[i] >= np.max(highs[left_window]) and
-                highs[i] >= np.max(highs[right_window]) and
-                highs[i] >= highs[i-1] and highs[i] >= highs[i+1]
-            )
-
-            # Check for low pivot
-            is_low_pivot = (
-                lows[i] <= np.min(lows[left_window]) and
-                lows[i] <= np.min(lows[right_window]) and
-                lows[i] <= lows[i-1] and lows[i] <= lows[i+1]
-            )
-
-            # Add BOTH high and low pivots if they exist
-            # This ensures we capture ALL extremum points
-            # Unlike the old logic which chose one, we keep both to allow pattern detection flexibility
-            if is_high_pivot:
-                self.extremum_points.append((timestamps[i], highs[i], True, i))
-
-            # Add low pivot separately (not elif) to capture both if they exist on same candle
-            if is_low_pivot:
-                self.extremum_points.append((timestamps[i], lows[i], False, i))
-
-        # Sort by date
-        self.extremum_points.sort(key=lambda x: x[0])
+        # Vectorized pivot detection (sliding-window max/min) - keeps BOTH high and
+        # low pivots when they exist on the same candle
+        self.extremum_points = detect_extremum_points(data, length=length)
 
         # Count highs and lows separately for detailed reporting
         high_count = sum(1 for _, _, is_high, _ in self.extremum_points if is_high)
@@ -0,0 +1,491 @@
+"""
+Incremental Unformed Pattern Detection
+======================================
+Walk-forward engine for unformed ABCD and XABCD detection.
+
+Instead of re-running detect_unformed_abcd_patterns and
+detect_strict_unformed_xabcd_patterns over the whole extremum list on every
+bar, the engine keeps its state between steps and only enumerates
+combinations whose last point (C) is a newly confirmed extremum:
+
+1. Everything that depends only on bars up to C (alternation, structure,
+   ratios, price containment, D-line projection) is evaluated once, when C
+   is confirmed. Partial A-B / X-A / X-A-B prefixes are kept in lists and
+   dropped as soon as a later bar breaks their containment rules.
+2. The checks that look at bars after C (C crossed, D-lines crossing
+   candlesticks) are monotone - once failed they stay failed - so live
+   candidates are only re-checked against bars added since the last step.
+
+Results are identical to the full detectors (unlimited search window,
+strict validation) run on the same extremum list and data slice.
+"""
+
+from dataclasses import dataclass, field
+from typing import List, Tuple, Dict
+import pandas as pd
+import numpy as np
+
+from ohlc_range_index import OHLCRangeIndex
+from ratio_index import XABCD_RATIO_INDEX
+from unformed_abcd import (
+    validate_price_containment_bullish,
+    validate_price_containment_bearish,
+    _process_abc_combination_optimized
+)
+from unformed_xabcd import (
+    XABCD_PATTERN_LOOKUP,
+    MAX_FUTURE_CANDLES,
+    validate_price_containment_bullish_xabcd,
+    validate_price_containment_bearish_xabcd,
+    calculate_horizontal_d_lines,
+    _build_unformed_xabcd_pattern
+)
+
+
+@dataclass
+class _Prefix:
+    """Partial pattern (A-B, X-A or X-A-B) waiting for its next point"""
+    positions: Tuple[int, ...]
+    is_bullish: bool
+    guard_price: float  # Price a later bar must not break
+    checked_to: int     # Bars before this index already checked against guard_price
+
+
+@dataclass
+class _UnformedCandidate:
+    """Unformed pattern whose C-dependent checks passed when C was confirmed"""
+    positions: Tuple[int, ...]
+    is_bullish: bool
+    c_bar: int
+    c_price: float
+    checked_to: int
+    d_lines: List[float] = field(default_factory=list)
+    d_lines_alive: List[bool] = field(default_factory=list)
+    matching_patterns_data: List[Dict] = field(default_factory=list)
+    ab_xa_retracement: float = 0.0
+    bc_ab_projection: float = 0.0
+
+
+class IncrementalUnformedDetector:
+    """
+    Incremental unformed ABCD/XABCD detector for walk-forward backtesting.
+
+    Call update() once per step with the extremum points confirmed so far and
+    the number of bars visible. Extremum points must be (timestamp, price,
+    is_high, bar_index) tuples sorted by bar index, as returned by
+    detect_extremum_points, and each call's list must extend the previous one
+    (otherwise the engine starts over from scratch).
+    """
+
+    def __init__(self, data: pd.DataFrame):
+        """
+        Args:
+            data: Full OHLC DataFrame (positional bar indices). Only bars before
+                  the data_end passed to update() are ever read.
+        """
+        self.data = data
+        high_col = 'High' if 'High' in data.columns else 'high'
+        low_col = 'Low' if 'Low' in data.columns else 'low'
+        self.highs = data[high_col].values
+        self.lows = data[low_col].values
+        self.range_index = OHLCRangeIndex(data)
+
+        self.reset()
+
+    def reset(self):
+        """Drop all state"""
+        self.extremum_points: List[Tuple] = []
+        self.data_end = 0
+        self._ab_prefixes: List[_Prefix] = []
+        self._xa_prefixes: List[_Prefix] = []
+        self._xab_prefixes: List[_Prefix] = []
+        self._abcd_candidates: List[_UnformedCandidate] = []
+        self._xabcd_candidates: List[_UnformedCandidate] = []
+
+    def get_state(self) -> Dict:
+        """State built up by update() (everything reset() clears), for checkpoints"""
+        return {
+            'extremum_points': self.extremum_points,
+            'data_end': self.data_end,
+            'ab_prefixes': self._ab_prefixes,
+            'xa_prefixes': self._xa_prefixes,
+            'xab_prefixes': self._xab_prefixes,
+            'abcd_candidates': self._abcd_candidates,
+            'xabcd_candidates': self._xabcd_candidates,
+        }
+
+    def set_state(self, state: Dict):
+        """Restore state returned by get_state(); the data must start with the same bars"""
+        self.extremum_points = state['extremum_points']
+        self.data_end = state['data_end']
+        self._ab_prefixes = state['ab_prefixes']
+        self._xa_prefixes = state['xa_prefixes']
+        self._xab_prefixes = state['xab_prefixes']
+        self._abcd_candidates = state['abcd_candidates']
+        self._xabcd_candidates = state['xabcd_candidates']
+
+    def update(self, extremum_points: List[Tuple], data_end: int) -> Tuple[List[Dict], List[Dict]]:
+        """
+        Advance the engine and return the current unformed patterns.
+
+        Args:
+            extremum_points: All extremum points confirmed within the first data_end bars
+            data_end: Number of bars visible (length of the detection data slice)
+
+        Returns:
+            Tuple of (unformed_abcd, unformed_xabcd) in the same order as
+            detect_unformed_abcd_patterns / detect_strict_unformed_xabcd_patterns
+        """
+        n_known = len(self.extremum_points)
+        if (data_end < self.data_end or len(extremum_points) < n_known or
+                (n_known and extremum_points[n_known - 1] != self.extremum_points[-1])):
+            self.reset()
+            n_known = 0
+
+        self.extremum_points.extend(extremum_points[n_known:])
+        self.data_end = data_end
+
+        for pos in range(n_known, len(self.extremum_points)):
+            self._add_extremum(pos)
+
+        self._refresh_candidates()
+        return self._build_abcd_patterns(), self._build_xabcd_patterns()
+
+    # ------------------------------------------------------------------
+    # Enumeration
+    # ------------------------------------------------------------------
+
+    def _guard_broken(self, prefix: _Prefix, end: int) -> bool:
+        """Scan bars [checked_to, end) for a break of the prefix guard price"""
+        if end > prefix.checked_to:
+            if prefix.is_bullish:
+                broken = self.range_index.low_breaks(prefix.checked_to, end, prefix.guard_price)
+            else:
+                broken = self.range_index.high_exceeds(prefix.checked_to, end, prefix.guard_price)
+            prefix.checked_to = end
+            return bool(broken)
+        return False
+
+    def _add_extremum(self, pos: int):
+        """Extend prefixes and candidates with the extremum at position pos"""
+        # Order matters: the new point is used as C/B/A against prefixes
+        # built from earlier points only
+        self._extend_abcd(pos)
+        self._extend_xabcd_c(pos)
+        self._extend_xabcd_b(pos)
+        self._add_ab_prefixes(pos)
+        self._add_xa_prefixes(pos)
+
+    def _add_ab_prefixes(self, pos: int):
+        """Register A-B prefixes with B at pos (rules that only need bars up to B)"""
+        B = self.extremum_points[pos]
+        b_bar, b_price = B[3], B[1]
+
+        for i in range(pos):
+            A = self.extremum_points[i]
+            if A[0] == B[0] or A[2] == B[2] or A[3] >= b_bar:
+                continue
+
+            is_bullish = A[2]  # A is HIGH for bullish
+            a_bar, a_price = A[3], A[1]
+            if is_bullish:
+                if not a_price > b_price:
+                    continue
+                # A->B: no high exceeds A
+                if a_bar + 1 < b_bar and self.range_index.high_exceeds(a_bar+1, b_bar+1, a_price):
+                    continue
+                # A->C: no low breaks B (bars up to B)
+                if self.range_index.low_breaks(a_bar+1, b_bar+1, b_price):
+                    continue
+            else:
+                if not a_price < b_price:
+                    continue
+                if a_bar + 1 < b_bar and self.range_index.low_breaks(a_bar+1, b_bar+1, a_price):
+                    continue
+                if self.range_index.high_exceeds(a_bar+1, b_bar+1, b_price):
+                    continue
+
+            self._ab_prefixes.append(_Prefix((i, pos), is_bullish, b_price, b_bar + 1))
+
+    def _extend_abcd(self, pos: int):
+        """Complete A-B prefixes with C at pos"""
+        C = self.extremum_points[pos]
+        c_bar = C[3]
+
+        alive = []
+        for prefix in self._ab_prefixes:
+            # A->C: no low breaks B - once broken, no later C can pass
+            if self._guard_broken(prefix, c_bar + 1):
+                continue
+            alive.append(prefix)
+
+            i, j = prefix.positions
+            A, B = self.extremum_points[i], self.extremum_points[j]
+            if C[2] != A[2] or A[0] == C[0] or B[0] == C[0]:
+                continue
+            if B[3] == c_bar or A[3] == c_bar:
+                continue
+            if prefix.is_bullish:
+                if not (C[1] > B[1] and C[1] < A[1]):
+                    continue
+            elif not (C[1] < B[1] and C[1] > A[1]):
+                continue
+
+            signature = (A[3], A[2], B[3], B[2], C[3], C[2])
+            if _process_abc_combination_optimized(A, B, C, signature) is None:
+                continue
+
+            try:
+                validate = (validate_price_containment_bullish if prefix.is_bullish
+                            else validate_price_containment_bearish)
+                if not validate(self.data, A[3], B[3], c_bar, None, A[1], B[1], C[1], None,
+                                range_index=self.range_index):
+                    continue
+            except Exception:
+                continue
+
+            self._abcd_candidates.append(_UnformedCandidate(
+                positions=(i, j, pos),
+                is_bullish=prefix.is_bullish,
+                c_bar=c_bar,
+                c_price=C[1],
+                checked_to=c_bar + 1
+            ))
+
+        self._ab_prefixes = alive
+
+    def _add_xa_prefixes(self, pos: int):
+        """Register X-A prefixes with A at pos"""
+        A = self.extremum_points[pos]
+        a_bar, a_price = A[3], A[1]
+
+        for i in range(pos):
+            X = self.extremum_points[i]
+            if X[0] == A[0] or X[2] == A[2] or X[3] >= a_bar:
+                continue
+
+            is_bullish = not X[2]  # X is low for bullish
+            x_bar, x_price = X[3], X[1]
+            if is_bullish:
+                if not x_price < a_price:
+                    continue
+                # Rule 1: X should be the lowest between X-A
+                if x_bar + 1 < a_bar and self.range_index.low_breaks(x_bar+1, a_bar+1, x_price):
+                    continue
+                # Rule 2 (bars up to A): A should be the highest between X-B
+                if self.range_index.high_exceeds(x_bar, a_bar+1, a_price):
+                    continue
+            else:
+                if not x_price > a_price:
+                    continue
+                if x_bar + 1 < a_bar and self.range_index.high_exceeds(x_bar+1, a_bar+1, x_price):
+                    continue
+                if self.range_index.low_breaks(x_bar, a_bar+1, a_price):
+                    continue
+
+            self._xa_prefixes.append(_Prefix((i, pos), is_bullish, a_price, a_bar + 1))
+
+    def _extend_xabcd_b(self, pos: int):
+        """Extend X-A prefixes to X-A-B prefixes with B at pos"""
+        B = self.extremum_points[pos]
+        b_bar, b_price = B[3], B[1]
+
+        alive = []
+        for prefix in self._xa_prefixes:
+            # Rule 2: no high exceeds A between X and B (B excluded)
+            if self._xa_guard_broken(prefix, b_bar):
+                continue
+            alive.append(prefix)
+
+            i, j = prefix.positions
+            X, A = self.extremum_points[i], self.extremum_points[j]
+            if A[0] == B[0] or A[2] == B[2] or A[3] >= b_bar:
+                continue
+
+            x_price, a_price = X[1], A[1]
+            if prefix.is_bullish:
+                if not a_price > b_price or b_price <= x_price:
+                    continue
+                # Rule 3b (bars up to B): B should be the lowest between A-C
+                if self.range_index.low_breaks(A[3], b_bar+1, b_price):
+                    continue
+            else:
+                if not a_price < b_price or b_price >= x_price:
+                    continue
+                if self.range_index.high_exceeds(A[3], b_bar+1, b_price):
+                    continue
+
+            xa_move = abs(a_price - x_price)
+            ab_move = abs(b_price - a_price)
+            if xa_move == 0 or ab_move == 0:
+                continue
+            ab_xa_retracement = (ab_move / xa_move) * 100
+            if not XABCD_RATIO_INDEX.match_mask({'ab_xa': ab_xa_retracement}, prefix.is_bullish):
+                continue
+
+            self._xab_prefixes.append(_Prefix((i, j, pos), prefix.is_bullish, b_price, b_bar + 1))
+
+        self._xa_prefixes = alive
+
+    def _xa_guard_broken(self, prefix: _Prefix, end: int) -> bool:
+        """Rule 2 scan for X-A prefixes (A is the extreme that must hold)"""
+        if end > prefix.checked_to:
+            if prefix.is_bullish:
+                broken = self.range_index.high_exceeds(prefix.checked_to, end, prefix.guard_price)
+            else:
+                broken = self.range_index.low_breaks(prefix.checked_to, end, prefix.guard_price)
+            prefix.checked_to = end
+            return bool(broken)
+        return False
+
+    def _extend_xabcd_c(self, pos: int):
+        """Complete X-A-B prefixes with C at pos"""
+        C = self.extremum_points[pos]
+        c_bar, c_price = C[3], C[1]
+
+        alive = []
+        for prefix in self._xab_prefixes:
+            # Rule 3b: B should be the lowest between A-C
+            if self._guard_broken(prefix, c_bar + 1):
+                continue
+            alive.append(prefix)
+
+            i, j, k = prefix.positions
+            X, A, B = self.extremum_points[i], self.extremum_points[j], self.extremum_points[k]
+            if X[0] == C[0] or B[0] == C[0] or B[2] == C[2]:
+                continue
+
+            x_price, a_price, b_price = X[1], A[1], B[1]
+            if prefix.is_bullish:
+                if not b_price < c_price:
+                    continue
+            elif not b_price > c_price:
+                continue
+
+            xa_move = abs(a_price - x_price)
+            ab_move = abs(b_price - a_price)
+            bc_move = abs(c_price - b_price)
+            if bc_move == 0:
+                continue
+
+            ab_xa_retracement = (ab_move / xa_move) * 100
+            bc_ab_projection = (bc_move / ab_move) * 100
+            matching_patterns_data = XABCD_PATTERN_LOOKUP.find_matching_patterns(
+                ab_xa_retracement, bc_ab_projection, prefix.is_bullish
+            )
+            if not matching_patterns_data:
+                continue
+
+            try:
+                validate = (validate_price_containment_bullish_xabcd if prefix.is_bullish
+                            else validate_price_containment_bearish_xabcd)
+                if not validate(self.data, int(X[3]), int(A[3]), int(B[3]), int(c_bar),
+                                x_price, a_price, b_price, c_price,
+                                range_index=self.range_index):
+                    continue
+            except Exception:
+                continue
+
+            d_lines = calculate_horizontal_d_lines(
+                x_price, a_price, b_price, c_price, matching_patterns_data[0], prefix.is_bullish
+            )
+            if not d_lines:
+                continue
+
+            self._xabcd_candidates.append(_UnformedCandidate(
+                positions=(i, j, k, pos),
+                is_bullish=prefix.is_bullish,
+                c_bar=c_bar,
+                c_price=c_price,
+                checked_to=c_bar + 1,
+                d_lines=d_lines,
+                d_lines_alive=[True] * len(d_lines),
+                matching_patterns_data=matching_patterns_data,
+                ab_xa_retracement=ab_xa_retracement,
+                bc_ab_projection=bc_ab_projection
+            ))
+
+        self._xab_prefixes = alive
+
+    # ------------------------------------------------------------------
+    # Post-C validation
+    # ------------------------------------------------------------------
+
+    def _c_point_crossed(self, candidate: _UnformedCandidate, end: int) -> bool:
+        """Check bars [checked_to, end) for price crossing C"""
+        start = candidate.checked_to
+        if end <= start:
+            return False
+        if candidate.is_bullish:
+            return self.range_index.high_exceeds(start, end, candidate.c_price)
+        return self.range_index.low_breaks(start, end, candidate.c_price)
+
+    def _refresh_candidates(self):
+        """Drop candidates invalidated by bars added since the last step"""
+        end = self.data_end
+
+        alive = []
+        for candidate in self._abcd_candidates:
+            if self._c_point_crossed(candidate, end):
+                continue
+            candidate.checked_to = max(candidate.checked_to, end)
+            alive.append(candidate)
+        self._abcd_candidates = alive
+
+        alive = []
+        for candidate in self._xabcd_candidates:
+            if self._c_point_crossed(candidate, end):
+                continue
+
+            # D lines may only cross candlesticks within MAX_FUTURE_CANDLES after C
+            window_end = min(candidate.c_bar + 1 + MAX_FUTURE_CANDLES, end)
+            start = candidate.checked_to
+            if window_end > start:
+                highs = self.highs[start:window_end]
+                lows = self.lows[start:window_end]
+                for n, d_price in enumerate(candidate.d_lines):
+                    if candidate.d_lines_alive[n] and np.any((lows <= d_price) & (d_price <= highs)):
+                        candidate.d_lines_alive[n] = False
+
+            candidate.checked_to = max(candidate.checked_to, end)
+            if any(candidate.d_lines_alive):
+                alive.append(candidate)
+        self._xabcd_candidates = alive
+
+    # ------------------------------------------------------------------
+    # Output
+    # ------------------------------------------------------------------
+
+    def _build_abcd_patterns(self) -> List[Dict]:
+        """Build unformed ABCD dicts in detect_unformed_abcd_patterns order"""
+        # Enumeration order of the full detector: A descending, then B, C ascending
+        ordered = sorted(self._abcd_candidates,
+                         key=lambda c: (-c.positions[0], c.positions[1], c.positions[2]))
+
+        patterns = []
+        for candidate in ordered:
+            A, B, C = (self.extremum_points[p] for p in candidate.positions)
+            signature = (A[3], A[2], B[3], B[2], C[3], C[2])
+            patterns.append(_process_abc_combination_optimized(A, B, C, signature))
+
+        # Same stable quality sort as the full detector
+        patterns.sort(key=lambda p: (
+            len(p['ratios']['matching_patterns']),
+            -abs(p['ratios']['bc_retracement'] - 50)
+        ), reverse=True)
+        return patterns
+
+    def _build_xabcd_patterns(self) -> List[Dict]:
+        """Build unformed XABCD dicts in detect_strict_unformed_xabcd_patterns order"""
+        ordered = sorted(self._xabcd_candidates, key=lambda c: c.positions)
+
+        patterns = []
+        for candidate in ordered:
+            X, A, B, C = (self.extremum_points[p] for p in candidate.positions)
+            d_lines = [d for d, alive in zip(candidate.d_lines, candidate.d_lines_alive) if alive]
+            patterns.append(_build_unformed_xabcd_pattern(
+                X, A, B, C, candidate.matching_patterns_data,
+                candidate.ab_xa_retracement, candidate.bc_ab_projection,
+                d_lines, candidate.is_bullish
+            ))
+        return patterns
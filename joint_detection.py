@@ -0,0 +1,764 @@
+"""
+Joint Pattern Detection
+=======================
+Single-pass detection of formed and unformed ABCD and XABCD patterns.
+
+Running detect_strict_abcd_patterns, detect_unformed_abcd_patterns,
+detect_xabcd_patterns and detect_strict_unformed_xabcd_patterns one after
+the other enumerates the same A-B-C prefixes four times. Here every A-B-C
+prefix is enumerated once:
+
+1. The containment rules all four families share (A is the extreme between
+   A and B, B between A and C, C between B and C) are checked once per
+   prefix, and the monotone ones prune whole branches.
+2. From a valid prefix the unformed ABCD projection is emitted and formed
+   ABCD completions are searched for D.
+3. The same prefix is extended backwards to X. Each valid X-A-B-C emits the
+   unformed XABCD D lines and is searched for formed XABCD completions.
+
+Each family then applies only its own extra rules (e.g. formed patterns
+check C and D against the bars up to D, unformed ones reject a C that
+price crossed later).
+
+Results are identical, including order, to the standalone detectors with
+strict validation and no max_patterns limit, run on the same extremum list
+and DataFrame. Extremum points must be sorted by bar index, as returned by
+detect_extremum_points.
+
+With unlimited search windows the full result lists can be very large.
+stream_patterns_joint yields compact PatternRecord tuples (family, name,
+direction, extremum positions) as they are found instead. The scan only
+runs each family's acceptance checks; a record is expanded to its pattern
+dict when the consumer asks for it, so patterns cut by max_patterns or
+filtered out by the consumer are never built. BoundedPatternQueue runs a
+stream on a background thread and hands its records to another thread in
+batches through a bounded queue; detect_all_patterns_joint(threaded=True)
+builds the pattern dicts on the calling thread while the enumeration runs
+on the queue's thread.
+"""
+
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple, Union
+import itertools
+import operator
+import queue
+import threading
+import pandas as pd
+
+from pattern_ratios_2_Final import ABCD_PATTERN_RATIOS
+from ohlc_range_index import OHLCRangeIndex
+from ratio_index import ABCD_RATIO_INDEX, XABCD_RATIO_INDEX
+from price_band_index import ExtremumBandIndex, ratio_price_band
+from extremum import ExtremumArray
+from formed_abcd import EPSILON, _abcd_prz_bounds, _build_formed_abcd_pattern
+from formed_xabcd import _build_formed_xabcd_pattern, _formed_xabcd_d_lines
+from unformed_abcd import PATTERN_LOOKUP, _process_abc_combination_optimized
+from unformed_xabcd import (
+    XABCD_PATTERN_LOOKUP,
+    calculate_horizontal_d_lines,
+    validate_d_lines_no_candlestick_crossing,
+    _build_unformed_xabcd_pattern
+)
+
+
+# Pattern families, named after the result keys
+FAMILIES = ('formed_abcd', 'unformed_abcd', 'formed_xabcd', 'unformed_xabcd')
+
+_ABCD_NAME_ORDER = {name: position for position, name in enumerate(ABCD_PATTERN_RATIOS)}
+
+
+class PatternRecord(NamedTuple):
+    """Compact reference to a detected pattern; expand with PatternStream.expand"""
+    family: str                  # One of FAMILIES
+    name: str                    # Ratio-table name (first matching name for unformed patterns)
+    is_bullish: bool
+    positions: Tuple[int, ...]   # Extremum list positions of X (XABCD), A, B, C and D (formed)
+    order: Tuple                 # Sort key of the standalone detector's result order
+
+
+def _within(window: Optional[int], start_bar: int, end_bar: int) -> bool:
+    """True if end_bar is at most window bars after start_bar (None = unlimited)"""
+    return window is None or end_bar - start_bar <= window
+
+
+def _loosest(windows) -> Optional[int]:
+    """Largest of several windows (None = unlimited wins)"""
+    windows = list(windows)
+    if not windows or any(window is None for window in windows):
+        return None
+    return max(windows)
+
+
+def _family_windows(max_search_window: Union[int, None, Dict[str, Optional[int]]],
+                    families: Sequence[str], n: int) -> Dict[str, Optional[int]]:
+    """Bar-distance limit per family, as each standalone detector reads its max_search_window"""
+    if isinstance(max_search_window, dict):
+        requested = {family: max_search_window.get(family) for family in families}
+    else:
+        requested = dict.fromkeys(families, max_search_window)
+
+    windows = dict(requested)
+    if 'formed_xabcd' in windows and windows['formed_xabcd'] == n:
+        # detect_xabcd_patterns treats a window equal to the point count as unlimited
+        windows['formed_xabcd'] = None
+    if windows.get('unformed_xabcd') is not None:
+        # detect_strict_unformed_xabcd_patterns caps the window at the point count
+        windows['unformed_xabcd'] = min(windows['unformed_xabcd'], n)
+    return windows
+
+
+def _unformed_xabcd_first_x(max_search_window: Optional[int], n: int) -> int:
+    """First X position detect_strict_unformed_xabcd_patterns enumerates"""
+    if max_search_window is None:
+        return 0
+    if max_search_window <= 10:
+        return max(0, n - max_search_window * 4)
+    return max(0, n - 300)
+
+
+def _family_limits(max_patterns: Union[int, None, Dict[str, Optional[int]]],
+                   families: Sequence[str]) -> Dict[str, Optional[int]]:
+    """Pattern limit per family (None = keep all)"""
+    if isinstance(max_patterns, dict):
+        return {family: max_patterns.get(family) for family in families}
+    return dict.fromkeys(families, max_patterns)
+
+
+def stream_patterns_joint(extremum_points: List[Tuple],
+                          df: pd.DataFrame,
+                          max_search_window: Union[int, None, Dict[str, Optional[int]]] = None,
+                          validate_d_crossing: bool = True,
+                          families: Sequence[str] = FAMILIES,
+                          log_details: bool = False) -> 'PatternStream':
+    """
+    Stream formed and unformed ABCD and XABCD patterns as they are found.
+
+    Takes the same arguments as detect_all_patterns_joint. Iterating the
+    returned stream runs the enumeration and yields a PatternRecord per
+    pattern, in discovery order (families interleaved); sorting a family's
+    records by their order field gives the standalone detector's order.
+
+    Example:
+        stream = stream_patterns_joint(extremums, df, families=('formed_xabcd',))
+        recent = [record for record in stream if record.positions[-1] >= len(extremums) - 10]
+        patterns = [stream.expand(record) for record in recent]
+
+    Returns:
+        PatternStream over the detected patterns
+    """
+    unknown = set(families) - set(FAMILIES)
+    if unknown:
+        raise ValueError(f"Unknown pattern families: {sorted(unknown)}")
+
+    scan = None
+    if families and df is not None and not df.empty and len(extremum_points) >= 3:
+        scan = _JointScan(extremum_points, df, max_search_window, validate_d_crossing,
+                          families, log_details)
+    return PatternStream(scan, families)
+
+
+def detect_all_patterns_joint(extremum_points: List[Tuple],
+                              df: pd.DataFrame,
+                              max_search_window: Union[int, None, Dict[str, Optional[int]]] = None,
+                              validate_d_crossing: bool = True,
+                              families: Sequence[str] = FAMILIES,
+                              log_details: bool = False,
+                              max_patterns: Union[int, None, Dict[str, Optional[int]]] = None,
+                              threaded: bool = False) -> Dict[str, List[Dict]]:
+    """
+    Detect formed and unformed ABCD and XABCD patterns in one enumeration.
+
+    Args:
+        extremum_points: List of tuples (timestamp, price, is_high, bar_index) sorted
+                         by bar index, or an ExtremumArray
+        df: DataFrame with OHLC data for price containment validation, or a
+            BacktestBars prefix (its shared range index is reused)
+        max_search_window: Maximum bar distance between consecutive pattern points
+                           (None = unlimited), or a dict of family -> window to
+                           mirror per-detector settings (missing families = unlimited)
+        validate_d_crossing: If True, reject formed patterns where price crosses D
+                             after formation
+        families: Families to detect (subset of FAMILIES)
+        log_details: Whether to print detailed logs
+        max_patterns: Maximum patterns kept per family (None = all), or a dict of
+                      family -> limit. A limited family holds at most twice its
+                      limit in records during the search, and only the kept
+                      records are built into pattern dicts
+        threaded: If True, run the enumeration on a background thread through a
+                  BoundedPatternQueue while this thread builds the pattern dicts
+
+    Returns:
+        Dict of family -> patterns, each list identical to the standalone detector's
+        result ('formed_abcd': detect_strict_abcd_patterns(max_patterns=None),
+        'unformed_abcd': detect_unformed_abcd_patterns,
+        'formed_xabcd': detect_xabcd_patterns(strict_validation=True),
+        'unformed_xabcd': detect_strict_unformed_xabcd_patterns), truncated to
+        max_patterns
+    """
+    stream = stream_patterns_joint(extremum_points, df, max_search_window, validate_d_crossing,
+                                   families, log_details)
+    if threaded:
+        with BoundedPatternQueue(stream) as pattern_queue:
+            results = stream.collect(max_patterns, batches=pattern_queue)
+    else:
+        results = stream.collect(max_patterns)
+
+    if log_details and stream.scan is not None:
+        print("\nJoint Detection Summary:")
+        print(f"  A-B-C prefixes: {stream.scan.abc_prefixes}, X-A-B-C prefixes: {stream.scan.xabc_prefixes}")
+        for family in families:
+            print(f"  {family}: {len(results[family])} patterns")
+
+    return results
+
+
+class PatternStream:
+    """
+    Patterns of one joint detection, produced lazily.
+
+    Each iteration re-runs the enumeration. Iterating yields PatternRecord
+    tuples of records that passed their family's checks; pattern dicts are
+    only built by expand(), items() and collect().
+    """
+
+    def __init__(self, scan: Optional['_JointScan'], families: Sequence[str]):
+        self.scan = scan
+        self.families = tuple(families)
+
+    def __iter__(self) -> Iterator[PatternRecord]:
+        if self.scan is not None:
+            yield from self.scan.run()
+
+    def items(self) -> Iterator[Tuple[PatternRecord, Dict]]:
+        """(record, pattern dict) for every pattern, in discovery order"""
+        for record in self:
+            yield record, self.expand(record)
+
+    def expand(self, record: PatternRecord) -> Dict:
+        """Pattern dict of a record yielded by this stream"""
+        return self.scan.build(record)
+
+    def collect(self, max_patterns: Union[int, None, Dict[str, Optional[int]]] = None,
+                batches: Optional[Iterable[List[PatternRecord]]] = None) -> Dict[str, List[Dict]]:
+        """
+        Run the stream and keep the first patterns of each family in detector order.
+
+        Args:
+            max_patterns: Maximum patterns per family (None = all), or a dict of
+                          family -> limit (missing families = all)
+            batches: Record batches of this stream to collect instead of running
+                     it here, e.g. a BoundedPatternQueue over it
+
+        Returns:
+            Dict of family -> patterns, identical to the standalone detector's result
+            truncated to the limit
+        """
+        limits = _family_limits(max_patterns, self.families)
+        kept = {family: [] for family in self.families}
+
+        records = self if batches is None else itertools.chain.from_iterable(batches)
+
+        for record in records:
+            family_kept = kept[record.family]
+            limit = limits[record.family]
+            if limit is None:
+                # Every pattern of an unlimited family is kept: build it right away
+                family_kept.append((record.order, self.expand(record)))
+                continue
+            family_kept.append((record.order, record))
+            if len(family_kept) > 2 * limit:
+                # Stable sort: equal keys (names of one X-A-B-C-D) keep discovery order
+                family_kept.sort(key=lambda item: item[0])
+                del family_kept[limit:]
+
+        results = {}
+        for family, family_kept in kept.items():
+            family_kept.sort(key=lambda item: item[0])
+            limit = limits[family]
+            if limit is None:
+                results[family] = [pattern for _, pattern in family_kept]
+            else:
+                results[family] = [self.expand(record) for _, record in family_kept[:limit]]
+        return results
+
+
+class BoundedPatternQueue:
+    """
+    Run a PatternStream on a background thread and hand its records over in batches.
+
+    The queue holds at most maxsize batches; the producer blocks while it is
+    full, so the records in flight stay bounded however slowly the consumer
+    (e.g. a GUI thread drawing patterns) drains them. Errors raised by the
+    detection are re-raised in the consuming thread.
+
+    Usage:
+        with BoundedPatternQueue(stream) as pattern_queue:
+            for batch in pattern_queue:
+                show([stream.expand(record) for record in batch if wanted(record)])
+    """
+
+    _DONE = object()
+
+    def __init__(self, stream: PatternStream, maxsize: int = 8, batch_size: int = 256):
+        self.stream = stream
+        self.batch_size = batch_size
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._stop = threading.Event()
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._produce, name='pattern-stream', daemon=True)
+
+    def start(self) -> 'BoundedPatternQueue':
+        """Start the producer thread (called on first iteration if not started)"""
+        if self._thread.ident is None:
+            self._thread.start()
+        return self
+
+    def close(self):
+        """Stop the producer (dropping unread batches) and wait for it to exit"""
+        self._stop.set()
+        if self._thread.ident is not None:
+            self._thread.join()
+
+    def __enter__(self) -> 'BoundedPatternQueue':
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __iter__(self) -> Iterator[List[PatternRecord]]:
+        self.start()
+        while True:
+            batch = self._queue.get()
+            if batch is self._DONE:
+                break
+            yield batch
+        if self._error is not None:
+            raise self._error
+
+    def _put(self, item) -> bool:
+        """Block until item is queued; False if the queue was closed meanwhile"""
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _produce(self):
+        try:
+            batch = []
+            for record in self.stream:
+                batch.append(record)
+                if len(batch) >= self.batch_size:
+                    if not self._put(batch):
+                        return
+                    batch = []
+            if batch and not self._put(batch):
+                return
+        except Exception as e:
+            self._error = e
+        self._put(self._DONE)
+
+
+class _JointScan:
+    """Enumeration state for one joint detection"""
+
+    def __init__(self, extremum_points, df: pd.DataFrame, max_search_window,
+                 validate_d_crossing: bool, families: Sequence[str], log_details: bool):
+        # Price-sorted extremum index for ratio-driven C/D candidate pruning,
+        # built on the columns; the enumeration indexes tuples
+        extremum_array = ExtremumArray.from_points(extremum_points)
+        self.band_index = ExtremumBandIndex(extremum_array)
+        self.points = extremum_array.points
+        self.n = len(self.points)
+        self.df = df
+        self.n_bars = len(df)
+        # A BacktestBars prefix shares the range index of the full data
+        self.range_index = getattr(df, 'range_index', None)
+        if self.range_index is None:
+            self.range_index = OHLCRangeIndex(df)
+        self.validate_d_crossing = validate_d_crossing
+        self.log_details = log_details
+
+        self.windows = _family_windows(max_search_window, families, self.n)
+        self.abcd_families = [f for f in ('formed_abcd', 'unformed_abcd') if f in families]
+        self.xabcd_families = [f for f in ('formed_xabcd', 'unformed_xabcd') if f in families]
+        self.prefix_window = _loosest(self.windows.values())
+        self.x_window = _loosest(self.windows[f] for f in self.xabcd_families)
+        if 'unformed_xabcd' in families:
+            requested = (max_search_window.get('unformed_xabcd') if isinstance(max_search_window, dict)
+                         else max_search_window)
+            self.unformed_x_start = _unformed_xabcd_first_x(requested, self.n)
+
+        self.seen_abc = set()
+        self.abc_prefixes = 0
+        self.xabc_prefixes = 0
+        # (positions, D line data) of the last accepted unformed XABCD record,
+        # so expanding a record right after it is yielded skips the D line check
+        self._last_d_lines = None
+
+        # C band: union of the BC/AB ranges of every pattern of a direction
+        self.c_bounds = {}
+        for is_bullish in (True, False):
+            bounds = []
+            if self.abcd_families:
+                bounds.append(ABCD_RATIO_INDEX.bounds(ABCD_RATIO_INDEX.match_mask({}, is_bullish), 'retr'))
+            if self.xabcd_families:
+                bounds.append(XABCD_RATIO_INDEX.bounds(XABCD_RATIO_INDEX.match_mask({}, is_bullish), 'bc_ab'))
+            self.c_bounds[is_bullish] = (min(lo for lo, _ in bounds), max(hi for _, hi in bounds))
+
+    def build(self, record: PatternRecord) -> Dict:
+        """Pattern dict of a record yielded by run()"""
+        if record.family == 'unformed_abcd':
+            return self._unformed_abcd_pattern(record.positions)
+        if record.family == 'formed_abcd':
+            return self._formed_abcd_pattern(record.name, record.positions, record.is_bullish)
+        if record.family == 'unformed_xabcd':
+            return self._unformed_xabcd_pattern(record.positions, record.is_bullish)
+        return self._formed_xabcd_pattern(record.name, record.positions, record.is_bullish)
+
+    def run(self) -> Iterator[PatternRecord]:
+        """Enumerate every A-B-C prefix once, yielding a record per accepted pattern"""
+        points, n = self.points, self.n
+        range_index = self.range_index
+        self.seen_abc = set()
+        self.abc_prefixes = 0
+        self.xabc_prefixes = 0
+
+        for a_pos in range(n):
+            A = points[a_pos]
+            is_bullish = bool(A[2])  # A is a high in bullish ABCD and XABCD patterns
+            a_bar, a_price = A[3], A[1]
+            # "Peak" points (A, C) are highs in bullish patterns, "trough" points (X, B, D) lows
+            peak_broken = range_index.high_exceeds if is_bullish else range_index.low_breaks
+            trough_broken = range_index.low_breaks if is_bullish else range_index.high_exceeds
+            beyond = operator.gt if is_bullish else operator.lt
+            c_ratio_min, c_ratio_max = self.c_bounds[is_bullish]
+
+            for b_pos in range(a_pos + 1, n - 1):
+                B = points[b_pos]
+                b_bar, b_price = B[3], B[1]
+                if not _within(self.prefix_window, a_bar, b_bar):
+                    break
+
+                # A is the extreme between A and B for every family. The range
+                # only grows with later B points, so once broken no later B can pass
+                if peak_broken(a_bar + 1, b_bar, a_price):
+                    break
+
+                if B[2] == A[2] or b_bar <= a_bar or not beyond(a_price, b_price):
+                    continue
+
+                ab_move = abs(b_price - a_price)
+                c_low, c_high = ratio_price_band(b_price, ab_move, c_ratio_min, c_ratio_max,
+                                                 upward=is_bullish)
+
+                for c_pos in self.band_index.candidates(is_bullish, c_low, c_high, b_pos + 1, n):
+                    C = points[c_pos]
+                    c_bar, c_price = C[3], C[1]
+                    if not _within(self.prefix_window, b_bar, c_bar):
+                        break
+
+                    # B is the extreme between A and C (monotone in C)
+                    if trough_broken(a_bar + 1, c_bar + 1, b_price):
+                        break
+
+                    if c_bar <= b_bar or not beyond(c_price, b_price):
+                        continue
+
+                    # C is the extreme between B and C
+                    if peak_broken(b_bar, c_bar, c_price):
+                        continue
+
+                    self.abc_prefixes += 1
+                    prefix = (a_pos, b_pos, c_pos)
+                    c_crossed = c_bar < self.n_bars - 1 and peak_broken(c_bar + 1, self.n_bars, c_price)
+
+                    if self.abcd_families:
+                        yield from self._abcd(prefix, is_bullish, peak_broken, trough_broken, beyond, c_crossed)
+                    if self.xabcd_families:
+                        yield from self._xabcd(prefix, is_bullish, peak_broken, trough_broken, beyond, c_crossed)
+
+    def _abcd(self, prefix, is_bullish, peak_broken, trough_broken, beyond, c_crossed):
+        """Yield the unformed ABCD projection and formed ABCD completions of an A-B-C prefix"""
+        a_pos, b_pos, c_pos = prefix
+        A, B, C = (self.points[pos] for pos in prefix)
+        a_bar, b_bar, c_bar = A[3], B[3], C[3]
+        a_price, b_price, c_price = A[1], B[1], C[1]
+
+        # ABCD only: C stays inside AB, and A's rule includes B's own bar
+        if not beyond(a_price, c_price):
+            return
+        if a_bar + 1 < b_bar and peak_broken(b_bar, b_bar + 1, a_price):
+            return
+
+        windows = self.windows
+        if ('unformed_abcd' in windows and not c_crossed
+                and _within(windows['unformed_abcd'], a_bar, b_bar)
+                and _within(windows['unformed_abcd'], b_bar, c_bar)):
+            signature = (a_bar, A[2], b_bar, B[2], c_bar, C[2])
+            if signature not in self.seen_abc:
+                self.seen_abc.add(signature)
+                record = self._unformed_abcd_record(prefix, is_bullish)
+                if record is not None:
+                    yield record
+
+        if 'formed_abcd' not in windows:
+            return
+        window = windows['formed_abcd']
+        if not (_within(window, a_bar, b_bar) and _within(window, b_bar, c_bar)):
+            return
+
+        bc_move = abs(c_price - b_price)
+        bc_retracement = (bc_move / abs(b_price - a_price)) * 100
+        retr_mask = ABCD_RATIO_INDEX.match_mask({'retr': bc_retracement}, is_bullish)
+        if not retr_mask:
+            return
+
+        # RATIO PRUNING: only D points whose CD projection can fall in the
+        # range of a pattern matching this retracement
+        proj_min, proj_max = ABCD_RATIO_INDEX.bounds(retr_mask, 'proj')
+        d_low, d_high = ratio_price_band(c_price, bc_move + EPSILON, proj_min, proj_max,
+                                         upward=not is_bullish)
+
+        for d_pos in self.band_index.candidates(not is_bullish, d_low, d_high, c_pos + 1, self.n):
+            D = self.points[d_pos]
+            d_bar, d_price = D[3], D[1]
+            if not _within(window, c_bar, d_bar):
+                break
+            if d_bar <= c_bar or not beyond(c_price, d_price):
+                continue
+
+            cd_projection = (abs(d_price - c_price) / (bc_move + EPSILON)) * 100
+            pattern_mask = retr_mask & ABCD_RATIO_INDEX.mask('proj', cd_projection)
+            if not pattern_mask:
+                continue
+
+            # C is the extreme between B and D, D between C and D
+            if peak_broken(b_bar, d_bar, c_price) or trough_broken(c_bar, d_bar, d_price):
+                continue
+
+            if (self.validate_d_crossing and d_bar < self.n_bars - 1
+                    and trough_broken(d_bar + 1, self.n_bars, d_price)):
+                continue
+
+            positions = prefix + (d_pos,)
+            for pattern_name in ABCD_RATIO_INDEX.names_for(pattern_mask):
+                prz_min, prz_max = _abcd_prz_bounds(pattern_name, c_price, bc_move, is_bullish)
+                if not (prz_min <= d_price <= prz_max):
+                    if self.log_details:
+                        print(f"  Rejected {pattern_name}: D point {d_price:.2f} not in PRZ "
+                              f"[{prz_min:.2f}, {prz_max:.2f}]")
+                    continue
+                order = (_ABCD_NAME_ORDER[pattern_name],) + positions
+                yield PatternRecord('formed_abcd', pattern_name, is_bullish, positions, order)
+
+    def _xabcd(self, prefix, is_bullish, peak_broken, trough_broken, beyond, c_crossed):
+        """Extend an A-B-C prefix backwards to X and yield unformed/formed XABCD patterns"""
+        a_pos, b_pos, c_pos = prefix
+        A, B, C = (self.points[pos] for pos in prefix)
+        a_bar, b_bar, c_bar = A[3], B[3], C[3]
+        a_price, b_price, c_price = A[1], B[1], C[1]
+
+        ab_move = abs(b_price - a_price)
+        bc_move = abs(c_price - b_price)
+        bc_ab = (bc_move / ab_move) * 100
+        bc_mask = XABCD_RATIO_INDEX.match_mask({'bc_ab': bc_ab}, is_bullish)
+        if not bc_mask:
+            return
+
+        # XABCD only: B's rule includes A's own bar
+        if trough_broken(a_bar, a_bar + 1, b_price):
+            return
+
+        windows = self.windows
+        unformed_window = windows.get('unformed_xabcd')
+        formed_window = windows.get('formed_xabcd')
+        emit_unformed = ('unformed_xabcd' in windows and not c_crossed
+                         and _within(unformed_window, a_bar, b_bar)
+                         and _within(unformed_window, b_bar, c_bar))
+        emit_formed = ('formed_xabcd' in windows
+                       and _within(formed_window, a_bar, b_bar)
+                       and _within(formed_window, b_bar, c_bar))
+        if not (emit_unformed or emit_formed):
+            return
+
+        for x_pos in range(a_pos - 1, -1, -1):
+            X = self.points[x_pos]
+            x_bar, x_price = X[3], X[1]
+            if not _within(self.x_window, x_bar, a_bar):
+                break
+
+            # A is the extreme between X and B; the range grows with earlier X
+            if peak_broken(x_bar, b_bar, a_price):
+                break
+
+            if X[2] == A[2] or x_bar >= a_bar or not beyond(a_price, x_price):
+                continue
+            # B stays inside XA
+            if not beyond(b_price, x_price):
+                continue
+            # X is the extreme between X and A
+            if x_bar + 1 < a_bar and trough_broken(x_bar + 1, a_bar + 1, x_price):
+                continue
+
+            xa_move = abs(a_price - x_price)
+            ab_xa = (ab_move / xa_move) * 100
+            xabc_mask = bc_mask & XABCD_RATIO_INDEX.match_mask({'ab_xa': ab_xa}, is_bullish)
+            if not xabc_mask:
+                continue
+
+            self.xabc_prefixes += 1
+            positions = (x_pos,) + prefix
+
+            if (emit_unformed and x_pos >= self.unformed_x_start
+                    and _within(unformed_window, x_bar, a_bar)):
+                d_line_data = self._unformed_xabcd_d_lines(positions, is_bullish)
+                if d_line_data is not None:
+                    self._last_d_lines = (positions, d_line_data)
+                    yield PatternRecord('unformed_xabcd', d_line_data[0][0]['name'],
+                                        is_bullish, positions, positions)
+
+            if emit_formed and _within(formed_window, x_bar, a_bar):
+                yield from self._formed_xabcd(positions, xabc_mask, is_bullish,
+                                              peak_broken, trough_broken, beyond)
+
+    def _formed_xabcd(self, positions, xabc_mask: int, is_bullish: bool,
+                      peak_broken, trough_broken, beyond):
+        """Yield formed XABCD completions of a valid X-A-B-C"""
+        x_pos, a_pos, b_pos, c_pos = positions
+        X, A, B, C = (self.points[pos] for pos in positions)
+        a_price, b_price, c_price = A[1], B[1], C[1]
+        b_bar, c_bar = B[3], C[3]
+        xa_move = abs(a_price - X[1])
+        bc_move = abs(c_price - b_price)
+        window = self.windows['formed_xabcd']
+
+        # RATIO PRUNING: CD/BC and AD/XA ranges of the matching patterns bound D's price
+        cd_min, cd_max = XABCD_RATIO_INDEX.bounds(xabc_mask, 'cd_bc')
+        d_low, d_high = ratio_price_band(c_price, bc_move, cd_min, cd_max, upward=not is_bullish)
+        _, ad_max = XABCD_RATIO_INDEX.bounds(xabc_mask, 'ad_xa')
+        ad_low, ad_high = ratio_price_band(a_price, xa_move, -ad_max, ad_max, upward=True)
+        d_low, d_high = max(d_low, ad_low), min(d_high, ad_high)
+
+        for d_pos in self.band_index.candidates(not is_bullish, d_low, d_high, c_pos + 1, self.n):
+            D = self.points[d_pos]
+            d_bar, d_price = D[3], D[1]
+            if not _within(window, c_bar, d_bar):
+                break
+            # D completes below C and stays inside BC (D beyond B fails rule 5b)
+            if d_bar <= c_bar or not beyond(c_price, d_price) or not beyond(b_price, d_price):
+                continue
+
+            # C is the extreme between B and D, D between C and D
+            if peak_broken(b_bar, d_bar, c_price) or trough_broken(c_bar, d_bar, d_price):
+                continue
+
+            cd_bc = (abs(d_price - c_price) / bc_move) * 100
+            ad_xa = (abs(d_price - a_price) / xa_move) * 100
+            pattern_mask = (xabc_mask & XABCD_RATIO_INDEX.mask('cd_bc', cd_bc)
+                            & XABCD_RATIO_INDEX.mask('ad_xa', ad_xa))
+
+            xabcd_positions = positions + (d_pos,)
+            points = (X, A, B, C, D)
+            for pattern_name in XABCD_RATIO_INDEX.names_for(pattern_mask):
+                # Containment was checked above; this applies the PRZ and D crossing checks
+                d_lines = _formed_xabcd_d_lines(
+                    pattern_name, points, xabcd_positions, is_bullish, self.df, self.range_index,
+                    False, self.validate_d_crossing, self.log_details
+                )
+                if d_lines is not None:
+                    yield PatternRecord('formed_xabcd', pattern_name, is_bullish,
+                                        xabcd_positions, xabcd_positions)
+
+    def _unformed_abcd_record(self, prefix, is_bullish: bool) -> Optional[PatternRecord]:
+        """Unformed ABCD record of a valid A-B-C (None if no pattern matches its retracement)"""
+        a_pos, b_pos, c_pos = prefix
+        A, B, C = (self.points[pos] for pos in prefix)
+        ab_move = abs(B[1] - A[1])
+        bc_move = abs(C[1] - B[1])
+        if ab_move == 0 or bc_move == 0:
+            return None
+        bc_retracement = (bc_move / (ab_move + EPSILON)) * 100
+        matching_patterns_data = PATTERN_LOOKUP.find_matching_patterns(bc_retracement, is_bullish)
+        if not matching_patterns_data:
+            return None
+
+        # detect_unformed_abcd_patterns enumerates A from the last point down,
+        # then sorts by quality (more matching names, retracement nearer 50%)
+        order = (-len(matching_patterns_data), abs(bc_retracement - 50), -a_pos, b_pos, c_pos)
+        return PatternRecord('unformed_abcd', matching_patterns_data[0]['name'],
+                             is_bullish, prefix, order)
+
+    def _unformed_abcd_pattern(self, positions) -> Optional[Dict]:
+        """Unformed ABCD pattern dict of a valid A-B-C"""
+        A, B, C = (self.points[pos] for pos in positions)
+        signature = (A[3], A[2], B[3], B[2], C[3], C[2])
+        return _process_abc_combination_optimized(A, B, C, signature)
+
+    def _formed_abcd_pattern(self, pattern_name: str, positions, is_bullish: bool) -> Optional[Dict]:
+        """Formed ABCD pattern dict of a ratio-matched A-B-C-D (None if D misses the PRZ)"""
+        A, B, C, D = (self.points[pos] for pos in positions)
+        bc_move = abs(C[1] - B[1])
+        bc_retracement = (bc_move / abs(B[1] - A[1])) * 100
+        cd_projection = (abs(D[1] - C[1]) / (bc_move + EPSILON)) * 100
+        rows = tuple((point[3], point[0], point[1]) for point in (A, B, C, D))
+        return _build_formed_abcd_pattern(pattern_name, rows, bc_retracement, cd_projection,
+                                          is_bullish, self.log_details)
+
+    def _unformed_xabcd_d_lines(self, positions, is_bullish: bool) -> Optional[Tuple]:
+        """
+        (matching patterns, AB/XA, BC/AB, D lines) of a valid X-A-B-C, or None if no
+        D line survives the candle crossing check
+        """
+        X, A, B, C = (self.points[pos] for pos in positions)
+        ab_move = abs(B[1] - A[1])
+        ab_xa = (ab_move / abs(A[1] - X[1])) * 100
+        bc_ab = (abs(C[1] - B[1]) / ab_move) * 100
+        matching_patterns_data = XABCD_PATTERN_LOOKUP.find_matching_patterns(ab_xa, bc_ab, is_bullish)
+
+        d_lines = calculate_horizontal_d_lines(
+            X[1], A[1], B[1], C[1], matching_patterns_data[0], is_bullish
+        )
+        if not d_lines:
+            return None
+        d_lines = validate_d_lines_no_candlestick_crossing(self.df, C[3], d_lines)
+        if not d_lines:
+            return None
+        return matching_patterns_data, ab_xa, bc_ab, d_lines
+
+    def _unformed_xabcd_pattern(self, positions, is_bullish: bool) -> Optional[Dict]:
+        """Unformed XABCD pattern dict of a valid X-A-B-C (None if no D line survives)"""
+        last = self._last_d_lines
+        if last is not None and last[0] == positions:
+            d_line_data = last[1]
+        else:
+            d_line_data = self._unformed_xabcd_d_lines(positions, is_bullish)
+            if d_line_data is None:
+                return None
+
+        X, A, B, C = (self.points[pos] for pos in positions)
+        matching_patterns_data, ab_xa, bc_ab, d_lines = d_line_data
+        return _build_unformed_xabcd_pattern(
+            X, A, B, C, matching_patterns_data, ab_xa, bc_ab, d_lines, is_bullish
+        )
+
+    def _formed_xabcd_pattern(self, pattern_name: str, positions, is_bullish: bool) -> Optional[Dict]:
+        """Formed XABCD pattern dict of a ratio-matched X-A-B-C-D (None if rejected)"""
+        points = tuple(self.points[pos] for pos in positions)
+        X, A, B, C, D = points
+        xa_move = abs(A[1] - X[1])
+        ab_move = abs(B[1] - A[1])
+        bc_move = abs(C[1] - B[1])
+        ratio_values = (
+            (ab_move / xa_move) * 100,
+            (bc_move / ab_move) * 100,
+            (abs(D[1] - C[1]) / bc_move) * 100,
+            (abs(D[1] - A[1]) / xa_move) * 100,
+        )
+        # Containment was checked during the search; the builder applies the PRZ
+        # and D crossing checks
+        return _build_formed_xabcd_pattern(
+            pattern_name, points, positions, ratio_values, is_bullish, self.df, self.range_index,
+            False, self.validate_d_crossing, self.log_details
+        )
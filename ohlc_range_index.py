@@ -0,0 +1,303 @@
+"""
+OHLC Range Index Module
+Constant-time range max/min queries over a DataFrame's High and Low columns
+
+Price containment validation asks the same question over and over for
+every candidate pattern: "does any candle in bars [start, stop) have a
+high above / a low below this price?".  Answering it with
+``any(df.iloc[start:stop][col] > price)`` copies a slice and walks it in
+Python for every combination.
+
+OHLCRangeIndex precomputes sparse tables over High and Low once per
+DataFrame (O(n log n)), after which every such question is two table
+lookups and a comparison.  The same tables answer "which is the first bar
+from `start` whose high is above / low is below this price?" in O(log n)
+by descending the levels (binary lifting), which is what the "price
+crossed C / D after formation" and post-D reversal checks need.
+
+Semantics match the pandas expressions they replace:
+- Ranges are half-open positional ranges, like ``df.iloc[start:stop]``
+  (stop is clamped to the length of the frame, empty ranges never match)
+- NaN prices inside a range are ignored, as ``any(series > price)`` does
+"""
+
+from typing import Optional
+import numpy as np
+import pandas as pd
+
+
+class OHLCRangeIndex:
+    """
+    Sparse table index answering range max(High) / min(Low) queries in O(1).
+
+    Build once per DataFrame and share it between all validators that work
+    on that DataFrame.  The index is a snapshot: rebuild it if the frame's
+    High/Low values change.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        """
+        Args:
+            df: OHLC DataFrame with 'High'/'Low' (or 'high'/'low') columns
+
+        Raises:
+            KeyError: If the DataFrame has no High/Low columns
+            TypeError: If the High/Low columns are not numeric
+        """
+        highs, lows = _high_low_arrays(df)
+
+        self._length = len(highs)
+        self._max_levels = self._build(highs, np.fmax)
+        self._min_levels = self._build(lows, np.fmin)
+        self._suffix_extremes = None
+
+    @staticmethod
+    def _build(values: np.ndarray, combine) -> list:
+        """Build sparse table levels; level k holds the result over 2**k bars."""
+        # Level 0 is copied so the index stays a snapshot of the frame
+        current = values.copy()
+        levels = [current]
+        span = 1
+        while span * 2 <= len(values):
+            current = combine(current[:-span], current[span:])
+            levels.append(current)
+            span *= 2
+        return levels
+
+    def __len__(self) -> int:
+        return self._length
+
+    def max_high(self, start: int, stop: int) -> float:
+        """
+        Highest High over bars [start, stop).
+
+        Returns:
+            The maximum, -inf for an empty range, NaN if every bar is NaN
+        """
+        if stop > self._length:
+            stop = self._length
+        size = int(stop - start)
+        if size <= 0:
+            return -np.inf
+        level = size.bit_length() - 1
+        row = self._max_levels[level]
+        left = row[start]
+        right = row[stop - (1 << level)]
+        # fmax semantics: a NaN side loses to a real price
+        if left != left or right > left:
+            return right
+        return left
+
+    def min_low(self, start: int, stop: int) -> float:
+        """
+        Lowest Low over bars [start, stop).
+
+        Returns:
+            The minimum, +inf for an empty range, NaN if every bar is NaN
+        """
+        if stop > self._length:
+            stop = self._length
+        size = int(stop - start)
+        if size <= 0:
+            return np.inf
+        level = size.bit_length() - 1
+        row = self._min_levels[level]
+        left = row[start]
+        right = row[stop - (1 << level)]
+        if left != left or right < left:
+            return right
+        return left
+
+    def first_high_above(self, start: int, price: float, stop: Optional[int] = None) -> Optional[int]:
+        """
+        First bar in [start, stop) whose High is above price.
+
+        Args:
+            start: First bar to look at
+            price: Price level
+            stop: End of the range (default: end of the frame)
+
+        Returns:
+            The bar position, or None if no bar in the range crosses price
+        """
+        return self._first_crossing(self._max_levels, start, price, stop, True)
+
+    def first_low_below(self, start: int, price: float, stop: Optional[int] = None) -> Optional[int]:
+        """
+        First bar in [start, stop) whose Low is below price.
+
+        Args:
+            start: First bar to look at
+            price: Price level
+            stop: End of the range (default: end of the frame)
+
+        Returns:
+            The bar position, or None if no bar in the range crosses price
+        """
+        return self._first_crossing(self._min_levels, start, price, stop, False)
+
+    def _first_crossing(self, levels: list, start: int, price: float,
+                        stop: Optional[int], above: bool) -> Optional[int]:
+        """Skip the largest crossing-free blocks from start, largest level first."""
+        if stop is None or stop > self._length:
+            stop = self._length
+        pos = max(int(start), 0)
+        for level in range(len(levels) - 1, -1, -1):
+            span = 1 << level
+            if pos + span > stop:
+                continue
+            value = levels[level][pos]
+            # NaN blocks (every bar NaN) never cross
+            if not (value > price if above else value < price):
+                pos += span
+        return pos if pos < stop else None
+
+    def high_exceeds(self, start: int, stop: int, price: float) -> bool:
+        """Equivalent to ``any(df.iloc[start:stop][high_col] > price)``."""
+        return self.max_high(start, stop) > price
+
+    def low_breaks(self, start: int, stop: int, price: float) -> bool:
+        """Equivalent to ``any(df.iloc[start:stop][low_col] < price)``."""
+        return self.min_low(start, stop) < price
+
+    def crossed_after(self, bars, prices, is_high) -> np.ndarray:
+        """
+        Whether price crosses each point after its bar, for many points at once.
+
+        Vectorised ``high_exceeds(bar + 1, len(self), price)`` for high points
+        and ``low_breaks(bar + 1, len(self), price)`` for low points.
+
+        Args:
+            bars: Bar position of each point
+            prices: Price of each point
+            is_high: True for high points, False for low points
+
+        Returns:
+            Boolean array, True where a later bar crosses the point's price
+        """
+        bars = np.asarray(bars, dtype=np.int64)
+        prices = np.asarray(prices, dtype=float)
+        is_high = np.asarray(is_high, dtype=bool)
+        if self._length == 0:
+            return np.zeros(len(bars), dtype=bool)
+
+        if self._suffix_extremes is None:
+            # Highest High / lowest Low from each bar to the end of the frame
+            self._suffix_extremes = (np.fmax.accumulate(self._max_levels[0][::-1])[::-1],
+                                     np.fmin.accumulate(self._min_levels[0][::-1])[::-1])
+        suffix_max, suffix_min = self._suffix_extremes
+
+        after = bars + 1
+        inside = (after >= 0) & (after < self._length)
+        after = np.clip(after, 0, self._length - 1)
+        crossed = np.where(is_high, suffix_max[after] > prices, suffix_min[after] < prices)
+        return crossed & inside
+
+
+def _high_low_arrays(df: pd.DataFrame):
+    """High and Low columns of df as float arrays (NaN for missing values)"""
+    high_col = 'High' if 'High' in df.columns else 'high'
+    low_col = 'Low' if 'Low' in df.columns else 'low'
+
+    try:
+        highs = df[high_col].to_numpy(dtype=float, na_value=np.nan)
+        lows = df[low_col].to_numpy(dtype=float, na_value=np.nan)
+    except ValueError as e:
+        raise TypeError(f"High/Low columns must be numeric: {e}") from e
+    return highs, lows
+
+
+class _SliceRangeQueries:
+    """
+    OHLCRangeIndex's range queries answered from plain array slices.
+
+    O(stop - start) per query and nothing to build, for callers that only
+    ask a handful of questions about a frame.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self._highs, self._lows = _high_low_arrays(df)
+
+    def __len__(self) -> int:
+        return len(self._highs)
+
+    def max_high(self, start: int, stop: int) -> float:
+        values = self._highs[start:stop]
+        return float(np.fmax.reduce(values)) if len(values) else -np.inf
+
+    def min_low(self, start: int, stop: int) -> float:
+        values = self._lows[start:stop]
+        return float(np.fmin.reduce(values)) if len(values) else np.inf
+
+    def first_high_above(self, start: int, price: float, stop: Optional[int] = None) -> Optional[int]:
+        start = max(int(start), 0)
+        hits = np.flatnonzero(self._highs[start:stop] > price)
+        return start + int(hits[0]) if len(hits) else None
+
+    def first_low_below(self, start: int, price: float, stop: Optional[int] = None) -> Optional[int]:
+        start = max(int(start), 0)
+        hits = np.flatnonzero(self._lows[start:stop] < price)
+        return start + int(hits[0]) if len(hits) else None
+
+    def high_exceeds(self, start: int, stop: int, price: float) -> bool:
+        return self.max_high(start, stop) > price
+
+    def low_breaks(self, start: int, stop: int, price: float) -> bool:
+        return self.min_low(start, stop) < price
+
+
+def reversal_outcome(range_index: OHLCRangeIndex, d_bar: int, d_price: float, is_bullish: bool,
+                     max_bars: int = 10, reversal_threshold: float = 0.02,
+                     stop: Optional[int] = None) -> Optional[str]:
+    """
+    Outcome of the bars after a formed pattern's D point.
+
+    Walks (in effect) the max_bars bars after D: a bar that moves
+    reversal_threshold away from D in the pattern's direction is a
+    reversal, one that moves reversal_threshold past D is a break, and the
+    first such bar decides (a reversal wins if one bar does both).
+
+    Args:
+        range_index: Index over the price data
+        d_bar: Bar position of D
+        d_price: Price of D
+        is_bullish: True if D is a low (price should reverse up)
+        max_bars: Number of bars after D to look at
+        reversal_threshold: Move as a fraction of D's price
+        stop: Bars from stop on are not visible (default: end of the data)
+
+    Returns:
+        'reversal', 'break', or None if neither happened within the bars looked at
+    """
+    start = d_bar + 1
+    end = start + max_bars
+    if stop is not None:
+        end = min(end, stop)
+
+    if is_bullish:
+        reversal = range_index.first_high_above(start, d_price * (1 + reversal_threshold), end)
+        failure = range_index.first_low_below(start, d_price * (1 - reversal_threshold), end)
+    else:
+        reversal = range_index.first_low_below(start, d_price * (1 - reversal_threshold), end)
+        failure = range_index.first_high_above(start, d_price * (1 + reversal_threshold), end)
+
+    if reversal is not None and (failure is None or reversal <= failure):
+        return 'reversal'
+    if failure is not None:
+        return 'break'
+    return None
+
+
+def ensure_range_index(df: pd.DataFrame,
+                       range_index: Optional[OHLCRangeIndex] = None) -> OHLCRangeIndex:
+    """
+    Return range_index if one was supplied, otherwise slice-based queries on df.
+
+    Detection loops should build the index once and pass it to every
+    validator call. A single, ad-hoc validator call without an index only
+    asks a few questions, so it reads plain slices of df instead of paying
+    for an O(n log n) index it would use once.
+    """
+    if range_index is not None:
+        return range_index
+    return _SliceRangeQueries(df)
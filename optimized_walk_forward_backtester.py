@@ -11,16 +11,31 @@ from dataclasses import dataclass, field
 from typing import List, Dict, Tuple, Optional, Any, Set
 from datetime import datetime
 import json
+import copy
 from enum import Enum
 import warnings
+import os
 warnings.filterwarnings('ignore')
 
 # Import pattern detection modules
-from unformed_abcd import detect_strict_unformed_abcd_patterns as detect_unformed_abcd_patterns
-from unformed_xabcd import detect_strict_unformed_xabcd_patterns
-from gui_compatible_detection import detect_all_gui_patterns
-from extremum import detect_extremum_points as find_extremum_points
+from joint_detection import detect_all_patterns_joint
+from gui_compatible_detection import detect_all_gui_patterns, detect_gui_compatible_xabcd_patterns
+from extremum import detect_extremum_points as find_extremum_points, ExtremumStream, ExtremumArray
 from pattern_tracking_utils import PatternTracker, TrackedPattern
+from incremental_detection import IncrementalUnformedDetector
+from fib_level_table import FibLevelTable
+from backtest_bars import BacktestBars, BarView
+from backtest_checkpoint import save_checkpoint, load_checkpoint, data_fingerprint
+from exceptions import CheckpointError
+
+
+def _with_date_column(data: pd.DataFrame) -> pd.DataFrame:
+    """Copy of data with its timestamp index as a 'Date' column, as the GUI detectors expect"""
+    data_with_date = data.reset_index()
+    if 'Date' not in data_with_date.columns:
+        # The index column is named after the index ('time', 'Date', ...) or 'index' if unnamed
+        data_with_date.rename(columns={data_with_date.columns[0]: 'Date'}, inplace=True)
+    return data_with_date
 
 
 class TradeDirection(Enum):
@@ -172,7 +187,8 @@ class OptimizedWalkForwardBacktester:
         max_open_trades: int = 5,  # Maximum concurrent trades
         detection_interval: int = 1,  # Detect patterns every N bars (use 1 to catch formed patterns when structure breaks)
         extremum_length: int = 1,  # Length for extremum detection (1 matches GUI default)
-        validate_d_crossing_during_tracking: bool = False  # Dismiss patterns when D point crossed during tracking
+        validate_d_crossing_during_tracking: bool = False,  # Dismiss patterns when D point crossed during tracking
+        incremental_detection: bool = False  # Only enumerate patterns ending at newly confirmed extremums
     ):
         """
         Initialize the optimized backtester.
@@ -187,8 +203,11 @@ class OptimizedWalkForwardBacktester:
             validate_d_crossing_during_tracking: If True, dismiss patterns when D point is crossed during tracking
             max_open_trades: Maximum number of concurrent open trades
             detection_interval: Run pattern detection every N bars (optimization)
+            incremental_detection: If True, keep extremums and unformed pattern state between
+                bars instead of re-detecting the full history (same results, much faster)
         """
         self.data = data.copy()
+        self.bars = BacktestBars(self.data)  # NumPy columns for the per-bar loop
         self.initial_capital = initial_capital
         self.position_size = position_size
         self.future_buffer = future_buffer
@@ -198,6 +217,19 @@ class OptimizedWalkForwardBacktester:
         self.extremum_length = extremum_length  # Store extremum detection length
         self.validate_d_crossing_during_tracking = validate_d_crossing_during_tracking  # Toggle for D crossing dismissal
 
+        # Incremental detection needs a sorted, unique index so extremums confirmed
+        # on earlier bars keep their positions as the data slice grows
+        self.incremental_detection = (
+            incremental_detection and
+            self.data.index.is_monotonic_increasing and
+            self.data.index.is_unique
+        )
+        self.incremental_detector = IncrementalUnformedDetector(self.data) if self.incremental_detection else None
+        self.extremum_stream: Optional[ExtremumStream] = None  # Confirmed extremums (incremental mode)
+        self.confirmed_extremums: List[Tuple] = []
+        self.formed_cache_key = -1  # Extremum count the cached formed patterns were detected with
+        self.formed_cache: List[Dict] = []
+
         # Trading state
         self.current_capital = initial_capital
         self.open_trades: List[TradeResult] = []
@@ -230,6 +262,7 @@ class OptimizedWalkForwardBacktester:
         # Fibonacci analysis tracking for formed patterns
         self.fibonacci_trackers: Dict[str, FormedPatternFibAnalysis] = {}  # pattern_id -> tracker
         self.active_fibonacci_tracking: Set[str] = set()  # Pattern IDs currently being tracked
+        self.fibonacci_level_table = FibLevelTable()  # Level prices of the actively tracked patterns
 
     def calculate_fibonacci_levels_for_formed_pattern(self, pattern: Dict) -> Dict[str, float]:
         """
@@ -366,6 +399,9 @@ class OptimizedWalkForwardBacktester:
 
         self.fibonacci_trackers[pattern_id] = tracker
         self.active_fibonacci_tracking.add(pattern_id)
+        self.fibonacci_level_table.add(
+            pattern_id, {**fib_levels, **harmonic_levels}, is_bullish, d_price, prz_min, prz_max
+        )
 
         # Get indices for debugging
         points = pattern.get('points', {})
@@ -376,123 +412,66 @@ class OptimizedWalkForwardBacktester:
 
         # Fibonacci tracking added (debug output removed)
 
-    def update_fibonacci_tracking(self, current_bar: pd.Series, current_idx: int):
+    def update_fibonacci_tracking(self, current_bar: BarView, current_idx: int):
         """
         Update Fibonacci tracking for all active patterns.
         Check for level touches, PRZ breaks, and D point crossing.
+
+        The checks run for every active pattern at once on
+        fibonacci_level_table; only patterns that end or touch a level
+        are visited here.
         """
         if not self.active_fibonacci_tracking:
             return
 
-        patterns_to_remove = set()
+        # Only if validate_d_crossing_during_tracking is enabled, crossing
+        # the D point (bullish: low below D, bearish: high above D) ends tracking
+        d_crossed, prz_broken, touches = self.fibonacci_level_table.update(
+            current_bar['High'], current_bar['Low'], current_bar['Open'], current_bar['Close'],
+            check_d_cross=self.validate_d_crossing_during_tracking
+        )
 
-        for pattern_id in list(self.active_fibonacci_tracking):
+        for pattern_id in d_crossed:
             tracker = self.fibonacci_trackers[pattern_id]
 
-            # Calculate bars since D formation
-            bars_since_d = current_idx - tracker.detection_bar
-
-            # Determine pattern direction (used in multiple checks below)
-            is_bullish = tracker.direction == 'bullish'
-
-            # Check if D point is crossed (price crosses D point after formation)
-            # Only if validate_d_crossing_during_tracking is enabled
-            if self.validate_d_crossing_during_tracking:
-                d_point_crossed = False
-
-                if is_bullish:
-                    # For bullish, D point crossed if price goes below D point
-                    if current_bar['Low'] < tracker.d_price:
-                        d_point_crossed = True
-                else:
-                    # For bearish, D point crossed if price goes above D point
-                    if current_bar['High'] > tracker.d_price:
-                        d_point_crossed = True
-
-                if d_point_crossed:
-                    # Mark pattern as invalid due to D point crossing
-                    # BUT: Do NOT dismiss patterns that already succeeded!
-                    if pattern_id in self.pattern_tracker.tracked_patterns:
-                        tracked_pattern = self.pattern_tracker.tracked_patterns[pattern_id]
-                        # Only dismiss if pattern hasn't succeeded yet
-                        if tracked_pattern.status not in ['dismissed', 'failed', 'success']:
-                            tracked_pattern.status = 'dismissed'
-                            tracked_pattern.dismissal_reason = 'D_point_crossed'
-                            tracked_pattern.dismissal_bar = current_idx
-                        elif tracked_pattern.status == 'success':
-                            # Pattern already succeeded - D point crossing after success doesn't invalidate it
-                            pass
-
-                    tracker.total_bars_tracked = bars_since_d
-                    tracker.is_tracking_complete = True
-                    patterns_to_remove.add(pattern_id)
-                    continue
-
-            # Check if PRZ is broken (price beyond PRZ zone)
-            prz_broken = False
-
-            if is_bullish:
-                # For bullish, PRZ broken if price goes below PRZ min
-                if current_bar['Low'] < tracker.prz_min:
-                    prz_broken = True
-            else:
-                # For bearish, PRZ broken if price goes above PRZ max
-                if current_bar['High'] > tracker.prz_max:
-                    prz_broken = True
-
-            if prz_broken:
-                tracker.prz_broken_bar = current_idx
-                tracker.total_bars_tracked = bars_since_d
-                tracker.is_tracking_complete = True
-                patterns_to_remove.add(pattern_id)
-                continue
-
-            # Check all Fibonacci levels for touches
-            all_levels = {**tracker.fib_levels, **tracker.harmonic_levels}
-
-            for level_name, level_price in all_levels.items():
-                # Check if current bar touches this level
-                high = current_bar['High']
-                low = current_bar['Low']
-
-                # A touch means the bar's high/low range CROSSES the level
-                # i.e., low <= level <= high
-                touched = low <= level_price <= high
-
-                if not touched:
-                    continue
-
-                # Determine touch type
-                close_price = current_bar['Close']
-                open_price = current_bar['Open']
-
-                # Check if close/open crossed the level (whipsaw)
-                if (open_price <= level_price <= close_price) or (close_price <= level_price <= open_price):
-                    touch_type = "body"  # Body crossed the level
-                elif abs(high - level_price) < abs(low - level_price):
-                    touch_type = "high"  # Touched at high
-                else:
-                    touch_type = "low"   # Touched at low
+            # Mark pattern as invalid due to D point crossing
+            # BUT: Do NOT dismiss patterns that already succeeded!
+            if pattern_id in self.pattern_tracker.tracked_patterns:
+                tracked_pattern = self.pattern_tracker.tracked_patterns[pattern_id]
+                # Only dismiss if pattern hasn't succeeded yet
+                if tracked_pattern.status not in ['dismissed', 'failed', 'success']:
+                    tracked_pattern.status = 'dismissed'
+                    tracked_pattern.dismissal_reason = 'D_point_crossed'
+                    tracked_pattern.dismissal_bar = current_idx
+
+            tracker.total_bars_tracked = current_idx - tracker.detection_bar
+            tracker.is_tracking_complete = True
+            self.active_fibonacci_tracking.discard(pattern_id)
 
-                # Calculate incremental bar count from detection (not last touch)
-                incremental_bar = bars_since_d
+        # PRZ broken (bullish: low below PRZ min, bearish: high above PRZ max)
+        for pattern_id in prz_broken:
+            tracker = self.fibonacci_trackers[pattern_id]
+            tracker.prz_broken_bar = current_idx
+            tracker.total_bars_tracked = current_idx - tracker.detection_bar
+            tracker.is_tracking_complete = True
+            self.active_fibonacci_tracking.discard(pattern_id)
 
-                # Add touch
-                touch = FibonacciLevelTouch(
+        # A touch means the bar's high/low range crosses the level. Touches
+        # record the bar count from detection (not from the last touch).
+        for pattern_id, level_touches in touches:
+            tracker = self.fibonacci_trackers[pattern_id]
+            bars_since_d = current_idx - tracker.detection_bar
+            tracker.touches.extend(
+                FibonacciLevelTouch(
                     level_name=level_name,
                     level_price=level_price,
                     absolute_bar=current_idx,
-                    incremental_bar=incremental_bar,
+                    incremental_bar=bars_since_d,
                     touch_type=touch_type
                 )
-                tracker.touches.append(touch)
-
-                # Update last touch bar for this specific level
-                tracker.last_touch_bar = current_idx
-
-        # Remove completed patterns from active tracking
-        for pattern_id in patterns_to_remove:
-            self.active_fibonacci_tracking.discard(pattern_id)
+                for level_name, level_price, touch_type in level_touches
+            )
+            tracker.last_touch_bar = current_idx
 
     def get_fibonacci_summary_statistics(self) -> Dict:
         """
@@ -644,6 +623,97 @@ class OptimizedWalkForwardBacktester:
 
         return summary
 
+    def convert_extremums_to_positions(self, extremum_points: List[Tuple],
+                                       data_slice: pd.DataFrame) -> List[Tuple]:
+        """
+        Convert extremum timestamps to positional indices in data_slice.
+
+        Args:
+            extremum_points: List of (timestamp, price, is_high, bar_index) tuples
+            data_slice: DataFrame the extremums were detected on
+
+        Returns:
+            List of (position, price, is_high, bar_index) tuples
+        """
+        # Convert extremum points from timestamps to indices
+        # This fixes the "out of bounds" errors
+        fixed_extremums = []
+        for point in extremum_points:
+            # Extract 4-tuple format
+            timestamp, price, is_high, bar_index = point
+            try:
+                # Handle numpy.datetime64
+                if isinstance(timestamp, np.datetime64):
+                    # Convert to pandas timestamp
+                    ts = pd.Timestamp(timestamp)
+                    # Find exact index in data_slice
+                    try:
+                        idx = data_slice.index.get_loc(ts)
+                    except KeyError:
+                        # If exact match not found, find the closest
+                        distances = abs(data_slice.index - ts)
+                        idx = distances.argmin()
+                elif hasattr(timestamp, 'to_pydatetime'):
+                    # It's already a pandas timestamp
+                    try:
+                        idx = data_slice.index.get_loc(timestamp)
+                    except KeyError:
+                        distances = abs(data_slice.index - timestamp)
+                        idx = distances.argmin()
+                elif isinstance(timestamp, (int, np.int64)):
+                    if timestamp > 1e15:
+                        # It's nanoseconds, convert to timestamp
+                        ts = pd.Timestamp(timestamp)
+                        try:
+                            idx = data_slice.index.get_loc(ts)
+                        except KeyError:
+                            distances = abs(data_slice.index - ts)
+                            idx = distances.argmin()
+                    else:
+                        # It might already be an index
+                        idx = int(timestamp)
+                else:
+                    # Try to find it directly
+                    try:
+                        idx = data_slice.index.get_loc(timestamp)
+                    except KeyError:
+                        distances = abs(data_slice.index - pd.Timestamp(timestamp))
+                        idx = distances.argmin()
+
+                # Only add if index is valid
+                if 0 <= idx < len(data_slice):
+                    fixed_extremums.append((idx, price, is_high, bar_index))
+            except Exception as e:
+                # Skip invalid extremum points (silent to avoid spam)
+                continue
+
+        return fixed_extremums
+
+    def get_confirmed_extremums(self, end_idx: int) -> List[Tuple]:
+        """
+        Get the extremums detect_extremum_points would find on data[:end_idx].
+
+        A pivot at bar i needs extremum_length bars on each side, so it is
+        confirmed once end_idx > i + extremum_length. Bars are streamed into an
+        ExtremumStream as the walk-forward advances, so each bar is only
+        processed once.
+
+        Args:
+            end_idx: Number of bars visible for detection
+
+        Returns:
+            List of (position, price, is_high, bar_index) tuples
+        """
+        if self.extremum_stream is None or end_idx < self.extremum_stream.bar_count:
+            self.extremum_stream = ExtremumStream(length=self.extremum_length)
+            self.confirmed_extremums = []
+
+        if end_idx > self.extremum_stream.bar_count:
+            new_points = self.extremum_stream.extend(self.data.iloc[self.extremum_stream.bar_count:end_idx])
+            self.confirmed_extremums.extend(self.convert_extremums_to_positions(new_points, self.data))
+
+        return list(self.confirmed_extremums)
+
     def detect_patterns_with_cache(self, current_idx: int) -> Tuple[List[Dict], List[Dict]]:
         """
         Detect patterns with caching for improved performance.
@@ -670,72 +740,26 @@ class OptimizedWalkForwardBacktester:
         if end_idx < 1:  # Allow detection from bar 1
             return [], []
 
+        # Bars [0, end_idx) as a view over the shared arrays and range index;
+        # only legacy detectors that need a DataFrame slice it
+        data_slice = self.bars.prefix(end_idx)
+
         # Check if extremums need updating
         if end_idx not in self.cached_patterns['extremums']:
-            # Use all data from beginning up to current point
-            data_slice = self.data.iloc[:end_idx].copy()
-
-            # Find extremum points (expensive operation - cache it!)
-            # Use configurable extremum_length (default=1 to match GUI)
-            extremum_points = find_extremum_points(data_slice, length=self.extremum_length)
-
-            # Convert extremum points from timestamps to indices
-            # This fixes the "out of bounds" errors
-            fixed_extremums = []
-            for point in extremum_points:
-                # Extract 4-tuple format
-                timestamp, price, is_high, bar_index = point
-                try:
-                    # Handle numpy.datetime64
-                    if isinstance(timestamp, np.datetime64):
-                        # Convert to pandas timestamp
-                        ts = pd.Timestamp(timestamp)
-                        # Find exact index in data_slice
-                        try:
-                            idx = data_slice.index.get_loc(ts)
-                        except KeyError:
-                            # If exact match not found, find the closest
-                            distances = abs(data_slice.index - ts)
-                            idx = distances.argmin()
-                    elif hasattr(timestamp, 'to_pydatetime'):
-                        # It's already a pandas timestamp
-                        try:
-                            idx = data_slice.index.get_loc(timestamp)
-                        except KeyError:
-                            distances = abs(data_slice.index - timestamp)
-                            idx = distances.argmin()
-                    elif isinstance(timestamp, (int, np.int64)):
-                        if timestamp > 1e15:
-                            # It's nanoseconds, convert to timestamp
-                            ts = pd.Timestamp(timestamp)
-                            try:
-                                idx = data_slice.index.get_loc(ts)
-                            except KeyError:
-                                distances = abs(data_slice.index - ts)
-                                idx = distances.argmin()
-                        else:
-                            # It might already be an index
-                            idx = int(timestamp)
-                    else:
-                        # Try to find it directly
-                        try:
-                            idx = data_slice.index.get_loc(timestamp)
-                        except KeyError:
-                            distances = abs(data_slice.index - pd.Timestamp(timestamp))
-                            idx = distances.argmin()
-
-                    # Only add if index is valid
-                    if 0 <= idx < len(data_slice):
-                        fixed_extremums.append((idx, price, is_high, bar_index))
-                except Exception as e:
-                    # Skip invalid extremum points (silent to avoid spam)
-                    continue
+            if self.incremental_detection:
+                # Pivots only depend on their own window, so only the bars added
+                # since the last step can confirm new extremums
+                extremum_points = self.get_confirmed_extremums(end_idx)
+            else:
+                # Find extremum points (expensive operation - cache it!)
+                # Use configurable extremum_length (default=1 to match GUI)
+                frame = data_slice.frame()
+                extremum_points = find_extremum_points(frame, length=self.extremum_length)
+                extremum_points = self.convert_extremums_to_positions(extremum_points, frame)
 
-            extremum_points = fixed_extremums
             self.cached_patterns['extremums'][end_idx] = extremum_points
             self.current_extremum_points = extremum_points  # Store for update_c_points
         else:
-            data_slice = self.data.iloc[:end_idx].copy()
             extremum_points = self.cached_patterns['extremums'][end_idx]
             self.current_extremum_points = extremum_points  # Store for update_c_points
 
@@ -746,6 +770,7 @@ class OptimizedWalkForwardBacktester:
 
         unformed_patterns = []
         formed_patterns = []
+        joint_patterns = None
 
         # Detect unformed patterns (signals)
         try:
@@ -754,15 +779,32 @@ class OptimizedWalkForwardBacktester:
 
                 # Only attempt pattern detection if we have minimum extremums
                 # ABCD needs 4, XABCD needs 5
+                if self.incremental_detection:
+                    # Only patterns whose C is a newly confirmed extremum are enumerated
+                    incremental_abcd, incremental_xabcd = self.incremental_detector.update(
+                        extremum_points, end_idx
+                    )
+                elif len(extremum_points) >= 4:
+                    # Unformed ABCD and XABCD share one enumeration of the
+                    # A-B-C / X-A-B-C prefixes (NO LIMITS). Formed XABCD stays on
+                    # the GUI-compatible detector below, as in incremental mode.
+                    # The enumeration runs on a bounded background queue while
+                    # this thread builds the pattern dicts
+                    joint_patterns = detect_all_patterns_joint(
+                        extremum_points, data_slice,
+                        max_search_window=None,
+                        families=('unformed_abcd', 'unformed_xabcd'),
+                        threaded=True
+                    )
+
                 if len(extremum_points) >= 4:
                     # ABCD patterns - use extremums that are before current position
                     # Extremums are (timestamp, price, is_high) tuples
                     # We want extremums that could form patterns up to current position
-                    unformed_abcd = detect_unformed_abcd_patterns(
-                        extremum_points,  # Use all extremums, let the detection function handle filtering
-                        df=data_slice  # Pass DataFrame for price containment validation
-                        # Removed backtest_mode - not supported by the function
-                    )
+                    if self.incremental_detection:
+                        unformed_abcd = incremental_abcd
+                    else:
+                        unformed_abcd = joint_patterns['unformed_abcd']
                     for pattern in unformed_abcd:
                         pattern['pattern_type'] = 'ABCD'
                         pattern['pattern_hash'] = self.pattern_tracker.generate_pattern_id(pattern)
@@ -770,12 +812,10 @@ class OptimizedWalkForwardBacktester:
 
                 if len(extremum_points) >= 5:
                     # XABCD patterns - NO LIMITS
-                    unformed_xabcd = detect_strict_unformed_xabcd_patterns(
-                        extremum_points,  # Use all extremums
-                        data_slice,
-                        max_patterns=None,  # NO LIMIT - detect ALL patterns
-                        max_search_window=None  # NO LIMIT - search entire history
-                    )
+                    if self.incremental_detection:
+                        unformed_xabcd = incremental_xabcd
+                    else:
+                        unformed_xabcd = joint_patterns['unformed_xabcd']
                     for pattern in unformed_xabcd:
                         pattern['pattern_type'] = 'XABCD'
                         pattern['pattern_hash'] = self.pattern_tracker.generate_pattern_id(pattern)
@@ -812,29 +852,30 @@ class OptimizedWalkForwardBacktester:
             if current_idx in self.cached_patterns['unformed']:
 
                 # Prepare data for GUI-compatible detection
-                data_with_date = data_slice.reset_index()
-                if 'time' in data_with_date.columns:
-                    data_with_date.rename(columns={'time': 'Date'}, inplace=True)
-                elif data_with_date.index.name == 'time':
-                    data_with_date['Date'] = data_with_date.index
+                data_with_date = _with_date_column(data_slice.frame())
 
                 # Convert extremums to indexed format
                 # extremum_points format: (timestamp, price, is_high, bar_index)
                 # But for formed pattern detection, we already have bar_index in element [3]
-                extremums_with_idx = []
-                for ext in extremum_points:
-                    timestamp, price, is_high, bar_index = ext
-                    # Use bar_index directly (it's already the DataFrame row index)
-                    extremums_with_idx.append((bar_index, price, is_high, bar_index))
+                # (bar_index is already the DataFrame row index; columns are shared)
+                extremums_with_idx = ExtremumArray.from_points(extremum_points).with_bar_timestamps()
 
                 # Detect formed XABCD patterns
                 if len(extremums_with_idx) >= 5:
-                    _, formed_xabcd = detect_all_gui_patterns(
-                        extremums_with_idx,
-                        data_with_date,
-                        max_patterns=200,
-                        validate_d_crossing=False
-                    )
+                    # Without D-crossing validation formed detection only looks at bars up
+                    # to D, so the result can only change when a new extremum is confirmed
+                    if self.incremental_detection and self.formed_cache_key == len(extremums_with_idx):
+                        formed_xabcd = copy.deepcopy(self.formed_cache)
+                    else:
+                        formed_xabcd = detect_gui_compatible_xabcd_patterns(
+                            extremums_with_idx,
+                            data_with_date,
+                            max_patterns=200,
+                            validate_d_crossing=False
+                        )
+                        if self.incremental_detection:
+                            self.formed_cache_key = len(extremums_with_idx)
+                            self.formed_cache = copy.deepcopy(formed_xabcd)
 
                     # Filter to only patterns with D point (truly formed)
                     for pattern in formed_xabcd:
@@ -850,7 +891,7 @@ class OptimizedWalkForwardBacktester:
 
         return unformed_patterns, formed_patterns
 
-    def generate_signal(self, pattern: Dict, current_bar: pd.Series) -> Optional[PatternSignal]:
+    def generate_signal(self, pattern: Dict, current_bar: BarView) -> Optional[PatternSignal]:
         """
         Convert an unformed pattern into a trading signal.
 
@@ -952,14 +993,14 @@ class OptimizedWalkForwardBacktester:
 
         return min(max(score, 0.0), 1.0)
 
-    def check_entry_conditions(self, signal: PatternSignal, current_bar: pd.Series) -> bool:
+    def check_entry_conditions(self, signal: PatternSignal, current_bar: BarView) -> bool:
         """Check if price has reached entry zone"""
         if signal.direction == TradeDirection.LONG:
             return current_bar['Low'] <= signal.entry_price <= current_bar['High']
         else:
             return current_bar['Low'] <= signal.entry_price <= current_bar['High']
 
-    def execute_trade(self, signal: PatternSignal, entry_bar: pd.Series) -> TradeResult:
+    def execute_trade(self, signal: PatternSignal, entry_bar: BarView) -> TradeResult:
         """Execute a trade based on signal"""
         # Mark pattern as traded
         if signal.pattern_hash:
@@ -973,7 +1014,7 @@ class OptimizedWalkForwardBacktester:
         self.open_trades.append(trade)
         return trade
 
-    def update_open_trades(self, current_bar: pd.Series, current_idx: int, formed_patterns: List[Dict]):
+    def update_open_trades(self, current_bar: BarView, current_idx: int, formed_patterns: List[Dict]):
         """Update open trades with current bar data"""
         for trade in self.open_trades[:]:  # Copy list to allow modification
             if trade.exit_time:
@@ -1021,15 +1062,104 @@ class OptimizedWalkForwardBacktester:
             # Close trade if exit triggered
             if trade.exit_time:
                 trade.pnl = self.current_capital * self.position_size * trade.pnl_percent
-                trade.trade_duration_bars = current_idx - self.data.index.get_loc(trade.entry_time)
+                trade.trade_duration_bars = current_idx - self.bars.position(trade.entry_time)
 
                 self.closed_trades.append(trade)
                 self.open_trades.remove(trade)
                 self.current_capital += trade.pnl
 
 
-    def run_backtest(self, progress_callback=None) -> BacktestStatistics:
-        """Run the complete backtest simulation"""
+    # Attributes that carry walk-forward state from one bar to the next. The
+    # per-bar pattern caches are left out: they are only read again for the
+    # bar that filled them.
+    CHECKPOINT_ATTRIBUTES = (
+        'current_capital', 'open_trades', 'closed_trades', 'all_signals', 'equity_curve',
+        'last_detection_idx', 'traded_patterns', 'pattern_cache', 'pattern_tracker',
+        'formed_cache_key', 'formed_cache', 'extremum_stream', 'confirmed_extremums',
+        'current_extremum_points', 'formed_pattern_ids', 'fibonacci_trackers',
+        'active_fibonacci_tracking', 'fibonacci_level_table', 'tracking_warnings',
+    )
+
+    def checkpoint_config(self) -> Dict:
+        """Settings a checkpoint must have been written with to be resumed"""
+        return {
+            'initial_capital': self.initial_capital,
+            'position_size': self.position_size,
+            'future_buffer': self.future_buffer,
+            'min_pattern_score': self.min_pattern_score,
+            'max_open_trades': self.max_open_trades,
+            'detection_interval': self.detection_interval,
+            'extremum_length': self.extremum_length,
+            'validate_d_crossing_during_tracking': self.validate_d_crossing_during_tracking,
+            'incremental_detection': self.incremental_detection,
+        }
+
+    def write_checkpoint(self, path: str, next_idx: int, loop_state: Dict):
+        """
+        Write the walk-forward state after bar next_idx - 1 to a checkpoint file.
+
+        Args:
+            path: Checkpoint file path
+            next_idx: First bar still to be processed
+            loop_state: run_backtest's running counters and pending signals
+        """
+        state = {
+            'config': self.checkpoint_config(),
+            'next_idx': next_idx,
+            'fingerprint': data_fingerprint(self.data, next_idx),
+            'attributes': {name: getattr(self, name) for name in self.CHECKPOINT_ATTRIBUTES},
+            'incremental_detector': (
+                self.incremental_detector.get_state() if self.incremental_detector is not None else None
+            ),
+            'loop_state': loop_state,
+        }
+        save_checkpoint(path, state, shared={'data': self.data})
+
+    def restore_checkpoint(self, path: str) -> Tuple[int, Dict]:
+        """
+        Restore the walk-forward state written by write_checkpoint.
+
+        The data may have gained bars since the checkpoint was written, but
+        the bars already processed must be unchanged.
+
+        Args:
+            path: Checkpoint file path
+
+        Returns:
+            Tuple of (first bar still to be processed, run_backtest loop state)
+
+        Raises:
+            CheckpointError: If the checkpoint was written with other settings or other data
+        """
+        state = load_checkpoint(path, shared={'data': self.data})
+
+        if state['config'] != self.checkpoint_config():
+            raise CheckpointError(f"{path} was written with different backtest settings: {state['config']}")
+        next_idx = state['next_idx']
+        if next_idx > len(self.data) or data_fingerprint(self.data, next_idx) != state['fingerprint']:
+            raise CheckpointError(f"{path} was written for different price data")
+
+        for name, value in state['attributes'].items():
+            setattr(self, name, value)
+        if self.incremental_detector is not None:
+            self.incremental_detector.set_state(state['incremental_detector'])
+
+        return next_idx, state['loop_state']
+
+    def run_backtest(self, progress_callback=None, checkpoint_path: Optional[str] = None,
+                     checkpoint_interval: int = 500, resume: bool = False) -> BacktestStatistics:
+        """
+        Run the complete backtest simulation.
+
+        Args:
+            progress_callback: Optional callback(percent)
+            checkpoint_path: If given, the walk-forward state is written there
+                every checkpoint_interval bars and after the last bar
+            checkpoint_interval: Bars between checkpoints
+            resume: Continue from the checkpoint at checkpoint_path if one
+                exists. The data may extend the checkpointed data with new
+                bars, in which case only the new bars are walked.
+        """
         import time
         start_time = time.time()
 
@@ -1054,11 +1184,18 @@ class OptimizedWalkForwardBacktester:
         self.traded_patterns = set()
         self.pattern_cache = set()  # Reset pattern cache
         self.pattern_tracker.reset()  # Reset pattern tracker
+        if self.incremental_detector is not None:
+            self.incremental_detector.reset()
+        self.formed_cache_key = -1
+        self.formed_cache = []
+        self.extremum_stream = None
+        self.confirmed_extremums = []
         self.formed_pattern_ids = set()  # Track unique formed pattern IDs
 
         # Reset Fibonacci tracking
         self.fibonacci_trackers = {}
         self.active_fibonacci_tracking = set()
+        self.fibonacci_level_table = FibLevelTable()
 
         # Track statistics during backtest
         total_unformed_found = 0
@@ -1077,9 +1214,32 @@ class OptimizedWalkForwardBacktester:
         # Walk forward through time
         # Start from bar 1 for TRUE 100% coverage
         # Patterns will be detected as soon as enough extremums are available
+        # Bars are read from NumPy arrays (self.bars) rather than building a
+        # pandas Series / prefix frame per bar
+        bars = self.bars
         start_idx = 1  # Start from bar 1 for 100% coverage
-        for idx in range(start_idx, len(self.data)):
-            current_bar = self.data.iloc[idx]
+
+        if resume and checkpoint_path and os.path.exists(checkpoint_path):
+            start_idx, loop_state = self.restore_checkpoint(checkpoint_path)
+            total_unformed_found = loop_state['total_unformed_found']
+            total_formed_found = loop_state['total_formed_found']
+            unique_unformed_patterns_found = loop_state['unique_unformed_patterns_found']
+            unique_formed_patterns = loop_state['unique_formed_patterns']
+            pattern_type_counts = loop_state['pattern_type_counts']
+            pending_signals = loop_state['pending_signals']
+
+        def current_loop_state() -> Dict:
+            return {
+                'total_unformed_found': total_unformed_found,
+                'total_formed_found': total_formed_found,
+                'unique_unformed_patterns_found': unique_unformed_patterns_found,
+                'unique_formed_patterns': unique_formed_patterns,
+                'pattern_type_counts': pattern_type_counts,
+                'pending_signals': pending_signals,
+            }
+
+        for idx in range(start_idx, len(bars)):
+            current_bar = bars.bar(idx)
 
             # Update progress
             if progress_callback and idx % 100 == 0:
@@ -1129,7 +1289,7 @@ class OptimizedWalkForwardBacktester:
                     if pattern_id not in unique_formed_patterns:
                         unique_formed_patterns.add(pattern_id)
                         # Track directly as formed pattern (pass all data up to current bar)
-                        data_slice = self.data.iloc[:idx+1]
+                        data_slice = bars.prefix(idx + 1)
                         self.pattern_tracker.track_formed_pattern(pattern, idx, data_slice)
                         formed_count_new += 1
 
@@ -1152,8 +1312,8 @@ class OptimizedWalkForwardBacktester:
             # )
 
             # Check if current price enters any pattern's D zone
-            current_timestamp = current_bar.name if hasattr(current_bar, 'name') else None
-            data_for_detection = self.data.iloc[:idx+1] if idx < len(self.data) else self.data
+            current_timestamp = current_bar.name
+            data_for_detection = bars.prefix(idx + 1)
             completed_pattern_ids = self.pattern_tracker.check_price_in_zone(
                 price_high=current_bar['High'],
                 price_low=current_bar['Low'],
@@ -1263,7 +1423,7 @@ class OptimizedWalkForwardBacktester:
                         self.execute_trade(signal, current_bar)
                         pending_signals.remove(signal)
                 # Remove old signals (>20 bars)
-                elif idx - self.data.index.get_loc(signal.timestamp) > 20:
+                elif idx - bars.position(signal.timestamp) > 20:
                     pending_signals.remove(signal)
 
             # Update Fibonacci tracking for all active formed patterns
@@ -1283,8 +1443,15 @@ class OptimizedWalkForwardBacktester:
             current_equity = self.current_capital + open_pnl
             self.equity_curve.append(current_equity)
 
+            if checkpoint_path and (idx + 1) % checkpoint_interval == 0:
+                self.write_checkpoint(checkpoint_path, idx + 1, current_loop_state())
+
+        # Checkpoint the end of the walk so the run can be extended with new bars
+        if checkpoint_path and start_idx < len(bars) and len(bars) % checkpoint_interval != 0:
+            self.write_checkpoint(checkpoint_path, len(bars), current_loop_state())
+
         # Close any remaining open trades
-        final_bar = self.data.iloc[-1]
+        final_bar = bars.bar(len(bars) - 1)
         for trade in self.open_trades:
             trade.exit_time = final_bar.name
             trade.exit_price = final_bar['Close']
@@ -1340,10 +1507,7 @@ class OptimizedWalkForwardBacktester:
 
         # Detect ALL patterns from full dataset
         # Use validate_d_crossing=False to match GUI without strict validation
-        data_with_date = self.data.reset_index()
-        # Rename time column to Date for GUI compatibility
-        if 'time' in data_with_date.columns:
-            data_with_date.rename(columns={'time': 'Date'}, inplace=True)
+        data_with_date = _with_date_column(self.data)
         all_abcd_full, all_xabcd_full = detect_all_gui_patterns(
             extremums_with_idx,
             data_with_date,
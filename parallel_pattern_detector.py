@@ -4,32 +4,57 @@ Detects all pattern types simultaneously using concurrent processing
 
 Features:
 - Parallel detection of all 4 pattern types
-- Thread pool executor for optimal CPU utilization
+- Thread pool executor for the light detectors
+- Process pool backend that splits one detector's search across cores,
+  used by ParallelPatternDetector for large inputs
 - Error isolation (one pattern type failure doesn't affect others)
 - Progress tracking for UI feedback
 """
 
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
 from typing import List, Dict, Tuple, Optional, Callable
+import importlib
+import inspect
+import os
+import numpy as np
 import pandas as pd
 import time
 
+from extremum import ExtremumArray
+from shared_frames import SharedArrays, attach_shared_arrays, encode_frame, decode_frame
+
+# Below this many extremum points a search finishes before a process pool
+# has started, so ParallelPatternDetector keeps it on a thread
+MIN_POOL_EXTREMUMS = 150
+
 
 class ParallelPatternDetector:
     """
     Detect multiple pattern types in parallel for maximum performance.
 
     Uses ThreadPoolExecutor to run pattern detection methods concurrently.
+    Threads share one interpreter lock, so detection methods that have a
+    process pool form run across ProcessPoolPatternDetector instead once
+    the input is large enough; the threads then only overlap the light
+    detectors.
     """
 
-    def __init__(self, max_workers: int = 4):
+    def __init__(self, max_workers: int = 4, process_workers: Optional[int] = None,
+                 min_pool_extremums: int = MIN_POOL_EXTREMUMS, mp_context=None):
         """
         Initialize parallel detector.
 
         Args:
             max_workers: Maximum number of parallel workers (default: 4)
+            process_workers: Worker processes for pooled methods (default: os.cpu_count())
+            min_pool_extremums: Smallest extremum count that uses the process
+                                pool (default: MIN_POOL_EXTREMUMS)
+            mp_context: Optional multiprocessing context for the process pool
         """
         self.max_workers = max_workers
+        self.process_workers = process_workers
+        self.min_pool_extremums = min_pool_extremums
+        self.mp_context = mp_context
         self._results = {}
         self._errors = {}
 
@@ -38,7 +63,8 @@ class ParallelPatternDetector:
         extremum_points: List[Tuple],
         df: pd.DataFrame,
         detection_methods: Dict[str, Callable],
-        progress_callback: Optional[Callable] = None
+        progress_callback: Optional[Callable] = None,
+        pooled_methods: Optional[Dict[str, Callable]] = None
     ) -> Dict[str, List[Dict]]:
         """
         Detect all pattern types in parallel.
@@ -54,6 +80,11 @@ class ParallelPatternDetector:
                     'unformed_xabcd': lambda: detector.detect_unformed_xabcd()
                 }
             progress_callback: Optional callback(pattern_type, status) for progress
+            pooled_methods: Optional dict mapping pattern type to a function
+                taking a ProcessPoolPatternDetector and returning the same
+                patterns as detection_methods[pattern_type]. With at least
+                min_pool_extremums extremum points these run one after
+                another across the process pool instead of on a thread.
 
         Returns:
             Dictionary mapping pattern type to list of detected patterns
@@ -69,18 +100,47 @@ class ParallelPatternDetector:
 
         start_time = time.time()
 
+        pooled = {}
+        if pooled_methods and len(extremum_points) >= self.min_pool_extremums:
+            pooled = {pattern_type: pooled_func for pattern_type, pooled_func in pooled_methods.items()
+                      if pattern_type in detection_methods}
+        threaded = {pattern_type: detection_func for pattern_type, detection_func in detection_methods.items()
+                    if pattern_type not in pooled}
+
         # Submit all detection tasks to thread pool
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(threaded)))) as executor:
             # Map futures to pattern types
             future_to_pattern = {}
 
-            for pattern_type, detection_func in detection_methods.items():
+            for pattern_type, detection_func in threaded.items():
                 if progress_callback:
                     progress_callback(pattern_type, 'started')
 
                 future = executor.submit(self._safe_detect, pattern_type, detection_func)
                 future_to_pattern[future] = pattern_type
 
+            # Heavy searches take the process pool one after another (each
+            # uses every core) while the threads work through the rest
+            if pooled:
+                process_pool = ProcessPoolPatternDetector(max_workers=self.process_workers,
+                                                          mp_context=self.mp_context)
+                for pattern_type, pooled_func in pooled.items():
+                    if progress_callback:
+                        progress_callback(pattern_type, 'started')
+
+                    try:
+                        patterns = pooled_func(process_pool)
+                        self._results[pattern_type] = patterns if patterns is not None else []
+
+                        if progress_callback:
+                            progress_callback(pattern_type, 'completed', len(self._results[pattern_type]))
+
+                    except Exception as e:
+                        self._errors[pattern_type] = str(e)
+
+                        if progress_callback:
+                            progress_callback(pattern_type, 'error', error=str(e))
+
             # Collect results as they complete
             for future in as_completed(future_to_pattern):
                 pattern_type = future_to_pattern[future]
@@ -214,6 +274,306 @@ def detect_patterns_parallel(
     return results
 
 
+# ============================================================================
+# Process pool backend
+# ============================================================================
+
+# Detectors the process pool can split by their outermost start position:
+# pattern type -> (module, function, trailing points after the start point,
+# whether the start position is enumerated in descending order)
+PARTITIONED_DETECTORS = {
+    'formed_xabcd': ('formed_xabcd', 'detect_xabcd_patterns', 4, False),
+    'unformed_xabcd': ('unformed_xabcd_o_n3', 'detect_unformed_xabcd_patterns_o_n3', 3, False),
+    'unformed_abcd': ('unformed_abcd', 'detect_unformed_abcd_patterns_optimized', 2, True),
+}
+
+# Keyword arguments whose semantics depend on seeing the whole search
+# (an early stop after N patterns or after T seconds); a partitioned run
+# could not reproduce them, so such calls run serially
+_SERIAL_ONLY_KWARGS = ('max_patterns', 'time_budget')
+
+# Per-process state set up once by _init_worker
+_worker_state = {}
+
+
+def _init_worker(shm_name: str, layout: List[Tuple], frame_spec: Optional[Dict],
+                 ts_kind: str, ts_values: Optional[list]):
+    """Process pool initializer: attach the shared block and rebuild inputs once"""
+    shm, arrays = attach_shared_arrays(shm_name, layout)
+    _worker_state['shm'] = shm
+    _worker_state['df'] = decode_frame(arrays, frame_spec) if frame_spec is not None else None
+    _worker_state['extremums'] = ExtremumArray(
+        arrays['bar_idx'], arrays['price'], arrays['is_high'], arrays['ts'], ts_kind, ts_values
+    )
+
+
+def _get_detector(pattern_type: str) -> Callable:
+    module_name, function_name, _, _ = PARTITIONED_DETECTORS[pattern_type]
+    return getattr(importlib.import_module(module_name), function_name)
+
+
+def _detect_partition(pattern_type: str, start_range: Tuple[int, int], kwargs: Dict) -> List[Dict]:
+    """Worker task: run one detector over one range of start positions"""
+    detector = _get_detector(pattern_type)
+    patterns = detector(_worker_state['extremums'], _worker_state['df'],
+                        start_range=start_range, **kwargs)
+    return list(patterns)
+
+
+def partition_start_positions(n_positions: int, n_chunks: int,
+                              cost_exponent: float = 0.0) -> List[Tuple[int, int]]:
+    """
+    Split start positions 0..n_positions-1 into contiguous, cost-balanced ranges.
+
+    An unlimited search from start position s visits on the order of
+    (n_positions - s) ** cost_exponent candidates, so early starts get
+    narrower ranges. cost_exponent=0 gives equal-width ranges.
+
+    Returns:
+        Ascending list of non-empty half-open (start, stop) ranges covering
+        every position exactly once
+    """
+    if n_positions <= 0:
+        return []
+    n_chunks = max(1, min(n_chunks, n_positions))
+    weights = np.arange(n_positions, 0, -1, dtype=np.float64) ** cost_exponent
+    cumulative = np.cumsum(weights)
+    targets = cumulative[-1] * np.arange(1, n_chunks) / n_chunks
+    cuts = np.searchsorted(cumulative, targets, side='left') + 1
+    bounds = sorted(set([0, *cuts.tolist(), n_positions]))
+    return [(start, stop) for start, stop in zip(bounds[:-1], bounds[1:]) if start < stop]
+
+
+def _merge_partitions(pattern_type: str, chunks: List[List[Dict]]) -> List[Dict]:
+    """Concatenate per-range results in the detector's enumeration order"""
+    patterns = [pattern for chunk in chunks for pattern in chunk]
+    if pattern_type == 'unformed_abcd':
+        from unformed_abcd import UnformedABCDResult, sort_unformed_abcd_patterns
+        sort_unformed_abcd_patterns(patterns)
+        return UnformedABCDResult(patterns)
+    return patterns
+
+
+class ProcessPoolPatternDetector:
+    """
+    Split single pattern searches across worker processes.
+
+    ParallelPatternDetector runs whole detectors side by side on threads,
+    which still share one interpreter lock, and the longest detector bounds
+    the wall time. This backend partitions each detector's search by its
+    outermost start position (X for XABCD, A for unformed ABCD) into
+    cost-balanced ranges, runs them in a process pool and concatenates the
+    results in enumeration order, so output is identical to the serial
+    detector.
+
+    The OHLC and extremum columns are copied into one shared-memory block
+    per call; each worker attaches to it once at start-up instead of
+    receiving pickled inputs with every task.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, chunks_per_worker: int = 4,
+                 mp_context=None):
+        """
+        Initialize process pool detector.
+
+        Args:
+            max_workers: Number of worker processes (default: os.cpu_count())
+            chunks_per_worker: Start-position ranges per worker and detector;
+                               more ranges balance better, fewer cost less
+                               overhead (default: 4)
+            mp_context: Optional multiprocessing context for the pool
+        """
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.chunks_per_worker = chunks_per_worker
+        self.mp_context = mp_context
+        self._results = {}
+        self._errors = {}
+
+    def detect(self, pattern_type: str, extremum_points, df: pd.DataFrame, **kwargs) -> List[Dict]:
+        """
+        Run one partitionable detector across the pool.
+
+        Args:
+            pattern_type: Key of PARTITIONED_DETECTORS
+            extremum_points: List of (timestamp, price, is_high, bar_index), or an ExtremumArray
+            df: OHLC DataFrame
+            **kwargs: Passed to the detector
+
+        Returns:
+            Detected patterns, identical to calling the detector directly
+        """
+        results = self.detect_all_patterns(extremum_points, df, {pattern_type: kwargs})
+        if pattern_type in self._errors:
+            raise RuntimeError(f"{pattern_type} detection failed: {self._errors[pattern_type]}")
+        return results[pattern_type]
+
+    def detect_all_patterns(
+        self,
+        extremum_points,
+        df: pd.DataFrame,
+        detector_kwargs: Dict[str, Dict],
+        progress_callback: Optional[Callable] = None
+    ) -> Dict[str, List[Dict]]:
+        """
+        Run several partitionable detectors over one shared pool.
+
+        Args:
+            extremum_points: List of (timestamp, price, is_high, bar_index), or an ExtremumArray
+            df: OHLC DataFrame
+            detector_kwargs: Dict mapping pattern type (key of
+                PARTITIONED_DETECTORS) to the keyword arguments for its detector
+                Example: {
+                    'formed_xabcd': {'max_search_window': None, 'batched': True},
+                    'unformed_xabcd': {},
+                }
+            progress_callback: Optional callback(pattern_type, status) for progress
+
+        Returns:
+            Dictionary mapping pattern type to list of detected patterns
+        """
+        self._results = {}
+        self._errors = {}
+
+        unknown = set(detector_kwargs) - set(PARTITIONED_DETECTORS)
+        if unknown:
+            raise ValueError(f"Unsupported pattern types for process pool detection: {sorted(unknown)}")
+
+        extremums = ExtremumArray.from_points(extremum_points)
+        n = len(extremums)
+
+        serial = {
+            pattern_type: kwargs for pattern_type, kwargs in detector_kwargs.items()
+            if self.max_workers <= 1 or any(kwargs.get(key) is not None for key in _SERIAL_ONLY_KWARGS)
+        }
+        pooled = {
+            pattern_type: kwargs for pattern_type, kwargs in detector_kwargs.items()
+            if pattern_type not in serial
+        }
+
+        for pattern_type, kwargs in serial.items():
+            if progress_callback:
+                progress_callback(pattern_type, 'started')
+            try:
+                self._results[pattern_type] = _get_detector(pattern_type)(extremums, df, **kwargs)
+                if progress_callback:
+                    progress_callback(pattern_type, 'completed', len(self._results[pattern_type]))
+            except Exception as e:
+                self._errors[pattern_type] = str(e)
+                if progress_callback:
+                    progress_callback(pattern_type, 'error', error=str(e))
+
+        if not pooled:
+            return self._results
+
+        arrays = {
+            'bar_idx': extremums.bar_idx,
+            'price': extremums.price,
+            'is_high': extremums.is_high,
+            'ts': extremums.ts,
+        }
+        frame_spec = None
+        if df is not None:
+            frame_arrays, frame_spec = encode_frame(df)
+            arrays.update(frame_arrays)
+
+        shared = SharedArrays(arrays)
+        try:
+            with ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=self.mp_context,
+                initializer=_init_worker,
+                initargs=(shared.name, shared.layout, frame_spec,
+                          extremums.ts_kind, extremums._ts_values)
+            ) as executor:
+                futures = {}
+                for pattern_type, kwargs in pooled.items():
+                    _, _, trailing, descending = PARTITIONED_DETECTORS[pattern_type]
+                    # Unlimited searches cost far more from early start points;
+                    # windowed ones cost about the same from every start point
+                    unlimited = kwargs.get(
+                        'max_search_window',
+                        inspect.signature(_get_detector(pattern_type)).parameters['max_search_window'].default
+                    ) is None
+                    ranges = partition_start_positions(
+                        n - trailing, self.max_workers * self.chunks_per_worker,
+                        cost_exponent=trailing if unlimited else 0.0
+                    )
+                    if descending:
+                        ranges.reverse()
+
+                    if progress_callback:
+                        progress_callback(pattern_type, 'started')
+                    futures[pattern_type] = [
+                        executor.submit(_detect_partition, pattern_type, start_range, kwargs)
+                        for start_range in ranges
+                    ]
+
+                for pattern_type, chunk_futures in futures.items():
+                    try:
+                        chunks = [future.result() for future in chunk_futures]
+                        self._results[pattern_type] = _merge_partitions(pattern_type, chunks)
+                        if progress_callback:
+                            progress_callback(pattern_type, 'completed', len(self._results[pattern_type]))
+                    except Exception as e:
+                        self._errors[pattern_type] = str(e)
+                        if progress_callback:
+                            progress_callback(pattern_type, 'error', error=str(e))
+        finally:
+            shared.close()
+
+        return self._results
+
+    def get_results(self) -> Dict[str, List[Dict]]:
+        """
+        Get detection results.
+
+        Returns:
+            Dictionary mapping pattern type to patterns
+        """
+        return self._results.copy()
+
+    def get_errors(self) -> Dict[str, str]:
+        """
+        Get detection errors.
+
+        Returns:
+            Dictionary mapping pattern type to error message
+        """
+        return self._errors.copy()
+
+
+def detect_patterns_multiprocess(
+    extremum_points,
+    df: pd.DataFrame,
+    detector_kwargs: Optional[Dict[str, Dict]] = None,
+    max_workers: Optional[int] = None,
+    progress_callback: Optional[Callable] = None
+) -> Dict[str, List[Dict]]:
+    """
+    Convenience function to detect patterns with the process pool backend.
+
+    Args:
+        extremum_points: Extremum points list, or an ExtremumArray
+        df: OHLC DataFrame
+        detector_kwargs: Pattern type -> detector kwargs (default: every
+            partitionable detector, formed XABCD unlimited and batched)
+        max_workers: Number of worker processes (default: os.cpu_count())
+        progress_callback: Optional progress callback
+
+    Returns:
+        Dictionary of patterns by type
+    """
+    if detector_kwargs is None:
+        detector_kwargs = {
+            'formed_xabcd': {'max_search_window': None, 'batched': True},
+            'unformed_xabcd': {},
+            'unformed_abcd': {},
+        }
+
+    detector = ProcessPoolPatternDetector(max_workers=max_workers)
+    return detector.detect_all_patterns(extremum_points, df, detector_kwargs, progress_callback)
+
+
 if __name__ == "__main__":
     print("Testing Parallel Pattern Detection...")
 
@@ -13,7 +13,7 @@ Designed to be triggered after auto-updater downloads new data.
 
 import pandas as pd
 import json
-from typing import Dict, List, Optional, Set
+from typing import Dict, List, Optional, Set, Tuple
 from datetime import datetime
 from pathlib import Path
 
@@ -23,7 +23,7 @@ from extremum import detect_extremum_points
 from xabcd_detection import detect_xabcd_patterns_smart as detect_xabcd_patterns
 from formed_abcd import detect_strict_abcd_patterns
 from unformed_abcd import detect_unformed_abcd_patterns_optimized
-from unformed_xabcd import detect_strict_unformed_xabcd_patterns
+from xabcd_detection import detect_unformed_xabcd_patterns_smart
 
 # Import our new modules
 from signal_database import (
@@ -34,6 +34,7 @@ from signal_database import (
     create_price_alerts_for_signal
 )
 from alert_manager import AlertManager, AlertConfig
+from ohlc_range_index import OHLCRangeIndex, reversal_outcome
 
 
 class PatternMonitorService:
@@ -133,7 +134,7 @@ class PatternMonitorService:
                 if last_extremum_bar_index == latest_bar_index:
                     print(f"  ✅ Latest candle IS an extremum (bar {latest_bar_index}) - running pattern detection")
                     # Step 1: Detect patterns
-                    detected_patterns = self._detect_patterns(data)
+                    detected_patterns = self._detect_patterns(data, extremum_points)
                     print(f"\n📊 Detected {len(detected_patterns)} formed patterns")
                 else:
                     print(f"  ⏭️ Latest candle is NOT an extremum (last extremum at bar {last_extremum_bar_index}, current bar {latest_bar_index})")
@@ -187,6 +188,8 @@ class PatternMonitorService:
             # and update statuses (detected → approaching → entered)
             active_signals = self.db.get_signals_by_symbol(self.symbol, active_only=True)
             print(f"\n📋 Monitoring {len(active_signals)} active signals")
+            range_index = None  # Shared by every outcome check of this pass
+
 
             for signal in active_signals:
                 signal_id = signal['signal_id']
@@ -207,10 +210,13 @@ class PatternMonitorService:
 
                 # Check for pattern outcome (completed/invalidated) if pattern has entered PRZ
                 if old_status == 'entered' and is_formed:
+                    if range_index is None:
+                        range_index = OHLCRangeIndex(data)
                     outcome_status = self._check_pattern_outcome(
                         signal,
                         current_price,
-                        data
+                        data,
+                        range_index
                     )
                     if outcome_status:
                         new_status = outcome_status
@@ -284,10 +290,15 @@ class PatternMonitorService:
 
         return results
 
-    def _detect_patterns(self, data: pd.DataFrame) -> List[Dict]:
+    def _detect_patterns(self, data: pd.DataFrame,
+                         extremum_points: Optional[List[Tuple]] = None) -> List[Dict]:
         """
         Detect both formed and unformed patterns in data
 
+        Args:
+            data: DataFrame with OHLCV data
+            extremum_points: Extremums already detected on data (detected here if None)
+
         Returns:
             List of detected pattern dictionaries
         """
@@ -299,8 +310,9 @@ class PatternMonitorService:
             # so it's not wasteful - 4h chart only checks every 4 hours
             print(f"  ℹ️ Analyzing {len(data)} candles for pattern detection")
 
-            # Detect extremum points
-            extremum_points = detect_extremum_points(data, length=self.extremum_length)
+            # Detect extremum points (reuse the ones from the latest-candle check)
+            if extremum_points is None:
+                extremum_points = detect_extremum_points(data, length=self.extremum_length)
 
             if len(extremum_points) < 4:
                 print("  ⚠️ Not enough extremum points for pattern detection")
@@ -371,7 +383,7 @@ class PatternMonitorService:
             # Detect UNFORMED XABCD patterns
             if len(extremums_indexed) >= 4:
                 try:
-                    unformed_xabcd = detect_strict_unformed_xabcd_patterns(
+                    unformed_xabcd = detect_unformed_xabcd_patterns_smart(
                         extremums_indexed,
                         df=data_with_date
                     )
@@ -462,7 +474,8 @@ class PatternMonitorService:
         self,
         signal: Dict,
         current_price: float,
-        data: pd.DataFrame
+        data: pd.DataFrame,
+        range_index: Optional[OHLCRangeIndex] = None
     ) -> Optional[str]:
         """
         Check if an entered pattern has completed or been invalidated
@@ -475,6 +488,7 @@ class PatternMonitorService:
             signal: Signal dictionary from database
             current_price: Current price
             data: Full price data
+            range_index: OHLCRangeIndex over data (built if None)
 
         Returns:
             'completed', 'invalidated', or None (still pending)
@@ -518,30 +532,16 @@ class PatternMonitorService:
             if max_bars_to_check <= 0:
                 return None  # Not enough data after D
 
-            # Check price action after D
-            for i in range(1, max_bars_to_check + 1):
-                bar_index = d_index + i
-                if bar_index >= len(data):
-                    break
-
-                bar = data.iloc[bar_index]
-
-                if is_bullish:
-                    # Bullish: D is low, should reverse up
-                    reversal_amount = (bar['High'] - d_price) / d_price
-                    if reversal_amount > reversal_threshold:
-                        return 'completed'
-                    # Check failure: price goes 2% below D
-                    if bar['Low'] < d_price * 0.98:
-                        return 'invalidated'
-                else:
-                    # Bearish: D is high, should reverse down
-                    reversal_amount = (d_price - bar['Low']) / d_price
-                    if reversal_amount > reversal_threshold:
-                        return 'completed'
-                    # Check failure: price goes 2% above D
-                    if bar['High'] > d_price * 1.02:
-                        return 'invalidated'
+            # Check price action after D: the first bar that reverses 2%
+            # (completed) or breaks 2% past D (invalidated) decides
+            if range_index is None:
+                range_index = OHLCRangeIndex(data)
+            outcome = reversal_outcome(range_index, d_index, d_price, is_bullish,
+                                       max_bars_to_check, reversal_threshold)
+            if outcome == 'reversal':
+                return 'completed'
+            if outcome == 'break':
+                return 'invalidated'
 
             # No outcome yet - still pending
             return None
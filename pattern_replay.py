@@ -0,0 +1,224 @@
+"""
+Pattern Replay Module
+Vectorized after-D replays of formed patterns for the backtest analyses
+
+The Fibonacci, harmonic point and enhanced PnL analyses all follow each
+successful pattern from its D bar forward through the backtest data.  Each
+of them used to walk every pattern candle by candle with DataFrame row
+access, recomputing the same level touches every time an analysis ran.
+
+PatternReplayEngine holds the backtest High/Low arrays and replays a
+pattern's future in one NumPy pass:
+
+- Level replay: for the Fibonacci levels measured between A/C and D plus
+  points A, B and C, the touch count (low <= level <= high) and the
+  first-touch candle of every level, up to and including the first candle
+  that touches 161.8%
+- Trade replay: which take-profit targets are hit and when (at most one per
+  candle, nearest first), the stop-loss hit candle (the stop moves to the
+  entry once TP1 is hit) and the MFE/MAE up to the outcome
+
+Candle offsets are counted from the D bar (offset 0 is the D bar itself),
+as the analyses' display windows ``data.iloc[d_bar:]`` do.  Replays are
+cached by their inputs, so analyses run on the same patterns share them.
+"""
+
+from typing import Dict, Hashable, NamedTuple, Optional, Sequence, Tuple
+import numpy as np
+import pandas as pd
+
+
+FIB_PERCENTAGES = (0, 23.6, 38.2, 50, 61.8, 78.6, 88.6, 100, 112.8, 127.2, 141.4, 161.8)
+STOP_LEVEL = '161.8%'  # Touching this level completes the pattern
+POINT_NAMES = ('A', 'B', 'C')
+
+
+class LevelReplay(NamedTuple):
+    """Touches of a pattern's levels up to the 161.8% stop candle"""
+    names: Tuple[str, ...]          # Fibonacci level names, then 'A', 'B', 'C'
+    prices: Tuple[float, ...]
+    stop: int                       # Candles analyzed (offsets [0, stop))
+    completed: bool                 # Whether a candle touched 161.8%
+    counts: Tuple[int, ...]         # Candles touching each level, D bar included
+    first_touch: Tuple[Optional[int], ...]  # Offset of each level's first touch
+    touched_at_d: Tuple[bool, ...]  # Whether the D bar itself touches each level
+
+    def touch_counts(self, skip_d_bar: bool = False) -> Dict[str, int]:
+        """Level name -> touch count, optionally leaving out the D bar"""
+        return {
+            name: count - (skip_d_bar and at_d)
+            for name, count, at_d in zip(self.names, self.counts, self.touched_at_d)
+        }
+
+
+class TradeReplay(NamedTuple):
+    """Outcome of trading a pattern from D with staged take-profits"""
+    tp_hits: Tuple[Tuple[int, int], ...]  # (target index, candle offset) in hit order
+    sl_hit_offset: Optional[int]          # Candle offset of the stop-loss hit
+    candles: int                          # Candles after the D bar
+    mfe_pct: float                        # Max favorable excursion, % of entry
+    mae_pct: float                        # Max adverse excursion, % of entry
+
+
+def fibonacci_levels(a_price: float, c_price: float, d_price: float) -> Dict[str, float]:
+    """
+    Fibonacci levels of a formed pattern, keyed like "61.8%".
+
+    Bullish patterns (A > C) measure from the A/C swing high (0%) to D
+    (100%); bearish ones from D (0%) back to the A/C swing low (100%).
+    """
+    if a_price > c_price:
+        start_price = max(a_price, c_price)
+        price_range = d_price - start_price
+    else:
+        start_price = d_price
+        price_range = min(a_price, c_price) - start_price
+    return {f"{pct}%": start_price + (price_range * pct / 100.0) for pct in FIB_PERCENTAGES}
+
+
+class PatternReplayEngine:
+    """
+    Cached after-D replays over one backtest's High/Low arrays.
+
+    The engine is a snapshot: build a new one if the backtest data changes.
+    """
+
+    def __init__(self, high: Sequence[float], low: Sequence[float]):
+        self.high = np.asarray(high, dtype=float)
+        self.low = np.asarray(low, dtype=float)
+        self._cache: Dict[Hashable, object] = {}
+
+    @classmethod
+    def from_data(cls, data: pd.DataFrame) -> 'PatternReplayEngine':
+        """Build from an OHLC DataFrame with 'High' and 'Low' columns"""
+        return cls(data['High'].to_numpy(dtype=float), data['Low'].to_numpy(dtype=float))
+
+    def __len__(self) -> int:
+        return len(self.high)
+
+    def clear_cache(self):
+        """Forget all cached replays"""
+        self._cache.clear()
+
+    def replay_levels(self, d_bar: int, a_price: float, b_price: Optional[float],
+                      c_price: float, d_price: float) -> Optional[LevelReplay]:
+        """
+        Replay the Fibonacci and A/B/C point levels of a pattern from D.
+
+        Args:
+            d_bar: Bar the pattern formed at (window start)
+            a_price, b_price, c_price, d_price: Pattern point prices (a
+                missing B is never touched)
+
+        Returns:
+            LevelReplay, or None if there is no data from d_bar on
+        """
+        key = ('levels', d_bar, a_price, b_price, c_price, d_price)
+        if key in self._cache:
+            return self._cache[key]
+
+        high, low = self.high[d_bar:], self.low[d_bar:]
+        replay = None
+        if len(high):
+            levels = fibonacci_levels(a_price, c_price, d_price)
+            stop_price = levels[STOP_LEVEL]
+            stop_hits = np.flatnonzero((low <= stop_price) & (stop_price <= high))
+            completed = len(stop_hits) > 0
+            stop = int(stop_hits[0]) + 1 if completed else len(high)
+
+            names = tuple(levels) + POINT_NAMES
+            prices = tuple(levels.values()) + (a_price, b_price, c_price)
+            level_prices = np.array([np.nan if p is None else p for p in prices], dtype=float)
+            touched = (low[:stop, None] <= level_prices) & (level_prices <= high[:stop, None])
+            any_touch = touched.any(axis=0)
+            first_touch = np.where(any_touch, touched.argmax(axis=0), -1)
+
+            replay = LevelReplay(
+                names=names,
+                prices=prices,
+                stop=stop,
+                completed=completed,
+                counts=tuple(touched.sum(axis=0).tolist()),
+                first_touch=tuple(None if offset < 0 else offset for offset in first_touch.tolist()),
+                touched_at_d=tuple(touched[0].tolist()),
+            )
+
+        self._cache[key] = replay
+        return replay
+
+    def replay_trade(self, d_bar: int, entry_price: float, stop_loss: float,
+                     is_bullish: bool, targets: Sequence[float]) -> TradeReplay:
+        """
+        Replay a staged take-profit trade entered at D.
+
+        Every candle after D is checked in order: first the stop (a low at
+        or below it for longs, a high at or above it for shorts), then the
+        remaining targets nearest-first; a candle hits at most one target.
+        After the first target is hit the stop moves to the entry price.
+
+        Args:
+            d_bar: Entry bar
+            entry_price: Entry (D) price
+            stop_loss: Initial stop price
+            is_bullish: Long if True, short otherwise
+            targets: Take-profit prices, nearest first
+
+        Returns:
+            TradeReplay (candle offsets count from the D bar, so the first
+            candle after entry is offset 1)
+        """
+        targets = tuple(targets)
+        key = ('trade', d_bar, entry_price, stop_loss, bool(is_bullish), targets)
+        if key in self._cache:
+            return self._cache[key]
+
+        high, low = self.high[d_bar + 1:], self.low[d_bar + 1:]
+        candles = len(high)
+        adverse = low if is_bullish else high
+
+        def stop_hit_from(stop_price: float, start: int) -> int:
+            """Index of the first candle from start that hits the stop, else candles"""
+            if is_bullish:
+                hits = adverse[start:] <= stop_price
+            else:
+                hits = adverse[start:] >= stop_price
+            return start + int(hits.argmax()) if hits.any() else candles
+
+        target_prices = np.asarray(targets, dtype=float)
+        touched = (low[:, None] <= target_prices) & (target_prices <= high[:, None])
+
+        sl_index = stop_hit_from(stop_loss, 0)
+        remaining = list(range(len(targets)))
+        tp_hits = []
+        for index in np.flatnonzero(touched.any(axis=1)).tolist():
+            if index >= sl_index or not remaining:
+                break
+            row = touched[index]
+            for target in remaining:
+                if row[target]:
+                    remaining.remove(target)
+                    tp_hits.append((target, index + 1))
+                    if len(tp_hits) == 1:
+                        sl_index = stop_hit_from(entry_price, index + 1)
+                    break
+
+        # Excursions up to the outcome: the stop candle, else the last candle
+        end = sl_index if sl_index < candles else candles - 1
+        mfe_pct = mae_pct = 0.0
+        if end >= 0 and entry_price:
+            max_high = np.fmax.reduce(high[:end + 1])
+            min_low = np.fmin.reduce(low[:end + 1])
+            up = (max_high - entry_price) / entry_price * 100
+            down = (entry_price - min_low) / entry_price * 100
+            mfe_pct, mae_pct = (up, down) if is_bullish else (down, up)
+            mfe_pct, mae_pct = float(max(mfe_pct, 0.0)), float(max(mae_pct, 0.0))
+
+        replay = TradeReplay(
+            tp_hits=tuple(tp_hits),
+            sl_hit_offset=sl_index + 1 if sl_index < candles else None,
+            candles=candles,
+            mfe_pct=mfe_pct,
+            mae_pct=mae_pct,
+        )
+        self._cache[key] = replay
+        return replay
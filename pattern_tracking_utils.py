@@ -6,14 +6,102 @@ enabling analysis of pattern completion rates, accuracy, and success metrics.
 """
 
 import hashlib
+import sys
+from bisect import bisect_right
+from collections import Counter
+from itertools import islice
 from typing import Dict, List, Tuple, Optional
-from dataclasses import dataclass, field
+from dataclasses import dataclass, fields
 from datetime import datetime
 import numpy as np
 import pandas as pd
 from typing import Optional
 
+from ohlc_range_index import OHLCRangeIndex, reversal_outcome
+from zone_interval_index import ZoneIntervalIndex
+from price_band_index import ratio_price_band
 
+
+# Statuses for which check_price_in_zone looks for zone entries
+ZONE_ENTRY_STATUSES = ('pending', 'in_zone')
+# Statuses of zone-reached patterns that check_zone_violation can still move on
+ZONE_OUTCOME_STATUSES = ('in_zone', 'invalid_prz')
+# Statuses the per-bar checks still act on; every other status is concluded
+LIVE_STATUSES = ('pending', 'in_zone', 'invalid_prz')
+# BC/AB range (percent) a moved C point must keep
+C_UPDATE_BC_AB_MIN = 10
+C_UPDATE_BC_AB_MAX = 500
+
+
+def _slotted(transient=(), **views):
+    """
+    Class decorator that rebuilds a dataclass with __slots__ (what
+    dataclass(slots=True) does on Python 3.10+).
+
+    A tracker holds one instance per tracked pattern and zone entry, so a
+    per-instance __dict__ dominates its memory. Slotted instances keep the
+    same attribute API; a lazily created __dict__ slot still accepts ad-hoc
+    attributes.
+
+    Args:
+        transient: Extra slots that are not pickled
+        views: Field name -> property; the field's value is stored in the
+               '_<name>' slot and accessed through the property
+    """
+    def wrap(cls):
+        names = [f.name for f in fields(cls)]
+        slots = tuple(f'_{name}' if name in views else name for name in names)
+        cls_dict = {key: value for key, value in cls.__dict__.items()
+                    if key not in names and key not in ('__dict__', '__weakref__')}
+        cls_dict['__slots__'] = slots + tuple(transient) + ('__dict__',)
+        cls_dict.update(views)
+
+        def __getstate__(self):
+            state = {slot: getattr(self, slot) for slot in slots if hasattr(self, slot)}
+            state.update(self.__dict__)
+            return state
+
+        def __setstate__(self, state):
+            for key, value in state.items():
+                object.__setattr__(self, key, value)
+
+        cls_dict['__getstate__'] = __getstate__
+        cls_dict['__setstate__'] = __setstate__
+        return type(cls)(cls.__name__, cls.__bases__, cls_dict)
+    return wrap
+
+
+def _lazy_field(name: str, factory):
+    """Property for a container field that is only allocated on first access"""
+    slot = f'_{name}'
+
+    def get(self):
+        value = getattr(self, slot)
+        if value is None:
+            value = factory()
+            setattr(self, slot, value)
+        return value
+
+    def set(self, value):
+        setattr(self, slot, value)
+
+    return property(get, set)
+
+
+def _get_status(self) -> str:
+    return self._status
+
+
+def _set_status(self, status: str):
+    # Report status changes (including ones made outside the tracker) to
+    # the TrackedPatternStore holding this pattern
+    store = getattr(self, '_store', None)
+    if store is not None:
+        store._status_changed(self, status)
+    self._status = status
+
+
+@_slotted()
 @dataclass
 class ZoneEntry:
     """Represents a single entry into a PRZ or d-line zone"""
@@ -35,6 +123,17 @@ class ZoneEntry:
     pattern_subtype: str = ''  # Gartley, Butterfly, etc.
     is_bullish: bool = True  # Direction expectation
 
+
+# Containers most patterns never fill are allocated on first access
+@_slotted(
+    transient=('_store', '_store_key'),
+    status=property(_get_status, _set_status),
+    prz_zones=_lazy_field('prz_zones', list),
+    all_prz_zones=_lazy_field('all_prz_zones', list),
+    d_lines=_lazy_field('d_lines', list),
+    completion_details=_lazy_field('completion_details', dict),
+    zone_entries=_lazy_field('zone_entries', list),
+)
 @dataclass
 class TrackedPattern:
     """Represents a tracked pattern through its lifecycle"""
@@ -56,9 +155,9 @@ class TrackedPattern:
     # Projected D zone (PRZ for ABCD, d_lines for XABCD)
     prz_min: Optional[float] = None  # For ABCD patterns (deprecated - use prz_zones)
     prz_max: Optional[float] = None  # For ABCD patterns (deprecated - use prz_zones)
-    prz_zones: List[Dict] = field(default_factory=list)  # Only THIS instance's PRZ for entry checking
-    all_prz_zones: List[Dict] = field(default_factory=list)  # ALL PRZ zones for display purposes
-    d_lines: List[float] = field(default_factory=list)  # For XABCD patterns
+    prz_zones: List[Dict] = None  # Only THIS instance's PRZ for entry checking
+    all_prz_zones: List[Dict] = None  # ALL PRZ zones for display purposes
+    d_lines: List[float] = None  # For XABCD patterns
     projected_d_time: int = 0  # Estimated time for D
 
     # Pattern timestamps for time tracking
@@ -100,10 +199,209 @@ class TrackedPattern:
     pattern_match_accuracy: Optional[float] = None  # Did it form the expected pattern?
 
     # Additional details
-    completion_details: Dict = field(default_factory=dict)
+    completion_details: Dict = None
 
     # Zone entry tracking
-    zone_entries: List[str] = field(default_factory=list)  # List of ZoneEntry IDs
+    zone_entries: List[str] = None  # List of ZoneEntry IDs
+
+
+class TrackedPatternStore(dict):
+    """
+    The tracker's pattern dict, partitioned by status.
+
+    Behaves like the plain {pattern_id: TrackedPattern} dict it replaces
+    (every pattern ever tracked, in insertion order). In addition, pattern
+    IDs are kept in one ordered set per live status and concluded patterns
+    in an archive, in the order they concluded. Status changes are reported
+    by the patterns themselves, so moving between partitions is O(1) and
+    per-bar checks only visit live patterns.
+    """
+
+    def __init__(self, items=(), archive_order=None):
+        super().__init__()
+        self._seq: Dict[str, int] = {}  # Insertion order of every pattern ID
+        self._next_seq = 0
+        self._live: Dict[str, Dict[str, None]] = {status: {} for status in LIVE_STATUSES}
+        self.archive: Dict[str, None] = {}  # Concluded pattern IDs in conclusion order
+        self.status_counts: Counter = Counter()
+        for pattern_id, tracked in items:
+            self[pattern_id] = tracked
+        if archive_order is not None:
+            self.archive = dict.fromkeys(pattern_id for pattern_id in archive_order
+                                         if pattern_id in self.archive)
+
+    def __reduce__(self):
+        return (self.__class__, (list(self.items()), list(self.archive)))
+
+    def __setitem__(self, pattern_id: str, tracked: 'TrackedPattern'):
+        if pattern_id in self:
+            self._leave(pattern_id, self[pattern_id].status, None)
+            self.archive.pop(pattern_id, None)
+        else:
+            self._seq[pattern_id] = self._next_seq
+            self._next_seq += 1
+        super().__setitem__(pattern_id, tracked)
+        tracked._store = self
+        tracked._store_key = pattern_id
+        self._enter(pattern_id, tracked.status)
+
+    def __delitem__(self, pattern_id: str):
+        self._leave(pattern_id, self[pattern_id].status, None)
+        self.archive.pop(pattern_id, None)
+        del self._seq[pattern_id]
+        super().__delitem__(pattern_id)
+
+    def pop(self, pattern_id: str, *default):
+        if pattern_id not in self:
+            return super().pop(pattern_id, *default)
+        tracked = self[pattern_id]
+        del self[pattern_id]
+        return tracked
+
+    def clear(self):
+        super().clear()
+        self.__init__()
+
+    def seq(self, pattern_id: str) -> int:
+        """Insertion position of a pattern (its position in iteration order)"""
+        return self._seq[pattern_id]
+
+    def count(self, status: str) -> int:
+        """Number of patterns currently in a status"""
+        return self.status_counts[status]
+
+    def ids_with_status(self, *statuses: str) -> List[str]:
+        """
+        IDs of the patterns in any of the given statuses, in insertion order.
+
+        Live statuses are read from their partitions; concluded statuses
+        are filtered from the archive.
+        """
+        pattern_ids = []
+        for status in statuses:
+            if status in self._live:
+                pattern_ids.extend(self._live[status])
+            elif self.status_counts[status]:
+                pattern_ids.extend(pattern_id for pattern_id in self.archive
+                                   if self[pattern_id].status == status)
+        return sorted(pattern_ids, key=self._seq.__getitem__)
+
+    def _status_changed(self, tracked: 'TrackedPattern', status: str):
+        pattern_id = getattr(tracked, '_store_key', None)
+        if self.get(pattern_id) is not tracked:
+            return  # Pattern was replaced or removed; it no longer belongs here
+        old_status = tracked.status
+        if old_status != status:
+            self._leave(pattern_id, old_status, status)
+            self._enter(pattern_id, status)
+
+    def _enter(self, pattern_id: str, status: str):
+        self.status_counts[status] += 1
+        if status in self._live:
+            self._live[status][pattern_id] = None
+        else:
+            self.archive.setdefault(pattern_id, None)
+
+    def _leave(self, pattern_id: str, status: str, new_status: Optional[str]):
+        self.status_counts[status] -= 1
+        if status in self._live:
+            del self._live[status][pattern_id]
+        elif new_status in self._live:
+            del self.archive[pattern_id]
+
+
+def pattern_structure_key(pattern: Dict) -> Optional[Tuple]:
+    """
+    Canonical structural key of a pattern: its type, its name without the
+    "_unformed" suffix, and the indices of its X, A, B, C points.
+
+    The key is computed on first use and stored on the pattern under
+    'structure_key', so a pattern is only inspected once however often
+    the backtester looks up its ID. Unformed and formed versions of the
+    same pattern share a key.
+
+    Args:
+        pattern: Pattern dictionary with A, B, C points (and X for XABCD)
+
+    Returns:
+        (pattern_type, normalized_name, point_names, *point_indices), or
+        None if the pattern has no structural points
+    """
+    pattern_type = pattern.get('pattern_type', 'UNK')
+    key = pattern.get('structure_key')
+    if key is not None and key[0] == pattern_type:
+        return key
+
+    # Normalize pattern name: strip "_unformed" suffix for matching
+    # This ensures unformed and formed versions of the same pattern get the same ID
+    # Example: "Gartley1_bull_unformed" -> "Gartley1_bull"
+    normalized_name = pattern.get('name', 'unknown').replace('_unformed', '')
+
+    # Extract ONLY the indices for unique identification (not prices)
+    point_names = []
+    point_indices = []
+
+    # Handle different pattern structures
+    if 'indices' in pattern:
+        # Direct indices available
+        indices = pattern['indices']
+        for point_name in 'XABC':
+            if point_name in indices:
+                point_names.append(point_name)
+                point_indices.append(indices[point_name])
+    elif 'points' in pattern:
+        # Extract indices from points structure
+        points = pattern['points']
+        for point_name in 'XABC':
+            if point_name in points:
+                point_data = points[point_name]
+                if isinstance(point_data, dict):
+                    # Try to get index or timestamp
+                    idx = point_data.get('index', point_data.get('time', point_data.get('timestamp', '')))
+                    # Use the bar index when there is one, else the full timestamp
+                    point_indices.append(int(idx) if isinstance(idx, (int, float)) else idx)
+                else:
+                    # Assume it's an index
+                    point_indices.append(point_data)
+                point_names.append(point_name)
+    else:
+        # Fallback: try to extract from direct keys
+        for point_name in 'XABC':
+            if point_name in pattern:
+                val = pattern[point_name]
+                # Try to extract index from tuple/list
+                if isinstance(val, (tuple, list)) and len(val) >= 1:
+                    val = val[0]
+                point_names.append(point_name)
+                point_indices.append(val)
+
+    if not point_names:
+        return None
+    key = (pattern_type, normalized_name, ''.join(point_names), *point_indices)
+    try:
+        hash(key)
+    except TypeError:
+        # Unhashable point data (e.g. lists): key on its text, which
+        # formats into the same ID
+        key = (pattern_type, normalized_name, ''.join(point_names),
+               *(f"{idx}" for idx in point_indices))
+    pattern['structure_key'] = key
+    return key
+
+
+def pattern_id_from_key(key: Tuple) -> str:
+    """
+    Hex pattern ID for a structural key, e.g. "ABCD_1f3870be274f6c49".
+
+    Hashes the same "<name>_<point>:<index>_..." string as earlier versions
+    of the tracker, so IDs stay comparable with exported results.
+    """
+    pattern_type, normalized_name, point_names, *point_indices = key
+    indices_string = '_'.join(f"{point_name}:{idx}"
+                              for point_name, idx in zip(point_names, point_indices))
+    key_string = f"{normalized_name}_{indices_string}"
+    pattern_hash = hashlib.md5(key_string.encode()).hexdigest()[:16]
+    return f"{pattern_type}_{pattern_hash}"
 
 
 class PatternTracker:
@@ -114,7 +412,7 @@ class PatternTracker:
 
     def __init__(self):
         """Initialize the pattern tracker without expiry mechanism."""
-        self.tracked_patterns: Dict[str, TrackedPattern] = {}
+        self.tracked_patterns: Dict[str, TrackedPattern] = TrackedPatternStore()
         self.completion_history: List[TrackedPattern] = []
         self.pattern_type_stats: Dict[str, Dict] = {}
         self.current_bar: int = 0
@@ -124,6 +422,27 @@ class PatternTracker:
         self.zone_entries: Dict[str, ZoneEntry] = {}  # All zone entries
         self.zone_entry_stats: Dict[str, Dict] = {}  # Stats by pattern type
 
+        # Price index of the PRZ zones / d-lines of patterns that can still
+        # enter their zone, so each bar only visits the zones it touches.
+        # New patterns are indexed from the tail of tracked_patterns.
+        self._zone_index = ZoneIntervalIndex()
+        self._indexed_count = 0
+        self._empty_d_line_ids: Dict[str, None] = {}  # Pending XABCD without d_lines
+
+        # Pattern ID per structural key (see generate_pattern_id)
+        self._pattern_ids: Dict[Tuple, str] = {}
+
+        # Pending patterns whose C point a new extremum can still move,
+        # indexed by the price band the new C may take: bullish patterns
+        # (C is a high) under True, bearish ones under False. Extremums
+        # already delivered are kept so newly tracked patterns can catch up.
+        self._c_update_index = {True: ZoneIntervalIndex(), False: ZoneIntervalIndex()}
+        self._c_subscribed_count = 0
+        self._c_source: List[Tuple] = []  # Every extremum delivered, as received
+        self._c_history: List[Tuple] = []  # Delivered (timestamp, price, is_high, bar_index) tuples
+        self._c_history_bars: List[int] = []
+        self._c_history_sorted = True
+
     def generate_pattern_id(self, pattern: Dict) -> str:
         """
         Generate a unique ID for a pattern based on its key points AND pattern name.
@@ -133,70 +452,29 @@ class PatternTracker:
         This allows tracking multiple patterns (e.g., Gartley, Butterfly) that share
         the same X, A, B, C points but have different D projections and PRZ zones.
 
+        The ID is the MD5 digest of the pattern's structural key (see
+        pattern_structure_key), memoized per key, so repeated lookups of the
+        same pattern cost a dict lookup instead of string formatting and
+        hashing.
+
         Args:
             pattern: Pattern dictionary with A, B, C points (and X for XABCD)
 
         Returns:
             Unique pattern ID string
         """
-        # Create a string representation of the key points
-        pattern_type = pattern.get('pattern_type', 'UNK')
-        pattern_name = pattern.get('name', 'unknown')
-
-        # Normalize pattern name: strip "_unformed" suffix for matching
-        # This ensures unformed and formed versions of the same pattern get the same ID
-        # Example: "Gartley1_bull_unformed" -> "Gartley1_bull"
-        normalized_name = pattern_name.replace('_unformed', '')
-
-        # Extract ONLY the indices for unique identification (not prices)
-        point_indices = []
-
-        # Handle different pattern structures
-        if 'indices' in pattern:
-            # Direct indices available
-            indices = pattern['indices']
-            for point_name in ['X', 'A', 'B', 'C']:
-                if point_name in indices:
-                    point_indices.append(f"{point_name}:{indices[point_name]}")
-        elif 'points' in pattern:
-            # Extract indices from points structure
-            points = pattern['points']
-            for point_name in ['X', 'A', 'B', 'C']:
-                if point_name in points:
-                    point_data = points[point_name]
-                    if isinstance(point_data, dict):
-                        # Try to get index or timestamp
-                        idx = point_data.get('index', point_data.get('time', point_data.get('timestamp', '')))
-                        # If idx is a timestamp/datetime, try to extract just the bar index
-                        if isinstance(idx, (int, float)):
-                            point_indices.append(f"{point_name}:{int(idx)}")
-                        else:
-                            # Use the full timestamp if we can't get an index
-                            point_indices.append(f"{point_name}:{idx}")
-                    else:
-                        # Assume it's an index
-                        point_indices.append(f"{point_name}:{point_data}")
-        else:
-            # Fallback: try to extract from direct keys
-            for point_name in ['X', 'A', 'B', 'C']:
-                if point_name in pattern:
-                    val = pattern[point_name]
-                    # Try to extract index from tuple/list
-                    if isinstance(val, (tuple, list)) and len(val) >= 1:
-                        point_indices.append(f"{point_name}:{val[0]}")
-                    else:
-                        point_indices.append(f"{point_name}:{val}")
-
-        # Create key string from indices AND normalized pattern name
-        # This ensures different patterns with same structure get unique IDs
-        # Uses normalized_name (without "_unformed") so unformed and formed versions match
-        key_string = f"{normalized_name}_{'_'.join(point_indices)}" if point_indices else f"unknown_{id(pattern)}"
-
-        # Generate hash for unique ID based on pattern name + point indices
-        pattern_hash = hashlib.md5(str(key_string).encode()).hexdigest()[:16]
-
-        # Use pattern type prefix
-        return f"{pattern_type}_{pattern_hash}"
+        key = pattern_structure_key(pattern)
+        if key is None:
+            # No structural points: fall back to an ID for this object only
+            key_string = f"unknown_{id(pattern)}"
+            pattern_hash = hashlib.md5(key_string.encode()).hexdigest()[:16]
+            return f"{pattern.get('pattern_type', 'UNK')}_{pattern_hash}"
+
+        # The hex ID is derived once per structure
+        pattern_id = self._pattern_ids.get(key)
+        if pattern_id is None:
+            pattern_id = self._pattern_ids[key] = pattern_id_from_key(key)
+        return pattern_id
 
     def _extract_point(self, point_data) -> Tuple[int, float]:
         """
@@ -340,7 +618,8 @@ class PatternTracker:
         # Create new tracked pattern with Unicode fixes
         from pattern_data_standard import fix_unicode_issues
         raw_name = pattern.get('subtype', pattern.get('name', ''))
-        clean_name = fix_unicode_issues(raw_name)
+        # Interned: every tracked instance of a subtype shares one string
+        clean_name = sys.intern(fix_unicode_issues(raw_name))
 
         # Extract timestamps from points if available
         a_timestamp = None
@@ -380,8 +659,6 @@ class PatternTracker:
                     c_timestamp=c_timestamp,
                     prz_min=None,  # XABCD doesn't use PRZ zones
                     prz_max=None,
-                    prz_zones=[],  # Empty for XABCD
-                    all_prz_zones=[],  # Empty for XABCD
                     d_lines=d_lines,  # All d_lines for XABCD
                     projected_d_time=projected_d_time,
                     detection_timestamp=current_timestamp,
@@ -447,7 +724,6 @@ class PatternTracker:
                     prz_max=zone_max,
                     prz_zones=[single_prz_zone],
                     all_prz_zones=prz_zones_to_track,
-                    d_lines=[],  # Empty for ABCD
                     projected_d_time=projected_d_time,
                     detection_timestamp=current_timestamp,
                     status='pending'
@@ -512,7 +788,8 @@ class PatternTracker:
         indices = formed_pattern.get('indices', {})
 
         # Look for matching unformed pattern
-        for pattern_id, tracked in self.tracked_patterns.items():
+        for pattern_id in self.tracked_patterns.ids_with_status('pending'):
+            tracked = self.tracked_patterns[pattern_id]
             # Skip if not pending or already has D point
             if tracked.status != 'pending' or tracked.actual_d_price:
                 continue
@@ -710,6 +987,49 @@ class PatternTracker:
 
         return True
 
+    def _reset_zone_index(self):
+        """Forget all indexed zones (they are rebuilt on the next sync)"""
+        self._zone_index.clear()
+        self._indexed_count = 0
+        self._empty_d_line_ids.clear()
+
+    def _sync_zone_index(self):
+        """Index the patterns added to tracked_patterns since the last sync"""
+        if len(self.tracked_patterns) < self._indexed_count:
+            # Patterns were removed from outside the tracker - start over
+            self._reset_zone_index()
+
+        for pattern_id, tracked in islice(self.tracked_patterns.items(), self._indexed_count, None):
+            self._index_pattern_zones(pattern_id, tracked)
+        self._indexed_count = len(self.tracked_patterns)
+
+    def _index_pattern_zones(self, pattern_id: str, tracked: 'TrackedPattern'):
+        """(Re)index the zones check_price_in_zone tests for one pattern"""
+        self._zone_index.discard(pattern_id)
+        self._empty_d_line_ids.pop(pattern_id, None)
+        if tracked.status not in ZONE_ENTRY_STATUSES:
+            return
+
+        if tracked.pattern_type == 'ABCD':
+            if tracked.prz_zones:
+                for zone_pos, zone in enumerate(tracked.prz_zones):
+                    zone_min = float(zone.get('min', 0))
+                    zone_max = float(zone.get('max', 0))
+                    if zone_min and zone_max:
+                        self._zone_index.add(pattern_id, zone_min, zone_max, zone_pos)
+            elif tracked.prz_min is not None and tracked.prz_max is not None:
+                self._zone_index.add(pattern_id, tracked.prz_min, tracked.prz_max)
+        elif tracked.pattern_type == 'XABCD':
+            if tracked.d_lines:
+                for d_line in tracked.d_lines:
+                    self._zone_index.add(pattern_id, float(d_line), float(d_line))
+            elif tracked.status == 'pending':
+                self._empty_d_line_ids[pattern_id] = None
+
+    def _in_tracking_order(self, pattern_ids) -> List[str]:
+        """Sort pattern IDs into tracked_patterns insertion order"""
+        return sorted(pattern_ids, key=self.tracked_patterns.seq)
+
     def check_price_in_zone(self, price_high: float, price_low: float, current_bar: int,
                             current_timestamp: datetime = None, data_for_detection = None) -> List[str]:
         """
@@ -717,6 +1037,9 @@ class PatternTracker:
         Also dismisses pending XABCD patterns if price crosses their D-lines.
         Returns list of pattern IDs that completed.
 
+        Only patterns with a zone overlapping [price_low, price_high] are
+        visited (see ZoneIntervalIndex); they are processed in tracking order.
+
         Args:
             price_high: Current bar's high price
             price_low: Current bar's low price
@@ -730,16 +1053,12 @@ class PatternTracker:
         self.current_bar = current_bar
         self.current_data = data_for_detection
         completed_patterns = []
-
-        # Debug: Count patterns being checked
-        pending_count = sum(1 for p in self.tracked_patterns.values() if p.status == 'pending')
-        if pending_count > 0 and current_bar % 10 == 0:  # Print every 10 bars to avoid spam
-            prz_count = sum(1 for p in self.tracked_patterns.values()
-                          if p.status == 'pending' and p.prz_min and p.prz_max)
-            # Debug output removed for cleaner console
+        self._sync_zone_index()
 
         # First pass: Check if any pending XABCD patterns should be dismissed due to empty d_lines
-        for pattern_id, tracked in list(self.tracked_patterns.items()):
+        for pattern_id in self._in_tracking_order(self._empty_d_line_ids):
+            tracked = self.tracked_patterns[pattern_id]
+            del self._empty_d_line_ids[pattern_id]
             if tracked.status == 'pending' and tracked.pattern_type == 'XABCD':
                 # Dismiss if d_lines is empty or None (pattern was invalidated)
                 if not hasattr(tracked, 'd_lines') or not tracked.d_lines:
@@ -752,11 +1071,17 @@ class PatternTracker:
                     if pattern_key in self.pattern_type_stats:
                         self.pattern_type_stats[pattern_key]['dismissed'] = \
                             self.pattern_type_stats[pattern_key].get('dismissed', 0) + 1
+                else:
+                    self._index_pattern_zones(pattern_id, tracked)
 
         # Second pass: Check zone entry for pending and in_zone patterns
-        for pattern_id, tracked in self.tracked_patterns.items():
+        # whose zones overlap this bar
+        touched_ids = self._zone_index.owners_overlapping(price_low, price_high)
+        for pattern_id in self._in_tracking_order(touched_ids):
+            tracked = self.tracked_patterns[pattern_id]
             # Skip if pattern already concluded (success/failed/dismissed)
             if tracked.status not in ['pending', 'in_zone']:
+                self._zone_index.discard(pattern_id)
                 continue
 
             # Check if price enters any of the pattern's D zones
@@ -1023,36 +1348,19 @@ class PatternTracker:
             self.tracked_patterns[pattern_id] = tracked
             return pattern_id
 
-        # Check price action after D
-        success = False
-        failure = False
-
-        for i in range(1, max_bars_to_check + 1):
-            if d_bar + i >= len(bars_data):
-                break
-
-            bar = bars_data.iloc[d_bar + i]
-
-            if is_bullish:
-                # Bullish pattern: D is a low, should reverse up
-                reversal_amount = (bar['High'] - d_price) / d_price
-                if reversal_amount > reversal_threshold:
-                    success = True
-                    break
-                # Check for failure: price goes significantly below D
-                if bar['Low'] < d_price * 0.98:  # 2% below D
-                    failure = True
-                    break
-            else:
-                # Bearish pattern: D is a high, should reverse down
-                reversal_amount = (d_price - bar['Low']) / d_price
-                if reversal_amount > reversal_threshold:
-                    success = True
-                    break
-                # Check for failure: price goes significantly above D
-                if bar['High'] > d_price * 1.02:  # 2% above D
-                    failure = True
-                    break
+        # Check price action after D: the first bar that reverses 2% from D
+        # (success) or continues 2% past it (failure) decides. Backtest data
+        # prefixes share one range index; other frames index just the window.
+        range_index = getattr(bars_data, 'range_index', None)
+        if range_index is not None:
+            outcome = reversal_outcome(range_index, d_bar, d_price, is_bullish, max_bars_to_check,
+                                       reversal_threshold, stop=len(bars_data))
+        else:
+            window = bars_data.iloc[d_bar:d_bar + max_bars_to_check + 1]
+            outcome = reversal_outcome(OHLCRangeIndex(window), 0, d_price, is_bullish, max_bars_to_check,
+                                       reversal_threshold)
+        success = outcome == 'reversal'
+        failure = outcome == 'break'
 
         # Set final status
         if success:
@@ -1104,7 +1412,8 @@ class PatternTracker:
             formed_type = formed.get('pattern_type', 'Unknown')
 
             # Find recently completed patterns to update
-            for pattern_id, tracked in self.tracked_patterns.items():
+            for pattern_id in self.tracked_patterns.ids_with_status('completed'):
+                tracked = self.tracked_patterns[pattern_id]
                 if (tracked.status == 'completed' and
                     tracked.zone_entry_bar == current_bar and
                     tracked.formed_pattern_name is None):
@@ -1144,10 +1453,8 @@ class PatternTracker:
         """
         dismissed_patterns = []
 
-        for pattern_id, tracked in list(self.tracked_patterns.items()):
-            # Only check pending patterns
-            if tracked.status != 'pending':
-                continue
+        for pattern_id in self.tracked_patterns.ids_with_status('pending'):
+            tracked = self.tracked_patterns[pattern_id]
 
             # Get B point price (critical structure level)
             b_price = tracked.b_point[1]
@@ -1178,6 +1485,7 @@ class PatternTracker:
                 tracked.completion_details['dismissal_reason'] = reason
                 tracked.completion_details['dismissal_bar'] = current_bar
                 dismissed_patterns.append(pattern_id)
+                self._zone_index.discard(pattern_id)
 
                 # Update statistics
                 pattern_key = f"{tracked.pattern_type}_{tracked.subtype}"
@@ -1400,6 +1708,10 @@ class PatternTracker:
         """
         Update C points for pending patterns when a new extremum exceeds the current C.
 
+        Extremums already seen in an earlier call are not rescanned: only the
+        new tail of extremum_points is delivered to on_extremum_confirmed. If
+        earlier extremums changed, the whole list is replayed.
+
         Args:
             extremum_points: List of extremum points (timestamp, price, is_high, bar_index)
             current_bar: Current bar index
@@ -1407,121 +1719,219 @@ class PatternTracker:
         Returns:
             List of updated pattern IDs
         """
-        updated_patterns = []
+        if not isinstance(extremum_points, list):
+            extremum_points = list(extremum_points)
+        # Before the prefix check: dropping every subscriber forgets the
+        # delivered extremums, so the whole list is delivered again
+        self._drop_removed_c_subscribers()
+        seen = len(self._c_source)
+        if len(extremum_points) >= seen and extremum_points[:seen] == self._c_source:
+            new_points = extremum_points[seen:]
+        else:
+            self._reset_c_subscriptions()
+            new_points = extremum_points
+
+        updated_patterns = self._sync_c_subscriptions(current_bar)
+        for ext in new_points:
+            updated_patterns.extend(self.on_extremum_confirmed(ext, current_bar))
+        return sorted(updated_patterns, key=self.tracked_patterns.seq)
 
-        # Performance optimization: pre-filter extremums by bar index
-        # Only consider extremums that are recent enough to potentially update any pattern
-        # c_point is (bar_index, price) so use [0] for bar index
-        min_c_bar = min((tracked.c_point[0] for tracked in self.tracked_patterns.values()
-                        if tracked.status == 'pending' and not tracked.zone_reached),
-                       default=current_bar)
+    def on_extremum_confirmed(self, extremum: Tuple, current_bar: int) -> List[str]:
+        """
+        Move the C point of pending patterns that a newly confirmed extremum extends.
+
+        Only the patterns whose C side matches the extremum and whose
+        admissible C price band contains its price are visited.
 
-        # Filter extremums to only those after the earliest C point
-        recent_extremums = [ext for ext in extremum_points if len(ext) == 4 and ext[3] > min_c_bar]
+        Args:
+            extremum: Extremum point (timestamp, price, is_high, bar_index)
+            current_bar: Current bar index
 
-        if not recent_extremums:
-            # No new extremums to check
+        Returns:
+            List of updated pattern IDs (a pattern appears once per C update)
+        """
+        updated_patterns = self._sync_c_subscriptions(current_bar)
+        self._c_source.append(extremum)
+        if len(extremum) != 4:
             return updated_patterns
 
-        for pattern_id, tracked in list(self.tracked_patterns.items()):
-            # Only update pending patterns (not yet in zone)
-            if tracked.status != 'pending' or tracked.zone_reached:
+        ext_bar = extremum[3]
+        if self._c_history_bars and ext_bar < self._c_history_bars[-1]:
+            self._c_history_sorted = False
+        self._c_history.append(extremum)
+        self._c_history_bars.append(ext_bar)
+
+        index = self._c_update_index[bool(extremum[2])]
+        for pattern_id in index.owners_overlapping(extremum[1], extremum[1]):
+            tracked = self.tracked_patterns.get(pattern_id)
+            if tracked is None or tracked.status != 'pending' or tracked.zone_reached:
+                index.discard(pattern_id)
                 continue
+            if self._apply_c_update(pattern_id, tracked, extremum, current_bar):
+                updated_patterns.append(pattern_id)
+                self._subscribe_c_update(pattern_id, tracked)
+            elif tracked.status != 'pending':
+                index.discard(pattern_id)
 
-            # Get current C point - it's a 2-tuple (bar_index, price)
-            c_idx, c_price = tracked.c_point
+        updated_patterns.sort(key=self.tracked_patterns.seq)
+        return updated_patterns
 
-            # Determine if pattern is bullish or bearish
-            # Bullish: A (high) > B (low), Bearish: A (low) < B (high)
-            is_bullish = tracked.a_point[1] > tracked.b_point[1]
+    def _reset_c_subscriptions(self):
+        """Forget delivered extremums and C subscriptions (rebuilt on the next sync)"""
+        for index in self._c_update_index.values():
+            index.clear()
+        self._c_subscribed_count = 0
+        self._c_source = []
+        self._c_history = []
+        self._c_history_bars = []
+        self._c_history_sorted = True
+
+    def _drop_removed_c_subscribers(self):
+        """Start the C subscriptions over if patterns were removed from outside the tracker"""
+        if len(self.tracked_patterns) >= self._c_subscribed_count:
+            return
+        if not self.tracked_patterns:
+            # The last subscriber is gone - nothing needs the delivered extremums
+            self._reset_c_subscriptions()
+            return
+        for index in self._c_update_index.values():
+            index.clear()
+        self._c_subscribed_count = 0
+
+    def _sync_c_subscriptions(self, current_bar: int) -> List[str]:
+        """
+        Subscribe the patterns added to tracked_patterns since the last sync,
+        first applying the extremums they missed.
 
-            # Find newer extremums that could update C (using pre-filtered list)
-            for ext in recent_extremums:
-                ext_idx, ext_price, is_high, ext_bar = ext
+        Returns:
+            List of pattern IDs updated while catching up
+        """
+        self._drop_removed_c_subscribers()
 
-                # Only consider extremums after current C
-                if ext_bar <= c_idx:
-                    continue
+        updated_patterns = []
+        for pattern_id, tracked in islice(self.tracked_patterns.items(), self._c_subscribed_count, None):
+            if tracked.status != 'pending' or tracked.zone_reached:
+                continue
+
+            # Only extremums after C can move it
+            start = bisect_right(self._c_history_bars, tracked.c_point[0]) if self._c_history_sorted else 0
+            for ext in islice(self._c_history, start, None):
+                if self._apply_c_update(pattern_id, tracked, ext, current_bar):
+                    updated_patterns.append(pattern_id)
+                elif tracked.status != 'pending':
+                    break
+            self._subscribe_c_update(pattern_id, tracked)
+        self._c_subscribed_count = len(self.tracked_patterns)
+        return updated_patterns
 
-                # Check if this extremum should become the new C
-                should_update = False
+    def _subscribe_c_update(self, pattern_id: str, tracked: 'TrackedPattern'):
+        """(Re)index the C price band in which a new extremum would move a pattern's C"""
+        a_price, b_price, c_price = tracked.a_point[1], tracked.b_point[1], tracked.c_point[1]
+        is_bullish = a_price > b_price
+        index = self._c_update_index[is_bullish]
+        index.discard(pattern_id)
+        if tracked.status != 'pending' or tracked.zone_reached:
+            return
+
+        # The band over-admits slightly; _apply_c_update does the exact checks
+        ab_move = abs(b_price - a_price)
+        if ab_move > 0:
+            band_min, band_max = ratio_price_band(b_price, ab_move, C_UPDATE_BC_AB_MIN,
+                                                  C_UPDATE_BC_AB_MAX, upward=is_bullish)
+        else:
+            band_min, band_max = -np.inf, np.inf
+        # New C must go beyond the current C: higher for bullish, lower for bearish
+        lo, hi = (c_price, band_max) if is_bullish else (band_min, c_price)
+        if lo <= hi:  # False for empty bands and NaN prices, which never update
+            index.add(pattern_id, lo, hi)
+
+    def _apply_c_update(self, pattern_id: str, tracked: 'TrackedPattern',
+                        ext: Tuple, current_bar: int) -> bool:
+        """
+        Make an extremum the pattern's new C if it extends the C leg.
 
-                if is_bullish:
-                    # For bullish patterns, C is a high - update if new extremum is higher
-                    if is_high and ext_price > c_price:
-                        should_update = True
-                else:
-                    # For bearish patterns, C is a low - update if new extremum is lower
-                    if not is_high and ext_price < c_price:
-                        should_update = True
+        Returns:
+            True if C was updated (a pattern whose D-lines all cross
+            candlesticks after the update is dismissed instead)
+        """
+        ext_idx, ext_price, is_high, ext_bar = ext
 
-                if should_update:
-                    # Validate structure before updating C
-                    b_price = tracked.b_point[1]
+        # Get current C point - it's a 2-tuple (bar_index, price)
+        c_idx, c_price = tracked.c_point
 
-                    # Check that new C maintains valid structure relative to B
-                    structure_valid = False
-                    if is_bullish:
-                        # For bullish: new C (high) must be > B (low)
-                        if ext_price > b_price:
-                            structure_valid = True
-                    else:
-                        # For bearish: new C (low) must be < B (high)
-                        if ext_price < b_price:
-                            structure_valid = True
+        # Only consider extremums after current C
+        if ext_bar <= c_idx:
+            return False
 
-                    if not structure_valid:
-                        # New C would violate structure, skip this update
-                        continue
+        # Determine if pattern is bullish or bearish
+        # Bullish: A (high) > B (low), Bearish: A (low) < B (high)
+        is_bullish = tracked.a_point[1] > tracked.b_point[1]
 
-                    # Check BC/AB ratio still produces valid harmonic patterns
-                    # If new C creates invalid ratios, skip update
-                    a_price = tracked.a_point[1]
-                    ab_move = abs(b_price - a_price)
-                    new_bc_move = abs(ext_price - b_price)
-
-                    if ab_move > 0:
-                        new_bc_ab_ratio = (new_bc_move / ab_move) * 100
-                        # BC/AB ratio should be reasonable (10% to 500% typical for harmonic patterns)
-                        if new_bc_ab_ratio < 10 or new_bc_ab_ratio > 500:
-                            # New C creates extreme ratio, skip update
-                            continue
-
-                    # Structure is valid, proceed with update
-                    # c_point is (bar_index, price) - use ext_bar as bar_index
-                    tracked.c_point = (ext_bar, ext_price)
-
-                    # Recalculate PRZ with new C
-                    prz_recalculated = self._recalculate_prz(tracked)
-
-                    if not prz_recalculated:
-                        # PRZ recalculation failed - all d_lines cross candlesticks
-                        # Dismiss this pattern
-                        tracked.status = 'dismissed'
-                        tracked.completion_details['dismissal_reason'] = 'All D-lines cross candlesticks after C update'
-                        tracked.completion_details['dismissal_bar'] = current_bar
+        if is_bullish:
+            # For bullish patterns, C is a high - update if new extremum is higher
+            if not (is_high and ext_price > c_price):
+                return False
+        else:
+            # For bearish patterns, C is a low - update if new extremum is lower
+            if not (not is_high and ext_price < c_price):
+                return False
 
-                        # Update statistics
-                        pattern_key = f"{tracked.pattern_type}_{tracked.subtype}"
-                        if pattern_key in self.pattern_type_stats:
-                            self.pattern_type_stats[pattern_key]['dismissed'] = \
-                                self.pattern_type_stats[pattern_key].get('dismissed', 0) + 1
+        # Validate structure before updating C
+        b_price = tracked.b_point[1]
 
-                        # Skip adding to updated_patterns since it's now dismissed
-                        continue
+        # Check that new C maintains valid structure relative to B
+        if is_bullish:
+            # For bullish: new C (high) must be > B (low)
+            if not ext_price > b_price:
+                return False
+        else:
+            # For bearish: new C (low) must be < B (high)
+            if not ext_price < b_price:
+                return False
 
-                    # Mark that C was updated
-                    tracked.completion_details['c_updated'] = True
-                    tracked.completion_details['c_update_bar'] = current_bar
-                    tracked.completion_details['prz_recalculated'] = prz_recalculated
+        # Check BC/AB ratio still produces valid harmonic patterns
+        # If new C creates invalid ratios, skip update
+        a_price = tracked.a_point[1]
+        ab_move = abs(b_price - a_price)
+        new_bc_move = abs(ext_price - b_price)
 
-                    updated_patterns.append(pattern_id)
+        if ab_move > 0:
+            new_bc_ab_ratio = (new_bc_move / ab_move) * 100
+            # BC/AB ratio should be reasonable (10% to 500% typical for harmonic patterns)
+            if new_bc_ab_ratio < C_UPDATE_BC_AB_MIN or new_bc_ab_ratio > C_UPDATE_BC_AB_MAX:
+                return False
 
-                    # Update to the latest valid C (not multiple updates per pattern)
-                    c_price = ext_price
-                    c_idx = ext_bar
+        # Structure is valid, proceed with update
+        # c_point is (bar_index, price) - use ext_bar as bar_index
+        tracked.c_point = (ext_bar, ext_price)
+
+        # Recalculate PRZ with new C
+        prz_recalculated = self._recalculate_prz(tracked)
+
+        if not prz_recalculated:
+            # PRZ recalculation failed - all d_lines cross candlesticks
+            # Dismiss this pattern
+            tracked.status = 'dismissed'
+            tracked.completion_details['dismissal_reason'] = 'All D-lines cross candlesticks after C update'
+            tracked.completion_details['dismissal_bar'] = current_bar
+            self._zone_index.discard(pattern_id)
+
+            # Update statistics
+            pattern_key = f"{tracked.pattern_type}_{tracked.subtype}"
+            if pattern_key in self.pattern_type_stats:
+                self.pattern_type_stats[pattern_key]['dismissed'] = \
+                    self.pattern_type_stats[pattern_key].get('dismissed', 0) + 1
+            return False
 
-        return updated_patterns
+        # Zones moved with C - reindex if already indexed
+        if self.tracked_patterns.seq(pattern_id) < self._indexed_count:
+            self._index_pattern_zones(pattern_id, tracked)
+
+        # Mark that C was updated
+        tracked.completion_details['c_updated'] = True
+        tracked.completion_details['c_update_bar'] = current_bar
+        tracked.completion_details['prz_recalculated'] = prz_recalculated
+        return True
 
     def check_zone_violation(self, price_high: float, price_low: float, current_bar: int) -> List[str]:
         """
@@ -1537,8 +1947,11 @@ class PatternTracker:
         """
         failed_patterns = []
         successful_patterns = []
+        self._sync_zone_index()
 
-        for pattern_id, tracked in self.tracked_patterns.items():
+        # Only zone-reached patterns still in_zone or invalid_prz can change
+        for pattern_id in self.tracked_patterns.ids_with_status(*ZONE_OUTCOME_STATUSES):
+            tracked = self.tracked_patterns[pattern_id]
             # Skip patterns that haven't entered zone yet
             if not tracked.zone_reached:
                 continue
@@ -1672,6 +2085,7 @@ class PatternTracker:
                     tracked.status = 'invalid_prz'
                     tracked.invalid_bar = current_bar  # Store when it became invalid
                     tracked.completion_details['invalid_reason'] = 'Price crossed PRZ completely'
+                    self._zone_index.discard(pattern_id)
                     tracked.completion_details['invalid_bar'] = current_bar
                     failed_patterns.append(pattern_id)  # Track as invalid for statistics
 
@@ -1697,6 +2111,7 @@ class PatternTracker:
                     tracked.status = 'success'
                     tracked.reversal_confirmed = True
                     tracked.reversal_bar = current_bar
+                    self._zone_index.discard(pattern_id)
                     # For bullish, reversal price is when it went above PRZ max
                     # For bearish, reversal price is when it went below PRZ min
                     tracked.reversal_price = price_high if is_bullish else price_low
@@ -1728,6 +2143,7 @@ class PatternTracker:
                     tracked.status = 'invalid_prz'
                     tracked.invalid_bar = current_bar  # Store when it became invalid
                     tracked.zone_exit_bar = current_bar
+                    self._zone_index.discard(pattern_id)
                     tracked.zone_exit_price = price_low if is_bullish else price_high
                     tracked.completion_details['invalid_reason'] = "PRZ violated without reversal"
                     failed_patterns.append(pattern_id)
@@ -1833,14 +2249,14 @@ class PatternTracker:
             Dictionary containing completion statistics
         """
         total_patterns = len(self.tracked_patterns)
-        success = sum(1 for p in self.tracked_patterns.values() if p.status == 'success')
-        invalid_prz = sum(1 for p in self.tracked_patterns.values() if p.status == 'invalid_prz')
-        failed_prz = sum(1 for p in self.tracked_patterns.values() if p.status == 'failed_prz')
-        dismissed = sum(1 for p in self.tracked_patterns.values() if p.status == 'dismissed')
-        pending = sum(1 for p in self.tracked_patterns.values() if p.status == 'pending')
-        in_zone = sum(1 for p in self.tracked_patterns.values() if p.status == 'in_zone')
-        inconclusive = sum(1 for p in self.tracked_patterns.values() if p.status == 'inconclusive')
-        evaluating = sum(1 for p in self.tracked_patterns.values() if p.status == 'evaluating')
+        success = self.tracked_patterns.count('success')
+        invalid_prz = self.tracked_patterns.count('invalid_prz')
+        failed_prz = self.tracked_patterns.count('failed_prz')
+        dismissed = self.tracked_patterns.count('dismissed')
+        pending = self.tracked_patterns.count('pending')
+        in_zone = self.tracked_patterns.count('in_zone')
+        inconclusive = self.tracked_patterns.count('inconclusive')
+        evaluating = self.tracked_patterns.count('evaluating')
 
         # OLD METHOD: Calculate success rate for patterns that reached a conclusion
         concluded = success + invalid_prz + failed_prz
@@ -1977,5 +2393,7 @@ class PatternTracker:
         self.pattern_type_stats.clear()
         self.zone_entries.clear()
         self.zone_entry_stats.clear()
+        self._reset_zone_index()
+        self._reset_c_subscriptions()
         self.current_bar = 0
         self.current_data = None
\ No newline at end of file
@@ -18,6 +18,7 @@ import pandas as pd
 import numpy as np
 from typing import Dict, Optional, Tuple
 import logging
+from ohlc_range_index import OHLCRangeIndex, ensure_range_index
 
 logger = logging.getLogger(__name__)
 
@@ -37,7 +38,8 @@ class PriceContainmentValidator:
                               a_idx: int, b_idx: int, c_idx: int, d_idx: Optional[int],
                               a_price: float, b_price: float, c_price: float,
                               d_price: Optional[float] = None,
-                              check_post_c: bool = False) -> bool:
+                              check_post_c: bool = False,
+                              range_index: Optional[OHLCRangeIndex] = None) -> bool:
         """
         Validate price containment for bullish ABCD patterns.
 
@@ -54,6 +56,7 @@ class PriceContainmentValidator:
             a_idx, b_idx, c_idx, d_idx: Bar indices for pattern points
             a_price, b_price, c_price, d_price: Pattern point prices
             check_post_c: Whether to validate price after C (for unformed patterns)
+            range_index: Prebuilt OHLCRangeIndex for df (built on demand if None)
 
         Returns:
             True if validation passes, False otherwise
@@ -70,45 +73,34 @@ class PriceContainmentValidator:
             assert c_idx <= d_idx, f"C({c_idx}) must be <= D({d_idx})"
 
         try:
-            high_col = 'High' if 'High' in df.columns else 'high'
-            low_col = 'Low' if 'Low' in df.columns else 'low'
+            range_index = ensure_range_index(df, range_index)
 
             # Rule 1: A to B - no high exceeds A
-            if a_idx + 1 < b_idx:
-                segment = df.iloc[a_idx+1:b_idx+1]
-                if any(segment[high_col] > a_price):
-                    return False
+            if a_idx + 1 < b_idx and range_index.high_exceeds(a_idx+1, b_idx+1, a_price):
+                return False
 
             # Rule 2: A to C - no low breaks B
-            if a_idx + 1 < c_idx:
-                segment = df.iloc[a_idx+1:c_idx+1]
-                if any(segment[low_col] < b_price):
-                    return False
+            if a_idx + 1 < c_idx and range_index.low_breaks(a_idx+1, c_idx+1, b_price):
+                return False
 
             # Rule 3: B to C - no high exceeds C
-            if b_idx < c_idx:
-                segment = df.iloc[b_idx:c_idx]
-                if any(segment[high_col] > c_price):
-                    return False
+            if b_idx < c_idx and range_index.high_exceeds(b_idx, c_idx, c_price):
+                return False
 
             # Rules 4 & 5: Only if D point exists
             if d_idx is not None and d_price is not None:
                 # B to D: no high exceeds C
-                if b_idx < d_idx:
-                    segment = df.iloc[b_idx:d_idx]
-                    if any(segment[high_col] > c_price):
-                        return False
+                if b_idx < d_idx and range_index.high_exceeds(b_idx, d_idx, c_price):
+                    return False
 
                 # C to D: no low breaks D
-                if c_idx < d_idx:
-                    segment = df.iloc[c_idx:d_idx]
-                    if any(segment[low_col] < d_price):
-                        return False
+                if c_idx < d_idx and range_index.low_breaks(c_idx, d_idx, d_price):
+                    return False
 
             # Optional: Check price after C (for unformed patterns)
             # This is NOT checked by default - pattern tracking handles invalidation
             if check_post_c and c_idx < len(df) - 1:
-                max_high_after = df[high_col].iloc[c_idx+1:].max()
+                max_high_after = range_index.max_high(c_idx+1, len(df))
                 if max_high_after > c_price:
                     return False
 
@@ -123,7 +115,8 @@ class PriceContainmentValidator:
                              a_idx: int, b_idx: int, c_idx: int, d_idx: Optional[int],
                              a_price: float, b_price: float, c_price: float,
                              d_price: Optional[float] = None,
-                             check_post_c: bool = False) -> bool:
+                             check_post_c: bool = False,
+                             range_index: Optional[OHLCRangeIndex] = None) -> bool:
         """
         Validate price containment for bearish ABCD patterns.
 
@@ -140,6 +133,7 @@ class PriceContainmentValidator:
             a_idx, b_idx, c_idx, d_idx: Bar indices
             a_price, b_price, c_price, d_price: Pattern point prices
             check_post_c: Whether to validate price after C
+            range_index: Prebuilt OHLCRangeIndex for df (built on demand if None)
 
         Returns:
             True if validation passes, False otherwise
@@ -156,44 +150,33 @@ class PriceContainmentValidator:
             assert c_idx <= d_idx, f"C({c_idx}) must be <= D({d_idx})"
 
         try:
-            high_col = 'High' if 'High' in df.columns else 'high'
-            low_col = 'Low' if 'Low' in df.columns else 'low'
+            range_index = ensure_range_index(df, range_index)
 
             # Rule 1: A to B - no low breaks A
-            if a_idx + 1 < b_idx:
-                segment = df.iloc[a_idx+1:b_idx+1]
-                if any(segment[low_col] < a_price):
-                    return False
+            if a_idx + 1 < b_idx and range_index.low_breaks(a_idx+1, b_idx+1, a_price):
+                return False
 
             # Rule 2: A to C - no high exceeds B
-            if a_idx + 1 < c_idx:
-                segment = df.iloc[a_idx+1:c_idx+1]
-                if any(segment[high_col] > b_price):
-                    return False
+            if a_idx + 1 < c_idx and range_index.high_exceeds(a_idx+1, c_idx+1, b_price):
+                return False
 
             # Rule 3: B to C - no low breaks C
-            if b_idx < c_idx:
-                segment = df.iloc[b_idx:c_idx]
-                if any(segment[low_col] < c_price):
-                    return False
+            if b_idx < c_idx and range_index.low_breaks(b_idx, c_idx, c_price):
+                return False
 
             # Rules 4 & 5: Only if D point exists
             if d_idx is not None and d_price is not None:
                 # B to D: no low breaks C
-                if b_idx < d_idx:
-                    segment = df.iloc[b_idx:d_idx]
-                    if any(segment[low_col] < c_price):
-                        return False
+                if b_idx < d_idx and range_index.low_breaks(b_idx, d_idx, c_price):
+                    return False
 
                 # C to D: no high exceeds D
-                if c_idx < d_idx:
-                    segment = df.iloc[c_idx:d_idx]
-                    if any(segment[high_col] > d_price):
-                        return False
+                if c_idx < d_idx and range_index.high_exceeds(c_idx, d_idx, d_price):
+                    return False
 
             # Optional: Check price after C (for unformed patterns)
             if check_post_c and c_idx < len(df) - 1:
-                min_low_after = df[low_col].iloc[c_idx+1:].min()
+                min_low_after = range_index.min_low(c_idx+1, len(df))
                 if min_low_after < c_price:
                     return False
 
@@ -207,7 +190,8 @@ class PriceContainmentValidator:
     def validate_bullish_xabcd(df: pd.DataFrame,
                                x_idx: int, a_idx: int, b_idx: int, c_idx: int,
                                x_price: float, a_price: float, b_price: float, c_price: float,
-                               check_post_c: bool = False) -> bool:
+                               check_post_c: bool = False,
+                               range_index: Optional[OHLCRangeIndex] = None) -> bool:
         """
         Validate price containment for bullish XABCD patterns.
 
@@ -224,6 +208,7 @@ class PriceContainmentValidator:
             x_idx, a_idx, b_idx, c_idx: Bar indices
             x_price, a_price, b_price, c_price: Pattern point prices
             check_post_c: Whether to validate price after C
+            range_index: Prebuilt OHLCRangeIndex for df (built on demand if None)
 
         Returns:
             True if validation passes, False otherwise
@@ -236,40 +221,31 @@ class PriceContainmentValidator:
         assert x_idx <= a_idx <= b_idx <= c_idx, "Invalid point order"
 
         try:
-            high_col = 'High' if 'High' in df.columns else 'high'
-            low_col = 'Low' if 'Low' in df.columns else 'low'
+            range_index = ensure_range_index(df, range_index)
 
             # Rule 1: X should be lowest between X-A
-            if x_idx + 1 < a_idx:
-                segment = df.iloc[x_idx+1:a_idx+1]
-                if any(segment[low_col] < x_price):
-                    return False
+            if x_idx + 1 < a_idx and range_index.low_breaks(x_idx+1, a_idx+1, x_price):
+                return False
 
             # Rule 2: A should be highest between X-B
-            if x_idx < b_idx:
-                segment = df.iloc[x_idx:b_idx]
-                if any(segment[high_col] > a_price):
-                    return False
+            if x_idx < b_idx and range_index.high_exceeds(x_idx, b_idx, a_price):
+                return False
 
             # Rule 3a: B should be greater than X
             if b_price <= x_price:
                 return False
 
             # Rule 3b: B should be lowest between A-C
-            if a_idx < c_idx:
-                segment = df.iloc[a_idx:c_idx+1]
-                if any(segment[low_col] < b_price):
-                    return False
+            if a_idx < c_idx and range_index.low_breaks(a_idx, c_idx+1, b_price):
+                return False
 
             # Rule 4: C should be highest between B-C
-            if b_idx < c_idx:
-                segment = df.iloc[b_idx:c_idx]
-                if any(segment[high_col] > c_price):
-                    return False
+            if b_idx < c_idx and range_index.high_exceeds(b_idx, c_idx, c_price):
+                return False
 
             # Optional: Check price after C
             if check_post_c and c_idx < len(df) - 1:
-                max_high_after = df[high_col].iloc[c_idx+1:].max()
+                max_high_after = range_index.max_high(c_idx+1, len(df))
                 if max_high_after > c_price:
                     return False
 
@@ -283,7 +259,8 @@ class PriceContainmentValidator:
     def validate_bearish_xabcd(df: pd.DataFrame,
                               x_idx: int, a_idx: int, b_idx: int, c_idx: int,
                               x_price: float, a_price: float, b_price: float, c_price: float,
-                              check_post_c: bool = False) -> bool:
+                              check_post_c: bool = False,
+                              range_index: Optional[OHLCRangeIndex] = None) -> bool:
         """
         Validate price containment for bearish XABCD patterns.
 
@@ -300,6 +277,7 @@ class PriceContainmentValidator:
             x_idx, a_idx, b_idx, c_idx: Bar indices
             x_price, a_price, b_price, c_price: Pattern point prices
             check_post_c: Whether to validate price after C
+            range_index: Prebuilt OHLCRangeIndex for df (built on demand if None)
 
         Returns:
             True if validation passes, False otherwise
@@ -312,40 +290,31 @@ class PriceContainmentValidator:
         assert x_idx <= a_idx <= b_idx <= c_idx, "Invalid point order"
 
         try:
-            high_col = 'High' if 'High' in df.columns else 'high'
-            low_col = 'Low' if 'Low' in df.columns else 'low'
+            range_index = ensure_range_index(df, range_index)
 
             # Rule 1: X should be highest between X-A
-            if x_idx + 1 < a_idx:
-                segment = df.iloc[x_idx+1:a_idx+1]
-                if any(segment[high_col] > x_price):
-                    return False
+            if x_idx + 1 < a_idx and range_index.high_exceeds(x_idx+1, a_idx+1, x_price):
+                return False
 
             # Rule 2: A should be lowest between X-B
-            if x_idx < b_idx:
-                segment = df.iloc[x_idx:b_idx]
-                if any(segment[low_col] < a_price):
-                    return False
+            if x_idx < b_idx and range_index.low_breaks(x_idx, b_idx, a_price):
+                return False
 
             # Rule 3a: B should be less than X
             if b_price >= x_price:
                 return False
 
             # Rule 3b: B should be highest between A-C
-            if a_idx < c_idx:
-                segment = df.iloc[a_idx:c_idx+1]
-                if any(segment[high_col] > b_price):
-                    return False
+            if a_idx < c_idx and range_index.high_exceeds(a_idx, c_idx+1, b_price):
+                return False
 
             # Rule 4: C should be lowest between B-C
-            if b_idx < c_idx:
-                segment = df.iloc[b_idx:c_idx]
-                if any(segment[low_col] < c_price):
-                    return False
+            if b_idx < c_idx and range_index.low_breaks(b_idx, c_idx, c_price):
+                return False
 
             # Optional: Check price after C
             if check_post_c and c_idx < len(df) - 1:
-                min_low_after = df[low_col].iloc[c_idx+1:].min()
+                min_low_after = range_index.min_low(c_idx+1, len(df))
                 if min_low_after < c_price:
                     return False
 
@@ -358,7 +327,8 @@ class PriceContainmentValidator:
 
 # Convenience wrapper for automatic pattern type detection
 def validate_pattern(pattern_type: str, direction: str, df: pd.DataFrame,
-                    points_dict: Dict, check_post_c: bool = False) -> bool:
+                    points_dict: Dict, check_post_c: bool = False,
+                    range_index: Optional[OHLCRangeIndex] = None) -> bool:
     """
     Validate any pattern type with automatic dispatcher.
 
@@ -370,6 +340,7 @@ def validate_pattern(pattern_type: str, direction: str, df: pd.DataFrame,
             For ABCD: {'a_idx', 'a_price', 'b_idx', 'b_price', 'c_idx', 'c_price', 'd_idx', 'd_price'}
             For XABCD: {'x_idx', 'x_price', 'a_idx', 'a_price', 'b_idx', 'b_price', 'c_idx', 'c_price'}
         check_post_c: Whether to validate price after C point
+        range_index: Prebuilt OHLCRangeIndex for df (built on demand if None)
 
     Returns:
         True if validation passes, False otherwise
@@ -384,7 +355,8 @@ def validate_pattern(pattern_type: str, direction: str, df: pd.DataFrame,
                 points_dict.get('d_idx'),
                 points_dict['a_price'], points_dict['b_price'], points_dict['c_price'],
                 points_dict.get('d_price'),
-                check_post_c
+                check_post_c,
+                range_index=range_index
             )
         else:  # bearish
             return validator.validate_bearish_abcd(
@@ -393,7 +365,8 @@ def validate_pattern(pattern_type: str, direction: str, df: pd.DataFrame,
                 points_dict.get('d_idx'),
                 points_dict['a_price'], points_dict['b_price'], points_dict['c_price'],
                 points_dict.get('d_price'),
-                check_post_c
+                check_post_c,
+                range_index=range_index
             )
 
     elif pattern_type == 'XABCD':
@@ -402,14 +375,16 @@ def validate_pattern(pattern_type: str, direction: str, df: pd.DataFrame,
                 df,
                 points_dict['x_idx'], points_dict['a_idx'], points_dict['b_idx'], points_dict['c_idx'],
                 points_dict['x_price'], points_dict['a_price'], points_dict['b_price'], points_dict['c_price'],
-                check_post_c
+                check_post_c,
+                range_index=range_index
             )
         else:  # bearish
             return validator.validate_bearish_xabcd(
                 df,
                 points_dict['x_idx'], points_dict['a_idx'], points_dict['b_idx'], points_dict['c_idx'],
                 points_dict['x_price'], points_dict['a_price'], points_dict['b_price'], points_dict['c_price'],
-                check_post_c
+                check_post_c,
+                range_index=range_index
             )
 
     else:
@@ -0,0 +1,157 @@
+"""
+Price Band Index Module
+Ratio-driven candidate pruning for the pattern detectors
+
+Once the earlier points of a pattern are fixed, the ratio ranges of the
+pattern definitions that are still possible bound the price of the next
+point: e.g. with B known, C must sit at B +/- AB * bc_ab / 100 for some
+bc_ab in the allowed ranges. Detectors that enumerate every later
+extremum and only check ratios at the end visit all candidates outside
+that band for nothing.
+
+PriceBandIndex keeps a price-sorted view of a list of extremum prices so
+the candidates inside an admissible price band (and a position range) are
+found with two bisects instead of a scan. Candidates are returned in
+ascending position order, so detectors keep their original enumeration
+(and output) order.
+
+Bands are padded by a small relative epsilon so they can only over-admit;
+detectors still apply the exact ratio checks to every candidate.
+"""
+
+from bisect import bisect_left, bisect_right
+from typing import List, Optional, Sequence, Tuple
+import numpy as np
+from extremum import ExtremumArray
+
+
+# Relative padding applied to every band (absorbs float rounding between
+# the band arithmetic and the detectors' ratio arithmetic)
+BAND_EPSILON = 1e-9
+
+
+def ratio_price_band(anchor: float, leg: float, ratio_min: float, ratio_max: float,
+                     upward: bool) -> Tuple[float, float]:
+    """
+    Price band for a point that lies `ratio` percent of `leg` away from `anchor`.
+
+    Args:
+        anchor: Price the next leg starts from (e.g. B when looking for C)
+        leg: Length of the reference leg (e.g. AB when looking for C)
+        ratio_min, ratio_max: Allowed ratio range in percent
+        upward: True if the next point lies above the anchor
+
+    Returns:
+        (low, high) admissible price band, padded by BAND_EPSILON
+    """
+    pad = BAND_EPSILON * (abs(anchor) + abs(leg) * max(abs(ratio_max), 1.0) / 100 + 1.0)
+    near = leg * ratio_min / 100
+    far = leg * ratio_max / 100
+    if upward:
+        return anchor + near - pad, anchor + far + pad
+    return anchor - far - pad, anchor - near + pad
+
+
+class PriceBandIndex:
+    """
+    Price-sorted index over a sequence of extremum prices.
+
+    Positions refer to the sequence the index was built from; build one
+    index per candidate list (e.g. one for highs and one for lows).
+    """
+
+    def __init__(self, prices: Sequence[float]):
+        """
+        Args:
+            prices: Candidate prices in enumeration order (sequence or array)
+        """
+        prices = np.asarray(prices, dtype=float)
+        order = np.argsort(prices, kind='stable')
+        self._prices = prices[order].tolist()
+        self._positions = order.tolist()
+        self._length = len(order)
+
+    def __len__(self) -> int:
+        return self._length
+
+    def positions(self, low: float, high: float,
+                  start: int = 0, stop: Optional[int] = None) -> List[int]:
+        """
+        Positions in [start, stop) whose price lies in [low, high].
+
+        Args:
+            low, high: Inclusive price band
+            start, stop: Half-open position range (stop=None means to the end)
+
+        Returns:
+            Matching positions in ascending order
+        """
+        if stop is None:
+            stop = self._length
+        if low > high or start >= stop:
+            return []
+        lo = bisect_left(self._prices, low)
+        hi = bisect_right(self._prices, high)
+        if start <= 0 and stop >= self._length:
+            return sorted(self._positions[lo:hi])
+        return sorted(pos for pos in self._positions[lo:hi] if start <= pos < stop)
+
+
+class ExtremumBandIndex:
+    """
+    Price band lookup over extremum points, split by extremum type.
+
+    Pattern legs alternate between highs and lows, so the next point of a
+    pattern is always looked up among one type only.
+    """
+
+    def __init__(self, extremum_points: Sequence[Tuple],
+                 positions: Optional[Sequence[int]] = None):
+        """
+        Args:
+            extremum_points: List of tuples (timestamp, price, is_high, bar_index)
+                             or an ExtremumArray
+            positions: Ascending extremum positions to index (None = all points)
+        """
+        if isinstance(extremum_points, ExtremumArray):
+            # Split and gather prices on the columns directly
+            selected = (np.arange(len(extremum_points)) if positions is None
+                        else np.asarray(positions, dtype=np.int64))
+            selected_high = extremum_points.is_high[selected]
+            type_positions = {True: selected[selected_high], False: selected[~selected_high]}
+            self._type_positions = {is_high: pos.tolist() for is_high, pos in type_positions.items()}
+            self._indices = {
+                is_high: PriceBandIndex(extremum_points.price[pos])
+                for is_high, pos in type_positions.items()
+            }
+            return
+
+        if positions is None:
+            positions = range(len(extremum_points))
+
+        self._type_positions = {True: [], False: []}
+        for pos in positions:
+            self._type_positions[bool(extremum_points[pos][2])].append(pos)
+
+        self._indices = {
+            is_high: PriceBandIndex([extremum_points[pos][1] for pos in positions])
+            for is_high, positions in self._type_positions.items()
+        }
+
+    def candidates(self, is_high: bool, low: float, high: float,
+                   start: int = 0, stop: Optional[int] = None) -> List[int]:
+        """
+        Extremum positions in [start, stop) of the given type priced in [low, high].
+
+        Args:
+            is_high: Extremum type to search
+            low, high: Inclusive price band
+            start, stop: Half-open range of extremum positions (stop=None means to the end)
+
+        Returns:
+            Matching extremum positions in ascending order
+        """
+        type_positions = self._type_positions[is_high]
+        first = bisect_left(type_positions, start)
+        last = len(type_positions) if stop is None else bisect_left(type_positions, stop)
+        return [type_positions[i] for i in self._indices[is_high].positions(low, high, first, last)]
@@ -0,0 +1,193 @@
+"""
+Compiled Ratio Index Module
+Logarithmic-time pattern-name matching for harmonic ratio tables
+
+Every detector asks "which pattern definitions accept these ratios?" for
+each candidate combination. Scanning XABCD_PATTERN_RATIOS / ABCD_PATTERN_RATIOS
+linearly makes that cost grow with every pattern added to the tables.
+
+RatioIndex compiles a ratio table into a sorted-breakpoint bitmask table per
+ratio: the sorted range endpoints split the number line into elementary
+slots (each endpoint, and the open gap between neighbours), and each slot
+stores the bitmask of patterns whose inclusive range covers it. A lookup
+is one bisect per ratio plus bitwise ANDs, independent of table size.
+
+Pattern bits follow table (insertion) order, so decoded matches come out in
+the same order as iterating the table dict directly.
+
+For batched detectors, match_matrix() answers the same question for whole
+NumPy vectors of ratios at once by broadcasting them against the range
+bounds of one direction's patterns.
+"""
+
+from bisect import bisect_left
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from pattern_ratios_2_Final import ABCD_PATTERN_RATIOS, XABCD_PATTERN_RATIOS
+
+
+class RatioIndex:
+    """
+    Compiled lookup from ratio values to matching pattern names.
+
+    Example:
+        >>> XABCD_RATIO_INDEX.match({'ab_xa': 61.8, 'bc_ab': 50.0}, is_bullish=True)
+        ['MaxBat1_bull', 'MaxBat2_bull', ...]
+    """
+
+    def __init__(self, ratio_table: Dict[str, Dict], ratio_keys: Sequence[str]):
+        """
+        Args:
+            ratio_table: Pattern name -> {ratio_key: (min, max), ...}
+                         (e.g. XABCD_PATTERN_RATIOS)
+            ratio_keys: Ratio keys to index (e.g. ('ab_xa', 'bc_ab', 'cd_bc', 'ad_xa'))
+        """
+        self.names: List[str] = list(ratio_table)
+        self.ratio_table = ratio_table
+        self.ratio_keys = tuple(ratio_keys)
+
+        self._direction_masks = {True: 0, False: 0}
+        for bit, name in enumerate(self.names):
+            self._direction_masks['bull' in name] |= 1 << bit
+
+        self._tables: Dict[str, Tuple[List[float], List[int]]] = {
+            key: self._compile(key) for key in self.ratio_keys
+        }
+        self._bounds_cache: Dict[Tuple[int, str], Tuple[float, float]] = {}
+        self._direction_arrays: Dict[bool, Tuple[List[str], Dict[str, np.ndarray]]] = {}
+
+    def _compile(self, key: str) -> Tuple[List[float], List[int]]:
+        """Build (breakpoints, slot masks) for one ratio key."""
+        ranges = [self.ratio_table[name][key] for name in self.names]
+        breakpoints = sorted({bound for lo_hi in ranges for bound in lo_hi})
+
+        # Slot 2i   -> open gap just below breakpoints[i] (i == len: above all)
+        # Slot 2i+1 -> exactly breakpoints[i]
+        slot_masks = [0] * (2 * len(breakpoints) + 1)
+        for bit, (lo, hi) in enumerate(ranges):
+            first = bisect_left(breakpoints, lo)
+            last = bisect_left(breakpoints, hi)
+            for slot in range(2 * first + 1, 2 * last + 2):
+                slot_masks[slot] |= 1 << bit
+
+        return breakpoints, slot_masks
+
+    def mask(self, key: str, value: float) -> int:
+        """Bitmask of patterns whose `key` range contains value (both directions)."""
+        breakpoints, slot_masks = self._tables[key]
+        if value != value:  # NaN never matches
+            return 0
+        i = bisect_left(breakpoints, value)
+        if i < len(breakpoints) and breakpoints[i] == value:
+            return slot_masks[2 * i + 1]
+        return slot_masks[2 * i]
+
+    def match_mask(self, ratios: Dict[str, float], is_bullish: bool) -> int:
+        """Bitmask of same-direction patterns accepting every ratio given."""
+        result = self._direction_masks[is_bullish]
+        for key, value in ratios.items():
+            result &= self.mask(key, value)
+            if not result:
+                break
+        return result
+
+    def names_for(self, mask: int) -> List[str]:
+        """Decode a bitmask into pattern names, in table order."""
+        names = []
+        while mask:
+            low_bit = mask & -mask
+            names.append(self.names[low_bit.bit_length() - 1])
+            mask ^= low_bit
+        return names
+
+    def bounds(self, mask: int, key: str) -> Tuple[float, float]:
+        """
+        Union hull (min, max) of the `key` ranges of the patterns in mask.
+
+        Used to bound the price of the next pattern point; results are
+        cached per (mask, key) since the same buckets recur constantly.
+        """
+        cache_key = (mask, key)
+        hull = self._bounds_cache.get(cache_key)
+        if hull is None:
+            ranges = [self.ratio_table[name][key] for name in self.names_for(mask)]
+            hull = (min(lo for lo, _ in ranges), max(hi for _, hi in ranges))
+            self._bounds_cache[cache_key] = hull
+        return hull
+
+    def direction_names(self, is_bullish: bool) -> List[str]:
+        """Pattern names of one direction, in table order (match_matrix columns)."""
+        return self._range_arrays(is_bullish)[0]
+
+    def _range_arrays(self, is_bullish: bool) -> Tuple[List[str], Dict[str, np.ndarray]]:
+        """Per-direction names and (2, patterns) [min; max] bound arrays per ratio key."""
+        arrays = self._direction_arrays.get(is_bullish)
+        if arrays is None:
+            names = self.names_for(self._direction_masks[is_bullish])
+            bounds = {
+                key: np.array([self.ratio_table[name][key] for name in names], dtype=float).T.reshape(2, -1)
+                for key in self.ratio_keys
+            }
+            arrays = (names, bounds)
+            self._direction_arrays[is_bullish] = arrays
+        return arrays
+
+    def match_matrix(self, ratios: Dict[str, np.ndarray], is_bullish: bool,
+                     columns: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Vectorized match_mask over many candidates.
+
+        Args:
+            ratios: Ratio key -> 1-D array of values, one entry per candidate
+                    (all arrays the same length)
+            is_bullish: Direction of the candidates
+            columns: Optional indices into direction_names(is_bullish) to test
+                     (None = every pattern of that direction)
+
+        Returns:
+            Boolean array (candidates, patterns); column j is
+            direction_names(is_bullish)[j] (or [columns[j]]), True where every
+            given ratio lies in that pattern's inclusive range (NaN never matches)
+        """
+        names, bounds = self._range_arrays(is_bullish)
+        result = None
+        for key, values in ratios.items():
+            values = np.asarray(values, dtype=float)[:, None]
+            lows, highs = bounds[key] if columns is None else bounds[key][:, columns]
+            key_match = (values >= lows) & (values <= highs)
+            result = key_match if result is None else result & key_match
+        if result is None:
+            raise ValueError("match_matrix needs at least one ratio")
+        return result
+
+    def row_bounds(self, match: np.ndarray, key: str, is_bullish: bool,
+                   columns: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Vectorized bounds(): per-row union hull of the `key` ranges of the
+        patterns marked True in a match_matrix result.
+
+        Rows without any match get an empty (inf, -inf) hull.
+        """
+        lows, highs = self._range_arrays(is_bullish)[1][key]
+        if columns is not None:
+            lows, highs = lows[columns], highs[columns]
+        return (np.where(match, lows, np.inf).min(axis=1, initial=np.inf),
+                np.where(match, highs, -np.inf).max(axis=1, initial=-np.inf))
+
+    def match(self, ratios: Dict[str, float], is_bullish: bool) -> List[str]:
+        """
+        Names of same-direction patterns whose ranges contain every ratio given.
+
+        Args:
+            ratios: Ratio key -> value (a subset of the indexed keys is allowed)
+            is_bullish: Direction of the candidate pattern
+
+        Returns:
+            Matching pattern names in table order
+        """
+        return self.names_for(self.match_mask(ratios, is_bullish))
+
+
+# Compiled indices for the shipped ratio tables
+ABCD_RATIO_INDEX = RatioIndex(ABCD_PATTERN_RATIOS, ('retr', 'proj'))
+XABCD_RATIO_INDEX = RatioIndex(XABCD_PATTERN_RATIOS, ('ab_xa', 'bc_ab', 'cd_bc', 'ad_xa'))
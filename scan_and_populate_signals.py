@@ -16,9 +16,10 @@ from datetime import datetime
 # Import detection modules
 from extremum import detect_extremum_points
 from formed_xabcd import detect_xabcd_patterns
-from formed_abcd import detect_strict_abcd_patterns
+from formed_abcd import detect_strict_abcd_patterns, DEFAULT_MAX_PATTERNS, DEFAULT_SEARCH_WINDOW
 from unformed_abcd import detect_unformed_abcd_patterns_optimized
-from unformed_xabcd import detect_strict_unformed_xabcd_patterns
+from xabcd_detection import detect_unformed_xabcd_patterns_smart
+from joint_detection import detect_all_patterns_joint
 
 # Import signal database
 from signal_database import (
@@ -71,6 +72,26 @@ def load_chart_data(file_path):
         return None
 
 
+# (family, pattern_type, is_formed, label) of every detected pattern family
+PATTERN_FAMILIES = (
+    ('formed_xabcd', 'XABCD', True, 'XABCD formed'),
+    ('unformed_xabcd', 'XABCD', False, 'XABCD unformed'),
+    ('formed_abcd', 'ABCD', True, 'ABCD formed'),
+    ('unformed_abcd', 'ABCD', False, 'ABCD unformed'),
+)
+
+
+def detect_family(family, extremum_points, df):
+    """Detect one pattern family with its standalone detector"""
+    if family == 'formed_xabcd':
+        return detect_xabcd_patterns(extremum_points, df=df, log_details=False)
+    if family == 'unformed_xabcd':
+        return detect_unformed_xabcd_patterns_smart(extremum_points, df=df, log_details=False)
+    if family == 'formed_abcd':
+        return detect_strict_abcd_patterns(extremum_points, df=df, log_details=False)
+    return detect_unformed_abcd_patterns_optimized(extremum_points, df=df, log_details=False)
+
+
 def detect_patterns_for_chart(df, extremum_length=5):
     """Detect all patterns for a chart - using extremum_length=5 for faster detection"""
     patterns = []
@@ -87,53 +108,42 @@ def detect_patterns_for_chart(df, extremum_length=5):
     # This speeds up detection significantly
     recent_extremum = extremum_points[-50:] if len(extremum_points) > 50 else extremum_points
 
-    # Detect formed XABCD patterns
-    try:
-        print(f"  ⏳ Detecting XABCD formed...", flush=True)
-        xabcd_formed = detect_xabcd_patterns(recent_extremum, df=df, log_details=False)
-        for pattern in xabcd_formed:
-            pattern['is_formed'] = True
-            pattern['pattern_type'] = 'XABCD'
-            patterns.append(pattern)
-        print(f"  ✓ Found {len(xabcd_formed)} XABCD formed", flush=True)
-    except Exception as e:
-        print(f"  ⚠️ XABCD formed detection error: {e}", flush=True)
-
-    # Detect unformed XABCD patterns
+    # Detect formed and unformed XABCD/ABCD patterns in one enumeration of the
+    # shared prefixes; each family keeps its standalone detector's window. The
+    # enumeration runs on a bounded background queue while this thread builds
+    # the pattern dicts, and the formed ABCD patterns past the limit are never built
     try:
-        print(f"  ⏳ Detecting XABCD unformed...", flush=True)
-        xabcd_unformed = detect_strict_unformed_xabcd_patterns(recent_extremum, df=df, log_details=False)
-        for pattern in xabcd_unformed:
-            pattern['is_formed'] = False
-            pattern['pattern_type'] = 'XABCD'
-            patterns.append(pattern)
-        print(f"  ✓ Found {len(xabcd_unformed)} XABCD unformed", flush=True)
-    except Exception as e:
-        print(f"  ⚠️ XABCD unformed detection error: {e}", flush=True)
-
-    # Detect formed ABCD patterns
-    try:
-        print(f"  ⏳ Detecting ABCD formed...", flush=True)
-        abcd_formed = detect_strict_abcd_patterns(recent_extremum, df=df, log_details=False)
-        for pattern in abcd_formed:
-            pattern['is_formed'] = True
-            pattern['pattern_type'] = 'ABCD'
-            patterns.append(pattern)
-        print(f"  ✓ Found {len(abcd_formed)} ABCD formed", flush=True)
+        print(f"  ⏳ Detecting XABCD/ABCD formed and unformed...", flush=True)
+        detected = detect_all_patterns_joint(
+            recent_extremum, df,
+            max_search_window={
+                'formed_xabcd': 30,
+                'unformed_xabcd': None,
+                'formed_abcd': DEFAULT_SEARCH_WINDOW,
+                'unformed_abcd': None,
+            },
+            max_patterns={'formed_abcd': DEFAULT_MAX_PATTERNS},
+            threaded=True
+        )
     except Exception as e:
-        print(f"  ⚠️ ABCD formed detection error: {e}", flush=True)
+        # Fall back to one detector per family so an error in one family
+        # does not cost the others
+        print(f"  ⚠️ Joint pattern detection error: {e}", flush=True)
+        detected = {}
+        for family, _, _, label in PATTERN_FAMILIES:
+            try:
+                print(f"  ⏳ Detecting {label}...", flush=True)
+                detected[family] = detect_family(family, recent_extremum, df)
+            except Exception as e:
+                print(f"  ⚠️ {label} detection error: {e}", flush=True)
+                detected[family] = []
 
-    # Detect unformed ABCD patterns
-    try:
-        print(f"  ⏳ Detecting ABCD unformed...", flush=True)
-        abcd_unformed = detect_unformed_abcd_patterns_optimized(recent_extremum, df=df, log_details=False)
-        for pattern in abcd_unformed:
-            pattern['is_formed'] = False
-            pattern['pattern_type'] = 'ABCD'
+    for family, pattern_type, is_formed, label in PATTERN_FAMILIES:
+        for pattern in detected[family]:
+            pattern['is_formed'] = is_formed
+            pattern['pattern_type'] = pattern_type
             patterns.append(pattern)
-        print(f"  ✓ Found {len(abcd_unformed)} ABCD unformed", flush=True)
-    except Exception as e:
-        print(f"  ⚠️ ABCD unformed detection error: {e}", flush=True)
+        print(f"  ✓ Found {len(detected[family])} {label}", flush=True)
 
     return patterns
 
@@ -0,0 +1,120 @@
+"""
+Shared Frames Module
+Hand NumPy arrays and OHLC DataFrames to worker processes through shared memory
+
+The process pool backends (ProcessPoolPatternDetector and BacktestSweep)
+copy their inputs into one shared-memory block per run; each worker attaches to it once at start-up instead of receiving
+pickled inputs with every task.
+
+- SharedArrays packs named arrays into one block (owned by the creator)
+- attach_shared_arrays returns read-only views of a block in a worker
+- encode_frame / decode_frame split a DataFrame into shareable arrays plus
+  a small picklable spec, and rebuild it
+"""
+
+from multiprocessing import shared_memory
+from typing import Dict, List, Tuple
+import sys
+import numpy as np
+import pandas as pd
+
+
+class SharedArrays:
+    """Named NumPy arrays packed into a single shared-memory block"""
+
+    def __init__(self, arrays: Dict[str, np.ndarray]):
+        self.layout = []
+        offset = 0
+        for name, array in arrays.items():
+            array = np.ascontiguousarray(array)
+            self.layout.append((name, array.dtype.str, array.shape, offset))
+            offset += -(-array.nbytes // 8) * 8  # keep every array 8-byte aligned
+
+        self.shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+        for (name, _, _, start), array in zip(self.layout, arrays.values()):
+            array = np.ascontiguousarray(array)
+            view = np.ndarray(array.shape, array.dtype, buffer=self.shm.buf, offset=start)
+            view[...] = array
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def close(self):
+        self.shm.close()
+        self.shm.unlink()
+
+
+def attach_shared_arrays(shm_name: str, layout: List[Tuple]) -> Tuple[shared_memory.SharedMemory, Dict[str, np.ndarray]]:
+    """Attach to a block created by SharedArrays and return read-only views"""
+    # The creating process owns (and unlinks) the block. Pool workers share
+    # its resource tracker, so attaching must not register the block again.
+    if sys.version_info >= (3, 13):
+        shm = shared_memory.SharedMemory(name=shm_name, track=False)
+    else:
+        shm = shared_memory.SharedMemory(name=shm_name)
+
+    arrays = {}
+    for name, dtype, shape, offset in layout:
+        view = np.ndarray(shape, np.dtype(dtype), buffer=shm.buf, offset=offset)
+        view.flags.writeable = False
+        arrays[name] = view
+    return shm, arrays
+
+
+def encode_frame(df: pd.DataFrame) -> Tuple[Dict[str, np.ndarray], Dict]:
+    """
+    Split a DataFrame into shareable numeric arrays and a small picklable spec.
+
+    Numeric and naive datetime64 columns (and index) go to shared memory;
+    anything else (strings, tz-aware timestamps) is pickled with the spec.
+    """
+    arrays = {}
+    columns = []
+    for pos, col in enumerate(df.columns):
+        values = df.iloc[:, pos]
+        if values.dtype.kind in 'biuf':
+            arrays[f'col{pos}'] = values.to_numpy()
+            columns.append((col, 'shared', None))
+        elif values.dtype.kind == 'M' and getattr(values.dtype, 'tz', None) is None:
+            arrays[f'col{pos}'] = values.to_numpy().view(np.int64)
+            columns.append((col, 'datetime64', str(values.dtype)))
+        else:
+            columns.append((col, 'pickled', values))
+
+    index = df.index
+    if isinstance(index, pd.RangeIndex):
+        index_spec = ('range', (index.start, index.stop, index.step), index.name)
+    elif index.dtype.kind in 'biuf':
+        arrays['index'] = index.to_numpy()
+        index_spec = ('shared', None, index.name)
+    elif index.dtype.kind == 'M' and getattr(index.dtype, 'tz', None) is None:
+        arrays['index'] = index.to_numpy().view(np.int64)
+        index_spec = ('datetime64', str(index.dtype), index.name)
+    else:
+        index_spec = ('pickled', index, None)
+
+    return arrays, {'columns': columns, 'index': index_spec}
+
+
+def decode_frame(arrays: Dict[str, np.ndarray], spec: Dict) -> pd.DataFrame:
+    """Rebuild the DataFrame described by encode_frame"""
+    kind, payload, name = spec['index']
+    if kind == 'range':
+        index = pd.RangeIndex(*payload, name=name)
+    elif kind == 'shared':
+        index = pd.Index(arrays['index'], name=name)
+    elif kind == 'datetime64':
+        index = pd.DatetimeIndex(arrays['index'].view(payload), name=name)
+    else:
+        index = payload
+
+    data = {}
+    for pos, (col, kind, payload) in enumerate(spec['columns']):
+        if kind == 'shared':
+            data[col] = arrays[f'col{pos}']
+        elif kind == 'datetime64':
+            data[col] = arrays[f'col{pos}'].view(payload)
+        else:
+            data[col] = payload.to_numpy()
+    return pd.DataFrame(data, index=index, columns=[col for col, _, _ in spec['columns']])
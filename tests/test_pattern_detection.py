@@ -108,6 +108,73 @@ class TestPriceContainmentValidator:
 
         assert isinstance(result, bool)
 
+    @pytest.mark.unit
+    @pytest.mark.validation
+    def test_range_index_matches_slices(self, sample_ohlc_data):
+        """Test OHLCRangeIndex and the unindexed fallback match iloc slice + any() checks"""
+        from ohlc_range_index import OHLCRangeIndex, ensure_range_index
+
+        df = sample_ohlc_data.copy()
+        df.iloc[7, df.columns.get_loc('High')] = np.nan
+        df.iloc[8, df.columns.get_loc('Low')] = np.nan
+        index = OHLCRangeIndex(df)
+        fallback = ensure_range_index(df)
+        assert ensure_range_index(df, index) is index
+
+        rng = np.random.default_rng(42)
+        for _ in range(500):
+            start, stop = sorted(rng.integers(0, len(df) + 5, 2).tolist())
+            price = rng.uniform(df['Low'].min(), df['High'].max())
+
+            for queries in (index, fallback):
+                assert queries.high_exceeds(start, stop, price) == any(df.iloc[start:stop]['High'] > price)
+                assert queries.low_breaks(start, stop, price) == any(df.iloc[start:stop]['Low'] < price)
+            assert fallback.first_high_above(start, price, stop) == index.first_high_above(start, price, stop)
+            assert fallback.first_low_below(start, price, stop) == index.first_low_below(start, price, stop)
+
+        bars = rng.integers(0, len(df) + 2, 200)
+        prices = rng.uniform(df['Low'].min(), df['High'].max(), 200)
+        is_high = rng.random(200) < 0.5
+        expected = [index.high_exceeds(bar + 1, len(df), price) if high
+                    else index.low_breaks(bar + 1, len(df), price)
+                    for bar, price, high in zip(bars.tolist(), prices.tolist(), is_high.tolist())]
+        assert index.crossed_after(bars, prices, is_high).tolist() == expected
+
+    @pytest.mark.unit
+    @pytest.mark.validation
+    def test_range_index_first_crossing_matches_scan(self, sample_ohlc_data):
+        """Test first-crossing queries and reversal outcomes match a bar-by-bar walk"""
+        from ohlc_range_index import OHLCRangeIndex, reversal_outcome
+
+        df = sample_ohlc_data.copy()
+        df.iloc[7, df.columns.get_loc('High')] = np.nan
+        index = OHLCRangeIndex(df)
+        highs, lows = df['High'].to_numpy(), df['Low'].to_numpy()
+
+        def first(values, start, stop):
+            hits = [pos for pos in range(max(start, 0), min(stop, len(df))) if values[pos]]
+            return hits[0] if hits else None
+
+        rng = np.random.default_rng(7)
+        for _ in range(500):
+            start, stop = sorted(rng.integers(0, len(df) + 5, 2).tolist())
+            price = rng.uniform(df['Low'].min(), df['High'].max())
+
+            assert index.first_high_above(start, price, stop) == first(highs > price, start, stop)
+            assert index.first_low_below(start, price, stop) == first(lows < price, start, stop)
+        assert index.first_high_above(0, np.inf) is None
+
+        for d_bar in range(0, len(df) - 1, 7):
+            for is_bullish in (True, False):
+                d_price = lows[d_bar] if is_bullish else highs[d_bar]
+                expected = None
+                for pos in range(d_bar + 1, min(d_bar + 11, len(df))):
+                    move_up, move_down = highs[pos] > d_price * 1.02, lows[pos] < d_price * 0.98
+                    if move_up or move_down:
+                        expected = 'reversal' if (move_up if is_bullish else move_down) else 'break'
+                        break
+                assert reversal_outcome(index, d_bar, d_price, is_bullish) == expected
+
 
 class TestPatternRatios:
     """Test pattern ratio calculations"""
@@ -157,6 +224,46 @@ class TestPatternRatios:
         assert abs(70.0 - ideal_ratio) > tolerance
         assert abs(55.0 - ideal_ratio) > tolerance
 
+    @pytest.mark.unit
+    @pytest.mark.pattern_detection
+    def test_ratio_index_matches_linear_scan(self):
+        """Test compiled ratio index returns the same names as scanning the table"""
+        from ratio_index import XABCD_RATIO_INDEX
+        from pattern_ratios_2_Final import XABCD_PATTERN_RATIOS
+
+        rng = np.random.default_rng(7)
+        bounds = sorted({b for r in XABCD_PATTERN_RATIOS.values() for b in r['ab_xa']})
+        probes = list(rng.uniform(0, 200, size=(200, 2))) + [(b, 50.0) for b in bounds]
+
+        for ab_xa, bc_ab in probes:
+            for is_bullish in (True, False):
+                expected = [
+                    name for name, r in XABCD_PATTERN_RATIOS.items()
+                    if ('bull' in name) == is_bullish
+                    and r['ab_xa'][0] <= ab_xa <= r['ab_xa'][1]
+                    and r['bc_ab'][0] <= bc_ab <= r['bc_ab'][1]
+                ]
+                assert XABCD_RATIO_INDEX.match({'ab_xa': ab_xa, 'bc_ab': bc_ab}, is_bullish) == expected
+
+    @pytest.mark.unit
+    @pytest.mark.pattern_detection
+    def test_ratio_match_matrix_matches_match(self):
+        """Test vectorized ratio matching agrees with the scalar lookup, bounds included"""
+        from ratio_index import XABCD_RATIO_INDEX
+        from pattern_ratios_2_Final import XABCD_PATTERN_RATIOS
+
+        rng = np.random.default_rng(11)
+        bounds = sorted({b for r in XABCD_PATTERN_RATIOS.values() for b in r['cd_bc']})
+        ab_xa = np.concatenate([rng.uniform(0, 200, 300), np.full(len(bounds), 50.0)])
+        cd_bc = np.concatenate([rng.uniform(0, 400, 300), bounds])
+
+        for is_bullish in (True, False):
+            names = XABCD_RATIO_INDEX.direction_names(is_bullish)
+            matrix = XABCD_RATIO_INDEX.match_matrix({'ab_xa': ab_xa, 'cd_bc': cd_bc}, is_bullish)
+            for row, (ab, cd) in enumerate(zip(ab_xa.tolist(), cd_bc.tolist())):
+                expected = XABCD_RATIO_INDEX.match({'ab_xa': ab, 'cd_bc': cd}, is_bullish)
+                assert [names[col] for col in np.flatnonzero(matrix[row])] == expected
+
 
 class TestExtremumDetection:
     """Test extremum point detection"""
@@ -210,6 +317,707 @@ class TestExtremumDetection:
             next_type = extremum_points[i + 1]['type']
             assert current_type != next_type
 
+    @pytest.mark.unit
+    @pytest.mark.pattern_detection
+    def test_detect_extremum_points_matches_pivot_loop(self, sample_ohlc_data):
+        """Test vectorized detection against the per-bar pivot definition"""
+        from extremum import detect_extremum_points
+
+        df = sample_ohlc_data
+        highs = df['High'].values
+        lows = df['Low'].values
+
+        for length in (1, 2, 5):
+            expected = []
+            for i in range(length, len(df) - length):
+                window = slice(i - length, i + length + 1)
+                if highs[i] >= np.max(highs[window]):
+                    expected.append((df.index.values[i], highs[i], True, i))
+                if lows[i] <= np.min(lows[window]):
+                    expected.append((df.index.values[i], lows[i], False, i))
+
+            assert detect_extremum_points(df, length=length) == expected
+
+    @pytest.mark.unit
+    @pytest.mark.pattern_detection
+    def test_extremum_stream_matches_batch(self, sample_ohlc_data):
+        """Test streaming append confirms the same pivots as batch detection"""
+        from extremum import detect_extremum_points, ExtremumStream
+
+        df = sample_ohlc_data
+        stream = ExtremumStream(length=2)
+
+        confirmed = stream.extend(df.iloc[:50])
+        for timestamp, bar in df.iloc[50:].iterrows():
+            new_points = stream.append(bar, timestamp=timestamp.to_datetime64())
+            # Only the bar `length` positions back can be confirmed
+            assert all(point[3] == stream.bar_count - 3 for point in new_points)
+            confirmed.extend(new_points)
+
+        assert confirmed == detect_extremum_points(df, length=2)
+        assert stream.points == confirmed
+
+    @pytest.mark.unit
+    @pytest.mark.pattern_detection
+    def test_extremum_array_matches_tuples(self, sample_ohlc_data):
+        """Test ExtremumArray columns, views and tuples match the tuple list"""
+        from extremum import detect_extremum_points, detect_extremum_array, ExtremumArray
+
+        for length in (1, 3):
+            expected = detect_extremum_points(sample_ohlc_data, length=length)
+            array = detect_extremum_array(sample_ohlc_data, length=length)
+
+            assert list(array) == expected
+            assert list(ExtremumArray.from_points(expected)) == expected
+            assert list(array[3:12]) == expected[3:12]
+            assert np.shares_memory(array[3:12].price, array.price)
+            assert list(array.highs) == [point for point in expected if point[2]]
+            assert list(array.lows) == [point for point in expected if not point[2]]
+            assert list(array.with_bar_timestamps()) == [(p[3], p[1], p[2], p[3]) for p in expected]
+
+    @pytest.mark.unit
+    @pytest.mark.pattern_detection
+    def test_detectors_accept_extremum_array(self, sample_ohlc_data):
+        """Test every detector returns the same patterns for tuples and ExtremumArray"""
+        from extremum import detect_extremum_points, ExtremumArray
+        from formed_abcd import detect_strict_abcd_patterns
+        from formed_xabcd import detect_xabcd_patterns
+        from formed_xabcd_o_n3 import detect_xabcd_patterns_o_n3
+        from unformed_abcd import detect_unformed_abcd_patterns
+        from unformed_xabcd import detect_strict_unformed_xabcd_patterns
+        from unformed_xabcd_o_n3 import detect_unformed_xabcd_patterns_o_n3
+
+        df = sample_ohlc_data.iloc[:100]
+        extremums = detect_extremum_points(df, length=1)
+        array = ExtremumArray.from_points(extremums)
+
+        for detect in (detect_strict_abcd_patterns, detect_xabcd_patterns, detect_xabcd_patterns_o_n3,
+                       detect_unformed_abcd_patterns, detect_strict_unformed_xabcd_patterns,
+                       detect_unformed_xabcd_patterns_o_n3):
+            assert detect(array, df) == detect(extremums, df)
+        assert detect_xabcd_patterns(array, df, batched=True) == detect_xabcd_patterns(extremums, df)
+
+
+class TestIncrementalDetection:
+    """Test incremental walk-forward detection matches full re-detection"""
+
+    @pytest.mark.unit
+    @pytest.mark.pattern_detection
+    def test_incremental_matches_full_detection(self, sample_ohlc_data):
+        """Test per-bar incremental output is identical to full detection"""
+        from extremum import detect_extremum_points
+        from unformed_abcd import detect_unformed_abcd_patterns
+        from unformed_xabcd import detect_strict_unformed_xabcd_patterns
+        from incremental_detection import IncrementalUnformedDetector
+
+        df = sample_ohlc_data.iloc[:60]
+        detector = IncrementalUnformedDetector(df)
+
+        for end_idx in range(1, len(df) + 1):
+            data_slice = df.iloc[:end_idx]
+            extremums = [(p[3], p[1], p[2], p[3]) for p in detect_extremum_points(data_slice, length=1)]
+
+            abcd, xabcd = detector.update(extremums, end_idx)
+
+            if len(extremums) >= 3:
+                assert abcd == detect_unformed_abcd_patterns(extremums, df=data_slice)
+            if len(extremums) >= 4:
+                assert xabcd == detect_strict_unformed_xabcd_patterns(
+                    extremums, data_slice, max_patterns=None, max_search_window=None
+                )
+
+    @pytest.mark.slow
+    @pytest.mark.pattern_detection
+    def test_backtester_modes_detect_same_patterns(self):
+        """Test incremental and full detection modes report the same patterns past 60 extremums"""
+        from extremum import detect_extremum_points
+        from optimized_walk_forward_backtester import OptimizedWalkForwardBacktester
+
+        rng = np.random.default_rng(0)
+        close = 100 + np.cumsum(rng.normal(0, 2, 200))
+        open_ = np.r_[close[0], close[:-1]]
+        df = pd.DataFrame({
+            'Open': open_,
+            'High': np.maximum(open_, close) + rng.uniform(0, 1, 200),
+            'Low': np.minimum(open_, close) - rng.uniform(0, 1, 200),
+            'Close': close,
+            'Volume': 1000.0
+        }, index=pd.date_range('2024-01-01', periods=200, freq='1h'))
+        # Formed XABCD switches to the O(n^3) engine from 60 extremums on
+        assert len(detect_extremum_points(df, length=1)) >= 60
+
+        backtesters = [
+            OptimizedWalkForwardBacktester(df, future_buffer=0, detection_interval=10,
+                                           incremental_detection=incremental)
+            for incremental in (False, True)
+        ]
+
+        def summary(patterns):
+            return [(p['name'], str(p['indices'])) for p in patterns]
+
+        for idx in range(len(df)):
+            full, incremental = (backtester.detect_patterns_with_cache(idx) for backtester in backtesters)
+            assert summary(incremental[0]) == summary(full[0])
+            assert summary(incremental[1]) == summary(full[1])
+
+    @pytest.mark.unit
+    @pytest.mark.pattern_detection
+    def test_confirmed_extremums_match_slice_detection(self, sample_ohlc_data):
+        """Test revealed extremums equal detection on the data slice"""
+        from extremum import detect_extremum_points
+        from optimized_walk_forward_backtester import OptimizedWalkForwardBacktester
+
+        backtester = OptimizedWalkForwardBacktester(
+            sample_ohlc_data, extremum_length=2, incremental_detection=True
+        )
+
+        for end_idx in (1, 5, 50, 120, len(sample_ohlc_data)):
+            data_slice = sample_ohlc_data.iloc[:end_idx]
+            expected = backtester.convert_extremums_to_positions(
+                detect_extremum_points(data_slice, length=2), data_slice
+            )
+            assert backtester.get_confirmed_extremums(end_idx) == expected
+
+    @pytest.mark.slow
+    def test_backtest_resumes_from_checkpoint(self, tmp_path):
+        """Test a backtest extended from a checkpoint ends in the same state as one uninterrupted run"""
+        from exceptions import CheckpointError
+        from optimized_walk_forward_backtester import OptimizedWalkForwardBacktester
+
+        class PRZBacktester(OptimizedWalkForwardBacktester):
+            """Trades unformed ABCD PRZ zones so the checkpoint carries open and closed trades"""
+
+            def generate_signal(self, pattern, current_bar):
+                zones = pattern.get('points', {}).get('D_projected', {}).get('prz_zones')
+                if zones:
+                    pattern['prz_levels'] = [min(z['min'] for z in zones), max(z['max'] for z in zones)]
+                return super().generate_signal(pattern, current_bar)
+
+        rng = np.random.default_rng(0)
+        close = 100 + np.cumsum(rng.normal(0, 2, 90))
+        open_ = np.r_[close[0], close[:-1]]
+        df = pd.DataFrame({
+            'Open': open_,
+            'High': np.maximum(open_, close) + rng.uniform(0, 1, 90),
+            'Low': np.minimum(open_, close) - rng.uniform(0, 1, 90),
+            'Close': close,
+            'Volume': 1000.0
+        }, index=pd.date_range('2024-01-01', periods=90, freq='1h'))
+        settings = dict(future_buffer=0, incremental_detection=True, min_pattern_score=0.5)
+        checkpoint = str(tmp_path / 'backtest.ckpt')
+
+        full = PRZBacktester(df, **settings)
+        full.run_backtest()
+
+        first = PRZBacktester(df.iloc[:55], **settings)
+        first.run_backtest(checkpoint_path=checkpoint, checkpoint_interval=20)
+        resumed = PRZBacktester(df, **settings)
+        resumed.run_backtest(checkpoint_path=checkpoint, resume=True)
+
+        def trades(backtester):
+            return [(t.signal.pattern_hash, t.entry_time, t.exit_time, t.exit_reason, t.pnl)
+                    for t in backtester.closed_trades]
+
+        # The first run's trades and tracked patterns come back from the checkpoint
+        assert first.closed_trades and first.pattern_tracker.tracked_patterns
+        assert trades(resumed)[:len(first.closed_trades)] == trades(first)
+        assert len(resumed.closed_trades) > len(first.closed_trades)
+
+        assert resumed.equity_curve == full.equity_curve
+        assert [s.pattern_hash for s in resumed.all_signals] == [s.pattern_hash for s in full.all_signals]
+        assert trades(resumed) == trades(full)
+        assert {pid: p.status for pid, p in resumed.pattern_tracker.tracked_patterns.items()} == \
+            {pid: p.status for pid, p in full.pattern_tracker.tracked_patterns.items()}
+
+        # Other settings or other bars cannot resume the checkpoint
+        with pytest.raises(CheckpointError):
+            PRZBacktester(df, extremum_length=2, **settings).restore_checkpoint(checkpoint)
+        with pytest.raises(CheckpointError):
+            PRZBacktester(df.iloc[10:], **settings).restore_checkpoint(checkpoint)
+
+    @pytest.mark.unit
+    def test_checkpoint_refuses_other_code_and_damaged_pickles(self, tmp_path):
+        """Test checkpoints from other code or with unreadable pickles raise CheckpointError"""
+        import struct
+        import zlib
+        from backtest_checkpoint import save_checkpoint, load_checkpoint, code_manifest
+        from exceptions import CheckpointError
+        from extremum import ExtremumStream
+
+        path = tmp_path / 'state.ckpt'
+        save_checkpoint(str(path), {'stream': ExtremumStream(2)})
+        assert load_checkpoint(str(path))['stream'].length == 2
+        payload = path.read_bytes()
+
+        # The manifest records the source of the modules whose classes were pickled
+        checksum = code_manifest(['extremum'])['extremum'].encode()
+        assert checksum in payload
+        path.write_bytes(payload.replace(checksum, b'00000000' if checksum != b'00000000' else b'11111111'))
+        with pytest.raises(CheckpointError, match='different version of extremum'):
+            load_checkpoint(str(path))
+
+        # A pickle cut short, or naming a class that no longer exists
+        (manifest_size,) = struct.unpack_from('<I', payload, 8)
+        head = payload[:12 + manifest_size]
+        raw = zlib.decompress(payload[12 + manifest_size:])
+        for damaged in (raw[:-5], raw.replace(b'ExtremumStream', b'ExtremumStreem')):
+            path.write_bytes(head + zlib.compress(damaged))
+            with pytest.raises(CheckpointError, match='could not be unpickled'):
+                load_checkpoint(str(path))
+
+
+class TestIndexedDetection:
+    """Test indexed detection engines match the nested-loop originals"""
+
+    @pytest.mark.unit
+    @pytest.mark.pattern_detection
+    def test_indexed_unformed_xabcd_matches_original(self, sample_ohlc_data):
+        """Test indexed unformed XABCD output is identical, including order"""
+        from extremum import detect_extremum_points
+        from unformed_xabcd import detect_strict_unformed_xabcd_patterns
+        from unformed_xabcd_o_n3 import detect_unformed_xabcd_patterns_o_n3
+
+        df = sample_ohlc_data.iloc[:100]
+        extremums = [(p[3], p[1], p[2], p[3]) for p in detect_extremum_points(df, length=1)]
+
+        for kwargs in ({}, {'strict_validation': False}, {'max_patterns': 5}, {'max_search_window': 8}):
+            expected = detect_strict_unformed_xabcd_patterns(extremums, df, **kwargs)
+            assert detect_unformed_xabcd_patterns_o_n3(extremums, df, **kwargs) == expected
+
+    @pytest.mark.unit
+    @pytest.mark.pattern_detection
+    def test_batched_d_lines_match_scalar(self, sample_ohlc_data):
+        """Test the D line matrix and batched crossing check match the per-candidate functions"""
+        from unformed_xabcd import (
+            XABCD_PATTERN_LOOKUP, calculate_horizontal_d_lines, validate_d_lines_no_candlestick_crossing,
+            project_d_lines, d_lines_cross_candles, valid_d_lines_from_matrix
+        )
+
+        df = sample_ohlc_data
+        rng = np.random.default_rng(3)
+        patterns = list(XABCD_PATTERN_LOOKUP.bull_patterns.values()) + list(XABCD_PATTERN_LOOKUP.bear_patterns.values())
+        candidates = []
+        for _ in range(200):
+            is_bullish = bool(rng.integers(2))
+            x, a, b, c = rng.uniform(df['Low'].min(), df['High'].max(), 4).tolist()
+            candidates.append((x, a, b, c, patterns[rng.integers(len(patterns))], is_bullish, int(rng.integers(len(df)))))
+        candidates.append((100.0, 100.0, 95.0, 98.0, patterns[0], True, 10))  # zero XA move
+
+        d_matrix = project_d_lines(
+            [cand[0] for cand in candidates], [cand[1] for cand in candidates],
+            [cand[2] for cand in candidates], [cand[3] for cand in candidates],
+            [(cand[4]['ad_xa_min'], cand[4]['ad_xa_max']) for cand in candidates],
+            [(cand[4]['cd_bc_min'], cand[4]['cd_bc_max']) for cand in candidates],
+            [cand[5] for cand in candidates]
+        )
+        crosses = d_lines_cross_candles(df['High'].to_numpy(), df['Low'].to_numpy(),
+                                        [cand[6] for cand in candidates], d_matrix)
+
+        for (x, a, b, c, pattern, is_bullish, c_bar), d_lines in zip(
+                candidates, valid_d_lines_from_matrix(d_matrix, crosses)):
+            expected = calculate_horizontal_d_lines(x, a, b, c, pattern, is_bullish)
+            if expected:
+                expected = validate_d_lines_no_candlestick_crossing(df, c_bar, expected)
+            assert d_lines == expected
+
+    @pytest.mark.unit
+    @pytest.mark.pattern_detection
+    def test_batched_formed_xabcd_matches_scalar(self, sample_ohlc_data):
+        """Test NumPy-batched formed XABCD output is identical, including order"""
+        from extremum import detect_extremum_points
+        from formed_xabcd import detect_xabcd_patterns
+
+        df = sample_ohlc_data.iloc[:120]
+        extremums = detect_extremum_points(df, length=1)
+
+        for kwargs in ({}, {'max_search_window': None}, {'strict_validation': False},
+                       {'validate_d_crossing': False, 'max_search_window': 10}):
+            expected = detect_xabcd_patterns(extremums, df, **kwargs)
+            assert detect_xabcd_patterns(extremums, df, batched=True, **kwargs) == expected
+
+    @pytest.mark.unit
+    @pytest.mark.pattern_detection
+    def test_formed_abcd_single_pass_keeps_ratio_table_order(self, sample_ohlc_data):
+        """Test single-pass formed ABCD groups patterns by ratio table order and truncates in that order"""
+        from extremum import detect_extremum_points
+        from formed_abcd import detect_strict_abcd_patterns
+        from pattern_ratios_2_Final import ABCD_PATTERN_RATIOS
+
+        df = sample_ohlc_data.iloc[:150]
+        extremums = detect_extremum_points(df, length=1)
+        patterns = detect_strict_abcd_patterns(extremums, df, max_patterns=None, max_search_window=None)
+
+        sources = [p['ratios']['prz_zones'][0]['pattern_source'] for p in patterns]
+        table_order = list(ABCD_PATTERN_RATIOS)
+        positions = [table_order.index(source) for source in sources]
+        assert positions == sorted(positions)
+
+        for pattern, source in zip(patterns, sources):
+            retr_min, retr_max = ABCD_PATTERN_RATIOS[source]['retr']
+            proj_min, proj_max = ABCD_PATTERN_RATIOS[source]['proj']
+            assert retr_min <= pattern['ratios']['bc_retracement'] <= retr_max
+            assert proj_min <= pattern['ratios']['cd_projection'] <= proj_max
+
+        limited = detect_strict_abcd_patterns(extremums, df, max_patterns=5, max_search_window=None)
+        assert limited == patterns[:5]
+
+    @pytest.mark.unit
+    @pytest.mark.pattern_detection
+    def test_joint_detection_matches_standalone_detectors(self, sample_ohlc_data):
+        """Test the single-pass joint detector reproduces all four detectors, including order"""
+        from extremum import detect_extremum_points
+        from formed_abcd import detect_strict_abcd_patterns
+        from formed_xabcd import detect_xabcd_patterns
+        from unformed_abcd import detect_unformed_abcd_patterns
+        from unformed_xabcd import detect_strict_unformed_xabcd_patterns
+        from joint_detection import detect_all_patterns_joint
+
+        df = sample_ohlc_data.iloc[:120]
+        extremums = detect_extremum_points(df, length=1)
+
+        for window, validate_d_crossing in ((None, True), (None, False), (8, True)):
+            joint = detect_all_patterns_joint(extremums, df, max_search_window=window,
+                                              validate_d_crossing=validate_d_crossing)
+            assert joint['formed_abcd'] == detect_strict_abcd_patterns(
+                extremums, df, max_patterns=None, max_search_window=window,
+                validate_d_crossing=validate_d_crossing)
+            assert joint['unformed_abcd'] == detect_unformed_abcd_patterns(
+                extremums, df, max_search_window=window)
+            assert joint['formed_xabcd'] == detect_xabcd_patterns(
+                extremums, df, max_search_window=window, validate_d_crossing=validate_d_crossing)
+            assert joint['unformed_xabcd'] == detect_strict_unformed_xabcd_patterns(
+                extremums, df, max_search_window=window)
+
+        subset = detect_all_patterns_joint(extremums, df, families=('formed_xabcd',))
+        assert subset == {'formed_xabcd': detect_xabcd_patterns(extremums, df, max_search_window=None)}
+
+    @pytest.mark.unit
+    @pytest.mark.pattern_detection
+    def test_chart_scan_isolates_family_errors(self, sample_ohlc_data, monkeypatch):
+        """Test a failing joint scan falls back to per-family detectors and one failure keeps the rest"""
+        import scan_and_populate_signals as scan
+
+        df = sample_ohlc_data.iloc[:120]
+        expected = scan.detect_patterns_for_chart(df, extremum_length=1)
+
+        def fail(*args, **kwargs):
+            raise RuntimeError("detector failure")
+
+        monkeypatch.setattr(scan, 'detect_all_patterns_joint', fail)
+        monkeypatch.setattr(scan, 'detect_strict_abcd_patterns', fail)
+        patterns = scan.detect_patterns_for_chart(df, extremum_length=1)
+
+        assert patterns == [p for p in expected if not (p['pattern_type'] == 'ABCD' and p['is_formed'])]
+        assert any(p['pattern_type'] == 'XABCD' for p in patterns)
+
+    @pytest.mark.unit
+    @pytest.mark.pattern_detection
+    def test_pattern_stream_records_expand_to_joint_results(self, sample_ohlc_data, monkeypatch):
+        """Test streamed records rebuild the joint results and bounded consumers keep detector order"""
+        import joint_detection
+        from extremum import detect_extremum_points
+        from joint_detection import BoundedPatternQueue, detect_all_patterns_joint, stream_patterns_joint
+
+        df = sample_ohlc_data.iloc[:120]
+        extremums = detect_extremum_points(df, length=1)
+        full = detect_all_patterns_joint(extremums, df)
+        assert detect_all_patterns_joint(extremums, df, threaded=True) == full
+
+        stream = stream_patterns_joint(extremums, df)
+        records = {family: [] for family in full}
+        # Iterating a stream only validates; no pattern dict is built
+        with monkeypatch.context() as patched:
+            for builder in ('_build_formed_abcd_pattern', '_build_formed_xabcd_pattern',
+                            '_build_unformed_xabcd_pattern', '_process_abc_combination_optimized'):
+                patched.setattr(joint_detection, builder, None)
+            for record in stream:
+                records[record.family].append(record)
+        for family, family_records in records.items():
+            family_records.sort(key=lambda record: record.order)
+            assert [stream.expand(record) for record in family_records] == full[family]
+
+        limited = detect_all_patterns_joint(extremums, df, max_patterns={'formed_xabcd': 3, 'unformed_abcd': 2})
+        assert limited['formed_xabcd'] == full['formed_xabcd'][:3]
+        assert limited['unformed_abcd'] == full['unformed_abcd'][:2]
+        assert limited['unformed_xabcd'] == full['unformed_xabcd']
+        assert detect_all_patterns_joint(extremums, df, max_patterns=1, threaded=True) == {
+            family: patterns[:1] for family, patterns in full.items()
+        }
+
+        with BoundedPatternQueue(stream, maxsize=1, batch_size=2) as pattern_queue:
+            queued = [record for batch in pattern_queue for record in batch]
+        assert queued == list(stream)
+
+    @pytest.mark.unit
+    @pytest.mark.pattern_detection
+    def test_unformed_abcd_time_budget_reports_truncation(self, sample_ohlc_data):
+        """Test unformed ABCD is only cut short by an explicit time_budget"""
+        from extremum import detect_extremum_points
+        from unformed_abcd import detect_unformed_abcd_patterns
+
+        extremums = detect_extremum_points(sample_ohlc_data, length=1)
+
+        full = detect_unformed_abcd_patterns(extremums, sample_ohlc_data)
+        assert not full.truncated
+        assert detect_unformed_abcd_patterns(extremums, sample_ohlc_data) == full
+
+        cut = detect_unformed_abcd_patterns(extremums, sample_ohlc_data, time_budget=0.0)
+        assert cut.truncated
+        assert len(cut) <= len(full)
+
+    @pytest.mark.unit
+    @pytest.mark.pattern_detection
+    def test_price_band_index_matches_scan(self):
+        """Test price band lookups return the same positions as a filtered scan"""
+        from price_band_index import PriceBandIndex
+
+        rng = np.random.default_rng(3)
+        prices = rng.integers(90, 110, size=60).astype(float).tolist()
+        index = PriceBandIndex(prices)
+
+        for _ in range(200):
+            low, high = sorted(rng.uniform(85, 115, size=2))
+            start, stop = sorted(rng.integers(0, 61, size=2).tolist())
+            expected = [pos for pos in range(start, stop) if low <= prices[pos] <= high]
+            assert index.positions(low, high, start, stop) == expected
+
+    @pytest.mark.unit
+    def test_zone_interval_index_matches_scan(self):
+        """Test zone overlap queries match a scan while zones are added and removed"""
+        from zone_interval_index import ZoneIntervalIndex
+
+        rng = np.random.default_rng(5)
+        index = ZoneIntervalIndex()
+        zones = {}
+
+        for step in range(600):
+            owner = int(rng.integers(0, 150))
+            if owner in zones and rng.random() < 0.4:
+                index.discard(owner)
+                del zones[owner]
+            elif owner not in zones:
+                lows = rng.uniform(90, 110, size=int(rng.integers(1, 4)))
+                zones[owner] = [(lo, lo + rng.uniform(0, 2)) for lo in lows]
+                for pos, (lo, hi) in enumerate(zones[owner]):
+                    index.add(owner, lo, hi, pos)
+
+            low = rng.uniform(88, 112)
+            high = low + rng.uniform(0, 3)
+            expected = {(owner, pos) for owner, owner_zones in zones.items()
+                        for pos, (lo, hi) in enumerate(owner_zones) if lo <= high and hi >= low}
+            assert set(index.overlapping(low, high)) == expected
+
+    @pytest.mark.unit
+    def test_pattern_tracker_zone_entry_uses_index(self, tmp_path, monkeypatch):
+        """Test zone entries are found through the index and concluded patterns leave it"""
+        from pattern_tracking_utils import PatternTracker
+
+        monkeypatch.chdir(tmp_path)  # zone entries are appended to pattern_debug.log
+
+        def unformed_abcd(c_index, prz):
+            return {
+                'pattern_type': 'ABCD', 'name': f'AB=CD_bull_{c_index}_unformed',
+                'indices': {'A': c_index - 4, 'B': c_index - 2, 'C': c_index},
+                'points': {'A': {'price': 120.0}, 'B': {'price': 100.0}, 'C': {'price': 110.0},
+                           'D_projected': {'prz_zones': [{'min': prz[0], 'max': prz[1], 'pattern_source': 'p'}]}},
+            }
+
+        tracker = PatternTracker()
+        tracker.track_unformed_pattern(unformed_abcd(10, (104.0, 106.0)), 10)
+        tracker.track_unformed_pattern(unformed_abcd(11, (95.0, 97.0)), 11)
+        near_id, far_id = list(tracker.tracked_patterns)
+
+        assert tracker.check_price_in_zone(107.0, 105.0, 12) == [near_id]
+        assert tracker.tracked_patterns[far_id].status == 'pending'
+
+        # Price leaves above the PRZ: success, and the pattern stops being indexed
+        tracker.check_zone_violation(108.0, 106.5, 13)
+        assert tracker.tracked_patterns[near_id].status == 'success'
+        assert near_id not in tracker._zone_index
+        assert far_id in tracker._zone_index
+
+    @pytest.mark.unit
+    def test_tracked_pattern_store_partitions_by_status(self):
+        """Test status partitions follow every status change, including external ones"""
+        import pickle
+        from pattern_tracking_utils import TrackedPattern, TrackedPatternStore
+
+        store = TrackedPatternStore()
+        for i in range(6):
+            store[f'p{i}'] = TrackedPattern(f'p{i}', 'ABCD', 'AB=CD', i, None, (0, 1.0), (1, 2.0), (2, 1.5))
+
+        store['p1'].status = 'in_zone'
+        store['p3'].status = 'dismissed'
+        store['p4'].status = 'in_zone'
+        store['p1'].status = 'success'
+        store['p4'].status = 'invalid_prz'
+        del store['p5']
+
+        def check(store):
+            for status in ('pending', 'in_zone', 'invalid_prz', 'success', 'dismissed'):
+                expected = [pid for pid, p in store.items() if p.status == status]
+                assert store.ids_with_status(status) == expected
+                assert store.count(status) == len(expected)
+            assert list(store.archive) == ['p3', 'p1']
+
+        check(store)
+        restored = pickle.loads(pickle.dumps(store))
+        check(restored)
+        restored['p0'].status = 'dismissed'
+        assert restored.ids_with_status('pending') == ['p2']
+        assert store.ids_with_status('pending') == ['p0', 'p2']
+
+    @pytest.mark.unit
+    def test_tracked_pattern_is_slotted(self):
+        """Test slotted tracked patterns keep their attribute API and pickle round-trip"""
+        import pickle
+        from pattern_tracking_utils import TrackedPattern, ZoneEntry
+
+        tracked = TrackedPattern('p0', 'ABCD', 'AB=CD', 0, None, (0, 1.0), (1, 2.0), (2, 1.5))
+        assert not tracked.__dict__  # Only ad-hoc attributes use the instance dict
+        assert tracked.zone_entries == [] and tracked.completion_details == {}
+        tracked.completion_details['dismissal_bar'] = 5
+        tracked.dismissal_reason = 'D_point_crossed'
+        tracked.status = 'dismissed'
+
+        restored = pickle.loads(pickle.dumps(tracked))
+        assert restored == tracked
+        assert restored.completion_details == {'dismissal_bar': 5}
+        assert restored.dismissal_reason == 'D_point_crossed'
+
+        entry = ZoneEntry('e0', 'p0', 1.0, 0.9, 1.1, 3, 1.0)
+        assert not entry.__dict__
+        assert pickle.loads(pickle.dumps(entry)) == entry
+
+    @pytest.mark.unit
+    def test_pattern_id_uses_structure_key(self):
+        """Test pattern IDs come from a cached structural key and keep their hex form"""
+        import hashlib
+        from pattern_tracking_utils import PatternTracker
+
+        tracker = PatternTracker()
+        unformed = {'name': 'AB=CD_bull_unformed', 'pattern_type': 'ABCD',
+                    'indices': {'A': 10, 'B': 15, 'C': 22}}
+        formed = {'name': 'AB=CD_bull', 'pattern_type': 'ABCD',
+                  'points': {p: {'index': i, 'price': 1.0} for p, i in zip('ABCD', (10, 15, 22, 30))}}
+
+        expected = 'ABCD_' + hashlib.md5(b'AB=CD_bull_A:10_B:15_C:22').hexdigest()[:16]
+        assert tracker.generate_pattern_id(unformed) == expected
+        assert tracker.generate_pattern_id(formed) == expected
+        assert unformed['structure_key'] == ('ABCD', 'AB=CD_bull', 'ABC', 10, 15, 22)
+        assert formed['structure_key'] == unformed['structure_key']
+
+        # A type set after the first lookup invalidates the cached key
+        unformed['pattern_type'] = 'XABCD'
+        assert tracker.generate_pattern_id(unformed).startswith('XABCD_')
+
+    @pytest.mark.unit
+    def test_c_point_updates_only_scan_new_extremums(self):
+        """Test C updates from growing extremum lists match delivering them all at once"""
+        from pattern_tracking_utils import PatternTracker, TrackedPattern
+
+        def make_tracker():
+            tracker = PatternTracker()
+            # Bullish ABCD: C is a high between 10% and 500% of AB above B
+            tracked = TrackedPattern('p', 'ABCD', 'AB=CD', 0, None, (0, 110.0), (5, 100.0), (10, 106.0))
+            tracked.ratios = {'matching_patterns': ['AB=CD_bull_1a']}
+            tracker.tracked_patterns['p'] = tracked
+            return tracker
+
+        extremums = [(12, 104.0, False, 12), (14, 108.0, True, 14), (16, 200.0, True, 16), (18, 109.0, True, 18)]
+
+        incremental = make_tracker()
+        assert incremental.update_c_points(extremums[:1], 20) == []
+        assert incremental.update_c_points(extremums[:3], 21) == ['p']
+        assert incremental.tracked_patterns['p'].c_point == (14, 108.0)
+        assert incremental.update_c_points(extremums, 22) == ['p']
+
+        at_once = make_tracker()
+        assert at_once.update_c_points(extremums, 22) == ['p', 'p']
+        assert at_once.tracked_patterns['p'].c_point == incremental.tracked_patterns['p'].c_point == (18, 109.0)
+
+        # A rewritten list is replayed in full
+        assert incremental.update_c_points([(19, 109.5, True, 19)], 23) == ['p']
+        assert incremental.tracked_patterns['p'].c_point == (19, 109.5)
+
+        # Removing the last pattern forgets the delivered extremums; a pattern
+        # tracked later gets the whole list again
+        incremental.tracked_patterns.clear()
+        assert incremental.update_c_points([], 24) == []
+        assert not incremental._c_source and not incremental._c_history
+        replayed = make_tracker()
+        incremental.tracked_patterns['p'] = replayed.tracked_patterns['p']
+        assert incremental.update_c_points(extremums, 25) == ['p', 'p']
+
+        incremental.reset()
+        assert not incremental._c_source and not incremental._c_history
+
+    @pytest.mark.unit
+    def test_fib_level_table_checks_all_patterns_per_bar(self):
+        """Test the level table reports D crosses, PRZ breaks and touches like the per-level loop"""
+        from fib_level_table import FibLevelTable
+
+        table = FibLevelTable()
+        table.add('bull', {'Fib_0%': 110.0, 'Fib_50%': 105.0, 'A_Level': 101.0}, True, 100.0, 99.0, 101.0)
+        table.add('bear', {'Fib_0%': 90.0, 'Fib_50%': 95.0}, False, 100.0, 99.0, 101.0)
+        table.add('broken', {'Fib_50%': 104.0}, True, 90.0, 104.0, 105.0)
+
+        # Bar 103-106 (open 103.5, close 105.5): bull touches Fib_50% with
+        # its body, 'broken' falls below its PRZ, 'bear' crosses D
+        d_crossed, prz_broken, touches = table.update(106.0, 103.0, 103.5, 105.5)
+        assert d_crossed == ['bear'] and prz_broken == ['broken']
+        assert touches == [('bull', [('Fib_50%', 105.0, 'body')])]
+        assert table.ids == ['bull']
+
+        # Wick touches are classified by the nearer end of the bar
+        _, _, touches = table.update(110.5, 108.0, 108.5, 108.8)
+        assert touches == [('bull', [('Fib_0%', 110.0, 'high')])]
+        _, _, touches = table.update(103.0, 100.9, 102.5, 102.8, check_d_cross=False)
+        assert touches == [('bull', [('A_Level', 101.0, 'low')])]
+
+    @pytest.mark.unit
+    def test_pattern_replay_matches_candle_walk(self):
+        """Test level and trade replays reproduce the per-candle analysis semantics"""
+        from pattern_replay import PatternReplayEngine
+
+        # Bullish levels (A=110, C=100, D=120): 50% = 115, 100% = 120, 161.8% = 126.18
+        engine = PatternReplayEngine(high=[200, 121, 116, 127, 116], low=[0, 119, 114, 125, 114])
+        replay = engine.replay_levels(1, 110.0, 105.0, 100.0, 120.0)
+        assert replay.completed and replay.stop == 3  # Stops after the 161.8% candle
+        assert replay.touch_counts()['50%'] == 1 and replay.first_touch[replay.names.index('50%')] == 1
+        assert replay.touch_counts()['100%'] == 1
+        assert replay.touch_counts(skip_d_bar=True)['100%'] == 0
+        assert engine.replay_levels(1, 110.0, 105.0, 100.0, 120.0) is replay
+        assert engine.replay_levels(5, 110.0, 105.0, 100.0, 120.0) is None
+
+        # Long from 100: one TP per candle, then the stop moves to entry
+        engine = PatternReplayEngine(high=[101, 103, 103.5, 101], low=[99, 101.5, 100.5, 99.5])
+        trade = engine.replay_trade(0, 100.0, 98.0, True, [102.0, 103.0, 105.0])
+        assert trade.tp_hits == ((0, 1), (1, 2))
+        assert trade.sl_hit_offset == 3
+        assert trade.mfe_pct == pytest.approx(3.5) and trade.mae_pct == pytest.approx(0.5)
+
+    @pytest.mark.unit
+    def test_backtest_bars_match_dataframe_access(self, sample_ohlc_data):
+        """Test bar views and prefixes read the same values as iloc rows and slices"""
+        from backtest_bars import BacktestBars
+
+        bars = BacktestBars(sample_ohlc_data)
+        bar = bars.bar(42)
+        row = sample_ohlc_data.iloc[42]
+        assert bar.name == row.name
+        assert all(bar[column] == row[column] for column in ('Open', 'High', 'Low', 'Close'))
+        assert bars.position(row.name) == 42
+
+        prefix = bars.prefix(51)
+        expected = sample_ohlc_data.iloc[:51]
+        assert len(prefix) == 51 and 'High' in prefix.columns
+        pd.testing.assert_frame_equal(prefix.iloc[40:60], expected.iloc[40:60])
+        pd.testing.assert_series_equal(prefix.iloc[-1], expected.iloc[-1])
+        with pytest.raises(IndexError):
+            prefix.iloc[51]
+        assert prefix['Close'].equals(expected['Close'])
+
 
 class TestPatternCache:
     """Test pattern caching functionality"""
@@ -399,6 +1207,92 @@ class TestParallelProcessing:
         assert 'bad' in results
         assert len(results['bad']) == 0
 
+    @pytest.mark.unit
+    @pytest.mark.performance
+    def test_process_pool_detection_matches_serial(self, sample_ohlc_data):
+        """Test partitioned process pool detection is identical to the serial detectors"""
+        from extremum import detect_extremum_points
+        from parallel_pattern_detector import (
+            ProcessPoolPatternDetector, PARTITIONED_DETECTORS, _get_detector, partition_start_positions
+        )
+
+        assert partition_start_positions(10, 4, cost_exponent=3)[0] == (0, 1)
+        ranges = partition_start_positions(50, 7, cost_exponent=4)
+        assert [start for start, _ in ranges[1:]] == [stop for _, stop in ranges[:-1]]
+        assert ranges[0][0] == 0 and ranges[-1][1] == 50
+
+        df = sample_ohlc_data.iloc[:120]
+        extremums = detect_extremum_points(df, length=1)
+        detector_kwargs = {
+            'formed_xabcd': {'max_search_window': None, 'batched': True},
+            'unformed_xabcd': {},
+            'unformed_abcd': {},
+        }
+        assert set(detector_kwargs) == set(PARTITIONED_DETECTORS)
+
+        detector = ProcessPoolPatternDetector(max_workers=2)
+        results = detector.detect_all_patterns(extremums, df, detector_kwargs)
+
+        assert not detector.get_errors()
+        for pattern_type, kwargs in detector_kwargs.items():
+            assert results[pattern_type] == _get_detector(pattern_type)(extremums, df, **kwargs)
+
+    @pytest.mark.unit
+    @pytest.mark.performance
+    def test_parallel_detector_pools_large_inputs(self, sample_ohlc_data):
+        """Test pooled methods run across the process pool for large inputs and on threads otherwise"""
+        from extremum import detect_extremum_points
+        from parallel_pattern_detector import ParallelPatternDetector
+        from unformed_abcd import detect_unformed_abcd_patterns
+
+        df = sample_ohlc_data.iloc[:120]
+        extremums = detect_extremum_points(df, length=1)
+        expected = detect_unformed_abcd_patterns(extremums, df)
+        used = []
+
+        def threaded():
+            used.append('thread')
+            return detect_unformed_abcd_patterns(extremums, df)
+
+        def pooled(pool):
+            used.append('pool')
+            return pool.detect('unformed_abcd', extremums, df)
+
+        detector = ParallelPatternDetector(max_workers=2, process_workers=2,
+                                           min_pool_extremums=len(extremums))
+        results = detector.detect_all_patterns(extremums, df, {'unformed': threaded},
+                                               pooled_methods={'unformed': pooled})
+        assert used == ['pool'] and results['unformed'] == expected
+
+        detector.min_pool_extremums = len(extremums) + 1
+        results = detector.detect_all_patterns(extremums, df, {'unformed': threaded},
+                                               pooled_methods={'unformed': pooled})
+        assert used == ['pool', 'thread'] and results['unformed'] == expected
+
+    @pytest.mark.slow
+    def test_backtest_sweep_runs_grid_in_pool(self, sample_ohlc_data):
+        """Test the sweep runs one backtest per dataset and parameter set and reports every row"""
+        from backtest_sweep import BacktestSweep, parameter_grid
+
+        grid = {'extremum_length': [1, 2], 'detection_interval': [5]}
+        assert parameter_grid(grid) == [
+            {'extremum_length': 1, 'detection_interval': 5},
+            {'extremum_length': 2, 'detection_interval': 5},
+        ]
+
+        df = sample_ohlc_data.iloc[:60]
+        sweep = BacktestSweep({'a': df, 'b': df}, grid, base_params={'future_buffer': 0}, max_workers=2)
+        assert len(sweep.jobs()) == 4 and sweep.jobs()[0] == ('a', {'future_buffer': 0, 'extremum_length': 1, 'detection_interval': 5})
+
+        streamed = []
+        results = sweep.run(result_callback=streamed.append)
+        assert len(streamed) == 4
+        assert list(results['dataset']) == ['a', 'a', 'b', 'b']
+        assert list(results['extremum_length']) == [1, 2, 1, 2]
+        assert (results['error'] == '').all()
+        # Both datasets hold the same bars, so their rows match
+        assert results.iloc[:2]['total_trades'].tolist() == results.iloc[2:]['total_trades'].tolist()
+
 
 class TestConfiguration:
     """Test configuration management"""
@@ -14,8 +14,13 @@ import pandas as pd
 import numpy as np
 import threading
 import time
+import logging
 from pattern_ratios_2_Final import ABCD_PATTERN_RATIOS
 from pattern_data_standard import StandardPattern, PatternPoint, standardize_pattern_name, fix_unicode_issues
+from ohlc_range_index import OHLCRangeIndex, ensure_range_index
+from ratio_index import ABCD_RATIO_INDEX
+from price_band_index import ExtremumBandIndex, ratio_price_band
+from extremum import ExtremumArray
 
 # Configuration constants
 EPSILON = 1e-10
@@ -24,6 +29,8 @@ DEFAULT_MAX_PATTERNS = 100
 DEFAULT_SEARCH_WINDOW = 30
 PRICE_TOLERANCE = 0.1
 
+logger = logging.getLogger(__name__)
+
 
 class PatternLookup:
     """Thread-safe pre-computed pattern lookup tables for O(1) access"""
@@ -69,26 +76,35 @@ class PatternLookup:
                 self.bear_patterns[pattern_name] = pattern_data
 
     def find_matching_patterns(self, bc_retracement: float, is_bullish: bool) -> List[Dict]:
-        """Fast O(1) pattern matching using pre-computed tables"""
+        """Fast pattern matching using the compiled ratio index"""
         patterns = self.bull_patterns if is_bullish else self.bear_patterns
-        matches = []
-
-        for pattern_name, data in patterns.items():
-            if data['retr_min'] <= bc_retracement <= data['retr_max']:
-                matches.append(data)
-
-        return matches
+        names = ABCD_RATIO_INDEX.match({'retr': bc_retracement}, is_bullish)
+        return [patterns[name] for name in names]
 
 
 # Global pattern lookup instance
 PATTERN_LOOKUP = PatternLookup()
 
 
+class UnformedABCDResult(list):
+    """
+    Unformed ABCD patterns plus search metadata.
+
+    A plain list of pattern dicts for every existing caller; `truncated` is
+    True only when an explicit time_budget stopped the search early.
+    """
+
+    def __init__(self, patterns: Optional[List[Dict]] = None, truncated: bool = False):
+        super().__init__(patterns or [])
+        self.truncated = truncated
+
+
 def validate_price_containment_bullish(df: pd.DataFrame,
                                       a_idx: int, b_idx: int,
                                       c_idx: int, d_idx: Optional[int],
                                       a_price: float, b_price: float,
-                                      c_price: float, d_price: Optional[float] = None) -> bool:
+                                      c_price: float, d_price: Optional[float] = None,
+                                      range_index: Optional[OHLCRangeIndex] = None) -> bool:
     """
     Validate price containment for bullish patterns.
     Works for unformed patterns (without D).
@@ -111,26 +127,19 @@ def validate_price_containment_bullish(df: pd.DataFrame,
     assert a_idx <= b_idx <= c_idx, f"Invalid index order: A({a_idx}) <= B({b_idx}) <= C({c_idx})"
 
     try:
-        high_col = 'High' if 'High' in df.columns else 'high'
-        low_col = 'Low' if 'Low' in df.columns else 'low'
+        range_index = ensure_range_index(df, range_index)
 
         # Check A to B: no high exceeds A (excluding A itself)
-        if a_idx + 1 < b_idx:
-            segment_ab = df.iloc[a_idx+1:b_idx+1]
-            if any(segment_ab[high_col] > a_price):
-                return False
+        if a_idx + 1 < b_idx and range_index.high_exceeds(a_idx+1, b_idx+1, a_price):
+            return False
 
         # Check A to C: no low breaks B (excluding A, including B and C)
-        if a_idx + 1 < c_idx:
-            segment_ac = df.iloc[a_idx+1:c_idx+1]
-            if any(segment_ac[low_col] < b_price):
-                return False
+        if a_idx + 1 < c_idx and range_index.low_breaks(a_idx+1, c_idx+1, b_price):
+            return False
 
         # Check B to C: no high exceeds C (excluding C itself, as C IS the high)
-        if b_idx < c_idx:
-            segment_bc = df.iloc[b_idx:c_idx]
-            if any(segment_bc[high_col] > c_price):
-                return False
+        if b_idx < c_idx and range_index.high_exceeds(b_idx, c_idx, c_price):
+            return False
 
         # Post-C validation REMOVED: Price can move above C before reaching D zone
         # Pattern invalidation is handled by the tracking system, not detection
@@ -148,7 +157,8 @@ def validate_price_containment_bearish(df: pd.DataFrame,
                                       a_idx: int, b_idx: int,
                                       c_idx: int, d_idx: Optional[int],
                                       a_price: float, b_price: float,
-                                      c_price: float, d_price: Optional[float] = None) -> bool:
+                                      c_price: float, d_price: Optional[float] = None,
+                                      range_index: Optional[OHLCRangeIndex] = None) -> bool:
     """
     Validate price containment for bearish patterns.
     Works for unformed patterns (without D).
@@ -171,26 +181,19 @@ def validate_price_containment_bearish(df: pd.DataFrame,
     assert a_idx <= b_idx <= c_idx, f"Invalid index order: A({a_idx}) <= B({b_idx}) <= C({c_idx})"
 
     try:
-        high_col = 'High' if 'High' in df.columns else 'high'
-        low_col = 'Low' if 'Low' in df.columns else 'low'
+        range_index = ensure_range_index(df, range_index)
 
         # Check A to B: no low breaks A (excluding A itself)
-        if a_idx + 1 < b_idx:
-            segment_ab = df.iloc[a_idx+1:b_idx+1]
-            if any(segment_ab[low_col] < a_price):
-                return False
+        if a_idx + 1 < b_idx and range_index.low_breaks(a_idx+1, b_idx+1, a_price):
+            return False
 
         # Check A to C: no high exceeds B (excluding A, including B and C)
-        if a_idx + 1 < c_idx:
-            segment_ac = df.iloc[a_idx+1:c_idx+1]
-            if any(segment_ac[high_col] > b_price):
-                return False
+        if a_idx + 1 < c_idx and range_index.high_exceeds(a_idx+1, c_idx+1, b_price):
+            return False
 
         # Check B to C: no low breaks C (excluding C itself, as C IS the low)
-        if b_idx < c_idx:
-            segment_bc = df.iloc[b_idx:c_idx]
-            if any(segment_bc[low_col] < c_price):
-                return False
+        if b_idx < c_idx and range_index.low_breaks(b_idx, c_idx, c_price):
+            return False
 
         # Post-C validation REMOVED: Price can move below C before reaching D zone
         # Pattern invalidation is handled by the tracking system, not detection
@@ -295,31 +298,58 @@ def _process_abc_combination_optimized(A: Tuple, B: Tuple, C: Tuple, signature:
     }
 
 
+def sort_unformed_abcd_patterns(patterns: List[Dict]) -> None:
+    """Sort patterns by quality in place (stable, so ties keep search order)"""
+    patterns.sort(key=lambda p: (
+        len(p['ratios']['matching_patterns']),
+        -abs(p['ratios']['bc_retracement'] - 50)
+    ), reverse=True)
+
+
 def detect_unformed_abcd_patterns_optimized(extremum_points: List[Tuple],
                                            df: Optional[pd.DataFrame] = None,
                                            log_details: bool = False,
                                            max_patterns: int = None,
                                            max_search_window: int = None,
-                                           strict_validation: bool = True) -> List[Dict]:
+                                           strict_validation: bool = True,
+                                           time_budget: Optional[float] = None,
+                                           start_range: Optional[Tuple[int, int]] = None) -> 'UnformedABCDResult':
     """
     Detect unformed ABCD patterns (3-point patterns with projected D).
 
+    The search is exhaustive and deterministic: containment rules that only
+    depend on bars up to B (or that are monotone in C) prune whole branches,
+    crossed C points are dropped up front in strict mode, and C candidates
+    are looked up by ratio-derived price band.
+
     Args:
-        extremum_points: List of tuples (timestamp, price, is_high, bar_index)
+        extremum_points: List of tuples (timestamp, price, is_high, bar_index), or an ExtremumArray
         df: Optional DataFrame for strict validation
         log_details: Whether to print detailed logs
         max_patterns: Maximum number of patterns to return
         max_search_window: Maximum distance between pattern points
         strict_validation: Whether to apply strict price containment for A-B-C
+        time_budget: Optional wall-clock limit in seconds (None = no limit).
+                     When it is hit the search stops early and the result
+                     is marked truncated.
+        start_range: Optional half-open (start, stop) range of A positions to
+                     enumerate (None = all). A is enumerated from the last
+                     position down, so results of descending ranges
+                     concatenate (before sorting) to the full result; used
+                     by the process-pool backend.
 
     Returns:
-        List of dictionaries containing unformed ABCD patterns with PRZ zones
+        UnformedABCDResult (a list of unformed ABCD pattern dicts with PRZ
+        zones) whose `truncated` flag reports whether time_budget cut the
+        search short
     """
 
     if len(extremum_points) < 3:
-        return []
+        return UnformedABCDResult()
 
-    n = len(extremum_points)
+    # Candidate filtering runs on the columns; the enumeration indexes tuples
+    extremum_array = ExtremumArray.from_points(extremum_points)
+    n = len(extremum_array)
     patterns = []
     processed_combinations = set()
 
@@ -364,23 +394,43 @@ def detect_unformed_abcd_patterns_optimized(extremum_points: List[Tuple],
     patterns_checked = 0
     patterns_rejected = 0
 
-    # OPTIMIZATION: Cache C point crossing checks
-    high_col = 'High' if df_copy is not None and 'High' in df_copy.columns else 'high'
-    low_col = 'Low' if df_copy is not None and 'Low' in df_copy.columns else 'low'
-    c_point_crossing_cache = {}  # (c_idx, c_price, is_bullish) -> bool
+    # OPTIMIZATION: Answer containment and crossing checks from one shared
+    # High/Low range index
+    range_index = OHLCRangeIndex(df_copy) if df_copy is not None else None
 
-    # Track time for timeout
+    # C candidates: in strict mode a C that price crosses after formation
+    # is rejected whatever A and B are, so it is dropped up front
+    c_positions = None
+    if strict_validation:
+        c_positions = np.flatnonzero(~range_index.crossed_after(
+            extremum_array.bar_idx, extremum_array.price, extremum_array.is_high))
+
+    # Price-sorted C candidate index and per-direction BC retracement hull
+    # for ratio-driven C candidate pruning
+    band_index = ExtremumBandIndex(extremum_array, c_positions)
+    extremum_points = extremum_array.points
+    retr_bounds = {
+        is_bullish: ABCD_RATIO_INDEX.bounds(ABCD_RATIO_INDEX.match_mask({}, is_bullish), 'retr')
+        for is_bullish in (True, False)
+    }
+
+    # Optional, explicit time budget - the search is otherwise exhaustive
+    # and deterministic, so results never depend on machine speed
     start_time = time.time()
-    timeout = 10  # 10 second timeout for GUI responsiveness
+    truncated = False
 
     # Process all points in the limited dataset
-    for i in range(n - 3, -1, -1):  # Process all points provided
-        # Check for timeout
-        if time.time() - start_time > timeout:
-            if log_details:
-                print(f"TIMEOUT: Detection taking too long (>{timeout}s), returning early with {len(patterns)} patterns")
+    a_start, a_stop = start_range if start_range is not None else (0, n - 2)
+    for i in range(min(a_stop, n - 2) - 1, max(a_start, 0) - 1, -1):  # Process all points provided
+        if time_budget is not None and time.time() - start_time > time_budget:
+            truncated = True
+            logger.warning(f"Unformed ABCD search stopped by time_budget={time_budget}s "
+                           f"after {n - 3 - i} of {n - 2} A points; results are truncated")
             break
 
+        A = extremum_points[i]
+        is_bullish = A[2]  # A is HIGH for bullish
+
         # Limit search for B to reasonable window (by bar index, not extremum index)
         j_end = n - 1
 
@@ -394,10 +444,35 @@ def detect_unformed_abcd_patterns_optimized(extremum_points: List[Tuple],
                 if B_bar - A_bar > max_search_window:
                     continue
 
+            if strict_validation and A[3] + 1 < B[3]:
+                # Rule 1: A is the extreme between A-B. The range only grows
+                # with later B points, so once broken no later B can pass
+                if is_bullish and range_index.high_exceeds(A[3] + 1, B[3] + 1, A[1]):
+                    break
+                if not is_bullish and range_index.low_breaks(A[3] + 1, B[3] + 1, A[1]):
+                    break
+
+            # RATIO PRUNING: A and B fix AB, so the BC retracement ranges of
+            # this direction bound C's price - only C points of A's type
+            # inside that band are visited
+            if B[2] == is_bullish:
+                continue
+            if (is_bullish and not A[1] > B[1]) or (not is_bullish and not A[1] < B[1]):
+                continue
+            if strict_validation:
+                # Rule 2 up to B: B is the extreme between A-B
+                if is_bullish and range_index.low_breaks(A[3] + 1, B[3] + 1, B[1]):
+                    continue
+                if not is_bullish and range_index.high_exceeds(A[3] + 1, B[3] + 1, B[1]):
+                    continue
+            retr_min, retr_max = retr_bounds[is_bullish]
+            c_low, c_high = ratio_price_band(B[1], abs(B[1] - A[1]) + EPSILON, retr_min, retr_max,
+                                             upward=is_bullish)
+
             # Limit search for C to reasonable window (by bar index, not extremum index)
             k_end = n
 
-            for k in range(j + 1, k_end):  # Check all k points
+            for k in band_index.candidates(is_bullish, c_low, c_high, j + 1, k_end):
                 C = extremum_points[k]
 
                 # Skip if C is beyond search window (measured in bar indices)
@@ -407,7 +482,12 @@ def detect_unformed_abcd_patterns_optimized(extremum_points: List[Tuple],
                     if C_bar - B_bar > max_search_window:
                         continue
 
-                A = extremum_points[i]
+                if strict_validation:
+                    # Rule 2: B is the extreme between A-C (monotone in C)
+                    if is_bullish and range_index.low_breaks(A[3] + 1, C[3] + 1, B[1]):
+                        break
+                    if not is_bullish and range_index.high_exceeds(A[3] + 1, C[3] + 1, B[1]):
+                        break
 
                 # Check that no two points share the same timestamp
                 # (prevents same candle from being both high and low)
@@ -456,12 +536,14 @@ def detect_unformed_abcd_patterns_optimized(extremum_points: List[Tuple],
                             if is_bullish:
                                 containment_valid = validate_price_containment_bullish(
                                     df_copy, a_candle_idx, b_candle_idx, c_candle_idx, None,
-                                    A[1], B[1], C[1], None
+                                    A[1], B[1], C[1], None,
+                                    range_index=range_index
                                 )
                             else:
                                 containment_valid = validate_price_containment_bearish(
                                     df_copy, a_candle_idx, b_candle_idx, c_candle_idx, None,
-                                    A[1], B[1], C[1], None
+                                    A[1], B[1], C[1], None,
+                                    range_index=range_index
                                 )
 
                             if not containment_valid:
@@ -477,20 +559,12 @@ def detect_unformed_abcd_patterns_optimized(extremum_points: List[Tuple],
                             # Validate that price doesn't cross C point after formation
                             # Check all bars after C to ensure C point integrity
                             if c_candle_idx < len(df_copy) - 1:
-                                high_col = 'High' if 'High' in df_copy.columns else 'high'
-                                low_col = 'Low' if 'Low' in df_copy.columns else 'low'
-
-                                c_point_crossed = False
                                 if is_bullish:
                                     # For bullish: C is a high, check if any bar after C goes above C
-                                    max_high_after = df_copy[high_col].iloc[c_candle_idx+1:].max()
-                                    if max_high_after > C[1]:  # C[1] is C price
-                                        c_point_crossed = True
+                                    c_point_crossed = range_index.high_exceeds(c_candle_idx+1, len(df_copy), C[1])
                                 else:
                                     # For bearish: C is a low, check if any bar after C goes below C
-                                    min_low_after = df_copy[low_col].iloc[c_candle_idx+1:].min()
-                                    if min_low_after < C[1]:  # C[1] is C price
-                                        c_point_crossed = True
+                                    c_point_crossed = range_index.low_breaks(c_candle_idx+1, len(df_copy), C[1])
 
                                 if c_point_crossed:
                                     patterns_rejected += 1
@@ -520,16 +594,12 @@ def detect_unformed_abcd_patterns_optimized(extremum_points: List[Tuple],
                     if max_patterns and len(patterns) >= max_patterns:
                         if log_details:
                             print(f"  Reached max_patterns limit ({max_patterns})")
-                        return patterns[:max_patterns]
+                        return UnformedABCDResult(patterns[:max_patterns], truncated=truncated)
 
                     if log_details and len(patterns) % 10 == 0:
                         print(f"  Found {len(patterns)} unformed patterns...")
 
-    # Sort patterns by quality
-    patterns.sort(key=lambda p: (
-        len(p['ratios']['matching_patterns']),
-        -abs(p['ratios']['bc_retracement'] - 50)
-    ), reverse=True)
+    sort_unformed_abcd_patterns(patterns)
 
     if log_details:
         print(f"\nUnformed ABCD Summary:")
@@ -537,27 +607,32 @@ def detect_unformed_abcd_patterns_optimized(extremum_points: List[Tuple],
         print(f"  Found: {len(patterns)} valid patterns")
         if strict_validation:
             print(f"  Rejected: {patterns_rejected} (price violations)")
+        if truncated:
+            print(f"  TRUNCATED: time_budget of {time_budget}s reached, search incomplete")
 
-    return patterns[:max_patterns] if max_patterns else patterns
+    return UnformedABCDResult(patterns[:max_patterns] if max_patterns else patterns,
+                              truncated=truncated)
 
 
 def detect_unformed_abcd_patterns(extremum_points: List[Tuple],
                                  df: Optional[pd.DataFrame] = None,
                                  log_details: bool = False,
                                  max_search_window: Optional[int] = None,
-                                 backtest_mode: bool = False) -> List[Dict]:
+                                 backtest_mode: bool = False,
+                                 time_budget: Optional[float] = None) -> 'UnformedABCDResult':
     """
     Main entry point for unformed ABCD pattern detection.
 
     Args:
-        extremum_points: List of tuples (timestamp, price, is_high, bar_index)
+        extremum_points: List of tuples (timestamp, price, is_high, bar_index), or an ExtremumArray
         df: DataFrame with OHLC data for validation
         log_details: Whether to print detailed logs
         max_search_window: Maximum distance between pattern points (None = unlimited)
         backtest_mode: Whether in backtesting mode (unused, for compatibility)
+        time_budget: Optional wall-clock limit in seconds (None = no limit)
 
     Returns:
-        List of unformed ABCD patterns
+        List of unformed ABCD patterns (UnformedABCDResult, see `truncated`)
     """
     # Call the optimized version with appropriate settings
     return detect_unformed_abcd_patterns_optimized(
@@ -566,7 +641,8 @@ def detect_unformed_abcd_patterns(extremum_points: List[Tuple],
         log_details=log_details,
         max_patterns=None,  # No limit for complete detection
         max_search_window=max_search_window,
-        strict_validation=True  # Always enable strict validation
+        strict_validation=True,  # Always enable strict validation
+        time_budget=time_budget
     )
 
 
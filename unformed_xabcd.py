@@ -17,6 +17,9 @@ import numpy as np
 import threading
 from pattern_ratios_2_Final import XABCD_PATTERN_RATIOS
 from pattern_data_standard import StandardPattern, PatternPoint, standardize_pattern_name, fix_unicode_issues
+from ohlc_range_index import OHLCRangeIndex, ensure_range_index
+from ratio_index import XABCD_RATIO_INDEX
+from extremum import as_extremum_tuples
 
 # Configuration constants
 EPSILON = 1e-10
@@ -76,16 +79,10 @@ class XABCDPatternLookup:
                 self.bear_patterns[pattern_name] = pattern_data
 
     def find_matching_patterns(self, ab_xa: float, bc_ab: float, is_bullish: bool) -> List[Dict]:
-        """Fast O(1) pattern matching using pre-computed tables"""
+        """Fast pattern matching using the compiled ratio index"""
         patterns = self.bull_patterns if is_bullish else self.bear_patterns
-        matches = []
-
-        for pattern_name, data in patterns.items():
-            if (data['ab_xa_min'] <= ab_xa <= data['ab_xa_max'] and
-                data['bc_ab_min'] <= bc_ab <= data['bc_ab_max']):
-                matches.append(data)
-
-        return matches
+        names = XABCD_RATIO_INDEX.match({'ab_xa': ab_xa, 'bc_ab': bc_ab}, is_bullish)
+        return [patterns[name] for name in names]
 
 
 # Global pattern lookup instance
@@ -95,7 +92,8 @@ XABCD_PATTERN_LOOKUP = XABCDPatternLookup()
 def validate_price_containment_bullish_xabcd(df: pd.DataFrame,
                                             x_idx: int, a_idx: int, b_idx: int, c_idx: int,
                                             x_price: float, a_price: float,
-                                            b_price: float, c_price: float) -> bool:
+                                            b_price: float, c_price: float,
+                                            range_index: Optional[OHLCRangeIndex] = None) -> bool:
     """
     Validate price containment for bullish XABCD patterns (unformed, 4 points).
 
@@ -119,36 +117,27 @@ def validate_price_containment_bullish_xabcd(df: pd.DataFrame,
     assert c_idx is not None, "C index is required"
 
     try:
-        high_col = 'High' if 'High' in df.columns else 'high'
-        low_col = 'Low' if 'Low' in df.columns else 'low'
+        range_index = ensure_range_index(df, range_index)
 
         # Rule 1: X should be the lowest between X-A (excluding X itself)
-        if x_idx + 1 < a_idx:
-            segment_xa = df.iloc[x_idx+1:a_idx+1]
-            if any(segment_xa[low_col] < x_price):
-                return False  # Found a lower low than X
+        if x_idx + 1 < a_idx and range_index.low_breaks(x_idx+1, a_idx+1, x_price):
+            return False  # Found a lower low than X
 
         # Rule 2: A should be the highest between X-B (excluding A itself)
-        if x_idx < b_idx:
-            segment_xb = df.iloc[x_idx:b_idx]
-            if any(segment_xb[high_col] > a_price):
-                return False  # Found a higher high than A
+        if x_idx < b_idx and range_index.high_exceeds(x_idx, b_idx, a_price):
+            return False  # Found a higher high than A
 
         # Rule 3a: B should be greater than X
         if b_price <= x_price:
             return False  # B must be higher than X
 
         # Rule 3b: B should be the lowest between A-C (excluding B where it's the low)
-        if a_idx < c_idx:
-            segment_ac = df.iloc[a_idx:c_idx+1]
-            if any(segment_ac[low_col] < b_price):
-                return False  # Found a lower low than B
+        if a_idx < c_idx and range_index.low_breaks(a_idx, c_idx+1, b_price):
+            return False  # Found a lower low than B
 
         # Rule 4: C should be the highest between B-C (excluding C itself)
-        if b_idx < c_idx:
-            segment_bc = df.iloc[b_idx:c_idx]
-            if any(segment_bc[high_col] > c_price):
-                return False  # Found a higher high than C
+        if b_idx < c_idx and range_index.high_exceeds(b_idx, c_idx, c_price):
+            return False  # Found a higher high than C
 
         # Rule 5 REMOVED: No post-C validation for unformed patterns
         # Price can move above C before reaching D zone - this is normal pattern behavior
@@ -166,7 +155,8 @@ def validate_price_containment_bullish_xabcd(df: pd.DataFrame,
 def validate_price_containment_bearish_xabcd(df: pd.DataFrame,
                                            x_idx: int, a_idx: int, b_idx: int, c_idx: int,
                                            x_price: float, a_price: float,
-                                           b_price: float, c_price: float) -> bool:
+                                           b_price: float, c_price: float,
+                                           range_index: Optional[OHLCRangeIndex] = None) -> bool:
     """
     Validate price containment for bearish XABCD patterns (unformed, 4 points).
 
@@ -190,36 +180,27 @@ def validate_price_containment_bearish_xabcd(df: pd.DataFrame,
     assert c_idx is not None, "C index is required"
 
     try:
-        high_col = 'High' if 'High' in df.columns else 'high'
-        low_col = 'Low' if 'Low' in df.columns else 'low'
+        range_index = ensure_range_index(df, range_index)
 
         # Rule 1: X should be the highest between X-A (excluding X itself)
-        if x_idx + 1 < a_idx:
-            segment_xa = df.iloc[x_idx+1:a_idx+1]
-            if any(segment_xa[high_col] > x_price):
-                return False  # Found a higher high than X
+        if x_idx + 1 < a_idx and range_index.high_exceeds(x_idx+1, a_idx+1, x_price):
+            return False  # Found a higher high than X
 
         # Rule 2: A should be the lowest between X-B (excluding A itself)
-        if x_idx < b_idx:
-            segment_xb = df.iloc[x_idx:b_idx]
-            if any(segment_xb[low_col] < a_price):
-                return False  # Found a lower low than A
+        if x_idx < b_idx and range_index.low_breaks(x_idx, b_idx, a_price):
+            return False  # Found a lower low than A
 
         # Rule 3a: B should be less than X
         if b_price >= x_price:
             return False  # B must be lower than X
 
         # Rule 3b: B should be the highest between A-C (excluding B where it's the high)
-        if a_idx < c_idx:
-            segment_ac = df.iloc[a_idx:c_idx+1]
-            if any(segment_ac[high_col] > b_price):
-                return False  # Found a higher high than B
+        if a_idx < c_idx and range_index.high_exceeds(a_idx, c_idx+1, b_price):
+            return False  # Found a higher high than B
 
         # Rule 4: C should be the lowest between B-C (excluding C itself)
-        if b_idx < c_idx:
-            segment_bc = df.iloc[b_idx:c_idx]
-            if any(segment_bc[low_col] < c_price):
-                return False  # Found a lower low than C
+        if b_idx < c_idx and range_index.low_breaks(b_idx, c_idx, c_price):
+            return False  # Found a lower low than C
 
         # Rule 5 REMOVED: No post-C validation for unformed patterns
         # Price can move below C before reaching D zone - this is normal pattern behavior
@@ -356,16 +337,168 @@ def calculate_horizontal_d_lines(x_price: float, a_price: float, b_price: float,
 
         d_lines.append(d_final)
 
-    # Remove duplicates (within 0.1 tolerance)
+    return _unique_d_lines(d_lines)
+
+
+def _unique_d_lines(d_lines) -> List[float]:
+    """Drop D lines within PRICE_TOLERANCE of an earlier one, keeping order"""
     unique_d_lines = []
     for d_price in d_lines:
-        is_duplicate = any(abs(d_price - existing) < 0.1 for existing in unique_d_lines)
+        is_duplicate = any(abs(d_price - existing) < PRICE_TOLERANCE for existing in unique_d_lines)
         if not is_duplicate:
             unique_d_lines.append(d_price)
-
     return unique_d_lines
 
 
+def project_d_lines(x_prices: np.ndarray, a_prices: np.ndarray, b_prices: np.ndarray,
+                    c_prices: np.ndarray, ad_ranges: np.ndarray, cd_ranges: np.ndarray,
+                    is_bullish: np.ndarray) -> np.ndarray:
+    """
+    Batched calculate_horizontal_d_lines, before duplicate removal.
+
+    Args:
+        x_prices, a_prices, b_prices, c_prices: Point prices, shape (N,)
+        ad_ranges: (min, max) AD/XA ratio of each candidate's pattern, shape (N, 2)
+        cd_ranges: (min, max) CD/BC ratio of each candidate's pattern, shape (N, 2)
+        is_bullish: Direction of each candidate, shape (N,)
+
+    Returns:
+        (N, 6) matrix of D prices in calculate_horizontal_d_lines order (AD
+        avg/max/min clamped by CD, then CD avg/max/min clamped by AD). Rows
+        with a zero XA or BC move, which have no D lines, are NaN.
+    """
+    x_prices, a_prices, b_prices, c_prices = (
+        np.asarray(prices, dtype=float) for prices in (x_prices, a_prices, b_prices, c_prices)
+    )
+    ad_ranges = np.asarray(ad_ranges, dtype=float).reshape(-1, 2)
+    cd_ranges = np.asarray(cd_ranges, dtype=float).reshape(-1, 2)
+
+    xa_move = np.abs(a_prices - x_prices)[:, None]
+    bc_move = np.abs(c_prices - b_prices)[:, None]
+    # D lies below A and C for bullish patterns, above them for bearish ones
+    sign = np.where(np.asarray(is_bullish, dtype=bool), -1.0, 1.0)[:, None]
+    a_col, c_col = a_prices[:, None], c_prices[:, None]
+
+    ad_min, ad_max = ad_ranges[:, :1], ad_ranges[:, 1:]
+    cd_min, cd_max = cd_ranges[:, :1], cd_ranges[:, 1:]
+    ad_ratios = np.hstack([(ad_min + ad_max) / 2, ad_max, ad_min])
+    cd_ratios = np.hstack([(cd_min + cd_max) / 2, cd_max, cd_min])
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Method 1: fix AD ratios, then clamp with CD ratios
+        d_from_ad = a_col + sign * (xa_move * (ad_ratios / 100))
+        cd_ratio_implied = (np.abs(d_from_ad - c_col) / bc_move) * 100
+        cd_ratio_clamped = np.maximum(cd_min, np.minimum(cd_max, cd_ratio_implied))
+        by_ad = c_col + sign * (bc_move * (cd_ratio_clamped / 100))
+
+        # Method 2: fix CD ratios, then clamp with AD ratios
+        d_from_cd = c_col + sign * (bc_move * (cd_ratios / 100))
+        ad_ratio_implied = (np.abs(a_col - d_from_cd) / xa_move) * 100
+        ad_ratio_clamped = np.maximum(ad_min, np.minimum(ad_max, ad_ratio_implied))
+        by_cd = a_col + sign * (xa_move * (ad_ratio_clamped / 100))
+
+    d_matrix = np.hstack([by_ad, by_cd])
+    d_matrix[((xa_move == 0) | (bc_move == 0))[:, 0]] = np.nan
+    return d_matrix
+
+
+def d_lines_cross_candles(highs: np.ndarray, lows: np.ndarray, c_bars: np.ndarray,
+                          d_matrix: np.ndarray) -> np.ndarray:
+    """
+    Batched candlestick crossing check of validate_d_lines_no_candlestick_crossing.
+
+    A D line crosses when some candle among the MAX_FUTURE_CANDLES after C
+    has low <= D <= high. Candidates are grouped by C, so each distinct C
+    window is compared against all of its D lines in one pass.
+
+    Args:
+        highs, lows: High/Low columns of the data
+        c_bars: Bar index of each candidate's C, shape (N,)
+        d_matrix: D lines per candidate, shape (N, K) (NaN never crosses)
+
+    Returns:
+        (N, K) boolean matrix, True where the D line crosses a candle
+    """
+    c_bars = np.asarray(c_bars, dtype=np.int64)
+    crosses = np.zeros(d_matrix.shape, dtype=bool)
+    n_bars = len(highs)
+
+    for c_bar in np.unique(c_bars):
+        if c_bar >= n_bars - 1:
+            continue  # No candles after C
+        end_idx = min(c_bar + 1 + MAX_FUTURE_CANDLES, n_bars)
+        window_highs = highs[c_bar + 1:end_idx]
+        window_lows = lows[c_bar + 1:end_idx]
+        rows = np.flatnonzero(c_bars == c_bar)
+        d_lines = d_matrix[rows][:, :, None]
+        crosses[rows] = ((window_lows <= d_lines) & (d_lines <= window_highs)).any(axis=2)
+
+    return crosses
+
+
+def valid_d_lines_from_matrix(d_matrix: np.ndarray, crosses: np.ndarray) -> List[List[float]]:
+    """
+    Per-candidate D lines as calculate_horizontal_d_lines followed by
+    validate_d_lines_no_candlestick_crossing would return them.
+
+    Duplicates are removed before crossing lines are dropped, so a line
+    only survives if its first occurrence does not cross.
+    """
+    valid = []
+    for row, row_crosses in zip(d_matrix.tolist(), crosses.tolist()):
+        if row[0] != row[0]:  # NaN row: no D lines
+            valid.append([])
+            continue
+        unique_d_lines = []
+        unique_crosses = []
+        for d_price, crossed in zip(row, row_crosses):
+            if not any(abs(d_price - existing) < PRICE_TOLERANCE for existing in unique_d_lines):
+                unique_d_lines.append(d_price)
+                unique_crosses.append(crossed)
+        valid.append([d_price for d_price, crossed in zip(unique_d_lines, unique_crosses) if not crossed])
+    return valid
+
+
+def _build_unformed_xabcd_pattern(X: Tuple, A: Tuple, B: Tuple, C: Tuple,
+                                  matching_patterns_data: List[Dict],
+                                  ab_xa_retracement: float, bc_ab_projection: float,
+                                  d_lines: List[float], is_bullish: bool) -> Dict:
+    """Build the legacy pattern dict for a validated unformed XABCD combination"""
+    first_pattern = matching_patterns_data[0]
+    direction = 'bullish' if is_bullish else 'bearish'
+    pattern_name = standardize_pattern_name(first_pattern['name'], 'unformed', direction)
+    pattern_name = fix_unicode_issues(pattern_name)
+
+    # Create pattern points with proper indices (element [3] is the bar index)
+    x_point = PatternPoint(timestamp=X[0], price=X[1], index=X[3])
+    a_point = PatternPoint(timestamp=A[0], price=A[1], index=A[3])
+    b_point = PatternPoint(timestamp=B[0], price=B[1], index=B[3])
+    c_point = PatternPoint(timestamp=C[0], price=C[1], index=C[3])
+
+    # Create standardized pattern
+    standard_pattern = StandardPattern(
+        name=pattern_name,
+        pattern_type='XABCD',
+        formation_status='unformed',
+        direction=direction,
+        x_point=x_point,
+        a_point=a_point,
+        b_point=b_point,
+        c_point=c_point,
+        d_point=None,  # Unformed patterns don't have D point
+        d_lines=d_lines,
+        ratios={
+            'ab_xa_retracement': ab_xa_retracement,
+            'bc_ab_projection': bc_ab_projection,
+            'matching_patterns': [p['name'] for p in matching_patterns_data]
+        },
+        validation_type='strict_containment'
+    )
+
+    # Convert to legacy dict format for backward compatibility
+    return standard_pattern.to_legacy_dict()
+
+
 def detect_strict_unformed_xabcd_patterns(extremum_points: List[Tuple],
                                          df: pd.DataFrame,
                                          log_details: bool = False,
@@ -376,7 +509,7 @@ def detect_strict_unformed_xabcd_patterns(extremum_points: List[Tuple],
     Detect strict unformed XABCD patterns (4-point patterns X-A-B-C with projected D).
 
     Args:
-        extremum_points: List of tuples (timestamp, price, is_high, bar_index)
+        extremum_points: List of tuples (timestamp, price, is_high, bar_index), or an ExtremumArray
         df: DataFrame with OHLC data for validation
         log_details: Whether to print detailed logs
         max_patterns: IGNORED - NO LIMITS for 100% accuracy
@@ -387,6 +520,7 @@ def detect_strict_unformed_xabcd_patterns(extremum_points: List[Tuple],
         List of dictionaries containing unformed XABCD patterns with horizontal D lines
     """
     patterns = []
+    extremum_points = as_extremum_tuples(extremum_points)
     n = len(extremum_points)
 
     if n < 4:
@@ -410,6 +544,9 @@ def detect_strict_unformed_xabcd_patterns(extremum_points: List[Tuple],
         elif 'time' in df_copy.columns:
             df_copy['timestamp'] = pd.to_datetime(df_copy['time'])
 
+    # Shared High/Low range index: containment and C crossing checks are O(1)
+    range_index = OHLCRangeIndex(df_copy)
+
     if log_details:
         print(f"\nDetecting Strict Unformed XABCD patterns with {n} extremum points")
         print(f"DataFrame has {len(df_copy)} candles for validation")
@@ -580,12 +717,14 @@ def detect_strict_unformed_xabcd_patterns(extremum_points: List[Tuple],
                             if is_bullish:
                                 containment_valid = validate_price_containment_bullish_xabcd(
                                     df_copy, x_candle_idx, a_candle_idx, b_candle_idx, c_candle_idx,
-                                    x_price, a_price, b_price, c_price
+                                    x_price, a_price, b_price, c_price,
+                                    range_index=range_index
                                 )
                             else:
                                 containment_valid = validate_price_containment_bearish_xabcd(
                                     df_copy, x_candle_idx, a_candle_idx, b_candle_idx, c_candle_idx,
-                                    x_price, a_price, b_price, c_price
+                                    x_price, a_price, b_price, c_price,
+                                    range_index=range_index
                                 )
 
                             if not containment_valid:
@@ -597,18 +736,15 @@ def detect_strict_unformed_xabcd_patterns(extremum_points: List[Tuple],
                             # Validate that price doesn't cross C point after formation
                             # Check all bars after C to ensure C point integrity
                             if c_candle_idx < len(df_copy) - 1:
-                                high_col = 'High' if 'High' in df_copy.columns else 'high'
-                                low_col = 'Low' if 'Low' in df_copy.columns else 'low'
-
                                 c_point_crossed = False
                                 if is_bullish:
                                     # For bullish: C is a high, check if any bar after C goes above C
-                                    max_high_after = df_copy[high_col].iloc[c_candle_idx+1:].max()
+                                    max_high_after = range_index.max_high(c_candle_idx+1, len(df_copy))
                                     if max_high_after > c_price:
                                         c_point_crossed = True
                                 else:
                                     # For bearish: C is a low, check if any bar after C goes below C
-                                    min_low_after = df_copy[low_col].iloc[c_candle_idx+1:].min()
+                                    min_low_after = range_index.min_low(c_candle_idx+1, len(df_copy))
                                     if min_low_after < c_price:
                                         c_point_crossed = True
 
@@ -649,45 +785,11 @@ def detect_strict_unformed_xabcd_patterns(extremum_points: List[Tuple],
                     d_lines = valid_d_lines
 
                     # Create standardized pattern object
-                    direction = 'bullish' if is_bullish else 'bearish'
-                    pattern_name = standardize_pattern_name(first_pattern['name'], 'unformed', direction)
-                    pattern_name = fix_unicode_issues(pattern_name)
-
-                    # Create pattern points with proper indices
-                    # Use bar indices - if element [3] exists use it, otherwise use element [0]
-                    x_bar_idx = X[3]
-                    a_bar_idx = A[3]
-                    b_bar_idx = B[3]
-                    c_bar_idx = C[3]
-
-                    x_point = PatternPoint(timestamp=X[0], price=x_price, index=x_bar_idx)
-                    a_point = PatternPoint(timestamp=A[0], price=a_price, index=a_bar_idx)
-                    b_point = PatternPoint(timestamp=B[0], price=b_price, index=b_bar_idx)
-                    c_point = PatternPoint(timestamp=C[0], price=c_price, index=c_bar_idx)
-
-                    # Create standardized pattern
-                    standard_pattern = StandardPattern(
-                        name=pattern_name,
-                        pattern_type='XABCD',
-                        formation_status='unformed',
-                        direction=direction,
-                        x_point=x_point,
-                        a_point=a_point,
-                        b_point=b_point,
-                        c_point=c_point,
-                        d_point=None,  # Unformed patterns don't have D point
-                        d_lines=d_lines,
-                        ratios={
-                            'ab_xa_retracement': ab_xa_retracement,
-                            'bc_ab_projection': bc_ab_projection,
-                            'matching_patterns': [p['name'] for p in matching_patterns_data]
-                        },
-                        validation_type='strict_containment'
+                    pattern = _build_unformed_xabcd_pattern(
+                        X, A, B, C, matching_patterns_data,
+                        ab_xa_retracement, bc_ab_projection, d_lines, is_bullish
                     )
 
-                    # Convert to legacy dict format for backward compatibility
-                    pattern = standard_pattern.to_legacy_dict()
-
                     patterns.append(pattern)
                     patterns_found += 1
 
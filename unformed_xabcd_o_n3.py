@@ -0,0 +1,388 @@
+"""
+Indexed Unformed XABCD Detection - XAB -> XABC Enumeration
+===========================================================
+
+Drop-in replacement for unformed_xabcd.detect_strict_unformed_xabcd_patterns
+that avoids the four-deep nested loop over all extremum points:
+
+1. XAB index - X, A, B are enumerated once. Every prefix is bucketed by the
+   pattern names whose AB/XA range it satisfies and pruned with the
+   containment rules that only need bars up to B. Prefixes with an empty
+   bucket never reach C.
+2. XABC probing - C is only probed against surviving prefixes. The BC/AB
+   ranges of the prefix's bucket give an admissible C price band, looked up
+   in a price-sorted index of C candidates (see price_band_index), and in
+   strict mode C candidates that are crossed after formation are dropped
+   up front (they can never pass, whatever X, A, B are).
+
+3. Batched D lines - candidates that pass the ratio and containment
+   checks are queued; D lines for a whole batch are projected as one
+   matrix (project_d_lines) and checked against the candles after C in
+   one pass per distinct C (d_lines_cross_candles).
+
+Every candidate that survives the pruning is accepted or rejected by the
+same validators as the original engine, and results are produced in the
+original (X, A, B, C) enumeration order, so output is identical.
+"""
+
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import List, Tuple, Dict, Optional
+import numpy as np
+import pandas as pd
+
+from ohlc_range_index import OHLCRangeIndex
+from ratio_index import XABCD_RATIO_INDEX
+from price_band_index import PriceBandIndex, ratio_price_band
+from extremum import ExtremumArray
+from unformed_xabcd import (
+    XABCD_PATTERN_LOOKUP,
+    validate_price_containment_bullish_xabcd,
+    validate_price_containment_bearish_xabcd,
+    project_d_lines,
+    d_lines_cross_candles,
+    valid_d_lines_from_matrix,
+    _build_unformed_xabcd_pattern
+)
+
+# Accepted candidates queued before their D lines are projected and checked together
+D_LINE_BATCH_SIZE = 512
+
+
+@dataclass
+class XAB_Prefix:
+    """X-A-B prefix with the pattern bucket its AB/XA ratio falls into"""
+    x_pos: int
+    a_pos: int
+    b_pos: int
+    xa_move: float
+    ab_move: float
+    ab_xa_ratio: float
+    pattern_names: List[str]
+    c_price_min: float
+    c_price_max: float
+
+
+def _c_price_band(b_price: float, ab_move: float, bucket: List[Dict],
+                  is_bullish: bool) -> Tuple[float, float]:
+    """
+    Admissible C price band for a prefix, from the BC/AB ranges of its bucket.
+
+    The band is padded by a relative epsilon so it can only over-admit;
+    the exact BC/AB ratio check happens when the candidate is evaluated.
+    """
+    bc_min = min(p['bc_ab_min'] for p in bucket)
+    bc_max = max(p['bc_ab_max'] for p in bucket)
+    # C above B for bullish, below B for bearish
+    return ratio_price_band(b_price, ab_move, bc_min, bc_max, upward=is_bullish)
+
+
+def detect_unformed_xabcd_patterns_o_n3(extremum_points: List[Tuple],
+                                        df: pd.DataFrame,
+                                        log_details: bool = False,
+                                        max_patterns: int = None,
+                                        max_search_window: int = None,
+                                        strict_validation: bool = True,
+                                        start_range: Optional[Tuple[int, int]] = None) -> List[Dict]:
+    """
+    Detect unformed XABCD patterns (X-A-B-C with projected D) using an
+    indexed XAB -> XABC enumeration.
+
+    Same arguments and output as detect_strict_unformed_xabcd_patterns.
+
+    Args:
+        extremum_points: List of tuples (timestamp, price, is_high, bar_index), or an ExtremumArray
+        df: DataFrame with OHLC data for validation
+        log_details: Whether to print detailed logs
+        max_patterns: Stop after this many patterns (None = unlimited)
+        max_search_window: Maximum bar distance between consecutive points (None = unlimited)
+        strict_validation: Whether to apply strict price containment validation
+        start_range: Optional half-open (start, stop) range of X positions to
+                     enumerate, intersected with the search window's start
+                     point (None = all). Used by the process-pool backend.
+
+    Returns:
+        List of dictionaries containing unformed XABCD patterns with horizontal D lines
+    """
+    patterns = []
+    # Candidate filtering runs on the columns; the enumeration indexes tuples
+    extremum_array = ExtremumArray.from_points(extremum_points)
+    n = len(extremum_array)
+
+    if n < 4:
+        if log_details:
+            print(f"[Indexed] Not enough extremum points for unformed XABCD: {n} < 4")
+        return patterns
+
+    if df is None or df.empty:
+        if log_details:
+            print("[Indexed] No DataFrame provided for strict validation")
+        return patterns
+
+    range_index = OHLCRangeIndex(df)
+    n_bars = len(df)
+    high_col = 'High' if 'High' in df.columns else 'high'
+    low_col = 'Low' if 'Low' in df.columns else 'low'
+    highs = df[high_col].to_numpy(dtype=float, na_value=np.nan)
+    lows = df[low_col].to_numpy(dtype=float, na_value=np.nan)
+
+    # Search window / start point semantics of the original engine
+    if max_search_window is None:
+        search_window = n
+        start_point = 0
+    elif max_search_window <= 10:
+        search_window = min(max_search_window, n)
+        start_point = max(0, n - max_search_window * 4)
+    else:
+        search_window = min(max_search_window, n)
+        start_point = max(0, n - 300)
+    end_point = n - 3
+    if start_range is not None:
+        start_point = max(start_point, start_range[0])
+        end_point = min(end_point, start_range[1])
+
+    pattern_tables = {
+        True: XABCD_PATTERN_LOOKUP.bull_patterns,
+        False: XABCD_PATTERN_LOOKUP.bear_patterns
+    }
+
+    # C candidates by extremum type (C is a high for bullish patterns).
+    # In strict mode a C that price crosses after formation fails whatever
+    # X, A and B are, so it is dropped before enumeration.
+    keep = np.ones(n, dtype=bool)
+    if strict_validation:
+        keep = ~range_index.crossed_after(extremum_array.bar_idx, extremum_array.price,
+                                          extremum_array.is_high)
+    c_positions = {
+        is_high: np.flatnonzero(keep & (extremum_array.is_high == is_high))
+        for is_high in (True, False)
+    }
+    c_candidates = {is_high: positions.tolist() for is_high, positions in c_positions.items()}
+    c_band_indices = {
+        is_high: PriceBandIndex(extremum_array.price[positions])
+        for is_high, positions in c_positions.items()
+    }
+    extremum_points = extremum_array.points
+
+    xab_count = 0
+    patterns_checked = 0
+    pending = []  # Accepted candidates awaiting D line projection
+
+    def flush() -> bool:
+        """Build patterns for the queued candidates; True once max_patterns is reached"""
+        for pattern in _build_batch(pending, highs, lows, log_details):
+            patterns.append(pattern)
+            if max_patterns is not None and len(patterns) >= max_patterns:
+                if log_details:
+                    print(f"[Indexed] Reached max_patterns limit ({max_patterns})")
+                return True
+        pending.clear()
+        return False
+
+    # ================================================================
+    # PHASE 1: XAB index - bucket by pattern name, prune up to B
+    # ================================================================
+    for i in range(start_point, end_point):
+        X = extremum_points[i]
+        x_bar, x_price = X[3], X[1]
+        is_bullish = not X[2]  # X is low for bullish
+
+        for j in range(i + 1, n - 2):
+            A = extremum_points[j]
+            a_bar, a_price = A[3], A[1]
+
+            if max_search_window is not None and (a_bar - x_bar) > search_window:
+                continue
+            if X[0] == A[0] or X[2] == A[2]:
+                continue
+            if is_bullish and not x_price < a_price:
+                continue
+            if not is_bullish and not x_price > a_price:
+                continue
+
+            if strict_validation and x_bar + 1 < a_bar:
+                # Rule 1: X is the extreme between X-A. The range only grows
+                # with later A points, so once broken no later A can pass.
+                if is_bullish and range_index.low_breaks(x_bar + 1, a_bar + 1, x_price):
+                    break
+                if not is_bullish and range_index.high_exceeds(x_bar + 1, a_bar + 1, x_price):
+                    break
+
+            xa_move = abs(a_price - x_price)
+
+            for k in range(j + 1, n - 1):
+                B = extremum_points[k]
+                b_bar, b_price = B[3], B[1]
+
+                if max_search_window is not None and (b_bar - a_bar) > search_window:
+                    continue
+
+                if strict_validation:
+                    # Rule 2: A is the extreme between X-B (monotone in B)
+                    if is_bullish and range_index.high_exceeds(x_bar, b_bar, a_price):
+                        break
+                    if not is_bullish and range_index.low_breaks(x_bar, b_bar, a_price):
+                        break
+
+                if A[0] == B[0] or A[2] == B[2]:
+                    continue
+                if is_bullish and not a_price > b_price:
+                    continue
+                if not is_bullish and not a_price < b_price:
+                    continue
+
+                ab_move = abs(b_price - a_price)
+                ab_xa_ratio = (ab_move / xa_move) * 100
+                bucket_names = XABCD_RATIO_INDEX.match({'ab_xa': ab_xa_ratio}, is_bullish)
+                if not bucket_names:
+                    continue
+
+                if strict_validation:
+                    # Rule 3a: B beyond X
+                    if is_bullish and b_price <= x_price:
+                        continue
+                    if not is_bullish and b_price >= x_price:
+                        continue
+                    # Rule 3b (bars up to B): B is the extreme between A-C
+                    if is_bullish and range_index.low_breaks(a_bar, b_bar + 1, b_price):
+                        continue
+                    if not is_bullish and range_index.high_exceeds(a_bar, b_bar + 1, b_price):
+                        continue
+
+                bucket = [pattern_tables[is_bullish][name] for name in bucket_names]
+                c_price_min, c_price_max = _c_price_band(b_price, ab_move, bucket, is_bullish)
+                prefix = XAB_Prefix(
+                    i, j, k, xa_move, ab_move, ab_xa_ratio,
+                    bucket_names, c_price_min, c_price_max
+                )
+                xab_count += 1
+
+                # ========================================================
+                # PHASE 2: probe C for this prefix (ascending position)
+                # ========================================================
+                c_list = c_candidates[A[2]]
+                in_band = c_band_indices[A[2]].positions(
+                    prefix.c_price_min, prefix.c_price_max, bisect_right(c_list, k))
+                for l in (c_list[pos] for pos in in_band):
+                    C = extremum_points[l]
+                    c_bar = C[3]
+
+                    if max_search_window is not None and (c_bar - b_bar) > search_window:
+                        continue
+
+                    if strict_validation:
+                        # Rule 3b: once price breaks B, no later C can pass
+                        if is_bullish and range_index.low_breaks(a_bar, c_bar + 1, b_price):
+                            break
+                        if not is_bullish and range_index.high_exceeds(a_bar, c_bar + 1, b_price):
+                            break
+
+                    if X[0] == C[0] or B[0] == C[0]:
+                        continue
+
+                    patterns_checked += 1
+                    candidate = _evaluate_xabc(
+                        X, A, B, C, prefix, is_bullish, df, range_index, strict_validation, log_details
+                    )
+                    if candidate is None:
+                        continue
+
+                    pending.append(candidate)
+                    if len(pending) >= D_LINE_BATCH_SIZE and flush():
+                        return patterns
+
+    if pending and flush():
+        return patterns
+
+    if log_details:
+        print(f"\n[Indexed] Unformed XABCD Detection Summary:")
+        print(f"  XAB prefixes indexed: {xab_count}")
+        print(f"  XABC candidates checked: {patterns_checked}")
+        print(f"  Found: {len(patterns)} patterns")
+
+    return patterns
+
+
+def _evaluate_xabc(X: Tuple, A: Tuple, B: Tuple, C: Tuple, prefix: XAB_Prefix,
+                   is_bullish: bool, df: pd.DataFrame, range_index: OHLCRangeIndex,
+                   strict_validation: bool, log_details: bool) -> Optional[Tuple]:
+    """
+    Run the original acceptance checks, up to the D lines, on one X-A-B-C candidate.
+
+    Returns:
+        (X, A, B, C, matching_patterns_data, ab_xa_retracement,
+        bc_ab_projection, is_bullish) for _build_batch, or None if rejected
+    """
+    x_price, a_price, b_price, c_price = X[1], A[1], B[1], C[1]
+
+    if is_bullish and not b_price < c_price:
+        return None
+    if not is_bullish and not b_price > c_price:
+        return None
+
+    bc_move = abs(c_price - b_price)
+    if bc_move == 0:
+        return None
+
+    ab_xa_retracement = prefix.ab_xa_ratio
+    bc_ab_projection = (bc_move / prefix.ab_move) * 100
+
+    matching_patterns_data = XABCD_PATTERN_LOOKUP.find_matching_patterns(
+        ab_xa_retracement, bc_ab_projection, is_bullish
+    )
+    if not matching_patterns_data:
+        return None
+
+    c_bar = int(C[3])
+    if strict_validation:
+        try:
+            validate = (validate_price_containment_bullish_xabcd if is_bullish
+                        else validate_price_containment_bearish_xabcd)
+            if not validate(df, int(X[3]), int(A[3]), int(B[3]), c_bar,
+                            x_price, a_price, b_price, c_price,
+                            range_index=range_index):
+                return None
+        except Exception as e:
+            if log_details:
+                print(f"[Indexed] Pattern rejected due to validation error: {e}")
+            return None
+
+    return (X, A, B, C, matching_patterns_data, ab_xa_retracement, bc_ab_projection, is_bullish)
+
+
+def _build_batch(candidates: List[Tuple], highs: np.ndarray, lows: np.ndarray,
+                 log_details: bool) -> List[Dict]:
+    """
+    Project and validate the D lines of accepted candidates in one batch
+    and build the patterns of those with at least one valid D line, in order.
+    """
+    if not candidates:
+        return []
+
+    # D lines come from the first matching pattern's AD/XA and CD/BC ranges
+    first_patterns = [candidate[4][0] for candidate in candidates]
+    d_matrix = project_d_lines(
+        [candidate[0][1] for candidate in candidates],
+        [candidate[1][1] for candidate in candidates],
+        [candidate[2][1] for candidate in candidates],
+        [candidate[3][1] for candidate in candidates],
+        [(p['ad_xa_min'], p['ad_xa_max']) for p in first_patterns],
+        [(p['cd_bc_min'], p['cd_bc_max']) for p in first_patterns],
+        [candidate[7] for candidate in candidates]
+    )
+
+    # D lines must not cross candlesticks after point C
+    crosses = d_lines_cross_candles(highs, lows, [int(candidate[3][3]) for candidate in candidates], d_matrix)
+
+    patterns = []
+    for candidate, d_lines, row in zip(candidates, valid_d_lines_from_matrix(d_matrix, crosses), d_matrix):
+        X, A, B, C, matching_patterns_data, ab_xa_retracement, bc_ab_projection, is_bullish = candidate
+        if not d_lines:
+            if log_details and not np.isnan(row[0]):
+                print(f"[Indexed] Rejected {matching_patterns_data[0]['name']} - all D-lines cross candlesticks")
+            continue
+        patterns.append(_build_unformed_xabcd_pattern(
+            X, A, B, C, matching_patterns_data,
+            ab_xa_retracement, bc_ab_projection, d_lines, is_bullish
+        ))
+    return patterns
@@ -6,6 +6,9 @@ Automatically selects the best XABCD implementation based on dataset size:
 - Small datasets (n < 60): Original O(n⁵) with early optimizations
 - Large datasets (n >= 60): O(n³) meet-in-the-middle algorithm
 
+Unformed XABCD detection follows the same rule, switching from the nested
+loop to the indexed XAB -> XABC enumeration in unformed_xabcd_o_n3.
+
 Performance characteristics:
 - n < 60:  Original is competitive due to early termination optimizations
 - n >= 60: O(n³) provides 3-4x speedup
@@ -145,6 +148,56 @@ def detect_xabcd_patterns_force_optimized(extremum_points: List[Tuple],
     )
 
 
+def detect_unformed_xabcd_patterns_smart(extremum_points: List[Tuple],
+                                         df: pd.DataFrame,
+                                         log_details: bool = False,
+                                         max_patterns: Optional[int] = None,
+                                         max_search_window: Optional[int] = None,
+                                         strict_validation: bool = True) -> List[Dict]:
+    """
+    Smart unformed XABCD detection with automatic algorithm selection.
+
+    Automatically selects between:
+    - Original nested-loop implementation: Fine for small extremum sets (n < 60)
+    - Indexed XAB -> XABC implementation: Best for large extremum sets (n >= 60)
+
+    Both return identical patterns in identical order.
+
+    Args:
+        extremum_points: List of (timestamp, price, is_high, bar_index)
+        df: DataFrame for validation
+        log_details: Print progress and algorithm selection
+        max_patterns: Stop after this many patterns (None = unlimited)
+        max_search_window: Max distance between points (None = unlimited)
+        strict_validation: Apply price containment validation
+
+    Returns:
+        List of unformed XABCD pattern dictionaries with horizontal D lines
+    """
+    n = len(extremum_points)
+
+    if n >= ADAPTIVE_THRESHOLD:
+        from unformed_xabcd_o_n3 import detect_unformed_xabcd_patterns_o_n3
+
+        if log_details:
+            print(f"[Smart XABCD] Using indexed unformed algorithm for n={n} extremum points")
+
+        return detect_unformed_xabcd_patterns_o_n3(
+            extremum_points, df, log_details,
+            max_patterns, max_search_window, strict_validation
+        )
+    else:
+        from unformed_xabcd import detect_strict_unformed_xabcd_patterns
+
+        if log_details:
+            print(f"[Smart XABCD] Using original unformed algorithm for n={n} extremum points")
+
+        return detect_strict_unformed_xabcd_patterns(
+            extremum_points, df, log_details,
+            max_patterns, max_search_window, strict_validation
+        )
+
+
 # Default export - use the smart adaptive version
 detect_xabcd_patterns = detect_xabcd_patterns_smart
 
@@ -155,5 +208,6 @@ __all__ = [
     'detect_xabcd_patterns_smart',
     'detect_xabcd_patterns_force_original',
     'detect_xabcd_patterns_force_optimized',
+    'detect_unformed_xabcd_patterns_smart',
     'ADAPTIVE_THRESHOLD'
 ]
@@ -0,0 +1,137 @@
+"""
+Zone Interval Index Module
+Price-keyed lookup of projected D zones for pattern tracking
+
+Every bar, PatternTracker has to find the tracked patterns whose PRZ zones
+or D-lines the bar's [low, high] range touches. Scanning every tracked
+pattern makes each bar O(patterns) even though a bar only ever touches a
+handful of zones.
+
+ZoneIntervalIndex keeps the zones as price intervals [lo, hi] (a D-line is
+the point interval [d, d]) owned by a key such as a pattern ID:
+
+- Overlap uses the tracker's own test, ``lo <= high and hi >= low``, so a
+  query returns exactly the zones the full scan would have matched
+- Zones live in a lo-sorted block (one bisect bounds the candidates, a
+  vectorized hi check selects the overlaps) plus a small unsorted buffer
+  of recent inserts that is merged into the block when it grows
+- Removing an owner tombstones its zones; dead zones are dropped when the
+  block is next rebuilt
+"""
+
+from typing import Dict, Hashable, List, Tuple
+import numpy as np
+
+
+# Buffered inserts are merged into the sorted block once the buffer holds
+# more than this many zones (or more than 1/8 of the block)
+MIN_MERGE_SIZE = 64
+
+
+class ZoneIntervalIndex:
+    """
+    Dynamic index of price intervals grouped by owner.
+
+    Zones are never updated in place: to change an owner's zones, discard
+    the owner and add the new zones.
+    """
+
+    def __init__(self):
+        # Sorted block: zone lows (ascending), highs and zone IDs
+        self._lo = np.empty(0, dtype=float)
+        self._hi = np.empty(0, dtype=float)
+        self._ids = np.empty(0, dtype=np.int64)
+        # Unsorted buffer of recent inserts
+        self._buffer_lo: List[float] = []
+        self._buffer_hi: List[float] = []
+        self._buffer_ids: List[int] = []
+        # Live zones: zone ID -> (owner, tag); owner -> its zone IDs
+        self._zones: Dict[int, Tuple[Hashable, object]] = {}
+        self._owner_zones: Dict[Hashable, List[int]] = {}
+        self._next_id = 0
+        self._dead = 0
+
+    def __len__(self) -> int:
+        """Number of live zones"""
+        return len(self._zones)
+
+    def __contains__(self, owner: Hashable) -> bool:
+        return owner in self._owner_zones
+
+    def add(self, owner: Hashable, lo: float, hi: float, tag: object = None):
+        """
+        Add the zone [lo, hi] for an owner.
+
+        Args:
+            owner: Key the zone belongs to (e.g. a pattern ID)
+            lo, hi: Zone bounds (a single price level uses lo == hi)
+            tag: Optional value returned with the zone (e.g. its position)
+        """
+        zone_id = self._next_id
+        self._next_id += 1
+        self._zones[zone_id] = (owner, tag)
+        self._owner_zones.setdefault(owner, []).append(zone_id)
+        self._buffer_lo.append(float(lo))
+        self._buffer_hi.append(float(hi))
+        self._buffer_ids.append(zone_id)
+
+    def discard(self, owner: Hashable):
+        """Remove every zone of an owner (no-op for unknown owners)"""
+        zone_ids = self._owner_zones.pop(owner, None)
+        if not zone_ids:
+            return
+        for zone_id in zone_ids:
+            del self._zones[zone_id]
+        self._dead += len(zone_ids)
+
+    def clear(self):
+        """Remove every zone"""
+        self.__init__()
+
+    def overlapping(self, low: float, high: float) -> List[Tuple[Hashable, object]]:
+        """
+        Zones that overlap the price range [low, high].
+
+        Args:
+            low, high: Price range, e.g. a bar's low and high
+
+        Returns:
+            List of (owner, tag) for every live zone with lo <= high and
+            hi >= low, in insertion order
+        """
+        if not (low <= high or low > high):
+            return []  # NaN bounds match nothing, like the scalar comparisons
+        if len(self._buffer_ids) > max(MIN_MERGE_SIZE, len(self._ids) // 8) or \
+                self._dead > max(MIN_MERGE_SIZE, len(self._zones)):
+            self._rebuild()
+
+        stop = int(np.searchsorted(self._lo, high, side='right'))
+        hit_ids = self._ids[:stop][self._hi[:stop] >= low].tolist()
+        hit_ids.extend(
+            zone_id for zone_id, lo, hi in zip(self._buffer_ids, self._buffer_lo, self._buffer_hi)
+            if lo <= high and hi >= low
+        )
+        hit_ids.sort()
+
+        zones = self._zones
+        return [zones[zone_id] for zone_id in hit_ids if zone_id in zones]
+
+    def owners_overlapping(self, low: float, high: float) -> List[Hashable]:
+        """Distinct owners with at least one zone overlapping [low, high]"""
+        return list(dict.fromkeys(owner for owner, _ in self.overlapping(low, high)))
+
+    def _rebuild(self):
+        """Merge the buffer into the sorted block and drop dead zones"""
+        lo = np.concatenate([self._lo, np.asarray(self._buffer_lo, dtype=float)])
+        hi = np.concatenate([self._hi, np.asarray(self._buffer_hi, dtype=float)])
+        ids = np.concatenate([self._ids, np.asarray(self._buffer_ids, dtype=np.int64)])
+
+        if self._dead:
+            live = np.fromiter((zone_id in self._zones for zone_id in ids.tolist()),
+                               dtype=bool, count=len(ids))
+            lo, hi, ids = lo[live], hi[live], ids[live]
+
+        order = np.argsort(lo, kind='stable')
+        self._lo, self._hi, self._ids = lo[order], hi[order], ids[order]
+        self._buffer_lo, self._buffer_hi, self._buffer_ids = [], [], []
+        self._dead = 0